@@ -75,9 +75,9 @@ class amc(object):
 
         # Python Class and Version
         self.pyclass = "AMC"
-        self.computer = os.environ["COMPUTERNAME"]
-        self.domain = os.environ["USERDOMAIN"]
-        self.condaenv = os.environ["CONDA_DEFAULT_ENV"]
+        self.computer = os.environ.get("COMPUTERNAME", socket.gethostname()) # Windows variables (absent on other systems, e.g., offline runs with amcarcpy)
+        self.domain = os.environ.get("USERDOMAIN", socket.getfqdn())
+        self.condaenv = os.environ.get("CONDA_DEFAULT_ENV", os.path.basename(sys.prefix))
         self.sysver = sys.version
 
         # Initiate global class variables from definitions
@@ -0,0 +1,332 @@
+##############################################################
+# PYTHON AUTOMATED MAP CHECKING ANALYSIS                     #
+# ALD Class Definition                                       #
+# Version: 1.6                                               #
+# Author: Dr. Kostas Alexandridis, GISP                      #
+# Organization: OC Survey Geospatial Services                #
+# Date: August 2020                                          #
+##############################################################
+
+
+#============================================================#
+# PRELIMINARIES AND LIBRARIES                                #
+#============================================================#
+
+
+# Importing the required libraries into the project
+import os, io, re, sys, copy, multiprocessing, concurrent.futures
+import amcresult
+from docx import Document
+from docx.shared import Pt, RGBColor
+from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+
+
+
+#============================================================#
+# DOCUMENT TEMPLATES                                         #
+#============================================================#
+
+# Parsed Word templates, keyed by path: each process (e.g., each batch worker) parses a template once and copies it for every document
+templateCache = {}
+
+# The surveyor's seal image (bytes), set once in each batch worker (see initWorker)
+sealImage = None
+
+# Keywords of the legal description paragraph set in bold (the longest keywords first)
+KEYWORDS = re.compile(r"(COMMENCING|TRUE POINT OF BEGINNING|POINT OF BEGINNING|EXCEPTING THEREFROM|BEGINNING(?= at))")
+
+
+
+def loadTemplate(template):
+    """
+    Function: Load Template
+        Returns a new Word document from a template, parsing the template once per process and copying the parsed template afterwards.
+    """
+    if template not in templateCache:
+        templateCache[template] = Document(template)
+    return copy.deepcopy(templateCache[template])
+
+
+
+def parcelDescription(jsonString, poid, scale):
+    """
+    Function: Parcel Description
+        Returns the preamp and course (grid or ground) of a parcel's legal description: the parcel's own description (LegalDescription['Parcels'], version 1.6), or the map's description for earlier versions of the JSON data string that have no parcel descriptions. Raises a KeyError for a parcel without a legal description (e.g., a Not a Part excepted area).
+    """
+    legal = jsonString["LegalDescription"]
+    if "Parcels" not in legal:
+        return legal[scale.capitalize()]
+    if str(poid) not in legal["Parcels"]:
+        raise KeyError("Parcel {} has no legal description (parcels: {})".format(poid, ", ".join(legal["Parcels"])))
+    return legal["Parcels"][str(poid)][scale.capitalize()]
+
+
+
+def parcelIds(jsonString, poid=None):
+    """
+    Function: Parcel IDs
+        Returns the parcel IDs (as strings) of a legal description: a single parcel ID, a list of parcel IDs, or None for all the described parcels of the map (in the order of LegalDescription['Parcels'], or of Controls.Areas for earlier versions of the JSON data string).
+    """
+    if poid is None:
+        legal = jsonString["LegalDescription"]
+        return list(legal["Parcels"]) if "Parcels" in legal else list(jsonString["Controls"]["Areas"])
+    if isinstance(poid, (list, tuple)):
+        return [str(p) for p in poid]
+    return [str(poid)]
+
+
+
+def exhibitLetter(first, offset):
+    """
+    Function: Exhibit Letter
+        Returns the exhibit letter that follows the first exhibit letter by an offset (A, B, ..., Z, AA, AB, ...).
+    """
+    number = 0
+    for c in first.upper():
+        number = number * 26 + ord(c) - 64
+    number += offset
+    letters = ""
+    while number > 0:
+        number, r = divmod(number - 1, 26)
+        letters = chr(65 + r) + letters
+    return letters
+
+
+
+def documentName(title, poid, scale):
+    """
+    Function: Document Name
+        Returns the unique file name of the legal description document of a map's parcel at a scale (e.g., TR18141_P1_Ground.docx), or of the map's combined document of all its parcels when the parcel ID is None (e.g., TR18141_Ground.docx).
+    """
+    name = "".join(c if c.isalnum() or c in "-_" else "_" for c in str(title))
+    if poid is None:
+        return "{}_{}.docx".format(name, scale.capitalize())
+    return "{}_P{}_{}.docx".format(name, poid, scale.capitalize())
+
+
+
+
+#============================================================#
+# AUTOMATED LEGAL DESCRIPTION                                #
+#============================================================#
+
+
+def writeDescription(doc, jsonString, scale="ground", fontName="Arial", fontSize=10, exhibitNo="A", poid=1, seal=None):
+    """
+    Function: Write Description
+        Writes the formatted legal description exhibit of a parcel in either ground or grid coordinates to a Word document (see loadTemplate), and returns the document. The seal is the path or the bytes of the surveyor's seal image.
+    """
+
+    # Get the scale factor from the JSON string
+    scalefactor = float(jsonString["Controls"]["ScaleFactor"])
+
+
+    # Initializing document settings
+    style = doc.styles["Normal"]
+    font = style.font
+    font.name = fontName
+    font.size = Pt(fontSize)
+    font.color.rgb = RGBColor(0, 0, 0) # Black color
+        
+    # Document title
+    parTitle = doc.add_heading(f"EXHIBIT {exhibitNo}")
+    parTitle.style = doc.styles["Heading 1"]
+    parTitle.font = parTitle.style.font
+    parTitle.font.bold = True
+    parTitle.font.size = Pt(fontSize + 2)
+    parTitle.font.color.rgb = RGBColor(0, 0, 0) # Black
+    parTitle.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+
+    # Document heading
+    parHead = doc.add_paragraph(jsonString["Controls"]["Title"])
+    parHead.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+
+    parLDHead = doc.add_paragraph("LEGAL DESCRIPTION")
+    parLDHead.style = doc.styles["Heading 2"]
+    parLDHead.font = parLDHead.style.font
+    parLDHead.font.bold = True
+    parLDHead.font.color.rgb = RGBColor(0, 0, 0)
+    parLDHead.alignment = WD_PARAGRAPH_ALIGNMENT.LEFT
+
+
+    # First Paragraph (Map description and preamble)
+    mapstring = jsonString["LegalDescription"]["Map"]
+    doc.add_paragraph(mapstring)
+
+    # Main Paragraph (the preamp and the course, with the commencing and beginning keywords in bold)
+    description = parcelDescription(jsonString, poid, scale)
+    p = doc.add_paragraph()
+    text = "{} {}".format(description["Preamp"] or "", description["Course"].replace("; to", ", to")).strip()
+    for i, part in enumerate(KEYWORDS.split(text)):
+        if part:
+            run = p.add_run(part)
+            run.font.bold = i % 2 == 1
+
+    # Epilogue
+    areaSqFeet = int(jsonString["Controls"]["Areas"][str(poid)]["SquareFeet"])
+    areaAcres = round(jsonString["Controls"]["Areas"][str(poid)]["Acres"], 3)
+    doc.add_paragraph(f"Containing an area of {areaSqFeet:,} square feet, or {areaAcres:.3f} acres.")
+    doc.add_paragraph()
+    if scale == "ground":
+        scalestring = f"All values are expressed on ground values. To get the grid values, multiply values by the scale factor of {scalefactor}"
+    elif scale == "grid":
+        scalestring = f"All values are expressed on grid values. To get the ground values, divide values by the scale factor of {scalefactor}"
+    doc.add_paragraph(scalestring)
+    doc.add_paragraph()
+    doc.add_paragraph("See Exhibit <Next Exhibit> attached hereto, and made a part hereof.")
+    doc.add_paragraph()
+    doc.add_paragraph()
+    doc.add_paragraph("_________________________________________________________")
+    doc.add_paragraph(" Kevin R. Hills, PLS 6617                                      Date")
+    if seal is not None:
+        doc.add_picture(io.BytesIO(seal) if isinstance(seal, bytes) else seal)
+
+    return doc
+
+
+
+def writeExhibits(jsonString, template, scale="ground", fontName="Arial", fontSize=10, exhibitNo="A", poids=None, seal=None, combine=True):
+    """
+    Function: Write Exhibits
+        Writes the legal description exhibits of the parcels of a map, lettered in sequence from the first exhibit letter, either as one document with sequential exhibits (combine) or as one document per parcel. Returns the list of (parcel IDs, document) pairs.
+    """
+    poids = parcelIds(jsonString) if poids is None else poids
+    letters = [exhibitLetter(exhibitNo, i) for i in range(len(poids))]
+
+    if not combine:
+        return [([poid], writeDescription(loadTemplate(template), jsonString, scale, fontName, fontSize, letter, poid, seal)) for poid, letter in zip(poids, letters)]
+
+    doc = loadTemplate(template)
+    for i, (poid, letter) in enumerate(zip(poids, letters)):
+        if i > 0:
+            doc.add_page_break()
+        writeDescription(doc, jsonString, scale, fontName, fontSize, letter, poid, seal)
+    return [(poids, doc)]
+
+
+
+
+def ald(jsonpath, prjpath, template=None, seal=None, scale="ground", fontName="Arial", fontSize=10, exhibitNo="A", poid=1, combine=True):
+    """
+    Function: Automated Legal Description (ALD)
+        Returns a Word document containing a formatted legal description in either ground or grid coordinates.
+        The poid is a single parcel ID, a list of parcel IDs, or None for all the parcels of the map. The parcels' exhibits are lettered in sequence from the exhibit number, and written to one document with sequential exhibits (combine, Reference.docx), or to one document per parcel (returned as a list, see documentName).
+        Only the Controls and LegalDescription sections of the JSON data string are read: with a sectioned output (jsonResponse.index.json or jsonResponse.zip, see amcresult.writeResponse) the boundary records are never loaded.
+    """
+    
+    # Import the JSON string (the sections used by the legal description)
+    jsonString = amcresult.readResponse(jsonpath, ["Controls", "LegalDescription"])
+
+    # The output path of the results (same as the directory with the JSON file)
+    outpath = os.path.split(jsonpath)[0]
+
+    # Template check (relative paths are in the project directory)
+    if template is None:
+        template = "LDTemplate.docx"
+    template = os.path.join(prjpath, template)
+
+    # Seal check
+    if seal is None:
+        seal = "SealKH.png"
+    seal = os.path.join(prjpath, seal)
+
+    # Initializing the documents from the template and writing the legal descriptions
+    poids = parcelIds(jsonString, poid)
+    documents = writeExhibits(jsonString, template, scale, fontName, fontSize, exhibitNo, poids, seal, combine)
+
+    # Saving the documents:
+    if len(documents) == 1:
+        docout = os.path.join(outpath, "Reference.docx")
+        documents[0][1].save(docout)
+        return docout
+
+    docouts = []
+    for ids, doc in documents:
+        docouts.append(os.path.join(outpath, documentName(jsonString["Controls"]["Title"], ids[0], scale)))
+        doc.save(docouts[-1])
+
+    return docouts
+
+
+
+
+#============================================================#
+# BATCH AUTOMATED LEGAL DESCRIPTIONS                         #
+#============================================================#
+
+
+def initWorker(seal):
+    """
+    Function: Initialize Worker
+        Sets the surveyor's seal image (bytes) of a batch worker process.
+    """
+    global sealImage
+    sealImage = seal
+
+
+
+def mapDocuments(jsonpath, template, scales, fontName, fontSize, exhibitNo, poids, outpath, combine):
+    """
+    Function: Map Documents
+        Writes the legal description documents of the parcels of one map (one document per parcel and scale, or one combined document per scale), and returns their paths. Runs in a batch worker process.
+    """
+    jsonString = amcresult.readResponse(jsonpath, ["Controls", "LegalDescription"])
+    outpath = outpath or os.path.split(jsonpath)[0]
+    title = jsonString["Controls"]["Title"]
+    poids = parcelIds(jsonString, poids)
+
+    documents = []
+    for scale in scales:
+        for ids, doc in writeExhibits(jsonString, template, scale, fontName, fontSize, exhibitNo, poids, sealImage, combine):
+            docout = os.path.join(outpath, documentName(title, ids[0] if len(ids) == 1 else None, scale))
+            doc.save(docout)
+            documents.append(docout)
+
+    return documents
+
+
+
+def batchAld(jsonpaths, prjpath, template=None, seal=None, scales=("ground",), fontName="Arial", fontSize=10, exhibitNo="A", poids=None, outpath=None, workers=1, combine=False):
+    """
+    Function: Batch Automated Legal Descriptions
+        Writes the legal description documents of many maps across a process pool: one document per map, parcel and scale (or per map and scale, with the parcels as sequential exhibits), named after the map (see documentName). Each worker parses the template once, and the seal image is read once for all the workers.
+
+    INPUT
+        jsonpaths: the paths to the JSON data strings of the maps (jsonResponse.json, or any layout of amcresult.writeResponse).
+        prjpath: the path to the project directory (holding the default template and seal).
+        template: (optional) the Word document template (default = None, LDTemplate.docx in the project directory).
+        seal: (optional) the surveyor's seal image (default = None, SealKH.png in the project directory).
+        scales: (optional) the scales of the documents: 'grid' and/or 'ground' (default = ('ground',)).
+        fontName, fontSize, exhibitNo: (optional) the document font and the first exhibit letter of each map, lettered in sequence over its parcels (default = 'Arial', 10, 'A').
+        poids: (optional) the parcel IDs of the documents of each map (default = None, all the parcels in the map's Controls.Areas).
+        outpath: (optional) the directory of the documents (default = None, the directory of each map's JSON data string).
+        workers: (optional) the number of worker processes; 1 writes the documents in this process and 0 uses all the processor cores (default = 1).
+        combine: (optional) whether the parcels of each map are written as sequential exhibits of one document per scale (default = False).
+
+    OUTPUT
+        A dictionary keyed by the JSON data string path of the list of document paths of each map.
+
+    NOTES
+        On Windows the worker processes re-import the calling script, so scripts using more than one worker must guard their entry point with `if __name__ == "__main__":`.
+    """
+    template = os.path.join(prjpath, template or "LDTemplate.docx")
+    with open(os.path.join(prjpath, seal or "SealKH.png"), "rb") as file:
+        sealBytes = file.read()
+    workers = workers or os.cpu_count() or 1
+    tasks = (template, tuple(scales), fontName, fontSize, exhibitNo, poids, outpath, combine)
+
+    # Serial processing: a single worker or a single map
+    if workers <= 1 or len(jsonpaths) <= 1:
+        initWorker(sealBytes)
+        return {jsonpath: mapDocuments(jsonpath, *tasks) for jsonpath in jsonpaths}
+
+    # Within ArcGIS Pro the interpreter is the application itself; the workers need the environment's python executable
+    if os.name == "nt" and not os.path.basename(sys.executable).lower().startswith("python"):
+        multiprocessing.set_executable(os.path.join(sys.exec_prefix, "python.exe"))
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=min(workers, len(jsonpaths)), initializer=initWorker, initargs=(sealBytes,)) as pool:
+        futures = {jsonpath: pool.submit(mapDocuments, jsonpath, *tasks) for jsonpath in jsonpaths}
+        return {jsonpath: futures[jsonpath].result() for jsonpath in jsonpaths}
+
+
+#========================= END OF PROGRAM =========================#
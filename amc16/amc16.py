@@ -9,7 +9,14 @@
 
 
 # Importing the required libraries into the project
-import arcpy, os, sys, math, json, datetime, socket, pandas
+import arcpy, os, re, sys, math, json, datetime, socket, pandas, numpy
+import amcgeom, amcgraph, amcpool, amcadjust, amcdesc, amcresult, amcprofile
+
+# Count the cursors, rows, geoprocessing tools and server queries of each stage of the AMC run (see amcprofile)
+arcpy = amcprofile.arcpyCounter(arcpy)
+
+# Lot labels of the drawing annotation: a lot number ("12", "12A"), or a lot or parcel number or letter ("LOT 12", "LOT A", "PARCEL 2")
+LOT_LABEL = re.compile(r"^(?:(?:LOT|PARCEL)\s+([0-9]+[A-Z]?|[A-Z]{1,2})|([0-9]+[A-Z]?))$", re.IGNORECASE)
 
 
 
@@ -21,6 +28,7 @@ import arcpy, os, sys, math, json, datetime, socket, pandas
 #============================================================#
 
 
+@amcprofile.profileClass
 class amc(object):
     """
     Class AMC: This class contains a number of functions, methods and processes for Automated Map Checking analysis using CAD drawings.
@@ -35,6 +43,8 @@ class amc(object):
         tpob: (optional) user input that overrides the TPOB point layer in the CAD drawing, or if it does not exist in the CAD drawing (default = None).
         direction: (optional) user input defining the direction (clockwise or counter-clockwise) for the boundary course path (default = None). When default, the program uses clockwise direction.
         tolerance: (optional) the decimal accuracy to check geometry coordinates and against County database (default = 2). When default, then the accuracy is 1/100th of a foot.
+        wkt: (optional) whether to store the Well Known Text (WKT) geometry of the boundary lines (default = False).
+        precision: (optional) the minimum precision ratio (1:N) of the traverse closure of each parcel's course for the closure check to pass (default = 10000, i.e., 1:10,000).
 
     OUTPUT
         Reference.gdb: geodatabase conatining all the separate, checked, and corrected layers of the CAD drawing's geometry. These include boundaries (with correct directional geometries); geodetic horizontal control points (checked and verified with corrected geometry if needed); lot lines, centerlines, geodetic ties, etc.
@@ -53,7 +63,7 @@ class amc(object):
 
     #==================== AMC Class Function: Initialization ====================#
 
-    def __init__(self, cadpath, prjpath, outpath, cadname, scale, scalefactor, tpob=None, direction=None, tolerance=2):
+    def __init__(self, cadpath, prjpath, outpath, cadname, scale, scalefactor, tpob=None, direction=None, tolerance=2, wkt=False, workers=1, precision=10000, profile=None, profileFraction=1.0, angularTolerance=amcgeom.ANGULAR_TOLERANCE):
         """
         Function Class Initalization (AMC): Returns an amc class object for further processing.
 
@@ -66,6 +76,12 @@ class amc(object):
             tpob: (optional) user input that overrides the TPOB point layer in the CAD drawing, or if it does not exist in the CAD drawing (default = None).
             direction: (optional) user input defining the direction (clockwise or counter-clockwise) for the boundary course path (default = None). When default, the program uses clockwise direction.
             tolerance: (optional) the decimal accuracy to check geometry coordinates and against County database (default = 2). When default, then the accuracy is 1/100th of a foot.
+            wkt: (optional) whether to store the Well Known Text (WKT) geometry of the boundary lines in the 'wkt' field and JSON data string (default = False). Vertex coordinates are always stored in 'wktpoints'.
+            workers: (optional) the number of worker processes used to process the parcels of multi-parcel boundaries concurrently (default = 1). When 0, all the processor cores are used. Scripts using more than one worker must guard their entry point with if __name__ == "__main__".
+            precision: (optional) the minimum precision ratio (1:N) of the traverse closure of each parcel's course, computed from its described bearings and distances, for the boundary closure check to pass (default = 10000, i.e., 1:10,000).
+            profile: (optional) capture a profile of each main stage (baseChecks, boundaryProcessing, createLegalDescription, boundaryToTable, finalizeReport), saved as pstats and collapsed-stack files next to ExecutionReport.txt: 'statistical' (stack sampling, low overhead) or 'deterministic' (cProfile) (default = None, no capture). See amcprofile.stageCapture.
+            profileFraction: (optional) the fraction of the runs that capture a profile, e.g., 0.05 for one run in twenty (default = 1.0).
+            angularTolerance: (optional) the largest angular difference (decimal degrees) at which two adjacent courses are tangent, radial, compound or reverse (default = 0.01, i.e., 36 seconds of arc). It is independent of the linear tolerance.
         OUTPUT
             client: an amc class object
         NOTES
@@ -84,9 +100,9 @@ class amc(object):
 
         # Python Class and Version
         self.pyclass = "AMC"
-        self.computer = os.environ["COMPUTERNAME"]
-        self.domain = os.environ["USERDOMAIN"]
-        self.condaenv = os.environ["CONDA_DEFAULT_ENV"]
+        self.computer = os.environ.get("COMPUTERNAME", socket.gethostname()) # Windows variables (absent on other systems, e.g., offline runs with amcarcpy)
+        self.domain = os.environ.get("USERDOMAIN", socket.getfqdn())
+        self.condaenv = os.environ.get("CONDA_DEFAULT_ENV", os.path.basename(sys.prefix))
         self.sysver = sys.version
 
         #--- A.2. Initiate global class variables from definitions ---#
@@ -99,6 +115,12 @@ class amc(object):
         self.tpob = tpob
         self.direction = direction
         self.tolerance = tolerance
+        self.wkt = wkt
+        self.workers = workers
+        self.precision = precision
+        self.angularTolerance = angularTolerance
+        self.profiler.capture = amcprofile.captureFor(profile, profileFraction)
+        self.renderer = amcdesc.courseRenderer(scalefactor, tolerance)
         self.warnings = []
 
         #--- A.3. Define output paths for project and geodatabase ---#
@@ -167,6 +189,7 @@ class amc(object):
         self.jsonChecks["BoundaryCorrections"] = {}
         self.jsonChecks["BoundaryLines"] = {}
         self.jsonChecks["BoundaryClosure"] = {}
+        self.jsonChecks["BoundaryArea"] = {}
         self.jsonChecks["GeometryCorrections"] = {}
         self.jsonChecks["GPSChecks"] = {}
         self.jsonChecks["GeodeticControlPoints"] = {}
@@ -178,6 +201,8 @@ class amc(object):
         self.jsonControls = {}
         self.jsonControls["Title"] = self.cadname
         self.jsonControls["ScaleFactor"] = self.scalefactor
+        self.jsonControls["Tolerance"] = self.tolerance
+        self.jsonControls["AngularTolerance"] = self.angularTolerance
         self.jsonControls["MapType"] = {}
         self.jsonControls["MapID"] = {}
         self.jsonControls["MapBookType"] = {}
@@ -204,6 +229,12 @@ class amc(object):
         #--- B.1.v. JSON Part 5: legal description (jsonLegalDescription) ---#
         self.jsonLegalDescription = {}
 
+        #--- B.1.vi. JSON Part 6: lot descriptions (jsonLots, see lotProcessing) ---#
+        self.jsonLots = {}
+
+        #--- B.1.vii. JSON Part 7: traverse adjustment (jsonAdjustment, see adjustBoundary) ---#
+        self.jsonAdjustment = {}
+
         #--- B.2. Determine map type (based on naming convention) ---#
 
         #--- B.2.i. Determine if it is Tract Map (TR), Parcel Map (PM), Record of Survey (RS), or None ---#
@@ -340,8 +371,8 @@ class amc(object):
                           ["coid", "LONG", "", "Course ID"], 
                           ["poid", "LONG", "", "Parcel ID"],
                           ["tpob", "TEXT", "", "TPOB Present"],
+                          ["tpobid", "LONG", "", "TPOB Point ID"],
                           ["shapetype", "TEXT", "", "Shape Type"], 
-                          ["wkt", "TEXT", "3000", "Well Known Text (WKT) Geometry"],
                           ["nwkt", "LONG", "", "Points in WKT Geometry"],
                           ["startx", "DOUBLE", "", "Startpoint X"], 
                           ["starty", "DOUBLE", "", "Startpoint Y"], 
@@ -372,6 +403,14 @@ class amc(object):
                           ["annweb_grid", "TEXT", "", "Web Annotation (Grid)"],
                           ["annweb_ground", "TEXT", "", "Web Annotation (Ground)"]]
 
+        # The Well Known Text (WKT) geometry field is optional (limited to 3000 characters)
+        if self.wkt:
+            boundaryFields.append(["wkt", "TEXT", "3000", "Well Known Text (WKT) Geometry"])
+
+        # Cursor fields and their positions in the cursor rows
+        cursorFields = ["OID@", "SHAPE@"] + [field[0] for field in boundaryFields]
+        idx = {field: i for i, field in enumerate(cursorFields)}
+
         #--- C.2. Add fields to the boundary feature class table in the geodatabase ---#
         for field in boundaryFields:
             arcpy.AddField_management("PIQ", field_name = field[0], field_type = field[1], field_length = field[2], field_alias = field[3])
@@ -381,424 +420,307 @@ class amc(object):
         #--- C.3. Check boundary closure and populate types and coordinates ---#
 
         #--- C.3.i. Define fields for JSON data string structure ---#
+        # The boundary line records are compact typed records holding the fields of amcresult.BOUNDARY_FIELDS (null until populated)
         self.jsonBoundary = {}
-        jsonFields = ["coid", "poid", "tpob", "shapetype", "wkt", "nwkt", "wktpoints", "startx", "starty", "midx", "midy", "endx", "endy", "midchordx", "midchordy", "centerx", "centery", "bearing", "distance", "height", "arclength", "radius", "midbearing", "delta", "radbearing_cs", "radbearing_sc", "radbearing_ce", "radbearing_st", "radtangent", "desc_grid", "desc_ground", "ann_grid", "ann_ground", "annweb_grid", "annweb_ground"]
 
-        #--- C.3.ii. Loop through rows in PIQ feature class multilines and populate attribute fields ---#
-        with arcpy.da.UpdateCursor("PIQ", ["OID@", "SHAPE@"] + [field[0] for field in boundaryFields]) as cursor:
+        # Read the vertex arrays (from the Well Known Binary), true curve interior points and (optional) WKT of the boundary lines once
+        vertexArrays, interiors, wkts = {}, {}, {}
+        with arcpy.da.SearchCursor("PIQ", ["OID@", "SHAPE@"]) as cursor:
             for row in cursor:
-                oid = row[0]
-                coid = row[2]
-                self.jsonBoundary[oid] = {} # Indexing from OBJECTID
-            
-                # Create empty JSON structure for each oid
-                for field in jsonFields:
-                    self.jsonBoundary[oid][field] = {}
-
-                # Loop all fields and create an empty JSON data structure for each OID
-                self.jsonBoundary[oid]["coid"] = coid
-
-                #----------Current Feature----------
-
-                # Start point coordinates
-                start = startx, starty = row[1].firstPoint.X, row[1].firstPoint.Y
-                row[8], row[9] = self.jsonBoundary[oid]["startx"], self.jsonBoundary[oid]["starty"] = start
-
-                # Mid point coordinates
-                mid = midx, midy = row[1].positionAlongLine(0.5, True).firstPoint.X, row[1].positionAlongLine(0.5, True).firstPoint.Y
-                row[10], row[11] = self.jsonBoundary[oid]["midx"], self.jsonBoundary[oid]["midy"] = mid
-
-                # End point coordinates
-                end = endx, endy = row[1].lastPoint.X, row[1].lastPoint.Y
-                row[12], row[13] = self.jsonBoundary[oid]["endx"], self.jsonBoundary[oid]["endy"] = end
+                vertexArrays[row[0]] = amcgeom.geometryVertices(row[1].WKB)
+                if row[1].hasCurves:
+                    interiors[row[0]] = amcgeom.curveInterior(row[1].JSON)
+                if self.wkt:
+                    wkts[row[0]] = row[1].WKT
 
-                # Mid-chord coordinates
-                midchord = midchordx, midchordy = (startx + endx)/2, (starty + endy)/2
-                row[14], row[15] = self.jsonBoundary[oid]["midchordx"], self.jsonBoundary[oid]["midchordy"] = midchord
+        #--- C.3.ii. Compute the coordinate geometry of the lines along each parcel's course (and C.3.iii./C.3.iv. their descriptions, and C.5. the course's closure) ---#
 
-                # Line bearing or chord bearing
-                bearing = math.degrees(math.atan2(endx - startx, endy - starty)) % 360
-                row[18] = self.jsonBoundary[oid]["bearing"] = bearing
+        # The parcels' courses are independent: with more than one worker, they are processed concurrently, one parcel per task (the vertex arrays are shared with the worker processes)
+        options = {"scalefactor": self.scalefactor, "tolerance": self.tolerance, "angularTolerance": self.angularTolerance, "precision": self.precision, "pobstring": self.tpobstring, "controls": True, "tpobIndex": self.tpobIndex}
+        results = amcpool.processCourses(vertexArrays, interiors, self.course, options, self.workers)
 
-                # Line distance or chord length
-                distance = math.hypot(endx - startx, endy - starty)
-                row[19] = self.jsonBoundary[oid]["distance"] = distance
+        for poid in self.course:
+            # Line records of the parcel, indexed by the line OID, holding the coordinate geometry of each line (oriented along the parcel's course) and its descriptions
+            self.jsonBoundary[poid] = results[poid]["records"]
+            self.jsonChecks["BoundaryClosure"][poid] = results[poid]["closure"]
 
+            for coid, entry in self.course[poid].items():
+                oid = entry["oid"]
+                record = self.jsonBoundary[poid][oid]
 
-                # Mid-chord bearing
-                midbearing = math.degrees(math.atan2(midchordx - midx, midchordy - midy)) % 360
-                row[23] = self.jsonBoundary[oid]["midbearing"] = midbearing
+                # The parcel's course begins at its point of beginning; a TPOB point is matched by a single lookup of the line's start point in the TPOB key index (single or multiple TPOB)
+                if record["tpob"] and record["tpobid"] is not None:
+                    self.jsonControls["TPOB"]["points"][record["tpobid"]].setdefault("parcels", {})[poid] = oid
 
-                # Height of Line/Arc
-                height = math.hypot(midchordx - midx, midchordy - midy)
-                row[20] = self.jsonBoundary[oid]["height"] = height
+                # Well Known Text (WKT) from object's geometry (optional)
+                if self.wkt:
+                    record["wkt"] = wkts[oid]
 
+                # Array of vertex coordinates (along the course), kept as an array until the JSON data string is written
+                record["wktpoints"] = vertexArrays[oid][::-1] if results[poid]["reversed"][oid] else vertexArrays[oid]
 
-                # Determine shape type and compute variables for lines and curves
 
-                if height == 0: 
-                    # This is a line
-                    shapetype = "Line"
-                    row[5] = self.jsonBoundary[oid]["shapetype"] = shapetype
+        self.appendReport("\tCalculated coordinate geometry for the courses of {} parcel(s)".format(len(self.course)))
+        self.appendReport("\tGenerated line and curve descriptions for boundary features")
+        self.appendReport("\tCorrected descriptions for Legal Description formatting")
+        self.appendReport("\tMultiline Descriptions added to JSON data string")
 
-                elif height > 0: 
-                    # This is a curve
-                    shapetype = "Curve"
-                    row[5] = self.jsonBoundary[oid]["shapetype"] = shapetype
 
-                    # Arc radius length
-                    radius = (height / 2) + ((distance ** 2) / (8 * height))
-                    row[22] = self.jsonBoundary[oid]["radius"] = radius
+        #--- C.3.v. Write the attributes to the boundary feature class (a line shared by two parcels holds the values of its first parcel) ---#
+        with arcpy.da.UpdateCursor("PIQ", cursorFields) as cursor:
+            for row in cursor:
+                oid = row[0]
+                if oid not in self.courseIndex:
+                    continue
+                record = self.jsonBoundary[self.courseIndex[oid]["poid"]][oid]
+                row[idx["loid"]] = oid
+                for field in boundaryFields:
+                    if field[0] in record and record[field[0]] is not None:
+                        row[idx[field[0]]] = record[field[0]]
+
+                # The WKT field holds up to 3000 characters
+                if self.wkt and len(record["wkt"]) > 3000:
+                    row[idx["wkt"]] = None
 
-                    # Curve angle (delta)
-                    if height > (distance / 2): # below the diameter (more than half circle, e.g., cul-de-sac)
-                        delta = (360 - math.degrees(2 * math.asin(distance / (2 * radius)))) % 360
-                    else: # above or at the diamerer (less or equal of half  circle)
-                        delta = math.degrees( 2 * math.asin(distance / (2 * radius))) % 360
-                    row[24] = self.jsonBoundary[oid]["delta"] = delta
+                cursor.updateRow(row)
 
-                    # The coordinates of the center of the arc/curve
-                    center = centerx, centery = midx + (math.sin(math.radians(float(bearing))) * float(radius)), midy + (math.cos(math.radians(float(bearing))) * float(radius))
-                    row[16], row[17] = self.jsonBoundary[oid]["centerx"], self.jsonBoundary[oid]["centery"] = center
+        self.appendReport("\tCalculated and populated new fields in boundary feature class")
 
-                    # Tangent Check:
-                    radbearing_cs = math.degrees(math.atan2(startx - centerx, starty - centery)) % 360 # Radial bearing: center to start
-                    row[25] = self.jsonBoundary[oid]["radbearing_cs"] = radbearing_cs
-                    radbearing_sc = math.degrees(math.atan2(centerx - startx, centery - starty)) % 360 # Radial bearing: start to center
-                    row[26] = self.jsonBoundary[oid]["radbearing_sc"] = radbearing_sc
-                    radbearing_ce = math.degrees(math.atan2(endx - centerx, endy - centery)) % 360 # Radial bearing: center to end
-                    row[27] = self.jsonBoundary[oid]["radbearing_ce"] = radbearing_ce
-                    radbearing_st = (90 + radbearing_cs) % 360 # Radial Tangent Angle at start
-                    row[28] = self.jsonBoundary[oid]["radbearing_st"] = radbearing_st
+        #--- C.5. Check the traverse closure (misclosure and precision ratio) of each parcel's course ---#
+        self.appendReport("\tTraverse Closure Check (minimum precision 1:{:,}):".format(self.precision))
+        for poid in self.course:
+            closure = self.jsonChecks["BoundaryClosure"][poid]
+            self.appendReport("\t\tParcel {}: Latitudes {:.4f}, Departures {:.4f}, Misclosure {:.4f} feet bearing {}, Perimeter {:.2f} feet, Precision {}: {}".format(poid, closure["Latitudes"], closure["Departures"], closure["Misclosure"], self.dd2dms(closure["Bearing"]), closure["Perimeter"], closure["Ratio"], closure["Status"]))
+            for i, ring in enumerate(closure["Rings"][1:], 1):
+                self.appendReport("\t\t\tExcepted area {}: Misclosure {:.4f} feet, Precision {}: {}".format(i, ring["Misclosure"], ring["Ratio"], ring["Status"]))
 
-                    # Calculate arc length:
-                    arclength = (2 * math.pi * radius) * (delta / 360) # Arc Length
-                    row[21] = self.jsonBoundary[oid]["arclength"] = arclength
+        if self.jsonBoundary is not None:
+            self.appendReport("\tBoundary Features Processing Complete: Passed\n")
+        else:
+            self.appendReport("\tBoundary Features Processing Complete: Failed\n")
 
+        #--- C.4. Write the derived annotation labels for the boundary geometry to the JSON string ---#
+        for scale in ["Grid", "Ground"]:
+            self.appendReport("Annotation Labels ({})".format(scale))
+            for poid in self.course:
+                if len(self.course) > 1:
+                    self.appendReport("\tParcel {}".format(poid))
+                for coid in self.course[poid]:
+                    jrow = self.jsonBoundary[poid][self.course[poid][coid]["oid"]]
+                    self.appendReport("\tCOID {} ({}): {}".format(coid, jrow["shapetype"], jrow["ann_{}".format(scale.lower())].replace("Δ", "D")))
+            self.appendReport("")
 
+        etime = datetime.datetime.now().strftime("%m/%d/%Y %H:%M %p")
+        self.appendReport("\nScript Completed on {}\n\n".format(etime))
 
-                # Match the TPOB with the boundary files:
+        return
 
-                # Single TPOB
-                if self.jsonControls["TPOB"]["count"] == 1:
-                    coortpob = self.truncate(self.jsonControls["TPOB"]["points"][1]["x"], self.tolerance), self.truncate(self.jsonControls["TPOB"]["points"][1]["y"], self.tolerance)
-                    coorstart = self.truncate(startx, self.tolerance), self.truncate(starty, self.tolerance)
-                    if coortpob == coorstart:
-                        row[4] = self.jsonBoundary[oid]["tpob"] = True
-                    else:
-                        row[4] = self.jsonBoundary[oid]["tpob"] = False
-
-                # Multiple TPOB
-                elif self.jsonControls["TPOB"]["count"] > 1:
-                    for i in self.jsonControls["TPOB"]["points"]:
-                        coortpob = self.truncate(self.jsonControls["TPOB"]["points"][i]["x"], self.tolerance), self.truncate(self.jsonControls["TPOB"]["points"][i]["y"], self.tolerance)
-                        coorstart = self.truncate(startx, self.tolerance), self.truncate(starty, self.tolerance)
-                        if coortpob == coorstart:
-                            row[4] = self.jsonBoundary[oid]["tpob"] = True
-                        else:
-                            row[4] = self.jsonBoundary[oid]["tpob"] = False
 
 
-                # Well Known Text (WKT) from object's geometry
-                wkt = row[1].WKT
-                row[6] = self.jsonBoundary[oid]["wkt"] = wkt
 
-                # Convert WKT to array format
-                wktpoints = [i.split(" ") for i in wkt.split("((")[1].split("))")[0].split(", ")]
-                # if float needed (to be tested use the code below)
-                wktpoints = [[float(j) for j in i] for i in wktpoints]
-                self.jsonBoundary[oid]["wktpoints"] = wktpoints
-            
-                # List and number of points in WKT
-                wktlist = wkt.split("((")[1].split("))")[0].replace(" 0, ",",").replace(" 0", "").split(",")
-                nwkt = len(wktlist) # Number of points in WKT geometry
-                row[7] = self.jsonBoundary[oid]["wktcount"] = nwkt
 
-                cursor.updateRow(row)
 
+    #==================== AMC Class Function: Create Legal Description ====================#
 
-        self.appendReport("\tCalculated and populated new fields in boundary feature class")
+    def createLegalDescription(self):
+        """AMC Class Function: Create Legal Description
+        Generates a legal description document after boundary processing data
+        """
+        #=== SECTION D: Process Legal Description ===#
 
+        stime = datetime.datetime.now().strftime("%m/%d/%Y %H:%M %p")
+        self.appendReport("\n{:-^80s}\n".format(" PART 3: AMC LEGAL DESCRIPTION PROCESSING "))
+        self.appendReport("Script Started on: {}\n".format(stime))
 
-        #--- C.3.iii. Repeat the same loop after writing all the previous fields and variables ---#
-        with arcpy.da.UpdateCursor("PIQ", ["OID@", "SHAPE@"] + [field[0] for field in boundaryFields]) as cursor:
-            for row in cursor:
-                oid = row[0]
-                coid = row[2]
-                # Total number of features in feature class:
-                nrows = int(arcpy.GetCount_management("PIQ")[0])
-
-                # Get the last feature from the current one looping:
-                if coid == 1:
-                    lcoid = nrows # Last coid
-                elif coid > 1:
-                    lcoid = coid - 1
-
-                #---------- Current Feature ----------
-
-                # Get shapetype, start, mid, end, chordlength, midchord and height from feature attributes
-                shapetype = row[5]
-                start = startx, starty = row[8], row[9]
-                mid = midx, midy = row[10], row[11]
-                end = endx, endy = row[12], row[13]
-                midchord = midchordx, midchordy = row[14], row[15]
-                center = centerx, centery = row[16], row[17]
-                bearing = row[18]
-                distance = row[19]            
-                height = row[20]
-                arclength = row[21]
-                radius = row[22]
-                midbearing = row[23]
-                delta = row[24]
-                radbearing_cs = row[25]
-                radbearing_sc = row[26]
-                radbearing_ce = row[27]
-                radbearing_st = row[28]
-
-
-
-                # Get the preamp for the description
-                if self.jsonBoundary[oid]["tpob"] is True:
-                    preamp = "Thence from said {}".format(self.tpobstring)
-                else:
-                    preamp = " Thence"
 
-                # Get the closing for the description
-                if coid == nrows:
-                    closing = " to the {}".format(self.tpobstring)
-                else:
-                    closing = ""
-
-
-                # If current feature is a line:
-                if shapetype == "Line":
-
-                    # Get the line description string depending on the bearing direction
-                    if 0 <= bearing <= 90:
-                        dbearing = "North {} East".format(self.dd2dms(bearing))
-                        abearing = "N {} E".format(self.dd2dms(bearing))
-                    elif 90 < bearing <= 180:
-                        dbearing = "South {} East".format(self.dd2dms(180 - bearing))
-                        abearing = "S {} E".format(self.dd2dms(180 - bearing))
-                    elif 180 < bearing <= 270:
-                        dbearing = "South {} West".format(self.dd2dms(bearing - 180))
-                        abearing = "S {} W".format(self.dd2dms(bearing - 180))
-                    elif 270 < bearing <= 360:
-                        dbearing = "North {} West".format(self.dd2dms(360 - bearing))
-                        abearing = "N {} W".format(self.dd2dms(360 - bearing))
-
-                    # Legal description (line)
-                    desc_grid = "{} {}, {:.2f} feet;{}".format(preamp, dbearing, self.truncate(distance, self.tolerance), closing)
-                    desc_ground = "{} {} {:.2f} feet;{}".format(preamp, dbearing, self.truncate(distance/self.scalefactor, self.tolerance), closing)
-                    row[30] = self.jsonBoundary[oid]["desc_grid"] = desc_grid
-                    row[31] = self.jsonBoundary[oid]["desc_ground"] = desc_ground
-
-                    # Annotation (line) for labels and web use
-                    ann_grid = "{}  {:.2f}".format(abearing, self.truncate(distance, self.tolerance))
-                    ann_ground = "{}  {:.2f}".format(abearing, self.truncate(distance/self.scalefactor, self.tolerance))
-                    row[32] = self.jsonBoundary[oid]["ann_grid"] = ann_grid
-                    row[33] = self.jsonBoundary[oid]["ann_ground"] = ann_ground
-                    annweb_grid = "{}\n{:.2f}".format(abearing, self.truncate(distance, self.tolerance))
-                    annweb_ground = "{}\n{:.2f}".format(abearing, self.truncate(distance/self.scalefactor, self.tolerance))
-                    row[34] = self.jsonBoundary[oid]["annweb_grid"] = annweb_grid
-                    row[35] = self.jsonBoundary[oid]["annweb_ground"] = annweb_ground
-
-
-                # Else, if current feature is a curve:
-                elif shapetype == "Curve":
-
-                    # Premp for description
-                    if self.jsonBoundary[oid]["tpob"] is False:
-                        preamp = ""
-
-                    # Get the characteristics of the previous (last) feature
-                    with arcpy.da.SearchCursor("PIQ", ["OID@", "SHAPE@"] + [field[0] for field in boundaryFields]) as lcursor:
-                        for lrow in lcursor:
-                            if lrow[2] == lcoid:
-                                loid = lrow[0]
-                                ltpob = lrow[4]
-                                lshapetype = lrow[5]
-                                lstart = lstartx, lstarty = lrow[8], lrow[9]
-                                lmid = lmidx, lmidy = lrow[10], lrow[11]
-                                lend = lendx, lendy = lrow[12], lrow[13]
-                                lmidchord = lmidchordx, lmidchordy = lrow[14], lrow[15]
-                                lcenter = lcenterx, lcentery = lrow[16], lrow[17]
-                                lbearing = lrow[18]
-                                ldistance = lrow[19]
-                                lheight = lrow[20]
-                                larclength = lrow[21]
-                                lradius = lrow[22]
-                                lmidbearing = lrow[23]
-                                ldelta = lrow[24]
-                                lradbearing_cs = lrow[25]
-                                lradbearing_sc = lrow[26]
-                                lradbearing_ce = lrow[27]
-                                lradbearing_st = lrow[28]
-
-
-                    # Determine the last shape:
-                    if lshapetype == "Line":
-                        # if the line bearing equals to the tangent bearing of the center-to-startpoint angle
-                        if self.truncate(radbearing_st, self.tolerance) == self.truncate(lbearing, self.tolerance):
-                            radtangent = "Tangent"
-                        else:
-                            radtangent = "Non-Tangent"
+        #--- D.1. Create a map description ---#
+        self.describeMapDocument()
+        self.jsonLegalDescription["Map"] = self.mapdesc
+        self.jsonLegalDescription["Parcels"] = {}
+
+        for poid in self.course:
+
+            #--- D.2. Create a Preamp (for Grid and Ground versions) from Horizontal Controls ---#
+            self.describeHorizontalControls(poid)
+
+            #--- D.3. Create the legal description ---#
+            ldtext = []
+            gldtext = []
+            for coid in self.course[poid]:
+                oid = self.course[poid][coid]["oid"]
+                desc = self.jsonBoundary[poid][oid]["desc_grid"]
+                gdesc = self.jsonBoundary[poid][oid]["desc_ground"]
+                ldtext.append(desc)
+                gldtext.append(gdesc)
+            self.ld = "".join(ldtext).replace("; to the", ", to the")
+            self.gld = "".join(gldtext).replace("; to the", ", to the")
+
+            # Parcel heading for multi-parcel boundaries
+            heading = " - PARCEL {}".format(poid) if len(self.course) > 1 else ""
+
+            # Write Legal Description to Report (grid)
+            self.appendReport("\n\nLEGAL DESCRIPTION (GRID){}\n".format(heading))
+            self.appendReport("\t{}".format(self.mapdesc))
+            self.appendReport("\t{}".format(self.preamp))
+            self.appendReport("\t{}\n".format(self.ld))
+
+            # Write Legal Description to Report (ground)
+            self.appendReport("\n\nLEGAL DESCRIPTION (GROUND){}\n".format(heading))
+            self.appendReport("\t{}".format(self.mapdesc))
+            self.appendReport("\t{}".format(self.gpreamp))
+            self.appendReport("\t{}\n".format(self.gld))
+
+            # Compile the JSON data for the legal description of the parcel
+            self.jsonLegalDescription["Parcels"][poid] = {}
+            self.jsonLegalDescription["Parcels"][poid]["Grid"] = {"Preamp": self.preamp, "Course": self.ld}
+            self.jsonLegalDescription["Parcels"][poid]["Ground"] = {"Preamp": self.gpreamp, "Course": self.gld}
+
+        # The first parcel's description is also kept at the top level (single parcel layout)
+        if len(self.course) > 0:
+            first = self.jsonLegalDescription["Parcels"][next(iter(self.course))]
+            self.jsonLegalDescription["Grid"] = first["Grid"]
+            self.jsonLegalDescription["Ground"] = first["Ground"]
+        
+        etime = datetime.datetime.now().strftime("%m/%d/%Y %H:%M %p")
+        self.appendReport("\nScript Completed on {}\n\n".format(etime))
 
-                    elif lshapetype == "Curve":
-                        if self.truncate(radbearing_cs, self.tolerance) == self.truncate(lradbearing_ce, self.tolerance):
-                            radtangent = "Compound"
-                        elif self.truncate(radbearing_cs, self.tolerance) == self.truncate(180 + lradbearing_ce, self.tolerance):
-                            radtangent = "Reverse"
-                        else:
-                            radtangent = "Non-Tangent"
-
-                    row[29] = self.jsonBoundary[oid]["radtangent"] = radtangent
-
-                    # Curve Description:
-
-                    if radtangent == "Tangent":
-                        desc_grid = "{} to the beginning of a curve, concave {}, and having a radius of {:.2f} feet; Thence {} along said curve {:.2f} feet through a central angle of {};{}".format(preamp, self.bearingLabel(midbearing), self.truncate(radius, self.tolerance), self.bearingLabel(bearing), self.truncate(arclength, self.tolerance), self.dd2dms(delta), closing)
-                        desc_ground = "{} to the beginning of a curve, concave {}, and having a radius of {:.2f} feet; Thence {} along said curve {:.2f} feet through a central angle of {};{}".format(preamp, self.bearingLabel(midbearing), self.truncate(radius/self.scalefactor, self.tolerance), self.bearingLabel(bearing), self.truncate(arclength/self.scalefactor, self.tolerance), self.dd2dms(delta), closing)
-                        ann_grid = "{}={}  R={:.2f}  L={:.2f}".format("\N{GREEK CAPITAL LETTER DELTA}", self.dd2dms(delta), self.truncate(radius, self.tolerance), self.truncate(arclength, self.tolerance))
-                        ann_ground = "{}={}  R={:.2f}  L={:.2f}".format("\N{GREEK CAPITAL LETTER DELTA}", self.dd2dms(delta), self.truncate(radius/self.scalefactor, self.tolerance), self.truncate(arclength/self.scalefactor, self.tolerance))
-                        annweb_grid = "{}={}\nR={:.2f}\nL={:.2f}".format("\u0394", self.dd2dms(delta), self.truncate(radius, self.tolerance), self.truncate(arclength, self.tolerance))
-                        annweb_ground = "{}={}\nR={:.2f}\nL={:.2f}".format("\u0394", self.dd2dms(delta), self.truncate(radius/self.scalefactor, self.tolerance), self.truncate(arclength/self.scalefactor, self.tolerance))
-
-                    elif radtangent == "Compound":
-                        desc_grid = "{} to the beginning of a compound curve concave {} and having a radius of {:.2f} feet; Thence {} along said curve {:.2f} feet through a central angle of {};{}".format(preamp, self.bearingLabel(midbearing), self.truncate(radius, self.tolerance), self.bearingLabel(bearing), self.truncate(arclength, self.tolerance), self.dd2dms(delta), closing)
-                        desc_ground = "{} to the beginning of a compound curve {} and having a radius of {:.2f} feet; Thence {} along said curve {:.2f} feet through a central angle of {};{}".format(preamp, self.bearingLabel(midbearing), self.truncate(radius/self.scalefactor, self.tolerance), self.bearingLabel(bearing), self.truncate(arclength/self.scalefactor, self.tolerance), self.dd2dms(delta), closing)
-                        ann_grid = "{}={}  R={:.2f}  L={:.2f}".format("\N{GREEK CAPITAL LETTER DELTA}", self.dd2dms(delta), self.truncate(radius, self.tolerance), self.truncate(arclength, self.tolerance))
-                        ann_ground = "{}={}  R={:.2f}  L={:.2f}".format("\N{GREEK CAPITAL LETTER DELTA}", self.dd2dms(delta), self.truncate(radius/self.scalefactor, self.tolerance), self.truncate(arclength/self.scalefactor, self.tolerance))
-                        annweb_grid = "{}={}\nR={:.2f}\nL={:.2f}".format("\u0394", self.dd2dms(delta), self.truncate(radius, self.tolerance), self.truncate(arclength, self.tolerance))
-                        annweb_ground = "{}={}\nR={:.2f}\nL={:.2f}".format("\u0394", self.dd2dms(delta), self.truncate(radius/self.scalefactor, self.tolerance), self.truncate(arclength/self.scalefactor, self.tolerance))
-
-                    elif radtangent == "Reverse":
-                        desc_grid = "{} to the beginning of a reverse curve concave {} and having a radius of {:.2f} feet; Thence {} along said curve {:.2f} feet through a central angle of {};{}".format(preamp, self.bearingLabel(midbearing), self.truncate(radius, self.tolerance), self.bearingLabel(bearing), self.truncate(arclength, self.tolerance), self.dd2dms(delta), closing)
-                        desc_ground = "{} to the beginning of a reverse curve concave {} and having a radius of {:.2f} feet; Thence {} along said curve {:.2f} feet through a central angle of {};{}".format(preamp, self.bearingLabel(midbearing), self.truncate(radius/self.scalefactor, self.tolerance), self.bearingLabel(bearing), self.truncate(arclength/self.scalefactor, self.tolerance), self.dd2dms(delta), closing)
-                        ann_grid = "{}={}  R={:.2f}  L={:.2f}".format("\N{GREEK CAPITAL LETTER DELTA}", self.dd2dms(delta), self.truncate(radius, self.tolerance), self.truncate(arclength, self.tolerance))
-                        ann_ground = "{}={}  R={:.2f}  L={:.2f}".format("\N{GREEK CAPITAL LETTER DELTA}", self.dd2dms(delta), self.truncate(radius/self.scalefactor, self.tolerance), self.truncate(arclength/self.scalefactor, self.tolerance))
-                        annweb_grid = "{}={}\nR={:.2f}\nL={:.2f}".format("\u0394", self.dd2dms(delta), self.truncate(radius, self.tolerance), self.truncate(arclength, self.tolerance))
-                        annweb_ground = "{}={}\nR={:.2f}\nL={:.2f}".format("\u0394", self.dd2dms(delta), self.truncate(radius/self.scalefactor, self.tolerance), self.truncate(arclength/self.scalefactor, self.tolerance))
-
-                    elif radtangent == "Non-Tangent":
-                        # Get the tangent description string depending on the bearing direction
-                        if 0 <= radbearing_cs <= 90:
-                            dbearing = "North {} East".format(self.dd2dms(radbearing_cs))
-                        elif 90 < radbearing_cs <= 180:
-                            dbearing = "South {} East".format(self.dd2dms(180 - radbearing_cs))
-                        elif 180 < radbearing_cs <= 270:
-                            dbearing = "South {} West".format(self.dd2dms(radbearing_cs - 180))
-                        elif 270 < radbearing_cs <= 360:
-                            dbearing = "North {} West".format(self.dd2dms(360 - radbearing_cs))
-
-                        desc_grid = "{} to the beginning of a non-tangent curve, concave {}, and having a radius of {:.2f} feet, a radial line to said beginning of curve bears {}; Thence {} along said curve {:.2f} feet through a central angle of {};{}".format(preamp, self.bearingLabel(midbearing), self.truncate(radius, self.tolerance), dbearing, self.bearingLabel(bearing), self.truncate(arclength, self.tolerance), self.dd2dms(delta), closing)
-                        desc_ground = "{} to the beginning of a non-tangent curve, concave {}, and having a radius of {:.2f} feet, a radial line to said beginning of curve bears {}; Thence {} along said curve {:.2f} feet through a central angle of {};{}".format(preamp, self.bearingLabel(midbearing), self.truncate(radius/self.scalefactor, self.tolerance), dbearing, self.bearingLabel(bearing), self.truncate(arclength/self.scalefactor, self.tolerance), self.dd2dms(delta), closing)
-                        ann_grid = "{}={}  R={:.2f}  L={:.2f}".format("\N{GREEK CAPITAL LETTER DELTA}", self.dd2dms(delta), self.truncate(radius, self.tolerance), self.truncate(arclength, self.tolerance))
-                        ann_ground = "{}={}  R={:.2f}  L={:.2f}".format("\N{GREEK CAPITAL LETTER DELTA}", self.dd2dms(delta), self.truncate(radius/self.scalefactor, self.tolerance), self.truncate(arclength/self.scalefactor, self.tolerance))
-                        annweb_grid = "{}={}\nR={:.2f}\nL={:.2f}".format("\u0394", self.dd2dms(delta), self.truncate(radius, self.tolerance), self.truncate(arclength, self.tolerance))
-                        annweb_ground = "{}={}\nR={:.2f}\nL={:.2f}".format("\u0394", self.dd2dms(delta), self.truncate(radius/self.scalefactor, self.tolerance), self.truncate(arclength/self.scalefactor, self.tolerance))
-
-                    # Adding the curve description to feature attributes and JSON data string
-                    row[30] = self.jsonBoundary[oid]["desc_grid"] = desc_grid
-                    row[31] = self.jsonBoundary[oid]["desc_ground"] = desc_ground
-                    row[32] = self.jsonBoundary[oid]["ann_grid"] = ann_grid
-                    row[33] = self.jsonBoundary[oid]["ann_ground"] = ann_ground
-                    row[34] = self.jsonBoundary[oid]["annweb_grid"] = annweb_grid
-                    row[35] = self.jsonBoundary[oid]["annweb_ground"] = annweb_ground
+        return
 
-                cursor.updateRow(row)
 
+    
 
-        self.appendReport("\tGenerated line and curve descriptions for boundary features")
 
+    #==================== AMC Class Function: Lot Processing ====================#
 
+    def lotProcessing(self):
+        """AMC Class Function: Lot Processing
+        Whole-tract lot description mode: polygonizes the lot lines (LOTS) together with the boundary lines (PIQ), and runs the traverse, coordinate geometry and legal description pipeline for every lot in a single batch. Writes the description of each lot to the JSON data string (jsonLots) and a combined lot table (LotData.xlsx)
+        """
+        #=== SECTION F: Process Lot Descriptions ===#
 
-    
-        #--- C.3.iv. Make another loop for updates and corrections ---#
-        with arcpy.da.UpdateCursor("PIQ", ["OID@", "SHAPE@"] + ["coid"] + [field[0] for field in boundaryFields]) as cursor:
+        stime = datetime.datetime.now().strftime("%m/%d/%Y %H:%M %p")
+        self.appendReport("\n{:-^80s}\n".format(" PART 3.1: AMC LOT DESCRIPTION PROCESSING "))
+        self.appendReport("Script Started on: {}\n".format(stime))
 
-            # Loop through lines in multilines
+        #--- F.1. Check for the lot lines feature class ---#
+        if not arcpy.Exists("LOTS"):
+            self.jsonChecks["LotDescriptions"] = "Fail"
+            self.appendReport("\tLot lines (LOTS) feature class not found: Failed\n")
+            return
+
+        #--- F.2. Split the lot and boundary lines at their intersections, and polygonize the lots ---#
+        for fc in ["LOTLINES", "LOTPARCELS"]:
+            if arcpy.Exists(fc):
+                arcpy.Delete_management(fc)
+        arcpy.FeatureToLine_management(["PIQ", "LOTS"], "LOTLINES")
+        arcpy.FeatureToPolygon_management("LOTLINES", "LOTPARCELS")
+        arcpy.AlterAliasName("LOTPARCELS", "Property Line Lot Areas")
+        self.appendReport("Creating Property Line Lot Areas (LOTPARCELS) Polygon Feature Class.")
+
+        #--- F.3. Read the lot line geometries once and build the planar graph of the lots ---#
+        vertexArrays, interiors, keys = {}, {}, set()
+        with arcpy.da.SearchCursor("LOTLINES", ["OID@", "SHAPE@"]) as cursor:
             for row in cursor:
-                oid = row[0]
-                coid = row[2]
-                nrows = int(arcpy.GetCount_management("PIQ")[0]) # Total number of multilines
-                shapetype = row[5]
-                radtangent = row[29]
-                desc_grid = row[30]
-                desc_ground = row[31]
-
-
-                # Get the previous and next multilines:
-                if coid == 1:
-                    lcoid = nrows # Last COID
-                    ncoid = coid + 1 # Next COID
-                elif coid > 1 and coid < nrows:
-                    lcoid = coid - 1
-                    ncoid = coid + 1
-                elif coid > 1 and coid == nrows:
-                    lcoid = coid - 1
-                    ncoid = 1
-
-                # Get the characteristics of the previous feature
-                with arcpy.da.SearchCursor("PIQ", ["OID@", "SHAPE@"] + ["coid"] + [field[0] for field in boundaryFields]) as lcursor:
-                    for lrow in lcursor:
-                        if lrow[2] == lcoid:
-                            lshapetype = lrow[5]
-                            lradtangent = lrow[29]
-                            lradbearing_cs = lrow[25]
-
-
-
-                # If current feature is a Line or a Non-Tangent curve and the previous is a tangent Curve:
-                if shapetype == "Line" or radtangent == "Non-Tangent":
-                    if lshapetype == "Curve" and lradtangent == "Tangent":
-                        desc_grid = desc_grid.replace("Thence", "Thence non-tangent to said curve")
-                        desc_ground = desc_ground.replace("Thence", "Thence non-tangent to said curve")
-                        row[30] = desc_grid
-                        row[31] = desc_ground
-                        self.jsonBoundary[oid]["desc_grid"] = desc_grid
-                        self.jsonBoundary[oid]["desc_ground"] = desc_ground
-
-                # If the first feature is a curve:
-                if coid == 1 and shapetype == "Curve":
-                    #newdesc1 = f"Thence from said {tpobstring} " + desc1.split(";")[1].replace("Thence ", "")
-                    desc_grid = desc_grid.split(";")[1]
-                    desc_ground = desc_ground.split(";")[1]
-                    row[30] = desc_grid
-                    row[31] = desc_ground
-                    self.jsonBoundary[oid]["desc_grid"] = desc_grid
-                    self.jsonBoundary[oid]["desc_ground"] = desc_ground
-
-                # if current feature is a line coming from a curve (radial)
-                if shapetype == "Line" and lshapetype == "Curve":
-                    if bearing == lradbearing_cs or bearing == (180 + lradbearing_cs) % 360:
-                        desc_grid = desc_grid.replace("Thence", "Thence radial to said curve")
-                        desc_ground = desc_ground.replace("Thence", "Thence radial to said curve")
-                        row[30] = desc_grid
-                        row[31] = desc_ground
-                        self.jsonBoundary[oid]["desc_grid"] = desc_grid
-                        self.jsonBoundary[oid]["desc_ground"] = desc_ground
-
-                cursor.updateRow(row)
-    
-        self.appendReport("\tCorrected descriptions for Legal Description formatting")
-        self.appendReport("\tMultiline Descriptions added to JSON data string")
-
-        if self.jsonBoundary is not None:
-            self.appendReport("\tBoundary Features Processing Complete: Passed\n")
+                vertices = amcgeom.geometryVertices(row[1].WKB)
+                # Lines drawn on both the lot and the boundary layers are kept once
+                key = frozenset(amcgeom.coordinateKey(xy[0], xy[1], self.tolerance) for xy in (vertices[0], vertices[-1])), int(round(row[1].length * 10 ** self.tolerance))
+                if key in keys:
+                    continue
+                keys.add(key)
+                vertexArrays[row[0]] = vertices
+                if row[1].hasCurves:
+                    interiors[row[0]] = amcgeom.curveInterior(row[1].JSON)
+        lotGraph = amcgraph.planarGraph(vertexArrays, self.tolerance)
+        self.appendReport("\tLot graph: {} lines, {} enclosed areas".format(len(vertexArrays), len(lotGraph.boundedFaces())))
+
+        #--- F.4. Join the lot labels (lot numbers) of the drawing annotation to the lot areas ---#
+        lotLabels = lotGraph.faceLabels(self.readLotLabels())
+        if len(lotLabels) > 0:
+            self.appendReport("\tLot labels found in {} of {} lot areas".format(len(lotLabels), len(lotGraph.boundedFaces())))
         else:
-            self.appendReport("\tBoundary Features Processing Complete: Failed\n")
+            warning = "WARNING: No lot labels (lot numbers) found inside the lot areas in the drawing annotation. Numbering the lots by position (from north to south, then west to east)."
+            self.warnings.append(warning)
+            self.appendReport("\t{}".format(warning))
 
-        #--- C.4. Write the derived annotation labels for the boundary geometry to the JSON string ---#
-        self.appendReport("Annotation Labels (Grid)")
-        for i in range(len(self.jsonBoundary)):
-            jrow = [self.jsonBoundary[j] for j in self.jsonBoundary if self.jsonBoundary[j]["coid"] == i+1][0]
-            self.appendReport("\tCOID {} ({}): {}".format(i+1, jrow["shapetype"], jrow["ann_grid"].replace("Δ", "D")))
-
-        self.appendReport("\nAnnotation Labels (Ground)")
-        for i in range(len(self.jsonBoundary)):
-            jrow = [self.jsonBoundary[j] for j in self.jsonBoundary if self.jsonBoundary[j]["coid"] == i+1][0]
-            self.appendReport("\tCOID {} ({}): {}".format(i+1, jrow["shapetype"], jrow["ann_ground"].replace("Δ", "D")))
+        #--- F.5. Traverse the course of each lot, starting from its most northwesterly corner ---#
+        lotRegions = []
+        with arcpy.da.SearchCursor("LOTPARCELS", ["SHAPE@"]) as cursor:
+            for row in cursor:
+                x, y = row[0].labelPoint.X, row[0].labelPoint.Y
+                face = lotGraph.locateFace((x, y))
+                if face is None:
+                    self.appendReport("\tLot area at Northing {:.2f} Easting {:.2f}: no matching lot area found".format(y, x))
+                    continue
+                lotRegions.append((x, y, face, {"SquareFeet": row[0].getArea("GEODESIC", "SQUAREFEET"), "Acres": row[0].getArea("GEODESIC", "ACRES")}))
+
+        # Without lot labels, the lots are numbered sequentially by the position of their label points
+        if len(lotLabels) == 0:
+            lotRegions.sort(key=lambda region: (-region[1], region[0]))
+
+        lotCourses, lotAreas = {}, {}
+        for number, (x, y, face, areas) in enumerate(lotRegions, start=1):
+            if len(lotLabels) == 0:
+                lot = str(number)
+            else:
+                # The lot number is the label inside the lot area (the label nearest to the area's label point, if there are more than one)
+                labels = sorted(lotLabels.get(face, []), key=lambda label: math.hypot(label[0] - x, label[1] - y))
+                if len(labels) == 0:
+                    self.appendReport("\tLot area at Northing {:.2f} Easting {:.2f}: no lot label found in the drawing: not described".format(y, x))
+                    continue
+                lot = labels[0][2]
+                if len(set(label[2] for label in labels)) > 1:
+                    self.appendReport("\tLot {}: more than one lot label in the lot area ({}): using the nearest label".format(lot, ", ".join(label[2] for label in labels)))
+                if lot in lotCourses:
+                    self.appendReport("\tLot {}: the lot label is found in more than one lot area: not described".format(lot))
+                    continue
+
+            corner = max((lotGraph.nodeXY[lotGraph.origin[h]] for h in lotGraph.faces[face]), key=lambda xy: xy[1] - xy[0])
+            lotCourses[lot] = {coid: entry for coid, entry in enumerate(lotGraph.faceCourse(face, self.direction, [corner]), start=1)}
+            lotAreas[lot] = areas
+        self.appendReport("\tTraversed the courses of {} lots".format(len(lotCourses)))
+
+        #--- F.6. Compute the coordinate geometry, descriptions and closure of all the lot courses in one batch (concurrently with more than one worker) ---#
+        options = {"scalefactor": self.scalefactor, "tolerance": self.tolerance, "angularTolerance": self.angularTolerance, "precision": self.precision, "pobstring": "POINT OF BEGINNING", "controls": False, "tpobIndex": None}
+        results = amcpool.processCourses(vertexArrays, interiors, lotCourses, options, self.workers)
+
+        #--- F.7. Generate the legal description of each lot ---#
+        kind = "Lot" if self.jsonControls["MapType"] == "Tract" else "Parcel"
+        self.jsonLots = {}
+        courseRows, lotRows = [], []
+        for lot in lotCourses:
+            course = lotCourses[lot]
+
+            # Line records of the lot's course (the course begins at the lot's point of beginning)
+            records = results[lot]["records"]
+
+            # Lot description, preamp and course (grid and ground)
+            startx, starty = course[1]["start"]
+            preamp = "BEGINNING at the most northwesterly corner of said {} {}, having a State Plane Coordinate Value of Northing {:.2f} and Easting {:.2f};".format(kind, lot, self.truncate(starty, self.tolerance), self.truncate(startx, self.tolerance))
+            gpreamp = "BEGINNING at the most northwesterly corner of said {} {}, having a State Plane Coordinate Value of Northing {:.2f} and Easting {:.2f};".format(kind, lot, self.truncate(starty/self.scalefactor, self.tolerance), self.truncate(startx/self.scalefactor, self.tolerance))
+            ld = "".join(records[course[coid]["oid"]]["desc_grid"] for coid in course).replace("; to the", ", to the")
+            gld = "".join(records[course[coid]["oid"]]["desc_ground"] for coid in course).replace("; to the", ", to the")
+
+            self.jsonLots[lot] = {"Map": self.describeMapDocument(lot), "Areas": lotAreas[lot], "Closure": results[lot]["closure"], "Grid": {"Preamp": preamp, "Course": ld}, "Ground": {"Preamp": gpreamp, "Course": gld}, "Boundaries": records}
+
+            # Rows of the combined lot table
+            lotRows.append({"Lot": lot, "Number of Lines": len(course), "Area (Square Feet)": lotAreas[lot]["SquareFeet"], "Area (Acres)": lotAreas[lot]["Acres"], "Misclosure": self.jsonLots[lot]["Closure"]["Misclosure"], "Precision": self.jsonLots[lot]["Closure"]["Ratio"], "Map Description": self.jsonLots[lot]["Map"], "Legal Description Grid": "{} {}".format(preamp, ld), "Legal Description Ground": "{} {}".format(gpreamp, gld)})
+            for coid in course:
+                record = records[course[coid]["oid"]]
+                courseRows.append({"Lot": lot, "Segment ID": coid, "Object ID": course[coid]["oid"], "Shape Type": record["shapetype"], "Line or Chord Bearing": record["bearing"], "Line Distance or Chord Length": record["distance"], "Arc Radius": record["radius"], "Radial Curve Angle": record["delta"], "Arc Length": record["arclength"], "Radial Tangent Description": record["radtangent"], "Legal Description Grid": record["desc_grid"], "Legal Description Ground": record["desc_ground"], "Annotation Grid": record["ann_grid"], "Annotation Ground": record["ann_ground"]})
+
+            self.appendReport("\n\nLEGAL DESCRIPTION (GRID) - {} {}\n".format(kind.upper(), lot))
+            self.appendReport("\t{}".format(self.jsonLots[lot]["Map"]))
+            self.appendReport("\t{}".format(preamp))
+            self.appendReport("\t{}\n".format(ld))
+
+        #--- F.8. Write the combined lot table (lot summary and lot courses) ---#
+        writer = pandas.ExcelWriter(os.path.join(self.outpath, "LotData.xlsx"), engine="xlsxwriter")
+        pandas.DataFrame(lotRows).to_excel(writer, sheet_name = "Lots", header=True, index=False)
+        pandas.DataFrame(courseRows).to_excel(writer, sheet_name = "Lot Courses", header=True, index=False)
+        writer.save()
+
+        self.jsonChecks["LotDescriptions"] = "Pass" if len(self.jsonLots) > 0 else "Fail"
+        self.appendReport("\nLot Descriptions and Tabulation ({} lots): {}\n".format(len(self.jsonLots), self.jsonChecks["LotDescriptions"]))
 
         etime = datetime.datetime.now().strftime("%m/%d/%Y %H:%M %p")
         self.appendReport("\nScript Completed on {}\n\n".format(etime))
@@ -808,76 +730,132 @@ class amc(object):
 
 
 
+    #==================== AMC Class Function: Read Lot Labels ====================#
 
+    def readLotLabels(self):
+        """AMC Class Function: Read Lot Labels
+        Returns the lot labels of the drawing annotation as (x, y, number) tuples: the annotation whose text is a lot number, or a lot or parcel number or letter (see LOT_LABEL), with the number (or letter) upper-cased
+        """
+        labels = []
+        if not arcpy.Exists(os.path.join("CAD", "Annotation")):
+            return labels
+        with arcpy.da.SearchCursor(os.path.join("CAD", "Annotation"), ["RefName", "SHAPE@XY"]) as cursor:
+            for row in cursor:
+                match = LOT_LABEL.match((row[0] or "").strip())
+                if match:
+                    labels.append((row[1][0], row[1][1], (match.group(1) or match.group(2)).upper()))
+        return labels
 
-    #==================== AMC Class Function: Create Legal Description ====================#
 
-    def createLegalDescription(self):
-        """AMC Class Function: Create Legal Description
-        Generates a legal description document after boundary processing data
+
+
+    #==================== AMC Class Function: Traverse Adjustment ====================#
+
+    def adjustBoundary(self, method="compass", correct=False, sigmaDistance=0.01, sigmaPpm=10.0, sigmaBearing=5.0):
+        """AMC Class Function: Traverse Adjustment
+        Adjusts the traverse of each parcel's course (from its described bearings and distances) by the compass (Bowditch) rule or by weighted least squares, holding the parcel's point of beginning fixed. Writes the adjusted coordinates of each course's end point and the bearing and distance residuals to the JSON data string (jsonAdjustment), and optionally a corrected copy of the boundary lines (PIQ_ADJUSTED)
+
+        INPUT
+            method: (optional) the adjustment method: 'compass' or 'leastsquares' (default = 'compass').
+            correct: (optional) whether to write the corrected boundary lines feature class (PIQ_ADJUSTED), with each line's vertices moved by the corrections at its ends, interpolated along the line (default = False).
+            sigmaDistance: (optional) least squares only: the constant part of the distance standard deviation, in feet (default = 0.01).
+            sigmaPpm: (optional) least squares only: the distance-proportional part of the distance standard deviation, in parts per million (default = 10).
+            sigmaBearing: (optional) least squares only: the bearing standard deviation, in seconds of arc (default = 5).
         """
-        #=== SECTION D: Process Legal Description ===#
+        #=== SECTION G: Traverse Adjustment ===#
 
         stime = datetime.datetime.now().strftime("%m/%d/%Y %H:%M %p")
-        self.appendReport("\n{:-^80s}\n".format(" PART 3: AMC LEGAL DESCRIPTION PROCESSING "))
+        self.appendReport("\n{:-^80s}\n".format(" PART 3.2: AMC TRAVERSE ADJUSTMENT "))
         self.appendReport("Script Started on: {}\n".format(stime))
 
+        if method not in ("compass", "leastsquares"):
+            raise ValueError("Unknown adjustment method: {} (use 'compass' or 'leastsquares')".format(method))
+        self.appendReport("Adjusting the parcel traverses ({} adjustment)".format("Compass (Bowditch)" if method == "compass" else "Weighted Least Squares"))
+
+        #--- G.1. Collect the described observations of all the parcels' courses (one ring numbering across the parcels) ---#
+        observations, starts, ringCount = {}, [], 0
+        for poid in self.course:
+            coids, rings, bearings, distances, lengths = self.courseObservations(self.course[poid], self.jsonBoundary[poid])
+            observations[poid] = (coids, rings + ringCount, bearings, distances, lengths)
+            starts.extend(self.course[poid][ring[0]]["start"] for ring in self.courseRings(self.course[poid]))
+            ringCount += int(rings.max()) + 1
+        coids = [(poid, coid) for poid in observations for coid in observations[poid][0]]
+        rings, bearings, distances, lengths = [numpy.concatenate([observations[poid][i] for poid in observations]) for i in range(1, 5)]
+
+        #--- G.2. Adjust all the traverses in one batch ---#
+        if method == "compass":
+            adjusted = amcadjust.compassAdjustment(starts, bearings, distances, lengths, rings)
+        else:
+            adjusted = amcadjust.leastSquaresAdjustment(starts, bearings, distances, rings, sigmaDistance, sigmaPpm, sigmaBearing)
+
+        #--- G.3. Write the adjusted coordinates and residuals of each parcel's course ---#
+        self.jsonAdjustment = {"Method": method, "Parcels": {}}
+        for i, (poid, coid) in enumerate(coids):
+            parcel = self.jsonAdjustment["Parcels"].setdefault(poid, {"Courses": {}})
+            parcel["Courses"][coid] = {"oid": self.course[poid][coid]["oid"], "x": float(adjusted["points"][i][0]), "y": float(adjusted["points"][i][1]), "bearing": float(adjusted["bearing"][i]), "distance": float(adjusted["distance"][i]), "vbearing": float(adjusted["vbearing"][i]), "vdistance": float(adjusted["vdistance"][i])}
+        for poid in observations:
+            courses = self.jsonAdjustment["Parcels"][poid]["Courses"]
+            if method == "leastsquares":
+                self.jsonAdjustment["Parcels"][poid]["Sigma0"] = [float(adjusted["sigma0"][ring]) for ring in numpy.unique(observations[poid][1])]
+            self.appendReport("\tParcel {}: largest residuals {:.1f} seconds, {:.4f} feet".format(poid, max(abs(c["vbearing"]) for c in courses.values()), max(abs(c["vdistance"]) for c in courses.values())))
+
+        #--- G.4. Write the corrected boundary lines (optional) ---#
+        if correct:
+            if arcpy.Exists("PIQ_ADJUSTED"):
+                arcpy.Delete_management("PIQ_ADJUSTED")
+            arcpy.CopyFeatures_management("PIQ", "PIQ_ADJUSTED")
+            arcpy.AlterAliasName("PIQ_ADJUSTED", "Adjusted Property Line Boundary")
+
+            with arcpy.da.UpdateCursor("PIQ_ADJUSTED", ["OID@", "SHAPE@"]) as cursor:
+                for row in cursor:
+                    oid = row[0]
+                    if oid not in self.courseIndex:
+                        continue
+
+                    # A line shared by two parcels follows its first parcel's course (see indexCourse)
+                    poid, coid = self.courseIndex[oid]["poid"], self.courseIndex[oid]["coid"]
+                    ring = next(r for r in self.courseRings(self.course[poid]) if coid in r)
+                    vertices = numpy.array(self.jsonBoundary[poid][oid]["wktpoints"], dtype=float)[:, :2]
+                    end = self.jsonAdjustment["Parcels"][poid]["Courses"][coid]
+                    start = self.jsonAdjustment["Parcels"][poid]["Courses"][ring[ring.index(coid) - 1]]
+                    startShift = numpy.array([start["x"], start["y"]]) - vertices[0] if coid != ring[0] else numpy.zeros(2)
+                    endShift = numpy.array([end["x"], end["y"]]) - vertices[-1]
+
+                    # Interpolate the corrections by the cumulative length along the line
+                    steps = numpy.hypot(*numpy.diff(vertices, axis=0).T)
+                    fraction = numpy.concatenate([[0.0], numpy.cumsum(steps)]) / max(steps.sum(), 1e-12)
+                    vertices = vertices + startShift + (endShift - startShift) * fraction[:, None]
+
+                    # Keep the stored direction of the line
+                    stored = amcgeom.geometryVertices(row[1].WKB)
+                    if numpy.hypot(*(stored[0, :2] - vertices[-1])) < numpy.hypot(*(stored[0, :2] - vertices[0])):
+                        vertices = vertices[::-1]
+                    row[1] = arcpy.FromWKB(amcgeom.verticesToWkb(vertices), self.sr)
+                    cursor.updateRow(row)
+
+            self.appendReport("\tCreated the Adjusted Property Line Boundary (PIQ_ADJUSTED) Feature Class")
 
-        #--- D.1. Create a map description ---#
-        self.describeMapDocument()
+        self.jsonChecks["TraverseAdjustment"] = "Pass"
+        self.appendReport("\nTraverse Adjustment of {} parcel(s): Pass\n".format(len(observations)))
 
-        #--- D.2. Create a Preamp (for Grid and Ground versions) from Horizontal Controls ---#
-        self.describeHorizontalControls()
-
-        #--- D.3. Create the legal description ---#
-        ldtext = []
-        gldtext = []
-        for i in self.course:
-            oid = self.course[i]["oid"]
-            desc = self.jsonBoundary[oid]["desc_grid"]
-            gdesc = self.jsonBoundary[oid]["desc_ground"]
-            ldtext.append(desc)
-            gldtext.append(gdesc)
-        self.ld = "".join(ldtext)
-        self.gld = "".join(gldtext)
-        self.ld.replace("; to the", ", to the")
-        self.gld.replace("; to the", ", to the")
-
-        # Write Legal Description to Report (grid)
-        self.appendReport("\n\nLEGAL DESCRIPTION (GRID)\n")
-        self.appendReport("\t{}".format(self.mapdesc))
-        self.appendReport("\t{}".format(self.preamp))
-        self.appendReport("\t{}\n".format(self.ld))
-
-        # Write Legal Description to Report (ground)
-        self.appendReport("\n\nLEGAL DESCRIPTION (GROUND)\n")
-        self.appendReport("\t{}".format(self.mapdesc))
-        self.appendReport("\t{}".format(self.gpreamp))
-        self.appendReport("\t{}\n".format(self.gld))
-
-        # Compile the JSON data for the legal description
-        self.jsonLegalDescription["Map"] = self.mapdesc
-        self.jsonLegalDescription["Grid"] = {}
-        self.jsonLegalDescription["Grid"]["Preamp"] = self.preamp
-        self.jsonLegalDescription["Grid"]["Course"] = self.ld
-        self.jsonLegalDescription["Ground"] = {}
-        self.jsonLegalDescription["Ground"]["Preamp"] = self.gpreamp
-        self.jsonLegalDescription["Ground"]["Course"] = self.gld
-        
         etime = datetime.datetime.now().strftime("%m/%d/%Y %H:%M %p")
         self.appendReport("\nScript Completed on {}\n\n".format(etime))
 
         return
 
 
-    
 
 
     #==================== AMC Class Function: Finalize Report ====================#
 
-    def finalizeReport(self):
+    def finalizeReport(self, layout="json", encoder="json", rounding=True):
         """AMC Class Function: Finalize Report and Execution
         Compiles and exports all data and reports and finishes up the execution
+
+        INPUT
+            layout: (optional) the layout of the JSON data string output (default = 'json'): 'json' writes jsonResponse.json, 'index' also writes the byte offsets of its sections (jsonResponse.index.json), and 'zip' writes one member per section (jsonResponse.zip). See amcresult.responseReader.
+            encoder: (optional) the encoder of the JSON data string output (default = 'json'): 'json' (standard library), 'orjson' (fast JSON) or 'msgpack' (MessagePack binary, jsonResponse.msgpack). See amcresult.responseEncoder.
+            rounding: (optional) whether the boundary coordinates and vertices are rounded to two decimals beyond the tolerance (default = True, i.e., 1/10,000 of a foot at the default tolerance).
         """
         #=== SECTION E: Finalize Report ===#
 
@@ -885,19 +863,24 @@ class amc(object):
         self.appendReport("\n{:-^80s}\n".format(" PART 4: AMC PROCESS FINALIZATION "))
         self.appendReport("Script Started on: {}\n".format(stime))
 
-        #--- E.1. Compile the final JSON data from JSON strings ---#
-        response = {}
-        response["Execution"] = self.jsonExecution
-        response["Checks"] = self.jsonChecks
-        response["Boundaries"] = self.jsonBoundary
-        response["Controls"] = self.jsonControls
-        response["LegalDescription"] = self.jsonLegalDescription
+        #--- E.1. Compile the final JSON data from JSON strings (the typed records are serialized as they are written) ---#
+        # The execution profile: the duration and arcpy counters of each stage (class method) so far
+        self.jsonExecution["Profile"] = self.profiler.summary()
+        self.response = amcresult.amcResult(self.jsonExecution, self.jsonChecks, self.jsonBoundary, self.jsonControls, self.jsonLegalDescription, self.jsonLots, self.jsonAdjustment)
 
         os.chdir(self.outpath)
-        with open("jsonResponse.json", "w") as jsonfile:
-            json.dump(response, jsonfile)
+        encoder = amcresult.responseEncoder(encoder, self.tolerance + 2 if rounding else None)
+        files = amcresult.writeResponse(self.response, "jsonResponse{}".format(".zip" if layout == "zip" else encoder.extension), layout, encoder)
+
+        self.appendReport("JSON Data String Output Written to Disk: {}\n".format(", ".join(files)))
 
-        self.appendReport("JSON Data String Output Written to Disk: jsonResponse.json\n")
+        #--- E.2. Write the execution profile (stage durations and counters) to the report and its sidecar file ---#
+        self.appendReport("Execution Profile (stages by duration, in seconds):")
+        for line in self.profiler.table(limit=15):
+            self.appendReport(line)
+        with open("ExecutionProfile.json", "w") as jsonfile:
+            json.dump(self.profiler.summary(), jsonfile, indent=2)
+        self.appendReport("Execution Profile Written to Disk: ExecutionProfile.json\n")
 
         etime = datetime.datetime.now().strftime("%m/%d/%Y %H:%M %p")
         self.appendReport("\nScript Completed on {}\n\n".format(etime))
@@ -905,7 +888,7 @@ class amc(object):
 
         self.appendReport("\n{:^80s}\n".format("END OF EXECUTION REPORT"))
 
-        return response
+        return self.response
 
 
 
@@ -1197,6 +1180,7 @@ class amc(object):
         self.tpobdict["source"] = "none"
         self.tpobdict["count"] = 0
         self.tpobdict["points"] = {}
+        self.tpobstring = amcdesc.POB
 
         # True Point of Beginning
         self.appendReport("True Point of Beginning (TPOB) Check")
@@ -1232,7 +1216,7 @@ class amc(object):
                             self.tpobdict["points"][i+1] = {"x": pt[0], "y": pt[1]}
                             self.jsonChecks["TPOB"] = "Pass"
                             self.tpobstring = "POINT OF BEGINNING"
-                            self.appendReport["\tMulti-point TPOB Provided by User: Passed. \n"]
+                            self.appendReport("\tMulti-point TPOB Provided by User: Passed. \n")
 
         # If TPOB coordinates are not provided by user - checking CAD drawing layers
         elif self.tpob is None:
@@ -1272,14 +1256,15 @@ class amc(object):
                         self.tpob = self.tpob[0]
                         self.tpobstring = "TRUE POINT OF BEGINNING"
                     else:
-                        self.tbostring = "POINT OF BEGINNING"
+                        self.tpobstring = "POINT OF BEGINNING"
 
 
         # If TPOB is not found
         if self.tpobdict["source"] == "none":
             self.appendReport("\tTPOB is missing: Failed\n")
 
-        # Populate the JSON Controls
+        # Populate the JSON Controls (with the name of the TPOB, so that a cached response re-renders the same descriptions)
+        self.tpobdict["pobstring"] = self.tpobstring
         self.jsonControls["TPOB"] = self.tpobdict
 
         return
@@ -1350,12 +1335,20 @@ class amc(object):
         boundaryparcels = int(arcpy.GetCount_management("PARCELS")[0])
         self.appendReport("\tNumber of Boundary Parcels: {}".format(boundaryparcels))
 
-        if boundaryparcels == 1:
-            self.boundaryCase = "Single"
-            areas = []
+        # Build the in-memory planar endpoint graph of the boundary lines
+        self.boundaryGraph = self.buildBoundaryGraph()
 
-            # Getting the centroid coordinates for a given polygon
+        # Classify the boundary case from the graph's components, faces, shared lines and containment
+        self.boundaryCase = self.boundaryGraph.classify()
+        self.appendReport("\tBoundary graph: {} lines, {} connected components, {} enclosed areas".format(len(self.boundaryGraph.oids), self.boundaryGraph.ncomponents, len(self.boundaryGraph.boundedFaces())))
+        self.appendReport("\tBoundary graph: {} shared lines, {} contained boundaries, {} open lines".format(len(self.boundaryGraph.sharedEdges()), len(self.boundaryGraph.containment()), len(self.boundaryGraph.openEdges())))
+        self.appendReport("\tBoundary Case: {}".format(self.boundaryCase))
+
+        if boundaryparcels >= 1 and self.boundaryCase is not None:
+
+            # Getting the centroid coordinates for each polygon
             self.appendReport("\tObtaining the centroid coordinates for each boundary polygon")
+            areas = {}
             with arcpy.da.UpdateCursor("PARCELS", ["OID@", "SHAPE@", "CentroidX", "CentroidY", "AreaSqFeet", "AreaAcres"]) as cursor:
                 for row in cursor:
                     oid = row[0]
@@ -1364,77 +1357,24 @@ class amc(object):
                     self.centroid = centroidx, centroidy # returns the centroid coordinates of that parcel
                     areaSqFeet = row[4] = row[1].getArea("GEODESIC", "SQUAREFEET")
                     areaAcres = row[5] = row[1].getArea("GEODESIC", "ACRES")
-                    areas = (areaSqFeet, areaAcres)
+                    areas[oid] = areaSqFeet
                     cursor.updateRow(row)
                     self.jsonControls["Centroid"][oid] = self.centroid
                     self.jsonControls["Areas"][oid] = {}
                     self.jsonControls["Areas"][oid]["SquareFeet"] = areaSqFeet
                     self.jsonControls["Areas"][oid]["Acres"] = areaAcres
-                    self.jsonChecks["BoundaryClosure"][oid] = "Pass"
-                    self.appendReport("\tBoundary area closure: Passed\n")
-
-        elif boundaryparcels > 1:
-
-            # Find which case it is
-            # Create Polygon Neighbors Table
-            arcpy.PolygonNeighbors_analysis("PARCELS", "NEIGHBORS", "OBJECTID;Shape_Area", "AREA_OVERLAP", "BOTH_SIDES", None, "FEET", "SQUARE_FEET")
-
-            # Search how many rows the table has. If it has no rows, then this is the case of Separate Boundaries
-            if int(arcpy.GetCount_management("NEIGHBORS")[0]) == 0:
-                self.boundaryCase = "Separate"
-                areas = []
-
-                # Getting the centroid coordinates for each polygon
-                self.appendReport("\tObtaining the centroid coordinates for each boundary polygon")
-                with arcpy.da.UpdateCursor("PARCELS", ["OID@", "SHAPE@", "CentroidX", "CentroidY", "AreaSqFeet", "AreaAcres"]) as cursor:
-                    for row in cursor:
-                        oid = row[0]
-                        centroidx = row[2] = row[1].centroid.X
-                        centroidy = row[3] = row[1].centroid.Y
-                        self.centroid = centroidx, centroidy # returns the centroid coordinates of that parcel
-                        areaSqFeet = row[4] = row[1].getArea("GEODESIC", "SQUAREFEET")
-                        areaAcres = row[5] = row[1].getArea("GEODESIC", "ACRES")
-                        areas = (areaSqFeet, areaAcres)
-                        cursor.updateRow(row)
-                        self.jsonControls["Centroid"][oid] = self.centroid
-                        self.jsonControls["Areas"][oid] = {}
-                        self.jsonControls["Areas"][oid]["SquareFeet"] = areaSqFeet
-                        self.jsonControls["Areas"][oid]["Acres"] = areaAcres
-                        self.jsonChecks["BoundaryClosure"][oid] = "Pass"
-                        self.appendReport("\tBoundary area for polygon {} closure: Passed\n".format(oid))
-
-
-            # otherwise, if there are rows in the table, we investigate further
-            elif int(arcpy.GetCount_management("NEIGHBORS")[0]) > 0:
-                # dictionary to get the query results
-                tableData = {}
-                # loop through table rows, and write the results to the dictionary
-                with arcpy.da.SearchCursor("NEIGHBORS", ["OID@", "src_OBJECTID", "nbr_OBJECTID", "src_Shape_Area", "nbr_Shape_Area", "AREA", "LENGTH", "NODE_COUNT"]) as cursor:
-                    for row in cursor:
-                        oid = row[0]
-                        if row[3] > row[4]: parentID = True
-                        elif row[3] < row[4]: parentID = False
-                        tableData[oid] = {"Source": row[1], "Neighbor": row[2], "Source Area": row[3], "Neighbor Area": row[4], "Overlap Area": row[5], "Overlap Length": row[6], "Node Count": row[7], "parent ID": parentID}
-
-                # Now check the data in the dictionary. There are two possibilities:
-                # if all the Lengths are equal to 0.0 then this is a case for Ajdacent Boundaries
-                if all(tableData[i]["Overlap Length"] == 0.0 for i in tableData):
-                    self.boundaryCase = "Adjacent"
-                    areas = []
-                # else, if all the Lengths are > 0 and are equal to each other, then there is the case of Not a Part Boundaries
-                elif all(tableData[i]["Overlap Length"] > 0.0 for i in tableData) and all(tableData[i]["Overlap Length"] == tableData[1]["Overlap Length"] for i in tableData):
-                    self.boundaryCase = "Not a Part"
-                    areas = []
-
-                    # Select the OID of the boundary with the larger area (parent)
-                    parents = [i for i in tableData if tableData[i]["Parent ID"]]
-                    if len(parents) == 1:
-                        self.parentBoundary = parents[0]
+                    self.appendReport("\tBoundary area for polygon {}: {:.2f} square feet".format(oid, areaSqFeet))
+            self.appendReport("")
 
+            # For Not a Part boundaries, the parent boundary is the polygon with the largest area (the one holding the excepted area)
+            if self.boundaryCase == "Not a Part":
+                self.parentBoundary = max(areas, key=areas.get)
+            self.jsonChecks["BoundaryArea"] = "Pass"
 
         else:
+            # The per-parcel traverse closures (BoundaryClosure, see amcdesc.courseClosure) are kept apart from the boundary area status
             self.centroid = None
-            self.jsonChecks["BoundaryClosure"][poid] == "Fail"
+            self.jsonChecks["BoundaryArea"] = "Fail"
             self.appendReport("\tBoundary area closure: Failed\n")
 
         return boundaryparcels
@@ -1661,7 +1601,7 @@ class amc(object):
 
     def traverseCourse(self):
         """AMC Class Function: Boundary Course Traverse Path
-        Obtains the course for the boundary traverse path
+        Obtains the course for the boundary traverse path of each parcel (self.course[poid][coid])
         """
         
         #--- B.17. Get the course data (traverse order) ---#
@@ -1669,14 +1609,13 @@ class amc(object):
         # Create empty directionaries for the pair of lines (either direction from the point of beginning or TPOB) to be selected, and the segments of multiline coordinates and OIDs from the boundary feature class in the geodatabase
         pair = {}
         segments = {}
+        self.course = {}
+        self.parcelSegments = {}
         
         self.appendReport("Traverse Course Report")
 
-        # Rounding TPOB coordinates
-        if type(self.tpob) is tuple:
-            rtpob = tuple(self.truncate(t, self.tolerance) for t in self.tpob)
-        elif type(self.tpob) is list:
-            rtpob = list(tuple(self.truncate(t, self.tolerance) for t in pair) for pair in self.tpob)
+        # Index the TPOB points by their fixed-point coordinate keys (one lookup per line endpoint)
+        self.tpobIndex = self.indexTPOB()
 
 
         # If this is a single boundary polygon, then loop through boundary multilines and get OIDs and coordinates
@@ -1695,15 +1634,11 @@ class amc(object):
                     # Will check later in the code if there are results populated
                     coor = None
 
-                    # Rounding start and end coordinates
-                    rstart = tuple(self.truncate(s, self.tolerance) for s in start)
-                    rend = tuple(self.truncate(e, self.tolerance) for e in end)
-
-                    # Check to see if the true point of beginning is in one of these coordinates
-                    if rstart == rtpob:
+                    # Check to see if the true point of beginning is in one of these coordinates (same or neighboring key cells)
+                    if start in self.tpobIndex:
                         coor = start, end
                         reversed = False
-                    elif rend == rtpob:
+                    elif end in self.tpobIndex:
                         coor = end, start
                         reversed = True
 
@@ -1728,183 +1663,106 @@ class amc(object):
                 # Selects the largest angle (clockwise)
                 seloid = int([i[0] for i in pts if max([j[1] for j in pts]) == i[1]][0])
                 selrow = pair[str(seloid)]
-            elif direction == "counter-clockwise":
+            elif self.direction == "counter-clockwise":
                 self.appendReport("\tDirection: counter-clockwise")
                 # Selects the smallest angle (counter-clockwise)
                 seloid = int([i[0] for i in pts if min([j[1] for j in pts]) == i[1]][0])
                 selrow = pair[str(seloid)]
 
-            # Once we select the right start line segment, we can populate the first entry of the course (with orderID = 1)
-            self.course = {}
-            self.course[1] = {}
-            self.course[1]["oid"] = seloid
-            self.course[1]["start"] = selrow["coor"][0]
-            self.course[1]["end"] = selrow["coor"][1]
-            self.course[1]["reversed"] = selrow["reversed"]
+            # Once we select the right start line segment, we can populate the first entry of the course (with orderID = 1) of the single parcel
+            poid = next(iter(self.jsonControls["Centroid"]))
+            self.parcelSegments[poid] = list(segments[1])
+            course = self.course[poid] = {}
+            course[1] = {}
+            course[1]["oid"] = seloid
+            course[1]["start"] = selrow["coor"][0]
+            course[1]["end"] = selrow["coor"][1]
+            course[1]["reversed"] = selrow["reversed"]
+
+            # Index the endpoints of all the line segments once (fixed-point keys), holding each segment's OID and whether the endpoint is its end (reversed)
+            endpoints = amcgeom.coordinateIndex(self.tolerance)
+            for oid in segments[1]:
+                endpoints.add(segments[1][oid]["start"], (oid, False))
+                endpoints.add(segments[1][oid]["end"], (oid, True))
+            used = set([seloid])
 
             # Now, given the first segment, we will run the loop for all the segments of the lines, and try to find the next start of the line (correcting at the same time the start/end coordinates of the initial feature class to make sure that start --> end follows a clockwise direction).
-            while len(self.course) < len(segments[1]): # runs until the course includes all the line segment
-                nextLine = self.nextCourseSegment(self.course, segments[1]) # calls the getnext function above and obtains the data of the next line
+            while len(course) < len(segments[1]): # runs until the course includes all the line segment
+                nextLine = self.nextCourseSegment(course, segments[1], endpoints, used) # calls the getnext function above and obtains the data of the next line
+                if len(nextLine) != 1:
+                    # The course breaks at a gap (no connecting line) or a junction (more than one connecting line); the course check below reports it as incomplete
+                    self.appendReport("\tCourse break after line OID {}: {} connecting lines {}".format(course[len(course)]["oid"], len(nextLine), sorted(nextLine)))
+                    break
                 nextKey = [key for key in nextLine.keys()][0] # get the OID of the next line
-                order = len(self.course) + 1 # update the orderID
+                used.add(nextKey)
+                order = len(course) + 1 # update the orderID
                 # Populate the next entry in the course JSON.
-                self.course[order] = {}
-                self.course[order]["oid"] = nextKey
-                self.course[order]["start"] = nextLine[nextKey]["start"]
-                self.course[order]["end"] = nextLine[nextKey]["end"]
-                self.course[order]["reversed"] = nextLine[nextKey]["reversed"]
+                course[order] = {}
+                course[order]["oid"] = nextKey
+                course[order]["start"] = nextLine[nextKey]["start"]
+                course[order]["end"] = nextLine[nextKey]["end"]
+                course[order]["reversed"] = nextLine[nextKey]["reversed"]
 
-            # Finally, create an course order ID field (COID) in the boundary feature class and populate it with the values of the course
-            arcpy.AddField_management("PIQ", "coid", "LONG", field_alias="Course Order ID")
-            with arcpy.da.UpdateCursor("PIQ", ["OID@", "SHAPE@", "coid"]) as cursor:
-                for row in cursor:
-                    oid = row[0]
-                    row[2] = [i for i in self.course if self.course[i]["oid"] == oid][0]
-                    cursor.updateRow(row)
 
-            # Write out the course to the report
-            for i in self.course:
-                self.appendReport("\tCourse Order: {}".format(i))
-                self.appendReport("\t\tCourse OID: {}".format(self.course[i]["oid"]))
-                self.appendReport("\t\tCourse start point: {}".format(self.course[i]["start"]))
-                self.appendReport("\t\tCourse end point: {}".format(self.course[i]["end"]))
-                self.appendReport("\t\tCourse reversal: {}".format(self.course[i]["reversed"]))
-
-            # Check the size of the course
-            if len(self.course) == len(segments):
-                self.appendReport("\tTraverse Course Complete: Passed\n")
-            else:
-                self.appendReport("\tTraverse Course Incomplete: Failed\n")
+        # If these are separate, adjacent (sharing lines), or not a part (excepted areas) boundary polygons, walk the faces of the boundary's planar graph (half-edges)
+        elif self.boundaryCase in ("Separate", "Adjacent", "Not a Part"):
 
+            # Rebuild the boundary graph (the expanded boundary layer check may have split the boundary lines)
+            self.boundaryGraph = self.buildBoundaryGraph()
+            excepted = self.boundaryGraph.containedFaces()
+            starts = [(point["x"], point["y"]) for point in self.jsonControls["TPOB"]["points"].values()]
+            self.appendReport("\tCourse Direction: {}".format(self.direction or "clockwise"))
 
-        # If this is a separate boundary polygon, then loop through boundary multilines and get OIDs and coordinates
-        elif self.boundaryCase == "Separate":
-            
-            # Create empty directionaries for the pair of lines (either direction from the point of beginning or TPOB) to be selected, and the segments of multiline coordinates and OIDs from the boundary feature class in the geodatabase
-            self.course = {}
-
-            # Loop through the parcels layer
-            with arcpy.da.SearchCursor("PARCELS", ["OID@"]) as cursor1:
-                for row1 in cursor1:
-                    # Get the object ID for each of the parcels
-                    oid1 = row1[0]
-                    segments[oid1]={}
-                    
-                    # Select the layer with this OBJECTID
-                    layer1 = arcpy.SelectLayerByAttribute_management("PARCELS", "NEW_SELECTION", "OBJECTID = {}".format(oid1))
-
-                    # Select all the multiline segment whose boundary touches the selected parcel area
-                    layer2 = arcpy.SelectLayerByLocation_management("PIQ", "BOUNDARY_TOUCHES", layer1, None, "NEW_SELECTION", "NOT_INVERT")
-                    
-                    # Loop through the selected muiltiline segments and get the line OBJECTIDs and properties
-                    with arcpy.da.SearchCursor(layer2, ["OID@", "SHAPE@"]) as cursor2:
-                        for row2 in cursor2:
-                            oid2 = row2[0]
-                            start = row2[1].firstPoint.X, row2[1].firstPoint.Y # the initial start coordinates
-                            end = row2[1].lastPoint.X, row2[1].lastPoint.Y # the initial end coordinates
-                            # update the segments dictionary to hold the segment data for each OID and parcel
-                            segments[oid1][oid2] = {"oid": oid2, "start": start, "end":end, "reversed": False}
-
-                            # Will check later in the code if there are results populated
-                            coor = None
-
-                            # Rounding start and end coordinates
-                            rstart = tuple(self.truncate(s, self.tolerance) for s in start)
-                            rend = tuple(self.truncate(e, self.tolerance) for e in end)
-
-                            # Check to see if the true point of beginning is in one of these coordinates
-
-                            if type(self.tpob) is list:
-                                for t in rtpob:
-                                    if rstart == t:
-                                        coor = start, end
-                                        reversed = False
-                                    elif rend == t:
-                                        coor = end, start
-                                        reversed = True
-
-                            if coor is not None:
-                                pair["{}".format(oid2)] = {}
-                                pair["{}".format(oid2)]["coor"] = coor
-                                pair["{}".format(oid2)]["reversed"] = reversed
-
-                    # Outside the arcpy row loop - choose which of the two coordinates is moving clockwise or counter-clockwise
-                    pts = []
-                    for i in pair:
-                        ptA = pair[i]["coor"][0]
-                        ptB = pair[i]["coor"][1]
-
-                        # Finds the angle degree difference from the centroid
-                        deg = math.degrees(math.atan2(ptA[1] - self.jsonControls["Centroid"][oid1][1], ptA[0] - self.jsonControls["Centroid"][oid1][0])) - math.degrees(math.atan2(ptB[1] -self.jsonControls["Centroid"][oid1][1], ptB[0] - self.jsonControls["Centroid"][oid1][0]))
-                        pts.append((i, deg))
-
-                    # Check the direction provided by the user, or if none, use clockwise direction (default)
-                    if self.direction is None or self.direction == "clockwise":
-                        self.appendReport("\tCourse Direction: clockwise")
-                        # Selects the largest angle (clockwise)
-                        seloid = int([i[0] for i in pts if max([j[1] for j in pts]) == i[1]][0])
-                        selrow = pair[str(seloid)]
-                    elif direction == "counter-clockwise":
-                        self.appendReport("\tDirection: counter-clockwise")
-                        # Selects the smallest angle (counter-clockwise)
-                        seloid = int([i[0] for i in pts if min([j[1] for j in pts]) == i[1]][0])
-                        selrow = pair[str(seloid)]
-
-                    # Once we select the right start line segment, we can populate the first entry of the course (with orderID = oid1)
-                    self.course[oid1]={}                    
-                    self.course[oid1][1] = {}
-                    self.course[oid1][1]["oid"] = seloid
-                    self.course[oid1][1]["start"] = selrow["coor"][0]
-                    self.course[oid1][1]["end"] = selrow["coor"][1]
-                    self.course[oid1][1]["reversed"] = selrow["reversed"]
-
-                    # Now, given the first segment, we will run the loop for all the segments of the lines, and try to find the next start of the line (correcting at the same time the start/end coordinates of the initial feature class to make sure that start --> end follows a clockwise direction).
-                    while len(self.course[oid1]) < len(segments[oid1][1]): # runs until the course includes all the line segment
-                        nextLine = self.nextCourseSegment(self.course[oid1], segments[oid1][1]) # calls the getnext function above and obtains the data of the next line
-                        nextKey = [key for key in nextLine.keys()][0] # get the OID of the next line
-                        order = len(self.course[oid1]) + 1 # update the orderID
-                        # Populate the next entry in the course JSON.
-                        self.course[oid1][order] = {}
-                        self.course[oid1][order]["oid"] = nextKey
-                        self.course[oid1][order]["start"] = nextLine[nextKey]["start"]
-                        self.course[oid1][order]["end"] = nextLine[nextKey]["end"]
-                        self.course[oid1][order]["reversed"] = nextLine[nextKey]["reversed"]
-
-                    # Create a parcel ID field (POID) in the boundary lines feature class and populate it with the values of the parcel
-                    arcpy.AddField_management("PIQ", "poid", "LONG", field_alias="Parcel ID")
-                    with arcpy.da.UpdateCursor("PIQ", ["OID@", "SHAPE@", "poid"]) as cursor:
-                        for row in cursor:
-                            oid = row[0]
-                            row[2] = oid1
-                            cursor.updateRow(row)
+            # Boundary lines of each connected component (assigned once; each separate parcel is its own component)
+            components = self.boundaryGraph.componentEdges()
 
-                    # Finally, create an course order ID field (COID) in the boundary feature class and populate it with the values of the course
-                    arcpy.AddField_management("PIQ", "coid", "LONG", field_alias="Course Order ID")
-                    with arcpy.da.UpdateCursor("PIQ", ["OID@", "SHAPE@", "coid"]) as cursor:
-                        for row in cursor:
-                            oid = row[0]
-                            if self.course[oid1]["oid"] == oid:
-                                row[2] = self.course[oid1]["oid"]
-                            cursor.updateRow(row)
-
-                    # Write out the course to the report
-                    for i in self.course[oid1]:
-                        self.appendReport("\tCourse Order: {}".format(i))
-                        self.appendReport("\t\tCourse OID: {}".format(self.course[oid1][i]["oid"]))
-                        self.appendReport("\t\tCourse start point: {}".format(self.course[oid1][i]["start"]))
-                        self.appendReport("\t\tCourse end point: {}".format(self.course[oid1][i]["end"]))
-                        self.appendReport("\t\tCourse reversal: {}".format(self.course[oid1][i]["reversed"]))
-
-                    # Check the size of the course
-                    if len(self.course[oid1]) == len(segments[oid1]):
-                        self.appendReport("\tTraverse Course for Parcel {} Complete: Passed\n".format(oid1))
+            # Match each parcel polygon to its face in the boundary graph; each face's course holds its outer ring and the rings of its excepted areas
+            with arcpy.da.SearchCursor("PARCELS", ["OID@", "SHAPE@"]) as cursor:
+                for row in cursor:
+                    poid = row[0]
+                    face = self.boundaryGraph.locateFace((row[1].labelPoint.X, row[1].labelPoint.Y))
+                    if face is None:
+                        self.appendReport("\tParcel {}: no matching boundary area found".format(poid))
+                    elif face in excepted:
+                        self.appendReport("\tParcel {}: not a part (excepted) area, described with its parent parcel".format(poid))
                     else:
-                        self.appendReport("\tTraverse Course for Parcel {} Incomplete: Failed\n".format(oid1))
+                        self.course[poid] = {coid: entry for coid, entry in enumerate(self.boundaryGraph.faceCourse(face, self.direction, starts), start=1)}
+
+                        # Parcel --> boundary lines map (a separate parcel holds all the lines of its component)
+                        if self.boundaryCase == "Separate":
+                            self.parcelSegments[poid] = components[self.boundaryGraph.faceComponent(face)]
+                        else:
+                            self.parcelSegments[poid] = [entry["oid"] for entry in self.course[poid].values()]
 
-        elif self.boundaryCase == "Adjacent":
-            None
-        elif self.boundaryCase == "Not a Part":
-            None
+
+        # Index the course by boundary line, and create parcel ID (POID) and course order ID (COID) fields in the boundary feature class (a line shared by two parcels holds the IDs of its first parcel)
+        self.courseIndex = self.indexCourse()
+        if len(self.courseIndex) > 0:
+            arcpy.AddField_management("PIQ", "poid", "LONG", field_alias="Parcel ID")
+            arcpy.AddField_management("PIQ", "coid", "LONG", field_alias="Course Order ID")
+            with arcpy.da.UpdateCursor("PIQ", ["OID@", "poid", "coid"]) as cursor:
+                for row in cursor:
+                    if row[0] in self.courseIndex:
+                        row[1], row[2] = self.courseIndex[row[0]]["poid"], self.courseIndex[row[0]]["coid"]
+                        cursor.updateRow(row)
+
+        # Write out the course to the report
+        for poid in self.course:
+            for i in self.course[poid]:
+                self.appendReport("\tCourse Order: {}".format(i))
+                self.appendReport("\t\tCourse OID: {}".format(self.course[poid][i]["oid"]))
+                self.appendReport("\t\tCourse start point: {}".format(self.course[poid][i]["start"]))
+                self.appendReport("\t\tCourse end point: {}".format(self.course[poid][i]["end"]))
+                self.appendReport("\t\tCourse reversal: {}".format(self.course[poid][i]["reversed"]))
+
+            # Check that the course covers all the parcel's lines and that each of its rings closes (ends where it starts)
+            rings = self.courseRings(self.course[poid])
+            covered = set(self.parcelSegments[poid]) == set(entry["oid"] for entry in self.course[poid].values())
+            closed = all(math.hypot(self.course[poid][ring[-1]]["end"][0] - self.course[poid][ring[0]]["start"][0], self.course[poid][ring[-1]]["end"][1] - self.course[poid][ring[0]]["start"][1]) < 10 ** -self.tolerance for ring in rings)
+            if len(self.course[poid]) > 0 and covered and closed:
+                self.appendReport("\tTraverse Course for Parcel {} Complete: Passed\n".format(poid))
+            else:
+                self.appendReport("\tTraverse Course for Parcel {} Incomplete: Failed\n".format(poid))
 
         return
 
@@ -1924,33 +1782,117 @@ class amc(object):
 
     #==================== AMC Class Function: Obtain the Next Course Segment ====================#
 
-    def nextCourseSegment(self, course, segments):
+    def nextCourseSegment(self, course, segments, endpoints, used):
         """AMC Class Function: Get next segment in boundary course
         Gets the next course coordinate based on the initial line (course[1]), and the line segment coordinates from ArcGIS Boundary Feature class. Returns a JSON string indexed by the order ID (the order to which the lines are added to the course), and for each item, the Boundary feature class OBJECTID, its true start and end coordinates (reversed from the feature class line direction if needed - always clockwise).
+        The unused lines connecting to the last endpoint are found with a single lookup in the index of the segment endpoints (amcgeom.coordinateIndex of (OID, reversed) values); the result holds every such line, so that it is empty at a gap and holds more than one line at a junction.
         """
 
         #--- B.17. Get the course data (traverse order) ---#
 
-        # This is the existing (initial) OID
-        existing = [course[i]["oid"] for i in course.keys()]
         # Get the endpoint of the existing feature segment
         lastend = course[len(course)]["end"]
         result = {}
-        # Search all segments to find the one whose startpoint or endpoint is the same with the last endpoint.
-        for key in segments:
-            if key not in existing:
-                if lastend == segments[key]["start"]:
-                    result[key] = {}
-                    result[key]["start"] = segments[key]["start"]
-                    result[key]["end"] = segments[key]["end"]
-                    result[key]["reversed"] = False
-                elif lastend == segments[key]["end"]:
-                    result[key] = {}
-                    result[key]["start"] = segments[key]["end"]
-                    result[key]["end"] = segments[key]["start"]
-                    result[key]["reversed"] = True
-        if len(result) == 1:
-            return result
+        # Find the unused segments whose startpoint or endpoint is the same with the last endpoint (same or neighboring key cells; a segment matching at both ends keeps its start).
+        for key, reversed in endpoints.findAll(lastend):
+            if key not in used and (key not in result or not reversed):
+                result[key] = {}
+                result[key]["start"] = segments[key]["end"] if reversed else segments[key]["start"]
+                result[key]["end"] = segments[key]["start"] if reversed else segments[key]["end"]
+                result[key]["reversed"] = reversed
+        return result
+
+
+
+
+    #==================== AMC Class Function: Index the TPOB Points ====================#
+
+    def indexTPOB(self):
+        """AMC Class Function: Index the TPOB Points
+        Returns the index of the (true) point of beginning points (amcgeom.coordinateIndex) keyed by their fixed-point coordinate keys, holding each point's TPOB point ID, so that a line endpoint is matched against all the TPOB points with a single lookup
+        """
+        index = amcgeom.coordinateIndex(self.tolerance)
+        for i, point in self.jsonControls["TPOB"]["points"].items():
+            index.add((point["x"], point["y"]), i)
+        return index
+
+
+
+
+    #==================== AMC Class Function: Index the Boundary Course ====================#
+
+    def indexCourse(self):
+        """AMC Class Function: Index the Boundary Course
+        Returns a dictionary of the course entries (start, end, reversed, with their parcel ID 'poid' and course order ID 'coid') keyed by the boundary line OID, so each line's course entry can be looked up in constant time. A line shared by two parcels is indexed by its first parcel's entry.
+        """
+        index = {}
+        for poid in self.course:
+            for coid, entry in self.course[poid].items():
+                if entry["oid"] not in index:
+                    index[entry["oid"]] = dict(entry, poid=poid, coid=coid)
+        return index
+
+
+
+
+    #==================== AMC Class Function: Course Rings ====================#
+
+    def courseRings(self, course):
+        """AMC Class Function: Course Rings
+        Returns the course order IDs (COID) of a parcel's course grouped by ring: the parcel's outer boundary first, followed by the boundary of each of its not a part (excepted) areas
+        """
+        rings = {}
+        for coid, entry in course.items():
+            rings.setdefault(entry.get("ring", 0), []).append(coid)
+        return [rings[ring] for ring in sorted(rings)]
+
+
+
+
+    #==================== AMC Class Function: Course Observations ====================#
+
+    def courseObservations(self, course, records):
+        """AMC Class Function: Course Observations
+        Returns the course order IDs (COID) of a course in ring order, with the ring number, bearing (truncated to the second), distance (truncated to the tolerance) and length (arc length for curves) of each line or curve chord, as they are described
+        """
+        rings = self.courseRings(course)
+        coids = [coid for ring in rings for coid in ring]
+        lines = [records[course[coid]["oid"]] for coid in coids]
+        bearings, distances, lengths = amcgeom.courseObservations(lines, self.tolerance)
+        return coids, numpy.repeat(numpy.arange(len(rings)), [len(ring) for ring in rings]), bearings, distances, lengths
+
+
+
+
+    #==================== AMC Class Function: Build the Boundary Graph ====================#
+
+    def buildBoundaryGraph(self):
+        """AMC Class Function: Build the Boundary Graph
+        Returns the in-memory planar graph (amcgraph.planarGraph) of the boundary lines, read from the lines' Well Known Binary in a single cursor pass. The boundary lines are first split at their T-junctions (a line ending on the interior of another line, see amcgraph.lineJunctions), which the endpoint graph would not node otherwise
+        """
+        segments = {}
+        with arcpy.da.SearchCursor("PIQ", ["OID@", "SHAPE@WKB"]) as cursor:
+            for row in cursor:
+                segments[row[0]] = amcgeom.geometryVertices(row[1])
+
+        # Split the boundary lines at the T-junctions (keeping their attributes and true curves), and read the split lines
+        junctions = amcgraph.lineJunctions(segments, self.tolerance)
+        if len(junctions) > 0:
+            for oid, x, y, other in junctions:
+                self.appendReport("\tT-junction: line OID {} ends on line OID {} at ({:.2f}, {:.2f}): splitting".format(other, oid, x, y))
+            arcpy.CopyFeatures_management([arcpy.PointGeometry(arcpy.Point(x, y), self.sr) for oid, x, y, other in junctions], "PIQJunctions")
+            arcpy.Rename_management("PIQ", "PIQUnsplit")
+            arcpy.SplitLineAtPoint_management("PIQUnsplit", "PIQJunctions", "PIQ", "{} Feet".format(10 ** -self.tolerance))
+            arcpy.Delete_management("PIQUnsplit")
+            arcpy.Delete_management("PIQJunctions")
+            self.appendReport("\tBoundary lines split at {} T-junction(s): {} lines".format(len(junctions), arcpy.GetCount_management("PIQ")[0]))
+            self.jsonChecks["BoundaryCorrections"] = "Corrected"
+            segments = {}
+            with arcpy.da.SearchCursor("PIQ", ["OID@", "SHAPE@WKB"]) as cursor:
+                for row in cursor:
+                    segments[row[0]] = amcgeom.geometryVertices(row[1])
+
+        return amcgraph.planarGraph(segments, self.tolerance)
 
 
 
@@ -1966,25 +1908,28 @@ class amc(object):
 
         self.appendReport("Boundary Multiline Geometry Correction Check")
 
-        # Update loop of the features in the geodatabase
-        with arcpy.da.UpdateCursor("PIQ", ["OID@", "SHAPE@"]) as cursor:
-            for row in cursor:
-                oid = row[0]
-                wkt = row[1].WKT
-                start = row[1].firstPoint.X, row[1].firstPoint.Y
-                end = row[1].lastPoint.X, row[1].lastPoint.Y
-                cid = [self.course[i] for i in self.course if self.course[i]["oid"] == oid][0]
-                if cid["start"] == start and cid["end"] == end:
-                    self.appendReport("\tOID {}: keeping original direction".format(oid))
-                    rwkt = wkt
-                elif cid["start"] == end and cid["end"] == start:
+        # Index of the course entries by boundary line OID (single pass over the course)
+        self.courseIndex = self.indexCourse()
+
+        # Lines whose course direction is opposite to their stored geometry
+        reversedOids = set(oid for oid in self.courseIndex if self.courseIndex[oid]["reversed"])
+        for oid in sorted(self.courseIndex):
+            if oid not in reversedOids:
+                self.appendReport("\tOID {}: keeping original direction".format(oid))
+
+        # Update loop of the features in the geodatabase (only the lines that need reversing)
+        if len(reversedOids) > 0:
+            where_clause = "OBJECTID IN ({})".format(", ".join(str(oid) for oid in sorted(reversedOids)))
+            with arcpy.da.UpdateCursor("PIQ", ["OID@", "SHAPE@"], where_clause) as cursor:
+                for row in cursor:
+                    oid = row[0]
                     self.appendReport("\tOID {}: reversing direction".format(oid))
-                    split = wkt.split("((")[1].split("))")[0].split(", ")
-                    split.reverse()
-                    rwkt = wkt.split("((")[0] + "((" + (", ").join(split) + "))"
-                geom = arcpy.FromWKT(rwkt, self.sr)
-                row[1] = geom
-                cursor.updateRow(row)
+                    # Reverse the order of the parts and of the vertices within each part, keeping the Z/M values
+                    wkb = row[1].WKB
+                    parts = [amcgeom.reverseVertices(part) for part in amcgeom.geometryVertices(wkb, parts=True)[::-1]]
+                    hasZ, hasM = amcgeom.geometryDimensions(wkb)
+                    row[1] = arcpy.FromWKB(amcgeom.verticesToWkb(parts, hasZ, hasM), self.sr)
+                    cursor.updateRow(row)
 
         self.jsonChecks["GeometryCorrections"] = "Pass"
         self.appendReport("\tGeometry Corrections Completed: Pass\n\n")
@@ -2010,42 +1955,11 @@ class amc(object):
 
 
 
-    #==================== AMC Class Function: Bearing to Word ====================#
-
-    def bearingLabel(self, bearing):
-        """AMC Class Function: Bearing to Word
-        Returns the corresponding direction word based on radial bearing values
-        """
-        if 0 < bearing <= 22.5:
-            bWord = "northerly"
-        elif 22.5 < bearing <= 67.5:
-            bWord = "northeasterly"
-        elif 67.5 < bearing <= 112.5:
-            bWord = "easterly"
-        elif 112.5 < bearing <= 157.5:
-            bWord = "southeasterly"
-        elif 157.5 < bearing <= 202.5:
-            bWord = "southerly"
-        elif 202.5 < bearing <= 247.5:
-            bWord = "southwesterly"
-        elif 247.5 < bearing <= 292.5:
-            bWord = "westerly"
-        elif 292.5 < bearing <= 337.5:
-            bWord = "northwesterly"
-        else:
-            bWord = "northerly"
-
-        return bWord
-
-
-
-
-
     #==================== AMC Class Function: Map Document Description ====================#
     
-    def describeMapDocument(self):
+    def describeMapDocument(self, lot=None):
         """AMC Class Function: Map Document Description
-        Generates a description of the map document
+        Generates a description of the map document, or of a single lot of the map document when a lot ID is given (see lotProcessing)
         """
         
         #--- D.1. Create a map description ---#
@@ -2059,7 +1973,9 @@ class amc(object):
         elif maptype == "Parcel" or maptype == "Record of Survey":
             kind = "Parcel"
 
-        if nparcels == 1:
+        if lot is not None:
+            pre = "{} {}".format(kind, lot)
+        elif nparcels == 1:
             # If portion of lot, then use "That", else if All, use "All"
             # Need to determine if it is all or portion of a lot/parcel (TBD later)
             pre = "That portion of {} 1".format(kind)
@@ -2085,128 +2001,37 @@ class amc(object):
         pagesNo = bookInfo["Pages"]
 
         # Generate a map description
-        self.mapdesc = "{} of {} No. {}, in the {}, County of {}, State of California, as per map filed in Book {}, pages {} of {} in the Office of the County Recorder of said County, more particularly described as follows:".format(pre, maptype, mapid, locname, loccounty, bookNo, pagesNo, mapbooktype)
+        mapdesc = "{} of {} No. {}, in the {}, County of {}, State of California, as per map filed in Book {}, pages {} of {} in the Office of the County Recorder of said County, more particularly described as follows:".format(pre, maptype, mapid, locname, loccounty, bookNo, pagesNo, mapbooktype)
+        if lot is None:
+            self.mapdesc = mapdesc
 
-        return
+        return mapdesc
 
 
 
 
     #==================== AMC Class Function: Describe Horizontal Controls ====================#
 
-    def describeHorizontalControls(self):
+    def describeHorizontalControls(self, poid):
         """AMC Class Function: Describe Horizontal Controls
-        Obtains and generates the Preamp description from horizontal geodetic controls to the point of beginning
+        Obtains and generates the Preamp description from horizontal geodetic controls to the point of beginning of the parcel (poid), i.e., the start of the parcel's course
         """
 
         #--- D.2. Create a Preamp (for Grid and Ground versions) from Horizontal Controls ---#
 
-        tpobx, tpoby = self.tpob
-        gpspoints = self.jsonControls["GPS"]
-
-        if len(gpspoints) == 2:
-            # Calculate distances to the parcel"s centroid for each GPS point
-            dist1 = math.hypot((gpspoints["1"]["x"] - self.centroid[0]), (gpspoints["1"]["y"] - self.centroid[1]))
-            dist2 = math.hypot((gpspoints["2"]["x"] - self.centroid[0]), (gpspoints["2"]["y"] - self.centroid[1]))
-            # Order from the most distant to the closest to the parcel points
-            gpsorder = {}
-            if dist1 >= dist2:
-                gpsorder["HC1"] = gpspoints["1"]
-                gpsorder["HC2"] = gpspoints["2"]
-            elif dist1 < dist2:
-                gpsorder["HC1"] = gpspoints["2"]
-                gpsorder["HC2"] = gpspoints["1"]
-
-        # GPS ID for horizontal control points
-        hc1id, hc2id = gpsorder["HC1"]["id"], gpsorder["HC2"]["id"]
-
-        # GPS coordinates for first control point (grid and ground)
-        hc1x, hc1y = self.truncate(gpsorder["HC1"]["x"], self.tolerance), self.truncate(gpsorder["HC1"]["y"], self.tolerance)
-        ghc1x, ghc1y = self.truncate(gpsorder["HC1"]["x"]/self.scalefactor, self.tolerance), self.truncate(gpsorder["HC1"]["y"]/self.scalefactor, self.tolerance)
-
-        # GPS coordinates for second control point (grid and ground)
-        hc2x, hc2y = self.truncate(gpsorder["HC2"]["x"], self.tolerance), self.truncate(gpsorder["HC2"]["y"], self.tolerance)
-        ghc2x, ghc2y = self.truncate(gpsorder["HC2"]["x"]/self.scalefactor, self.tolerance), self.truncate(gpsorder["HC2"]["y"]/self.scalefactor, self.tolerance)
-        
-        # Bearing and distances (distances for both grid and ground)
-        hc1bearing = math.degrees(math.atan2((hc2x - hc1x), (hc2y - hc1y))) % 360
-        hc1distance = math.hypot((hc2x - hc1x), (hc2y - hc1y))
-        ghc1distance = hc1distance / self.scalefactor
-        hc2bearing = math.degrees(math.atan2((tpobx - hc2x), (tpoby - hc2y))) % 360
-        hc2distance = math.hypot((tpobx - hc2x), (tpoby - hc2y))
-        ghc2distance = hc2distance/ self.scalefactor
-        annotation2 = self.labelBearingDistance(hc2bearing, hc2distance)
-        gannotation2 = self.labelBearingDistance(hc2bearing, ghc2distance)
-
-        # Get the first feature in the boundary course
-        firstjson = [self.jsonBoundary[i] for i in self.jsonBoundary if self.jsonBoundary[i]["coid"] == 1][0]
-
-        # if the first feature is a curve
-        if firstjson["shapetype"] == "Curve":
-            midbearing = firstjson["midbearing"]
-            radius = firstjson["radius"]
-            startx, starty = firstjson["startx"], firstjson["starty"]
-            centerx, centery = firstjson["centerx"], firstjson["centery"]
-            radbearing_cs = firstjson["radbearing_cs"]
-
-            if 0 <= radbearing_cs <= 90:
-                dbearing = "North {} East".format(self.dd2dms(radbearing_cs))
-            elif 90 < radbearing_cs <= 180:
-                dbearing = "South {} East".format(self.dd2dms(180 - radbearing_cs))
-            elif 180 < radbearing_cs <= 270:
-                dbearing = "South {} West".format(self.dd2dms(radbearing_cs - 180))
-            elif 270 < radbearing_cs <= 360:
-                dbearing = "North {} West".format(self.dd2dms(360 - radbearing_cs))
-
-            if firstjson["radtangent"] == "Tangent":
-                predesc = ", to the beginning of a curve, concave {}, and having a radius of {:.2f} feet, a radial bearing to said beginning of curve bears {}".format(self.bearingLabel(midbearing), self.truncate(radius, self.tolerance), dbearing)
-                gpredesc = ", to the beginning of a curve, concave {}, and having a radius of {:.2f} feet, a radial bearing to said beginning of curve bears {}".format(self.bearingLabel(midbearing), self.truncate(radius/self.scalefactor, self.tolerance), dbearing)
-
-            elif firstjson["radtangent"] == "Reverse":
-                predesc = ", to the beginning of a reverse curve {}, and having a radius of {:.2f} feet, a radial bearing to said beginning of curve bears {}".format(self.bearingLabel(midbearing), self.truncate(radius, self.tolerance), dbearing)
-                gpredesc = ", to the beginning of a reverse curve {self.bearingLabel(midbearing)}, and having a radius of {self.truncate(radius/self.scalefactor, self.tolerance):.2f} feet, a radial bearing to said beginning of curve bears {dbearing}".format()
-
-            elif firstjson["radtangent"] == "Compound":
-                predesc = ", to the beginning of a compound curve {}, and having a radius of {:.2f} feet, a radial bearing to said beginning of curve bears {}".format(self.bearingLabel(midbearing), self.truncate(radius, self.tolerance), dbearing)
-                gpredesc = ", to the beginning of a compound curve {}, and having a radius of {:.2f} feet, a radial bearing to said beginning of curve bears {}".format(self.bearingLabel(midbearing), self.truncate(radius/self.scalefactor, self.tolerance), dbearing)
+        # Horizontal control stations ordered from the most distant to the closest to the parcel's centroid
+        hc1, hc2 = amcdesc.orderControls(self.jsonControls["GPS"], self.jsonControls["Centroid"][poid])
 
-            else:
-                predesc = ", to the beginning of a non-tangent curve, concave {}, and having a radius of {:.2f} feet, a radial bearing to said beginning of curve bears {}".format(self.bearingLabel(midbearing), self.truncate(radius, self.tolerance), dbearing)
-                gpredesc = ", to the beginning of a non-tangent curve, concave {}, and having a radius of {:.2f} feet, a radial bearing to said beginning of curve bears {}".format(self.bearingLabel(midbearing), self.truncate(radius/self.scalefactor, self.tolerance), dbearing)
+        # The preamp runs from the stations to the start of the parcel's course (its TPOB, or its point of beginning when the course does not start at a TPOB point), and describes its first feature if it is a curve
+        firstjson = self.jsonBoundary[poid][self.course[poid][1]["oid"]]
+        preamps = self.renderer.renderPreamp(hc1, hc2, self.course[poid][1]["start"], firstjson, amcdesc.pointOfBeginning(firstjson, self.tpobstring))
+        self.preamp, self.gpreamp = preamps["grid"], preamps["ground"]
 
-        else:
-            predesc = ""
-            gpredesc = ""
-    
-    
-        self.preamp = "COMMENCING at Orange County Horizontal Control Station \"{}\" having a State Plane Coordinate Value of Northing {} and Easting {}; Thence {} to Station \"{}\"; Thence {} to the TRUE POINT OF BEGINNING having a State Plane Coordinate Value of Northing {:.2f} and Easting {:.2f}{}.".format(hc1id, hc1x, hc1y, self.labelBearingDistance(hc1bearing, hc1distance), hc2id, annotation2, self.truncate(tpobx, self.tolerance), self.truncate(tpoby, self.tolerance), predesc)
-        self.gpreamp = "COMMENCING at Orange County Horizontal Control Station \"{}\" having a State Plane Coordinate Value of Northing {} and Easting {}; Thence {} to Station \"{}\"; Thence {} to the TRUE POINT OF BEGINNING having a State Plane Coordinate Value of Northing {:.2f} and Easting {:.2f}{}.".format(hc1id, ghc1x, ghc1y, self.labelBearingDistance(hc1bearing, ghc1distance), hc2id, gannotation2, self.truncate(tpobx/self.scalefactor, self.tolerance), self.truncate(tpoby/self.scalefactor, self.tolerance), gpredesc)
-        
         return
 
 
 
 
-    #==================== AMC Class Function: Format Labels for Bearing and Distance ====================#
-
-    def labelBearingDistance(self, bearing, distance):
-        """AMC Class Function: Format Labels for Bearing and Distance
-        Generates a formatted bearing and distance string from coordinates
-        """
-        if 0 <= bearing <= 90:
-            label = "North {} East, {} feet".format(self.dd2dms(self.truncate(bearing, self.tolerance)), self.truncate(distance, self.tolerance))
-        elif 90 < bearing <= 180:
-            label = "South {} East, {} feet".format(self.dd2dms(self.truncate(180 - bearing, self.tolerance)), self.truncate(distance, self.tolerance))
-        elif 180 < bearing <= 270:
-            label = "South {} West, {} feet".format(self.dd2dms(self.truncate(bearing - 180, self.tolerance)), self.truncate(distance, self.tolerance))
-        elif 270 < bearing <= 360:
-            label = "North {}, West, {} feet".format(self.dd2dms(self.truncate(360 - bearing, self.tolerance)), self.truncate(distance, self.tolerance))
-
-        return label
-
-
-
-    
     #==================== AMC Class Function: Generate CSV Boundary Table ====================#
 
     def boundaryToTable(self):
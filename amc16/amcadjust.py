@@ -0,0 +1,260 @@
+##############################################################
+# PYTHON AUTOMATED MAP CHECKING ANALYSIS                     #
+# AMC Traverse Adjustment (Compass and Least Squares)        #
+# Version: 1.6                                               #
+# Author: Dr. Kostas Alexandridis, GISP                      #
+# Organization: OC Survey Geospatial Services                #
+# Date: August 2020                                          #
+##############################################################
+
+
+# Importing the required libraries into the project
+import numpy
+
+
+
+
+#============================================================#
+#  TRAVERSE COORDINATES                                      #
+#============================================================#
+
+
+#==================== AMC Adjustment Function: Ring Offsets ====================#
+
+def ringOffsets(rings):
+    """
+    AMC Adjustment Function: Ring Offsets
+        Returns the ring numbers as an integer array, the number of rings, and the index of the first course of each course's ring (the courses of each ring are consecutive).
+    """
+    rings = numpy.asarray(rings, dtype=int)
+    n = int(rings.max()) + 1 if len(rings) > 0 else 0
+    first = numpy.searchsorted(rings, numpy.arange(n))
+    return rings, n, first[rings]
+
+
+
+#==================== AMC Adjustment Function: Traverse Coordinates ====================#
+
+def traverseCoordinates(starts, bearings, distances, rings=None):
+    """
+    AMC Adjustment Function: Traverse Coordinates
+        Computes the (unadjusted) coordinates of the end point of each course of one or more traverses, from their start points, bearings and distances.
+
+    INPUT
+        starts: a (k, 2) array of the x, y coordinates of the start point (point of beginning) of each traverse (ring).
+        bearings: an array of the course bearings (azimuths in decimal degrees, clockwise from north).
+        distances: an array of the course distances (line lengths or curve chord lengths).
+        rings: (optional) an array of the traverse (ring) number 0, 1, 2, ... of each course, with the courses of each ring consecutive (default = None, a single traverse).
+
+    OUTPUT
+        An (n, 2) array of the x, y coordinates of the end point of each course.
+    """
+    radians = numpy.radians(numpy.asarray(bearings, dtype=float))
+    distances = numpy.asarray(distances, dtype=float)
+    rings, n, first = ringOffsets(numpy.zeros(len(distances), dtype=int) if rings is None else rings)
+    starts = numpy.asarray(starts, dtype=float).reshape(-1, 2)
+
+    # Cumulative departures and latitudes restart at the first course of each ring
+    steps = numpy.column_stack([distances * numpy.sin(radians), distances * numpy.cos(radians)])
+    totals = numpy.cumsum(steps, axis=0)
+    offsets = totals[first] - steps[first]
+    return starts[rings] + totals - offsets
+
+
+
+#==================== AMC Adjustment Function: Course Residuals ====================#
+
+def courseResiduals(starts, points, bearings, distances, rings=None):
+    """
+    AMC Adjustment Function: Course Residuals
+        Computes the adjusted bearings and distances between consecutive adjusted points of one or more traverses, and their residuals (adjusted minus observed: bearings in seconds of arc, distances in feet).
+    """
+    rings, n, first = ringOffsets(numpy.zeros(len(points), dtype=int) if rings is None else rings)
+    starts = numpy.asarray(starts, dtype=float).reshape(-1, 2)
+    previous = numpy.roll(points, 1, axis=0)
+    heads = first == numpy.arange(len(points))
+    previous[heads] = starts[rings[heads]]
+
+    delta = points - previous
+    adjustedDistances = numpy.hypot(delta[:, 0], delta[:, 1])
+    adjustedBearings = numpy.degrees(numpy.arctan2(delta[:, 0], delta[:, 1])) % 360
+    bearingResiduals = (adjustedBearings - numpy.asarray(bearings, dtype=float) + 180) % 360 - 180
+
+    return {"bearing": adjustedBearings, "distance": adjustedDistances, "vbearing": bearingResiduals * 3600, "vdistance": adjustedDistances - numpy.asarray(distances, dtype=float)}
+
+
+
+
+#============================================================#
+#  COMPASS (BOWDITCH) ADJUSTMENT                             #
+#============================================================#
+
+
+#==================== AMC Adjustment Function: Compass Adjustment ====================#
+
+def compassAdjustment(starts, bearings, distances, lengths=None, rings=None):
+    """
+    AMC Adjustment Function: Compass (Bowditch) Adjustment
+        Adjusts one or more closed traverses by the compass rule: the misclosure in latitude and departure of each traverse is distributed to its courses in proportion to their lengths, vectorized over all the courses.
+
+    INPUT
+        starts: a (k, 2) array of the x, y coordinates of the start point (point of beginning) of each traverse (ring); each traverse closes back on its start point.
+        bearings: an array of the course bearings (azimuths in decimal degrees, clockwise from north).
+        distances: an array of the course distances (line lengths or curve chord lengths).
+        lengths: (optional) an array of the course lengths used to distribute the misclosure (default = None, the distances).
+        rings: (optional) an array of the traverse (ring) number 0, 1, 2, ... of each course, with the courses of each ring consecutive (default = None, a single traverse).
+
+    OUTPUT
+        A dictionary holding 'points' (an (n, 2) array of the adjusted end point of each course), 'corrections' (an (n, 2) array of the corrections to the unadjusted end points), and the adjusted course 'bearing' and 'distance' with their residuals 'vbearing' (seconds) and 'vdistance' (feet).
+    """
+    distances = numpy.asarray(distances, dtype=float)
+    lengths = distances if lengths is None else numpy.asarray(lengths, dtype=float)
+    rings, n, first = ringOffsets(numpy.zeros(len(distances), dtype=int) if rings is None else rings)
+    starts = numpy.asarray(starts, dtype=float).reshape(-1, 2)
+
+    points = traverseCoordinates(starts, bearings, distances, rings)
+
+    # Misclosure of each ring (the computed end point minus the start point), and the cumulative length fraction of each course
+    last = numpy.searchsorted(rings, numpy.arange(n), side="right") - 1
+    misclosure = points[last] - starts
+    perimeter = numpy.bincount(rings, lengths, n)
+    cumulative = numpy.cumsum(lengths)
+    fraction = (cumulative - (cumulative[first] - lengths[first])) / perimeter[rings]
+
+    corrections = -misclosure[rings] * fraction[:, None]
+    points = points + corrections
+
+    return dict(courseResiduals(starts, points, bearings, distances, rings), points=points, corrections=corrections)
+
+
+
+
+#============================================================#
+#  WEIGHTED LEAST SQUARES ADJUSTMENT                         #
+#============================================================#
+
+
+#==================== AMC Adjustment Function: Block Tridiagonal Solve ====================#
+
+def blockTridiagonalSolve(diagonal, offdiagonal, rhs):
+    """
+    AMC Adjustment Function: Block Tridiagonal Solve
+        Solves a symmetric block tridiagonal system of 2 x 2 blocks (block Thomas algorithm), in time and memory linear in the number of blocks.
+
+    INPUT
+        diagonal: a (k, 2, 2) array of the diagonal blocks.
+        offdiagonal: a (k - 1, 2, 2) array of the blocks coupling unknown j with unknown j + 1 (the blocks below the diagonal are their transposes).
+        rhs: a (k, 2) array of the right hand side.
+
+    OUTPUT
+        A (k, 2) array of the solution.
+    """
+    D = numpy.asarray(diagonal, dtype=float).reshape(-1, 4).tolist()
+    U = numpy.asarray(offdiagonal, dtype=float).reshape(-1, 4).tolist()
+    r = numpy.asarray(rhs, dtype=float).tolist()
+    k = len(D)
+
+    # Forward elimination of the blocks below the diagonal (the transposed coupling blocks), keeping the inverse of each pivot block; the 2 x 2 blocks are inverted in closed form
+    inverses, reduced = [], []
+    p, g = D[0], r[0]
+    for j in range(k):
+        if j > 0:
+            u, P = U[j - 1], inverses[-1]
+            # factor = U^T P^-1
+            f0, f1 = u[0] * P[0] + u[2] * P[2], u[0] * P[1] + u[2] * P[3]
+            f2, f3 = u[1] * P[0] + u[3] * P[2], u[1] * P[1] + u[3] * P[3]
+            d = D[j]
+            p = [d[0] - f0 * u[0] - f1 * u[2], d[1] - f0 * u[1] - f1 * u[3], d[2] - f2 * u[0] - f3 * u[2], d[3] - f2 * u[1] - f3 * u[3]]
+            g = [r[j][0] - f0 * g[0] - f1 * g[1], r[j][1] - f2 * g[0] - f3 * g[1]]
+        det = p[0] * p[3] - p[1] * p[2]
+        inverses.append([p[3] / det, -p[1] / det, -p[2] / det, p[0] / det])
+        reduced.append(g)
+
+    # Back substitution
+    solution = [None] * k
+    x = [0.0, 0.0]
+    for j in range(k - 1, -1, -1):
+        g = reduced[j]
+        if j < k - 1:
+            u = U[j]
+            g = [g[0] - u[0] * x[0] - u[1] * x[1], g[1] - u[2] * x[0] - u[3] * x[1]]
+        P = inverses[j]
+        x = solution[j] = [P[0] * g[0] + P[1] * g[1], P[2] * g[0] + P[3] * g[1]]
+    return numpy.array(solution, dtype=float).reshape(-1, 2)
+
+
+
+#==================== AMC Adjustment Function: Least Squares Adjustment ====================#
+
+def leastSquaresAdjustment(starts, bearings, distances, rings=None, sigmaDistance=0.01, sigmaPpm=10.0, sigmaBearing=5.0, iterations=10, threshold=1e-8):
+    """
+    AMC Adjustment Function: Weighted Least Squares Adjustment
+        Adjusts one or more closed traverses by weighted least squares (parametric, Gauss-Newton): the bearing and distance of each course are observations, and the coordinates of each traverse's points (other than its fixed start point) are the unknowns. The compass adjustment is used for the initial coordinates. Each course couples only its two end points, so the block tridiagonal normal equations are solved in time and memory linear in the number of courses (see blockTridiagonalSolve).
+
+    INPUT
+        starts: a (k, 2) array of the x, y coordinates of the start point (point of beginning) of each traverse (ring); each traverse closes back on its start point.
+        bearings: an array of the course bearings (azimuths in decimal degrees, clockwise from north).
+        distances: an array of the course distances (line lengths or curve chord lengths).
+        rings: (optional) an array of the traverse (ring) number 0, 1, 2, ... of each course, with the courses of each ring consecutive (default = None, a single traverse).
+        sigmaDistance: (optional) the constant part of the distance standard deviation, in feet (default = 0.01).
+        sigmaPpm: (optional) the distance-proportional part of the distance standard deviation, in parts per million (default = 10).
+        sigmaBearing: (optional) the bearing standard deviation, in seconds of arc (default = 5).
+        iterations: (optional) the maximum number of iterations (default = 10).
+        threshold: (optional) the largest coordinate correction (feet) at which the iterations stop (default = 1e-8).
+
+    OUTPUT
+        A dictionary holding 'points' (an (n, 2) array of the adjusted end point of each course), 'corrections' (an (n, 2) array of the corrections to the unadjusted end points), the adjusted course 'bearing' and 'distance' with their residuals 'vbearing' (seconds) and 'vdistance' (feet), and 'sigma0' (the a posteriori standard deviation of unit weight of each traverse).
+    """
+    bearings = numpy.asarray(bearings, dtype=float)
+    distances = numpy.asarray(distances, dtype=float)
+    rings, n, first = ringOffsets(numpy.zeros(len(distances), dtype=int) if rings is None else rings)
+    starts = numpy.asarray(starts, dtype=float).reshape(-1, 2)
+
+    unadjusted = traverseCoordinates(starts, bearings, distances, rings)
+    points = compassAdjustment(starts, bearings, distances, rings=rings)["points"]
+    sigma0 = numpy.zeros(n)
+
+    # Observation weights: distances (constant + ppm) and bearings (radians)
+    sd = numpy.hypot(sigmaDistance, distances * sigmaPpm * 1e-6)
+    sb = numpy.radians(sigmaBearing / 3600.0)
+    observed = numpy.radians(bearings)
+
+    for ring in range(n):
+        courses = numpy.flatnonzero(rings == ring)
+        m = len(courses)
+        if m < 2:
+            continue
+
+        # Unknowns: the x, y of the end points of all but the last course (the last course closes on the start point)
+        wd, wb = 1.0 / sd[courses] ** 2, numpy.full(m, 1.0 / sb ** 2)
+        weights = numpy.concatenate([wd, wb])
+        x = points[courses[:-1]].copy()
+        for iteration in range(iterations):
+            xy = numpy.vstack([starts[ring], x, starts[ring]])
+            dx, dy = numpy.diff(xy[:, 0]), numpy.diff(xy[:, 1])
+            s = numpy.hypot(dx, dy)
+
+            # Observation equations of each course (from point i - 1 to point i): the distance and bearing gradients with respect to the end point (the start point has the opposite gradients; the fixed start point has no unknowns)
+            a = numpy.column_stack([dx / s, dy / s])
+            b = numpy.column_stack([dy / s ** 2, -dx / s ** 2])
+
+            # Misclosure vector (observed minus computed), with the bearings wrapped to (-pi, pi]
+            fd = distances[courses] - s
+            fb = (observed[courses] - numpy.arctan2(dx, dy) + numpy.pi) % (2 * numpy.pi) - numpy.pi
+
+            # Normal equations: each course couples only its two end points, so the normal matrix is block tridiagonal (2 x 2 blocks per point)
+            K = wd[:, None, None] * a[:, :, None] * a[:, None, :] + wb[:, None, None] * b[:, :, None] * b[:, None, :]
+            q = (wd * fd)[:, None] * a + (wb * fb)[:, None] * b
+            delta = blockTridiagonalSolve(K[:-1] + K[1:], -K[1:-1], q[:-1] - q[1:])
+            x += delta
+            if numpy.abs(delta).max() < threshold:
+                break
+
+        points[courses[:-1]] = x
+        points[courses[-1]] = starts[ring]
+        shift = numpy.diff(numpy.vstack([numpy.zeros(2), delta, numpy.zeros(2)]), axis=0)
+        v = numpy.concatenate([fd - (a * shift).sum(axis=1), fb - (b * shift).sum(axis=1)])
+        # Degrees of freedom: 2m observations, 2(m - 1) unknowns
+        sigma0[ring] = numpy.sqrt((weights * v ** 2).sum() / 2)
+
+    return dict(courseResiduals(starts, points, bearings, distances, rings), points=points, corrections=points - unadjusted, sigma0=sigma0)
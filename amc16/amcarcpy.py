@@ -0,0 +1,1346 @@
+##############################################################
+# PYTHON AUTOMATED MAP CHECKING ANALYSIS                     #
+# AMC Offline ArcPy (In-Memory Stand-In, Record and Replay)  #
+# Version: 1.6                                               #
+# Author: Dr. Kostas Alexandridis, GISP                      #
+# Organization: OC Survey Geospatial Services                #
+# Date: August 2020                                          #
+##############################################################
+
+
+# Importing the required libraries into the project
+import os, re, sys, json, gzip, math, types, struct, fnmatch, datetime, functools, numpy
+import amcgraph, amcprofile
+
+
+
+
+#============================================================#
+#  GEOMETRY                                                  #
+#============================================================#
+
+# Spatial references known by name (the County's State Plane projection)
+SPATIAL_REFERENCES = {102646: "NAD_1983_StatePlane_California_VI_FIPS_0406_Feet", 2230: "NAD_1983_StatePlane_California_VI_FIPS_0406_Feet"}
+
+# Area unit conversions from square (US survey) feet, the linear unit of the State Plane projection
+AREA_UNITS = {"SQUAREFEET": 1.0, "SQUAREFEETUS": 1.0, "ACRES": 1.0 / 43560.0, "SQUAREMETERS": (1200.0 / 3937.0) ** 2, "HECTARES": (1200.0 / 3937.0) ** 2 / 10000.0, "SQUAREMILES": 1.0 / 27878400.0}
+
+# Geometry types: WKB geometry type codes, Esri JSON keys and WKT names
+WKB_TYPES = {1: "point", 2: "polyline", 3: "polygon", 4: "multipoint", 5: "polyline", 6: "polygon"}
+WKT_TYPES = {"POINT": "point", "MULTIPOINT": "multipoint", "LINESTRING": "polyline", "MULTILINESTRING": "polyline", "POLYGON": "polygon", "MULTIPOLYGON": "polygon"}
+
+
+class ExecuteError(Exception):
+    """
+    Class Execute Error: Raised by the stand-in geoprocessing tools when a tool fails (as arcpy.ExecuteError), e.g., a tool that can only be replayed from a recording.
+    """
+    pass
+
+
+
+class spatialReference(object):
+    """
+    Class Spatial Reference: The spatial reference of the stand-in geometries (factory code and name only; no projections are done).
+    """
+
+    def __init__(self, item=None):
+        self.factoryCode = int(item) if isinstance(item, (int, float)) or (isinstance(item, str) and item.isdigit()) else 0
+        self.name = SPATIAL_REFERENCES.get(self.factoryCode, str(item) if item is not None else "Unknown")
+        self.linearUnitName = "Foot_US" if "Feet" in self.name else "Unknown"
+
+    def __repr__(self):
+        return "<SpatialReference {}>".format(self.name)
+
+
+
+class point(object):
+    """
+    Class Point: A stand-in arcpy.Point (X, Y and optional Z, M coordinates).
+    """
+
+    def __init__(self, X=None, Y=None, Z=None, M=None, ID=None):
+        self.X, self.Y, self.Z, self.M, self.ID = X, Y, Z, M, ID
+
+    def __repr__(self):
+        return "{} {} {} {}".format(self.X, self.Y, "NaN" if self.Z is None else self.Z, "NaN" if self.M is None else self.M)
+
+
+
+class geometry(object):
+    """
+    Class Geometry: A stand-in arcpy geometry (point, multipoint, polyline or polygon) holding the (x, y) vertex arrays of its parts (polygon rings: outer rings clockwise, holes counter-clockwise). The properties used by AMC are computed in plane (State Plane) coordinates, unless they were recorded from ArcGIS (see dumpGeometry), in which case the recorded values are returned: e.g., the geodesic areas, label points and the Esri JSON of true curves.
+
+    INPUT
+        shapeType: the geometry type: 'point', 'multipoint', 'polyline' or 'polygon'.
+        parts: a list of (n, 2) vertex arrays (a single vertex for a point).
+        spatialReference: (optional) the spatial reference (default = None).
+        esriJson: (optional) the Esri JSON of the geometry, when it holds true curves (default = None).
+        properties: (optional) the recorded properties: 'centroid', 'labelPoint', 'length' and the areas keyed by unit (default = None).
+    """
+
+    def __init__(self, shapeType, parts, spatialReference=None, esriJson=None, properties=None):
+        self.type = shapeType.lower()
+        self.parts = [numpy.asarray(part, dtype=float).reshape(-1, 2) for part in parts]
+        self.spatialReference = spatialReference
+        self.esriJson = esriJson
+        self.properties = properties or {}
+
+    def __repr__(self):
+        return "<{} object, {} part(s)>".format(self.type.capitalize(), len(self.parts))
+
+    def __getitem__(self, i):
+        if self.type == "point":
+            return self.firstPoint
+        return [point(x, y) for x, y in self.parts[i]]
+
+    def __iter__(self):
+        for i in range(len(self.parts)):
+            yield self[i]
+
+    def getPart(self, index=None):
+        return [self[i] for i in range(len(self.parts))] if index is None else self[index]
+
+    @property
+    def partCount(self):
+        return len(self.parts)
+
+    @property
+    def pointCount(self):
+        return sum(len(part) for part in self.parts)
+
+    @property
+    def isMultipart(self):
+        return len(self.parts) > 1
+
+    @property
+    def firstPoint(self):
+        return point(float(self.parts[0][0][0]), float(self.parts[0][0][1]))
+
+    @property
+    def lastPoint(self):
+        return point(float(self.parts[-1][-1][0]), float(self.parts[-1][-1][1]))
+
+    @property
+    def length(self):
+        if "length" in self.properties:
+            return self.properties["length"]
+        return float(sum(numpy.hypot(*numpy.diff(part, axis=0).T).sum() for part in self.parts if len(part) > 1))
+
+    @property
+    def area(self):
+        # Esri rings: outer rings clockwise (negative shoelace area), holes counter-clockwise
+        if self.type != "polygon":
+            return 0.0
+        return abs(sum(-amcgraph.planarGraph.ringArea(part) for part in self.parts if len(part) > 2))
+
+    def getArea(self, method=None, units=None):
+        """Returns the area in the units (e.g., 'SQUAREFEET', 'ACRES'): the recorded (e.g., geodesic) area, or the planar area"""
+        units = (units or "SQUAREFEET").upper().replace("_", "")
+        if units in self.properties.get("area", {}):
+            return self.properties["area"][units]
+        return self.area * AREA_UNITS.get(units, 1.0)
+
+    @property
+    def centroid(self):
+        if "centroid" in self.properties:
+            return point(*self.properties["centroid"])
+        if self.type == "polygon":
+            sx = sy = total = 0.0
+            for part in self.parts:
+                if len(part) < 3:
+                    continue
+                x, y = part[:, 0] - part[0, 0], part[:, 1] - part[0, 1]
+                cross = x[:-1] * y[1:] - x[1:] * y[:-1]
+                sx += float(numpy.sum((x[:-1] + x[1:]) * cross)) + 3 * part[0, 0] * float(cross.sum())
+                sy += float(numpy.sum((y[:-1] + y[1:]) * cross)) + 3 * part[0, 1] * float(cross.sum())
+                total += float(cross.sum())
+            if total != 0:
+                return point(sx / (3 * total), sy / (3 * total))
+        if self.type == "polyline":
+            lengths = numpy.concatenate([numpy.hypot(*numpy.diff(part, axis=0).T) for part in self.parts])
+            mids = numpy.concatenate([(part[:-1] + part[1:]) / 2 for part in self.parts])
+            if lengths.sum() > 0:
+                x, y = (mids * lengths[:, None]).sum(axis=0) / lengths.sum()
+                return point(float(x), float(y))
+        x, y = numpy.concatenate(self.parts).mean(axis=0)
+        return point(float(x), float(y))
+
+    trueCentroid = centroid
+
+    @property
+    def labelPoint(self):
+        if "labelPoint" in self.properties:
+            return point(*self.properties["labelPoint"])
+        if self.type != "polygon":
+            return self.centroid
+        # The midpoint of the widest interior span along the horizontal line through the centroid
+        y = self.centroid.Y
+        crossings = []
+        for part in self.parts:
+            x1, y1, x2, y2 = part[:-1, 0], part[:-1, 1], part[1:, 0], part[1:, 1]
+            crossing = (y1 > y) != (y2 > y)
+            crossings.extend((x1[crossing] + (y - y1[crossing]) * (x2[crossing] - x1[crossing]) / (y2[crossing] - y1[crossing])).tolist())
+        crossings.sort()
+        spans = [(crossings[i + 1] - crossings[i], crossings[i]) for i in range(0, len(crossings) - 1, 2)]
+        if len(spans) == 0:
+            return self.centroid
+        width, start = max(spans)
+        return point(start + width / 2, y)
+
+    @property
+    def hasCurves(self):
+        return self.esriJson is not None and ("curvePaths" in self.esriJson or "curveRings" in self.esriJson)
+
+    @property
+    def JSON(self):
+        if self.esriJson is not None:
+            return self.esriJson
+        sr = {"wkid": self.spatialReference.factoryCode} if self.spatialReference is not None else {}
+        if self.type == "point":
+            value = {"x": float(self.parts[0][0][0]), "y": float(self.parts[0][0][1])}
+        elif self.type == "multipoint":
+            value = {"points": numpy.concatenate(self.parts).tolist()}
+        else:
+            value = {"paths" if self.type == "polyline" else "rings": [part.tolist() for part in self.parts]}
+        value["spatialReference"] = sr
+        return json.dumps(value)
+
+    @property
+    def WKT(self):
+        def coordinates(part):
+            return ", ".join("{!r} {!r}".format(float(x), float(y)) for x, y in part)
+        if self.type == "point":
+            return "POINT ({})".format(coordinates(self.parts[0][:1]))
+        if self.type == "multipoint":
+            return "MULTIPOINT ({})".format(", ".join("({})".format(coordinates(part)) for part in self.parts))
+        if self.type == "polyline":
+            return "MULTILINESTRING ({})".format(", ".join("({})".format(coordinates(part)) for part in self.parts))
+        return "MULTIPOLYGON (({}))".format(", ".join("({})".format(coordinates(part)) for part in self.parts))
+
+    @property
+    def WKB(self):
+        return bytearray(wkbBytes(self.type, self.parts))
+
+    def positionAlongLine(self, value, use_percentage=False):
+        """Returns the point geometry at a distance (or a fraction, with use_percentage) along the line"""
+        xy = numpy.concatenate(self.parts)
+        lengths = numpy.concatenate([[0.0], numpy.cumsum(numpy.hypot(*numpy.diff(xy, axis=0).T))])
+        distance = min(max(value * lengths[-1] if use_percentage else value, 0.0), lengths[-1])
+        x, y = numpy.interp(distance, lengths, xy[:, 0]), numpy.interp(distance, lengths, xy[:, 1])
+        return geometry("point", [[(float(x), float(y))]], self.spatialReference)
+
+    def copy(self):
+        return geometry(self.type, [part.copy() for part in self.parts], self.spatialReference, self.esriJson, dict(self.properties))
+
+
+
+#==================== AMC ArcPy Function: Well Known Binary ====================#
+
+def wkbBytes(shapeType, parts):
+    """
+    AMC ArcPy Function: Well Known Binary
+        Returns the little-endian Well Known Binary of a geometry: a Point, MultiPoint, MultiLineString (one LineString per part) or MultiPolygon (a single Polygon holding all the rings).
+    """
+    def coordinates(part):
+        return struct.pack("<I", len(part)) + numpy.ascontiguousarray(part, dtype="<f8").tobytes()
+    if shapeType == "point":
+        return struct.pack("<BI", 1, 1) + numpy.ascontiguousarray(parts[0][0], dtype="<f8").tobytes()
+    if shapeType == "multipoint":
+        xy = numpy.concatenate(parts)
+        return struct.pack("<BII", 1, 4, len(xy)) + b"".join(struct.pack("<BI", 1, 1) + numpy.ascontiguousarray(p, dtype="<f8").tobytes() for p in xy)
+    if shapeType == "polyline":
+        return struct.pack("<BII", 1, 5, len(parts)) + b"".join(struct.pack("<BI", 1, 2) + coordinates(part) for part in parts)
+    return struct.pack("<BII", 1, 6, 1) + struct.pack("<BII", 1, 3, len(parts)) + b"".join(coordinates(part) for part in parts)
+
+
+
+#==================== AMC ArcPy Function: Parse Well Known Binary ====================#
+
+def parseWkb(wkb):
+    """
+    AMC ArcPy Function: Parse Well Known Binary
+        Returns the geometry type and the list of (n, 2) part arrays (lines or rings) of a Well Known Binary geometry (ISO or extended Z/M flags; Z and M values are dropped).
+    """
+    buffer = bytes(wkb)
+
+    def read(offset):
+        order = "<" if buffer[offset] == 1 else ">"
+        gtype = struct.unpack_from(order + "I", buffer, offset + 1)[0]
+        iso = (gtype & 0x0fffffff) // 1000
+        dims = 2 + bool(gtype & 0x80000000 or iso in (1, 3)) + bool(gtype & 0x40000000 or iso in (2, 3))
+        gtype = (gtype & 0x0fffffff) % 1000
+        offset += 5
+        if gtype == 1:
+            xy = numpy.frombuffer(buffer, dtype=order + "f8", count=dims, offset=offset)[:2].reshape(1, 2)
+            return gtype, [xy], offset + 8 * dims
+        if gtype == 2:
+            n = struct.unpack_from(order + "I", buffer, offset)[0]
+            xy = numpy.frombuffer(buffer, dtype=order + "f8", count=n * dims, offset=offset + 4).reshape(n, dims)[:, :2]
+            return gtype, [xy], offset + 4 + 8 * n * dims
+        if gtype == 3:
+            nrings = struct.unpack_from(order + "I", buffer, offset)[0]
+            offset += 4
+            rings = []
+            for i in range(nrings):
+                n = struct.unpack_from(order + "I", buffer, offset)[0]
+                rings.append(numpy.frombuffer(buffer, dtype=order + "f8", count=n * dims, offset=offset + 4).reshape(n, dims)[:, :2])
+                offset += 4 + 8 * n * dims
+            return gtype, rings, offset
+        if gtype in (4, 5, 6):
+            n = struct.unpack_from(order + "I", buffer, offset)[0]
+            offset += 4
+            parts = []
+            for i in range(n):
+                subtype, subparts, offset = read(offset)
+                parts.extend(subparts)
+            return gtype, parts, offset
+        raise ValueError("Unsupported WKB geometry type: {}".format(gtype))
+
+    gtype, parts, offset = read(0)
+    return WKB_TYPES[gtype], [part.astype(float) for part in parts]
+
+
+
+#==================== AMC ArcPy Function: From Well Known Binary ====================#
+
+def fromWkb(wkb, spatial_reference=None):
+    """
+    AMC ArcPy Function: From Well Known Binary
+        Returns a stand-in geometry from its Well Known Binary (as arcpy.FromWKB).
+    """
+    shapeType, parts = parseWkb(wkb)
+    return geometry(shapeType, parts, spatial_reference)
+
+
+
+#==================== AMC ArcPy Function: From Well Known Text ====================#
+
+def fromWkt(wkt, spatial_reference=None):
+    """
+    AMC ArcPy Function: From Well Known Text
+        Returns a stand-in geometry from its Well Known Text (as arcpy.FromWKT); each innermost parenthesized coordinate list is a part (or ring).
+    """
+    name = re.match(r"\s*([A-Za-z]+)", wkt).group(1).upper()
+    parts = []
+    for group in re.findall(r"\(([^()]+)\)", wkt):
+        parts.append([tuple(float(v) for v in pair.split()[:2]) for pair in group.split(",")])
+    if name == "MULTIPOINT" and len(parts) == 1 and len(parts[0]) > 1:
+        parts = [[xy] for xy in parts[0]]
+    return geometry(WKT_TYPES[name], parts, spatial_reference)
+
+
+
+#==================== AMC ArcPy Function: Point Geometry ====================#
+
+def pointGeometry(inputs, spatial_reference=None, *args):
+    """
+    AMC ArcPy Function: Point Geometry
+        Returns a stand-in point geometry from a point (as arcpy.PointGeometry).
+    """
+    return geometry("point", [[(inputs.X, inputs.Y)]], spatial_reference)
+
+
+
+#==================== AMC ArcPy Function: Split Line Part ====================#
+
+def splitPart(part, points, radius):
+    """
+    AMC ArcPy Function: Split Line Part
+        Returns the pieces of a line part (vertex array) split at the points within the search radius of its interior: each point is projected onto the line, and the line is cut at the projected measures (as arcpy.SplitLineAtPoint).
+    """
+    a, d = part[:-1], numpy.diff(part, axis=0)
+    steps = numpy.hypot(d[:, 0], d[:, 1])
+    lengths = numpy.concatenate([[0.0], numpy.cumsum(steps)])
+    measures = []
+    for xy in points:
+        t = numpy.clip(((xy - a) * d).sum(axis=1) / numpy.where(steps > 0, steps ** 2, 1.0), 0.0, 1.0)
+        distance = numpy.hypot(*(a + t[:, None] * d - xy).T)
+        i = int(numpy.argmin(distance))
+        measure = lengths[i] + t[i] * steps[i]
+        if distance[i] <= radius and radius < measure < lengths[-1] - radius:
+            measures.append(measure)
+
+    pieces, start = [], 0.0
+    for measure in sorted(set(measures)) + [lengths[-1]]:
+        inside = (lengths > start) & (lengths < measure)
+        x = numpy.interp([start, measure], lengths, part[:, 0])
+        y = numpy.interp([start, measure], lengths, part[:, 1])
+        pieces.append(numpy.vstack([[x[0], y[0]], part[inside], [x[1], y[1]]]))
+        start = measure
+    return pieces
+
+
+
+#==================== AMC ArcPy Function: Dump Geometry ====================#
+
+def dumpGeometry(shape):
+    """
+    AMC ArcPy Function: Dump Geometry
+        Returns the JSON-serializable record of a geometry (ArcGIS or stand-in): its type, part coordinates (from the WKB, densifying true curves) and the properties AMC reads from it, so that replayed geometries return the values ArcGIS computed (the Esri JSON of true curves, the centroid, label point, length and geodesic areas).
+    """
+    if shape is None:
+        return None
+    shapeType, parts = parseWkb(shape.WKB)
+    record = {"type": shapeType, "parts": [part.tolist() for part in parts]}
+    properties = {"centroid": [shape.centroid.X, shape.centroid.Y], "length": shape.length}
+    if shape.hasCurves:
+        record["json"] = shape.JSON
+    if shapeType == "polygon":
+        properties["labelPoint"] = [shape.labelPoint.X, shape.labelPoint.Y]
+        properties["area"] = {units: shape.getArea("GEODESIC", units) for units in ("SQUAREFEET", "ACRES")}
+    record["properties"] = properties
+    return record
+
+
+
+#==================== AMC ArcPy Function: Load Geometry ====================#
+
+def loadGeometry(record, spatial_reference=None):
+    """
+    AMC ArcPy Function: Load Geometry
+        Returns the stand-in geometry of a geometry record (see dumpGeometry).
+    """
+    if record is None:
+        return None
+    return geometry(record["type"], record["parts"], spatial_reference, record.get("json"), record.get("properties"))
+
+
+
+
+#============================================================#
+#  WHERE CLAUSES                                             #
+#============================================================#
+
+# SQL tokens: quoted strings, numbers, (quoted) identifiers and operators
+SQL_TOKENS = re.compile(r"\s*(?:('(?:[^']|'')*')|(\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)|(\"[^\"]+\"|[A-Za-z_][\w.]*)|(<>|!=|<=|>=|=|<|>|\(|\)|,|-|\+|\*|/))")
+SQL_KEYWORDS = {"AND": "and", "OR": "or", "NOT": "not", "NULL": "None", "TRUE": "True", "FALSE": "False"}
+
+
+#==================== AMC ArcPy Function: Like ====================#
+
+def sqlLike(value, pattern):
+    """
+    AMC ArcPy Function: Like
+        Returns whether a value matches a SQL LIKE pattern (% for any characters, _ for one character).
+    """
+    if value is None:
+        return False
+    expression = "".join(".*" if c == "%" else "." if c == "_" else re.escape(c) for c in pattern)
+    return re.fullmatch(expression, str(value), re.DOTALL) is not None
+
+
+
+#==================== AMC ArcPy Function: Where Filter ====================#
+
+@functools.lru_cache(maxsize=256)
+def whereFilter(clause):
+    """
+    AMC ArcPy Function: Where Filter
+        Returns a predicate of the rows (called with a field value getter) for a SQL where clause: comparisons, AND, OR, NOT, IN (...), LIKE, IS (NOT) NULL, UPPER() and LOWER() over field names and literals. An empty clause matches every row.
+    """
+    if clause is None or not clause.strip():
+        return lambda value: True
+
+    tokens, position = [], 0
+    clause = clause.strip()
+    while position < len(clause):
+        match = SQL_TOKENS.match(clause, position)
+        if match is None or match.end() == position:
+            raise ExecuteError("Invalid where clause: {}".format(clause))
+        tokens.append(match.groups())
+        position = match.end()
+
+    output, depth, lists = [], 0, []
+    for i, (string, number, name, operator) in enumerate(tokens):
+        if string is not None:
+            output.append(repr(string[1:-1].replace("''", "'")))
+        elif number is not None:
+            output.append(number)
+        elif name is not None:
+            keyword = name.upper()
+            if keyword == "IN":
+                output.append("in")
+            elif keyword == "LIKE":
+                # Rewrite "value [NOT] LIKE pattern" as a function call on the previous operand
+                negate = len(output) > 1 and output[-1] == "not"
+                if negate:
+                    output.pop()
+                operand = output.pop()
+                output.append("{}sqlLike({}, ".format("not " if negate else "", operand))
+                lists.append(("like", depth))
+            elif keyword == "IS":
+                output.append("is")
+            elif keyword in ("UPPER", "LOWER"):
+                output.append("(lambda v: None if v is None else str(v).{}())".format(keyword.lower()))
+            elif keyword in SQL_KEYWORDS:
+                output.append(SQL_KEYWORDS[keyword])
+            else:
+                output.append("value({!r})".format(name.strip('"')))
+            if lists and lists[-1] == ("like", depth) and keyword != "LIKE":
+                lists.pop()
+                output[-1] += ")"
+        elif operator == "(":
+            # A list after IN is a Python list
+            output.append("[" if output and output[-1] == "in" else "(")
+            lists.append(("list" if output[-1] == "[" else "group", depth))
+            depth += 1
+        elif operator == ")":
+            depth -= 1
+            kind = lists.pop()[0]
+            output.append("]" if kind == "list" else ")")
+        elif operator in ("=", "<>"):
+            output.append({"=": "==", "<>": "!="}[operator])
+        else:
+            output.append(operator)
+        if string is not None or number is not None:
+            if lists and lists[-1] == ("like", depth):
+                lists.pop()
+                output[-1] += ")"
+
+    code = compile(" ".join(output), "<where>", "eval")
+
+    def predicate(value):
+        try:
+            return bool(eval(code, {"__builtins__": {}, "sqlLike": sqlLike, "str": str}, {"value": value}))
+        except TypeError: # e.g., comparing a null (None) value
+            return False
+    return predicate
+
+
+
+
+#============================================================#
+#  FEATURE STORE                                             #
+#============================================================#
+
+# Special cursor field tokens
+OID_TOKENS = ["OID@"]
+SHAPE_TOKENS = ["SHAPE@", "SHAPE@XY", "SHAPE@TRUECENTROID", "SHAPE@X", "SHAPE@Y", "SHAPE@WKB", "SHAPE@WKT", "SHAPE@JSON", "SHAPE@LENGTH", "SHAPE@AREA"]
+
+
+#==================== AMC ArcPy Function: Dataset Key ====================#
+
+def datasetKey(path):
+    """
+    AMC ArcPy Function: Dataset Key
+        Returns the case-insensitive key of a dataset path (Windows or POSIX separators).
+    """
+    return os.path.normpath(str(path).replace("\\", "/")).replace("\\", "/").lower()
+
+
+
+class toolResult(object):
+    """
+    Class Tool Result: The result of a stand-in geoprocessing tool (as arcpy's Result object): its outputs as strings, indexed from 0.
+    """
+
+    def __init__(self, *outputs):
+        self.outputs = [str(output) if output is not None else "" for output in outputs]
+        self.outputCount = len(self.outputs)
+
+    def __getitem__(self, i):
+        return self.outputs[i]
+
+    def getOutput(self, i):
+        return self.outputs[i]
+
+    def __str__(self):
+        return self.outputs[0] if self.outputs else ""
+
+
+
+class featureClass(object):
+    """
+    Class Feature Class: An in-memory feature class (or table, without a shape type) of the feature store. Rows are lists of field values keyed by their object ID, and the first two fields are the object ID and the shape.
+
+    INPUT
+        path: the dataset path.
+        shapeType: (optional) 'Point', 'Multipoint', 'Polyline' or 'Polygon', or None for a table (default = None).
+        fields: (optional) a list of the (name, type, alias) of the attribute fields (default = None).
+        alias: (optional) the alias name (default = None).
+    """
+
+    def __init__(self, path, shapeType=None, fields=None, alias=None):
+        self.path = path
+        self.name = os.path.basename(str(path).replace("\\", "/"))
+        self.shapeType = shapeType
+        self.alias = alias or self.name
+        self.fields = [("OBJECTID", "OID", "OBJECTID")] + ([("Shape", "Geometry", "Shape")] if shapeType else [])
+        self.rows = {}
+        self.nextOid = 1
+        self.reindex()
+        for name, ftype, falias in [tuple(f) + (None,) * (3 - len(f)) for f in fields or []]:
+            self.addField(name, ftype, falias)
+
+    def reindex(self):
+        self.index = {name.lower(): i for i, (name, ftype, falias) in enumerate(self.fields)}
+
+    def addField(self, name, ftype="TEXT", alias=None):
+        if name.lower() not in self.index:
+            self.fields.append((name, ftype, alias or name))
+            self.reindex()
+            for values in self.rows.values():
+                values.append(None)
+
+    def fieldIndex(self, name):
+        if name.lower() not in self.index:
+            raise RuntimeError("Cannot find field '{}'".format(name))
+        return self.index[name.lower()]
+
+    def insert(self, values, oid=None):
+        oid = self.nextOid if oid is None else int(oid)
+        self.nextOid = max(self.nextOid, oid + 1)
+        values = list(values) + [None] * (len(self.fields) - len(values))
+        values[0] = oid
+        self.rows[oid] = values
+        return oid
+
+    def copy(self, path, oids=None):
+        target = featureClass(path, self.shapeType, self.fields[2 if self.shapeType else 1:], self.alias)
+        for oid in (self.rows if oids is None else oids):
+            values = list(self.rows[oid])
+            if self.shapeType and values[1] is not None:
+                values[1] = values[1].copy()
+            target.insert(values)
+        return target
+
+
+
+class featureLayer(object):
+    """
+    Class Feature Layer: An in-memory feature layer (or table view) over a feature store dataset, with an optional definition query and selection.
+    """
+
+    def __init__(self, name, dataset, where=None):
+        self.name = name
+        self.dataset = dataset
+        self.where = where
+        self.selection = None
+
+    def oids(self):
+        predicate = whereFilter(self.where)
+        oids = [oid for oid in self.dataset.rows if predicate(rowGetter(self.dataset, oid))]
+        return oids if self.selection is None else [oid for oid in oids if oid in self.selection]
+
+
+
+#==================== AMC ArcPy Function: Row Getter ====================#
+
+def rowGetter(dataset, oid):
+    """
+    AMC ArcPy Function: Row Getter
+        Returns the field value getter of a dataset row (used by the where clause predicates).
+    """
+    values = dataset.rows[oid]
+    return lambda name: values[dataset.fieldIndex(name)]
+
+
+
+class searchCursor(object):
+    """
+    Class Search Cursor: A stand-in arcpy.da.SearchCursor over a feature store dataset or layer, returning tuples of the field values (field names or the OID@ and SHAPE@ tokens; '*' for all the fields).
+    """
+
+    rowType = tuple
+
+    def __init__(self, store, in_table, field_names, where_clause=None, spatial_reference=None, explode_to_points=False, sql_clause=(None, None)):
+        self.store = store
+        source = store.resolve(in_table, required=True)
+        self.dataset = source.dataset if isinstance(source, featureLayer) else source
+        oids = source.oids() if isinstance(source, featureLayer) else list(self.dataset.rows)
+        if where_clause:
+            predicate = whereFilter(where_clause)
+            oids = [oid for oid in oids if predicate(rowGetter(self.dataset, oid))]
+        if sql_clause and sql_clause[1] and "ORDER BY" in sql_clause[1].upper():
+            names = [name.strip().split()[0] for name in sql_clause[1].upper().split("ORDER BY")[1].split(",")]
+            oids.sort(key=lambda oid: tuple(self.dataset.rows[oid][self.dataset.fieldIndex(name)] for name in names))
+        self.oids = oids
+        if isinstance(field_names, str):
+            field_names = [name.strip() for name in field_names.split(";")] if field_names != "*" else ["*"]
+        if list(field_names) == ["*"]:
+            field_names = [name for name, ftype, alias in self.dataset.fields]
+        self.fields = tuple(field_names)
+        self.position = 0
+
+    def value(self, oid, field):
+        values = self.dataset.rows[oid]
+        token = field.upper()
+        if token in OID_TOKENS:
+            return oid
+        if token in SHAPE_TOKENS:
+            shape = values[1]
+            if shape is None:
+                return None
+            if token == "SHAPE@":
+                return shape
+            if token in ("SHAPE@XY", "SHAPE@TRUECENTROID"):
+                xy = shape.firstPoint if shape.type == "point" else shape.centroid
+                return (xy.X, xy.Y)
+            if token in ("SHAPE@X", "SHAPE@Y"):
+                xy = shape.firstPoint if shape.type == "point" else shape.centroid
+                return xy.X if token == "SHAPE@X" else xy.Y
+            return {"SHAPE@WKB": lambda: shape.WKB, "SHAPE@WKT": lambda: shape.WKT, "SHAPE@JSON": lambda: shape.JSON, "SHAPE@LENGTH": lambda: shape.length, "SHAPE@AREA": lambda: shape.area}[token]()
+        return values[self.dataset.fieldIndex(field)]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def __iter__(self):
+        while self.position < len(self.oids):
+            yield self.__next__()
+
+    def __next__(self):
+        while self.position < len(self.oids) and self.oids[self.position] not in self.dataset.rows:
+            self.position += 1
+        if self.position >= len(self.oids):
+            raise StopIteration
+        oid = self.oids[self.position]
+        self.position += 1
+        return self.rowType(self.value(oid, field) for field in self.fields)
+
+    next = __next__
+
+    def reset(self):
+        self.position = 0
+
+
+
+class updateCursor(searchCursor):
+    """
+    Class Update Cursor: A stand-in arcpy.da.UpdateCursor, returning lists of the field values that updateRow writes back to the current row (geometries, SHAPE@XY points and field values), and deleteRow removes.
+    """
+
+    rowType = list
+
+    def updateRow(self, row):
+        oid = self.oids[self.position - 1]
+        values = self.dataset.rows[oid]
+        for field, value in zip(self.fields, row):
+            token = field.upper()
+            if token in OID_TOKENS:
+                continue
+            if token == "SHAPE@":
+                values[1] = value
+            elif token == "SHAPE@XY":
+                values[1] = geometry("point", [[tuple(value)]], values[1].spatialReference if values[1] is not None else None)
+            elif token == "SHAPE@WKB":
+                values[1] = fromWkb(value)
+            elif token == "SHAPE@WKT":
+                values[1] = fromWkt(value)
+            elif token not in SHAPE_TOKENS:
+                values[self.dataset.fieldIndex(field)] = value
+
+    def deleteRow(self):
+        self.dataset.rows.pop(self.oids[self.position - 1], None)
+
+
+
+class insertCursor(object):
+    """
+    Class Insert Cursor: A stand-in arcpy.da.InsertCursor; insertRow returns the object ID of the new row.
+    """
+
+    def __init__(self, store, in_table, field_names):
+        self.dataset = store.resolve(in_table, required=True)
+        self.dataset = self.dataset.dataset if isinstance(self.dataset, featureLayer) else self.dataset
+        self.fields = tuple([field_names] if isinstance(field_names, str) else field_names)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def insertRow(self, row):
+        values = [None] * len(self.dataset.fields)
+        for field, value in zip(self.fields, row):
+            token = field.upper()
+            if token == "SHAPE@":
+                values[1] = value
+            elif token == "SHAPE@XY":
+                values[1] = geometry("point", [[tuple(value)]])
+            elif token not in OID_TOKENS and token not in SHAPE_TOKENS:
+                values[self.dataset.fieldIndex(field)] = value
+        return self.dataset.insert(values)
+
+
+
+class environment(object):
+    """
+    Class Environment: The stand-in arcpy.env settings (workspace, overwriteOutput and any other setting); names are case-insensitive.
+    """
+
+    def __init__(self):
+        object.__setattr__(self, "settings", {"workspace": None, "overwriteoutput": True})
+
+    def __getattr__(self, name):
+        return self.settings.get(name.lower())
+
+    def __setattr__(self, name, value):
+        self.settings[name.lower()] = value
+
+
+
+class featureStore(object):
+    """
+    Class Feature Store: The in-memory geodatabase of the offline arcpy stand-in: workspaces, feature datasets, feature classes and tables, feature layers, the environment settings and the tool messages. The tools AMC calls run on the store; the tools that need ArcGIS (importing a CAD drawing, server geodatabase layers, spatial selections and overlays) replay the output datasets recorded from a real run (see arcpyRecorder), or compute a planar equivalent where one exists (FeatureToPolygon, SplitLine, PolygonNeighbors and SelectLayerByLocation).
+
+    INPUT
+        replay: (optional) a recording (dictionary) or the path to a recording file (.json or .json.gz) (default = None).
+    """
+
+    def __init__(self, replay=None):
+        if isinstance(replay, str):
+            replay = loadRecording(replay)
+        self.replay = replay or {"Events": {}}
+        self.used = set()
+        self.env = environment()
+        self.datasets = {}
+        self.workspaces = set()
+        self.layers = {}
+        self.messages = []
+        self.toolMessages = ""
+
+    #--- Paths and datasets ---#
+
+    def path(self, name):
+        """Returns the full path of a dataset name in the current workspace"""
+        name = str(name[0] if isinstance(name, toolResult) else name)
+        if os.path.isabs(name.replace("\\", "/")) or re.match(r"^[A-Za-z]:", name) or self.env.workspace is None:
+            return name
+        return os.path.join(self.env.workspace, name)
+
+    def resolve(self, name, required=False):
+        """Returns the layer or dataset of a name, path or tool result (a feature class in a feature dataset can be named without its dataset)"""
+        name = str(name[0] if isinstance(name, toolResult) else name)
+        if name.lower() in self.layers:
+            return self.layers[name.lower()]
+        key = datasetKey(self.path(name))
+        if key in self.datasets:
+            return self.datasets[key]
+        if self.env.workspace is not None and os.path.dirname(name.replace("\\", "/")) == "":
+            root = datasetKey(self.env.workspace) + "/"
+            for path, dataset in self.datasets.items():
+                if path.startswith(root) and path.rsplit("/", 1)[-1] == name.lower():
+                    return dataset
+        if required:
+            raise ExecuteError("ERROR 000732: Dataset {} does not exist or is not supported".format(name))
+        return None
+
+    def add(self, dataset):
+        self.datasets[datasetKey(dataset.path)] = dataset
+        return dataset
+
+    def remove(self, name):
+        key = datasetKey(self.path(name))
+        self.layers.pop(str(name).lower(), None)
+        for path in [path for path in self.datasets if path == key or path.startswith(key + "/")]:
+            del self.datasets[path]
+        self.workspaces = set(w for w in self.workspaces if w != key and not w.startswith(key + "/"))
+
+    def succeeded(self, tool):
+        now = datetime.datetime.now().strftime("%A, %B %d, %Y %I:%M:%S %p")
+        self.toolMessages = "Start Time: {0}\n{1} (offline)\nSucceeded at {0} (Elapsed Time: 0.00 seconds)".format(now, tool)
+
+    #--- Recorded events ---#
+
+    def event(self, tool, output=None):
+        """Returns the next unused recorded event of a tool, preferring one with the same output name, or None"""
+        events = self.replay.get("Events", {}).get(tool, [])
+        candidates = [i for i in range(len(events)) if (tool, i) not in self.used]
+        name = os.path.basename(str(output).replace("\\", "/")).lower() if output is not None else None
+        matches = [i for i in candidates if name is not None and str(events[i].get("Output", "")).lower() == name] or candidates
+        if len(matches) == 0:
+            return None
+        self.used.add((tool, matches[0]))
+        return events[matches[0]]
+
+    def load(self, path, dump):
+        """Adds a recorded dataset (see dumpDataset) to the store at a path"""
+        dataset = featureClass(path, dump.get("ShapeType"), dump.get("Fields"), dump.get("Alias"))
+        for row in dump.get("Rows", []):
+            values = [row[0]] + ([loadGeometry(row[1])] if dataset.shapeType else []) + list(row[2:])
+            dataset.insert(values, row[0])
+        return self.add(dataset)
+
+    #--- Geometry overlays (planar) ---#
+
+    def lineParts(self, names):
+        """Returns the (key, vertex array) of every line part of the input feature classes"""
+        parts = {}
+        for name in ([names] if isinstance(names, (str, toolResult)) else names):
+            source = self.resolve(name, required=True)
+            dataset = source.dataset if isinstance(source, featureLayer) else source
+            for oid in (source.oids() if isinstance(source, featureLayer) else dataset.rows):
+                shape = dataset.rows[oid][1]
+                for i, part in enumerate(shape.parts if shape is not None else []):
+                    parts[(dataset.name, oid, i)] = part
+        return parts
+
+    def polygons(self, names, tolerance=4):
+        """Returns the polygon parts (outer ring clockwise, holes counter-clockwise) of the bounded areas formed by the input lines (planar graph faces), noding the lines at their T-junctions as ArcGIS does"""
+        parts = self.lineParts(names)
+        junctions = {}
+        for key, x, y, other in amcgraph.lineJunctions(parts, tolerance):
+            junctions.setdefault(key, []).append((x, y))
+        for key, points in junctions.items():
+            for i, piece in enumerate(splitPart(parts.pop(key), numpy.array(points), 10 ** -tolerance)):
+                parts[key + (i,)] = piece
+        keys = list(parts)
+        graph = amcgraph.planarGraph({i: parts[key] for i, key in enumerate(keys)}, tolerance)
+        holes = graph.faceHoles()
+        return [[graph.faceRing(f)[::-1]] + [graph.faceRing(g)[::-1] for g in holes.get(f, [])] for f in graph.boundedFaces()]
+
+    def selectByLocation(self, layer, overlap, select_features, distance):
+        """Returns the object IDs of a layer's features that intersect (or whose boundary touches) the select features, within a distance (planar vertex and edge tests)"""
+        tolerance = float(str(distance).split()[0]) if distance else 1e-6
+        source = self.resolve(select_features, required=True)
+        other = source.dataset if isinstance(source, featureLayer) else source
+        shapes = [other.rows[oid][1] for oid in (source.oids() if isinstance(source, featureLayer) else other.rows)]
+        segments = numpy.concatenate([numpy.stack([part[:-1], part[1:]], axis=1) for shape in shapes for part in shape.parts if len(part) > 1] or [numpy.empty((0, 2, 2))])
+        points = numpy.concatenate([part for shape in shapes for part in shape.parts] or [numpy.empty((0, 2))])
+
+        def near(xy):
+            # Distance from the point to the nearest select feature segment (or point)
+            if len(segments) > 0:
+                a, b = segments[:, 0], segments[:, 1]
+                ab = b - a
+                t = numpy.clip(numpy.einsum("ij,ij->i", xy - a, ab) / numpy.maximum(numpy.einsum("ij,ij->i", ab, ab), 1e-300), 0, 1)
+                if numpy.min(numpy.hypot(*(a + t[:, None] * ab - xy).T)) <= tolerance:
+                    return True
+            return len(points) > 0 and numpy.min(numpy.hypot(*(points - xy).T)) <= tolerance
+
+        def inside(xy):
+            return any(shape.type == "polygon" and sum(amcgraph.planarGraph.pointInRing(xy, part) for part in shape.parts) % 2 == 1 for shape in shapes)
+
+        dataset = layer.dataset
+        selected = []
+        for oid in layer.dataset.rows:
+            shape = dataset.rows[oid][1]
+            xy = numpy.concatenate(shape.parts)
+            if overlap.upper() == "BOUNDARY_TOUCHES":
+                hit = all(near(p) for p in xy)
+            else:
+                hit = any(near(p) or inside(p) for p in xy)
+            if hit:
+                selected.append(oid)
+        return selected
+
+    #--- Geoprocessing tools ---#
+
+    def layerFor(self, name):
+        """Returns the layer of a name; a dataset name gets a new layer, as the selection tools do"""
+        source = self.resolve(name, required=True)
+        if isinstance(source, featureLayer):
+            return source
+        layer = featureLayer("{}_Layer{}".format(source.name, len(self.layers) + 1), source)
+        self.layers[layer.name.lower()] = layer
+        return layer
+
+    def Exists(self, dataset, data_type=None):
+        key = datasetKey(self.path(dataset))
+        return self.resolve(dataset) is not None or key in self.workspaces or any(path.startswith(key + "/") for path in self.datasets)
+
+    def Delete_management(self, in_data, data_type=None):
+        self.remove(in_data)
+        self.succeeded("Delete")
+        return toolResult(True)
+
+    def CreateFileGDB_management(self, out_folder_path, out_name, out_version=None):
+        path = os.path.join(out_folder_path, out_name if out_name.lower().endswith(".gdb") else out_name + ".gdb")
+        self.workspaces.add(datasetKey(path))
+        self.succeeded("Create File Geodatabase")
+        return toolResult(path)
+
+    def CreateDatabaseConnection_management(self, out_folder_path, out_name, *args, **kwargs):
+        path = os.path.join(out_folder_path, out_name)
+        self.workspaces.add(datasetKey(path))
+        self.succeeded("Create Database Connection")
+        return toolResult(path)
+
+    def CADToGeodatabase_conversion(self, input_cad_datasets, out_gdb_path, out_dataset_name, reference_scale=None, spatial_reference=None):
+        event = self.event("CADToGeodatabase_conversion", out_dataset_name)
+        if event is None:
+            raise ExecuteError("CADToGeodatabase: the CAD drawing {} can only be imported from a recording".format(input_cad_datasets))
+        self.workspaces.add(datasetKey(os.path.join(out_gdb_path, out_dataset_name)))
+        for name, dump in event["Datasets"].items():
+            self.load(os.path.join(out_gdb_path, out_dataset_name, name), dump)
+        self.succeeded("CAD To Geodatabase")
+        return toolResult(os.path.join(out_gdb_path, out_dataset_name))
+
+    def ListFeatureClasses(self, wild_card=None, feature_type=None, feature_dataset=None):
+        if self.env.workspace is None:
+            return []
+        root = datasetKey(os.path.join(self.env.workspace, feature_dataset) if feature_dataset else self.env.workspace)
+        names = [dataset.name for path, dataset in self.datasets.items() if os.path.dirname(path) == root and dataset.shapeType is not None]
+        if wild_card:
+            names = [name for name in names if fnmatch.fnmatch(name.lower(), wild_card.lower())]
+        if feature_type and feature_type.upper() != "ALL":
+            names = [name for name in names if self.resolve(os.path.join(feature_dataset or "", name)).shapeType.upper() == feature_type.upper()]
+        return names
+
+    def ListFields(self, dataset, wild_card=None, field_type=None):
+        source = self.resolve(dataset, required=True)
+        source = source.dataset if isinstance(source, featureLayer) else source
+        return [types.SimpleNamespace(name=name, type=ftype, aliasName=alias) for name, ftype, alias in source.fields if wild_card is None or fnmatch.fnmatch(name.lower(), wild_card.lower())]
+
+    def Describe(self, value):
+        source = self.resolve(value, required=True)
+        source = source.dataset if isinstance(source, featureLayer) else source
+        return types.SimpleNamespace(name=source.name, catalogPath=source.path, shapeType=source.shapeType, aliasName=source.alias, dataType="FeatureClass" if source.shapeType else "Table")
+
+    def GetCount_management(self, in_rows):
+        source = self.resolve(in_rows, required=True)
+        self.succeeded("Get Count")
+        return toolResult(len(source.oids()) if isinstance(source, featureLayer) else len(source.rows))
+
+    def AddField_management(self, in_table, field_name, field_type, field_precision=None, field_scale=None, field_length=None, field_alias=None, field_is_nullable=None, field_is_required=None, field_domain=None):
+        source = self.resolve(in_table, required=True)
+        (source.dataset if isinstance(source, featureLayer) else source).addField(field_name, field_type, field_alias)
+        self.succeeded("Add Field")
+        return toolResult(in_table)
+
+    def AlterAliasName(self, table, alias):
+        self.resolve(table, required=True).alias = alias
+
+    def Select_analysis(self, in_features, out_feature_class, where_clause=None):
+        source = self.resolve(in_features, required=True)
+        dataset = source.dataset if isinstance(source, featureLayer) else source
+        oids = source.oids() if isinstance(source, featureLayer) else list(dataset.rows)
+        predicate = whereFilter(where_clause)
+        self.add(dataset.copy(self.path(out_feature_class), [oid for oid in oids if predicate(rowGetter(dataset, oid))]))
+        self.succeeded("Select")
+        return toolResult(self.path(out_feature_class))
+
+    def CopyFeatures_management(self, in_features, out_feature_class, *args):
+        if isinstance(in_features, (list, tuple)):
+            # A list of geometries (as arcpy.CopyFeatures)
+            dataset = self.add(featureClass(self.path(out_feature_class), {"point": "Point", "multipoint": "Multipoint", "polyline": "Polyline", "polygon": "Polygon"}[in_features[0].type]))
+            for shape in in_features:
+                dataset.insert([None, shape])
+            self.succeeded("Copy Features")
+            return toolResult(self.path(out_feature_class))
+        return self.Select_analysis(in_features, out_feature_class)
+
+    def Rename_management(self, in_data, out_data, data_type=None):
+        dataset = self.resolve(in_data, required=True)
+        self.remove(in_data)
+        dataset.path = self.path(out_data)
+        dataset.name = os.path.basename(str(out_data).replace("\\", "/"))
+        self.add(dataset)
+        self.succeeded("Rename")
+        return toolResult(dataset.path)
+
+    def MakeFeatureLayer_management(self, in_features, out_layer, where_clause=None, workspace=None, field_info=None):
+        source = self.resolve(in_features)
+        if source is None or amcprofile.serverPath(in_features):
+            # Server geodatabase layers are replayed from the recording
+            event = self.event("MakeFeatureLayer_management", out_layer)
+            if event is None:
+                raise ExecuteError("MakeFeatureLayer: {} can only be read from a recording".format(in_features))
+            source = self.load(os.path.join(str(in_features), "_layer_" + out_layer), event["Dataset"])
+            where_clause = None
+        dataset = source.dataset if isinstance(source, featureLayer) else source
+        self.layers[out_layer.lower()] = featureLayer(out_layer, dataset, where_clause)
+        self.succeeded("Make Feature Layer")
+        return toolResult(out_layer)
+
+    def SelectLayerByAttribute_management(self, in_layer_or_view, selection_type="NEW_SELECTION", where_clause=None, invert_where_clause=None):
+        layer = self.layerFor(in_layer_or_view)
+        predicate = whereFilter(where_clause)
+        matched = set(oid for oid in layer.dataset.rows if predicate(rowGetter(layer.dataset, oid)) != (invert_where_clause == "INVERT"))
+        layer.selection = self.combine(layer, matched, selection_type)
+        self.succeeded("Select Layer By Attribute")
+        return toolResult(layer.name, "", len(layer.oids()))
+
+    def SelectLayerByLocation_management(self, in_layer, overlap_type="INTERSECT", select_features=None, search_distance=None, selection_type="NEW_SELECTION", invert_spatial_relationship="NOT_INVERT"):
+        layer = self.layerFor(in_layer)
+        event = self.event("SelectLayerByLocation_management", in_layer)
+        matched = set(event["Selection"]) if event is not None else set(self.selectByLocation(layer, overlap_type, select_features, search_distance))
+        if invert_spatial_relationship == "INVERT":
+            matched = set(layer.dataset.rows) - matched
+        layer.selection = self.combine(layer, matched, selection_type)
+        self.succeeded("Select Layer By Location")
+        return toolResult(layer.name, "", len(layer.oids()))
+
+    @staticmethod
+    def combine(layer, matched, selection_type):
+        current = set(layer.selection if layer.selection is not None else layer.dataset.rows)
+        selection_type = (selection_type or "NEW_SELECTION").upper()
+        if selection_type == "ADD_TO_SELECTION":
+            return current | matched
+        if selection_type == "REMOVE_FROM_SELECTION":
+            return current - matched
+        if selection_type == "SUBSET_SELECTION":
+            return current & matched
+        if selection_type == "SWITCH_SELECTION":
+            return set(layer.dataset.rows) - current
+        if selection_type == "CLEAR_SELECTION":
+            return None
+        return matched
+
+    def FeatureToPolygon_management(self, in_features, out_feature_class, cluster_tolerance=None, attributes=None, label_features=None):
+        event = self.event("FeatureToPolygon_management", out_feature_class)
+        if event is not None:
+            self.load(self.path(out_feature_class), event["Dataset"])
+        else:
+            dataset = self.add(featureClass(self.path(out_feature_class), "Polygon"))
+            for rings in self.polygons(in_features):
+                dataset.insert([None, geometry("polygon", rings)])
+        self.succeeded("Feature To Polygon")
+        return toolResult(self.path(out_feature_class))
+
+    def FeatureToLine_management(self, in_features, out_feature_class, cluster_tolerance=None, attributes=None):
+        event = self.event("FeatureToLine_management", out_feature_class)
+        if event is None:
+            raise ExecuteError("FeatureToLine: the planar overlay of {} can only be read from a recording".format(in_features))
+        self.load(self.path(out_feature_class), event["Dataset"])
+        self.succeeded("Feature To Line")
+        return toolResult(self.path(out_feature_class))
+
+    def SplitLine_management(self, in_features, out_feature_class):
+        event = self.event("SplitLine_management", out_feature_class)
+        if event is not None:
+            self.load(self.path(out_feature_class), event["Dataset"])
+        else:
+            source = self.resolve(in_features, required=True)
+            target = self.add(featureClass(self.path(out_feature_class), "Polyline", source.fields[2:], source.alias))
+            for oid, values in source.rows.items():
+                shape = values[1]
+                for part in shape.parts:
+                    for a, b in zip(part[:-1], part[1:]):
+                        target.insert([None, geometry("polyline", [[a, b]], shape.spatialReference)] + values[2:])
+        self.succeeded("Split Line At Vertices")
+        return toolResult(self.path(out_feature_class))
+
+    def SplitLineAtPoint_management(self, in_features, point_features, out_feature_class, search_radius=None):
+        event = self.event("SplitLineAtPoint_management", out_feature_class)
+        if event is not None:
+            self.load(self.path(out_feature_class), event["Dataset"])
+        else:
+            source = self.resolve(in_features, required=True)
+            points = self.resolve(point_features, required=True)
+            xy = numpy.array([values[1].parts[0][0] for values in points.rows.values()]).reshape(-1, 2)
+            radius = float(str(search_radius).split()[0]) if search_radius else 1e-3
+            target = self.add(featureClass(self.path(out_feature_class), "Polyline", source.fields[2:], source.alias))
+            for oid, values in source.rows.items():
+                shape = values[1]
+                for part in shape.parts:
+                    pieces = splitPart(part, xy, radius)
+                    # An unsplit line keeps its geometry (and true curves)
+                    piece = shape.copy() if len(pieces) == 1 and len(shape.parts) == 1 else None
+                    for vertices in pieces:
+                        target.insert([None, piece or geometry("polyline", [vertices], shape.spatialReference)] + values[2:])
+        self.succeeded("Split Line At Point")
+        return toolResult(self.path(out_feature_class))
+
+    def PolygonNeighbors_analysis(self, in_features, out_table, *args, **kwargs):
+        event = self.event("PolygonNeighbors_analysis", out_table)
+        if event is not None:
+            self.load(self.path(out_table), event["Dataset"])
+        else:
+            source = self.resolve(in_features, required=True)
+            target = self.add(featureClass(self.path(out_table), None, [("src_OBJECTID", "LONG"), ("nbr_OBJECTID", "LONG"), ("LENGTH", "DOUBLE"), ("NODE_COUNT", "LONG")]))
+            edges = {}
+            for oid, values in source.rows.items():
+                for part in values[1].parts:
+                    for a, b in zip(part[:-1], part[1:]):
+                        key = tuple(sorted([tuple(numpy.round(a, 4)), tuple(numpy.round(b, 4))]))
+                        edges.setdefault(key, set()).add(oid)
+            shared = {}
+            for (a, b), oids in edges.items():
+                for src in oids:
+                    for nbr in oids - {src}:
+                        shared[(src, nbr)] = shared.get((src, nbr), 0.0) + math.hypot(b[0] - a[0], b[1] - a[1])
+            for (src, nbr), length in sorted(shared.items()):
+                target.insert([None, src, nbr, length, 0])
+        self.succeeded("Polygon Neighbors")
+        return toolResult(self.path(out_table))
+
+    #--- Messages ---#
+
+    def AddMessage(self, message):
+        self.messages.append(str(message))
+
+    AddWarning = AddError = AddMessage
+
+    def GetMessages(self, severity=0):
+        return self.toolMessages
+
+
+
+
+#============================================================#
+#  RECORDING                                                 #
+#============================================================#
+
+# The tools whose outputs are recorded (the tools that need ArcGIS, a CAD drawing or the server geodatabase)
+RECORDED_TOOLS = ["CADToGeodatabase_conversion", "FeatureToPolygon_management", "FeatureToLine_management", "SplitLine_management", "SplitLineAtPoint_management", "PolygonNeighbors_analysis", "MakeFeatureLayer_management", "SelectLayerByLocation_management"]
+
+
+#==================== AMC ArcPy Function: Dump Dataset ====================#
+
+def dumpDataset(module, name):
+    """
+    AMC ArcPy Function: Dump Dataset
+        Returns the JSON-serializable record of a dataset or layer (with ArcGIS or the stand-in): its shape type, alias, attribute fields and rows (object ID, geometry record and field values).
+    """
+    description = module.Describe(name)
+    shapeType = getattr(description, "shapeType", None)
+    fields = [field for field in module.ListFields(name) if field.type not in ("OID", "Geometry") and field.name.lower() not in ("shape_length", "shape_area")]
+    rows = []
+    with module.da.SearchCursor(name, ["OID@"] + (["SHAPE@"] if shapeType else []) + [field.name for field in fields]) as cursor:
+        for row in cursor:
+            values = [row[0], dumpGeometry(row[1]) if shapeType else None] + [value.isoformat() if isinstance(value, (datetime.date, datetime.datetime)) else value for value in row[2 if shapeType else 1:]]
+            rows.append(values)
+    return {"ShapeType": shapeType, "Alias": getattr(description, "aliasName", None), "Fields": [[field.name, field.type, field.aliasName] for field in fields], "Rows": rows}
+
+
+
+class arcpyRecorder(object):
+    """
+    Class ArcPy Recorder: Forwards to the arcpy module and records the outputs of the tools that need ArcGIS (RECORDED_TOOLS): the feature classes imported from the CAD drawing, the feature layers read from the server geodatabase, the polygons, lines and tables built by the overlay tools, and the selections of the spatial selection tools. Saved to a recording file (save), they replay the same run offline in the feature store (see featureStore and install).
+    """
+
+    def __init__(self, module):
+        object.__setattr__(self, "module", module)
+        object.__setattr__(self, "wrapped", {})
+        object.__setattr__(self, "events", {})
+
+    def __getattr__(self, name):
+        if name not in self.wrapped:
+            value = getattr(self.module, name)
+            if name not in RECORDED_TOOLS:
+                return value
+            self.wrapped[name] = self.tool(name, value)
+        return self.wrapped[name]
+
+    def __setattr__(self, name, value):
+        setattr(self.module, name, value)
+
+    def tool(self, name, function):
+        module = self.module
+
+        @functools.wraps(function)
+        def caller(*args, **kwargs):
+            result = function(*args, **kwargs)
+            if name == "CADToGeodatabase_conversion":
+                # The feature classes of the imported CAD feature dataset
+                workspace = module.env.workspace
+                module.env.workspace = args[1]
+                try:
+                    names = module.ListFeatureClasses(feature_dataset=args[2])
+                finally:
+                    module.env.workspace = workspace
+                event = {"Output": args[2], "Datasets": {fc: dumpDataset(module, os.path.join(args[1], args[2], fc)) for fc in names}}
+            elif name == "SelectLayerByLocation_management":
+                with module.da.SearchCursor(result[0], ["OID@"]) as cursor:
+                    event = {"Output": os.path.basename(str(args[0])), "Selection": [row[0] for row in cursor]}
+            elif name == "MakeFeatureLayer_management" and not amcprofile.serverPath(args[0]):
+                return result
+            else:
+                output = args[1] if len(args) > 1 else list(kwargs.values())[0]
+                event = {"Output": os.path.basename(str(output)), "Dataset": dumpDataset(module, output)}
+            self.events.setdefault(name, []).append(event)
+            return result
+        return caller
+
+    def save(self, path):
+        """Writes the recording to a file (gzip compressed for a .gz path)"""
+        recording = {"Version": 1, "Recorded": datetime.datetime.now().isoformat(), "Events": self.events}
+        with (gzip.open(path, "wt", encoding="utf-8") if path.endswith(".gz") else open(path, "w", encoding="utf-8")) as file:
+            json.dump(recording, file)
+        return path
+
+
+
+#==================== AMC ArcPy Function: Load Recording ====================#
+
+def loadRecording(path):
+    """
+    AMC ArcPy Function: Load Recording
+        Reads a recording file (.json, or gzip compressed .json.gz) written by arcpyRecorder.save.
+    """
+    with (gzip.open(path, "rt", encoding="utf-8") if path.endswith(".gz") else open(path, encoding="utf-8")) as file:
+        return json.load(file)
+
+
+
+
+#============================================================#
+#  STAND-IN MODULE                                           #
+#============================================================#
+
+# The geoprocessing tools and functions of the stand-in module (arcpy names)
+STORE_FUNCTIONS = ["Exists", "Delete_management", "CreateFileGDB_management", "CreateDatabaseConnection_management", "CADToGeodatabase_conversion", "ListFeatureClasses", "ListFields", "Describe", "GetCount_management", "AddField_management", "AlterAliasName", "Select_analysis", "CopyFeatures_management", "Rename_management", "MakeFeatureLayer_management", "SelectLayerByAttribute_management", "SelectLayerByLocation_management", "FeatureToPolygon_management", "FeatureToLine_management", "SplitLine_management", "SplitLineAtPoint_management", "PolygonNeighbors_analysis", "AddMessage", "AddWarning", "AddError", "GetMessages"]
+
+
+#==================== AMC ArcPy Function: Stand-In Module ====================#
+
+def standIn(store=None):
+    """
+    AMC ArcPy Function: Stand-In Module
+        Returns an offline stand-in of the arcpy module over a feature store: the data access cursors (arcpy.da), the geometry constructors and properties, the environment settings and the geoprocessing tools AMC uses.
+
+    INPUT
+        store: (optional) the feature store, or a recording to replay (dictionary or file path) (default = None, an empty store).
+    """
+    store = store if isinstance(store, featureStore) else featureStore(store)
+    module = types.ModuleType("arcpy", "Offline arcpy stand-in (amcarcpy)")
+    module.store = store
+    module.env = store.env
+    module.ExecuteError = ExecuteError
+    module.SpatialReference = spatialReference
+    module.Point = point
+    module.Geometry = geometry
+    module.FromWKB = fromWkb
+    module.FromWKT = fromWkt
+    module.PointGeometry = pointGeometry
+    for name in STORE_FUNCTIONS:
+        setattr(module, name, getattr(store, name))
+
+    module.da = types.ModuleType("arcpy.da")
+    module.da.SearchCursor = functools.partial(searchCursor, store)
+    module.da.UpdateCursor = functools.partial(updateCursor, store)
+    module.da.InsertCursor = functools.partial(insertCursor, store)
+    return module
+
+
+
+#==================== AMC ArcPy Function: Install ====================#
+
+def install(replay=None):
+    """
+    AMC ArcPy Function: Install
+        Installs the offline arcpy stand-in as the arcpy module (sys.modules), so that the AMC classes (amc16, amc15, amc14, ...) import it instead of ArcGIS. Install before importing them.
+
+    INPUT
+        replay: (optional) a recording to replay (dictionary or file path, see arcpyRecorder) (default = None).
+
+    OUTPUT
+        The stand-in module (its feature store is module.store).
+    """
+    module = standIn(replay)
+    sys.modules["arcpy"] = module
+    sys.modules["arcpy.da"] = module.da
+    return module
+
+
+
+#==================== AMC ArcPy Function: Record ====================#
+
+def record():
+    """
+    AMC ArcPy Function: Record
+        Installs a recorder of the real arcpy module (ArcGIS) as the arcpy module (sys.modules), so that a run of the AMC classes records the outputs of the tools that need ArcGIS. Install before importing them, run the stages, and save the recording: recorder.save("TR12345.json.gz").
+
+    OUTPUT
+        The recorder (arcpyRecorder).
+    """
+    import arcpy
+    recorder = arcpyRecorder(arcpy)
+    sys.modules["arcpy"] = recorder
+    return recorder
@@ -0,0 +1,84 @@
+##############################################################
+# PYTHON AUTOMATED MAP CHECKING ANALYSIS                     #
+# AMC Batch Runner                                           #
+# Version: 1.6                                               #
+# Author: Dr. Kostas Alexandridis, GISP                      #
+# Organization: OC Survey Geospatial Services                #
+# Date: August 2020                                          #
+##############################################################
+
+
+# Importing the required libraries into the project
+import os, sys, traceback, multiprocessing, concurrent.futures
+
+
+# The main stages of an AMC run, in order
+STAGES = ["baseChecks", "boundaryProcessing", "createLegalDescription", "boundaryToTable", "finalizeReport"]
+
+
+
+
+#============================================================#
+#  BATCH AMC RUNS                                            #
+#============================================================#
+
+
+#==================== AMC Batch Function: Run Map ====================#
+
+def runMap(job):
+    """
+    AMC Batch Function: Run Map
+        Runs the main stages of an AMC run for one CAD drawing, and returns its output directory, status and execution profile. A drawing that fails returns its failed stage and error instead of raising, so that one bad drawing does not discard the results of the batch. Runs in a batch worker process.
+
+    INPUT
+        job: a dictionary of the amc class arguments of the drawing (cadpath, prjpath, outpath, cadname, scale, scalefactor, and the optional arguments).
+
+    OUTPUT
+        A dictionary of the drawing's 'cadname', 'outpath' (None if the run failed before creating it), 'Status' ('Pass', or the failed stage and error), 'Error' (the traceback of a failed run, or None) and 'Profile' (None if the run failed).
+    """
+    client, stage = None, "import"
+    try:
+        from amc16 import amc
+        stage = "__init__"
+        client = amc(**job)
+        for stage in STAGES:
+            getattr(client, stage)()
+    except Exception as e:
+        return {"cadname": job["cadname"], "outpath": getattr(client, "outpath", None), "Status": "Failed in {}: {}: {}".format(stage, type(e).__name__, e), "Error": traceback.format_exc(), "Profile": None}
+
+    return {"cadname": job["cadname"], "outpath": client.outpath, "Status": "Pass", "Error": None, "Profile": client.jsonExecution["Profile"]}
+
+
+
+#==================== AMC Batch Function: Batch AMC ====================#
+
+def batchAmc(jobs, workers=1, profile=None, profileFraction=1.0):
+    """
+    AMC Batch Function: Batch AMC
+        Runs the main stages of AMC runs for many CAD drawings across a process pool (each worker process runs one drawing at a time, in the drawing's output directory).
+
+    INPUT
+        jobs: a list of dictionaries of the amc class arguments of each drawing (see runMap).
+        workers: (optional) the number of worker processes; 1 runs the drawings in this process and 0 uses all the processor cores (default = 1).
+        profile: (optional) the profiler capture mode of the runs: 'statistical' or 'deterministic' (default = None, no capture). See amcprofile.stageCapture.
+        profileFraction: (optional) the fraction of the runs that capture a profile, e.g., 0.05 for one run in twenty (default = 1.0).
+
+    OUTPUT
+        A list of the results of each drawing (see runMap), in the order of the jobs; failed drawings hold their status and error.
+
+    NOTES
+        On Windows the worker processes re-import the calling script, so scripts using more than one worker must guard their entry point with `if __name__ == "__main__":`.
+    """
+    jobs = [dict(job, profile=job.get("profile", profile), profileFraction=job.get("profileFraction", profileFraction)) for job in jobs]
+    workers = workers or os.cpu_count() or 1
+
+    # Serial processing: a single worker or a single drawing
+    if workers <= 1 or len(jobs) <= 1:
+        return [runMap(job) for job in jobs]
+
+    # Within ArcGIS Pro the interpreter is the application itself; the workers need the environment's python executable
+    if os.name == "nt" and not os.path.basename(sys.executable).lower().startswith("python"):
+        multiprocessing.set_executable(os.path.join(sys.exec_prefix, "python.exe"))
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+        return list(pool.map(runMap, jobs))
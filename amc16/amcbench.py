@@ -0,0 +1,227 @@
+##############################################################
+# PYTHON AUTOMATED MAP CHECKING ANALYSIS                     #
+# AMC Scaling Benchmark (Synthetic Tracts)                   #
+# Version: 1.6                                               #
+# Variant: Python Stand-Alone Execution Script (no ArcGIS)   #
+# Date: August 2020                                          #
+##############################################################
+
+# Runs the AMC engine (amc16) on synthetic tracts (amcsynth.syntheticTract) of increasing
+# size, or with an increasing number of parcels, on the offline arcpy stand-in (amcarcpy),
+# times its stages (base checks, traverse, boundary processing, legal description and
+# response output), fits the scaling exponent of each stage (time ~ lines^k, or
+# parcels^k), and compares the timings with a saved baseline, so that superlinear
+# (e.g., O(n^2)) regressions of the engine are caught without ArcGIS.
+#
+# Usage: python amcbench.py [--sizes 10 100 1000 10000] [--case Single] [--parcels 1] [--curves 0.3]
+#                           [--repeat 3] [--workers 1] [--baseline bench.json] [--save] [--threshold 1.5] [--max-exponent 1.5]
+#        python amcbench.py --case Separate --sizes 2000 --parcels 2 8 32 128   (parcel-count sweep)
+
+
+# Importing the required libraries
+import os, sys, json, math, time, argparse, platform, tempfile, contextlib, importlib, numpy
+import amcarcpy, amcresult, amcsynth
+
+
+# The benchmarked stages, in order: the base checks (without the traverse), the traverse of the parcels' courses (traverseCourse), the boundary processing (coordinate geometry, descriptions and closure), the legal description and the response output
+STAGES = ["checks", "traverse", "boundary", "legal", "output"]
+
+
+
+
+#============================================================#
+#  BENCHMARK STAGES                                          #
+#============================================================#
+
+
+#==================== AMC Benchmark Function: Benchmark Tract ====================#
+
+def benchmarkTract(tract, directory, encoder="json", workers=1, scalefactor=0.9999677, cadname="TR12345"):
+    """
+    AMC Benchmark Function: Benchmark Tract
+        Runs the AMC engine (amc16) on a synthetic tract, replayed as a CAD drawing by the offline arcpy stand-in (see amcsynth.tractDrawing), and returns the duration (perf_counter seconds) of each stage.
+
+    INPUT
+        tract: a synthetic tract (see amcsynth.syntheticTract).
+        directory: the directory of the run's output.
+        encoder: (optional) the response encoder of the output stage (default = 'json').
+        workers: (optional) the number of worker processes of the boundary processing (default = 1).
+        scalefactor, cadname: (optional) the scale factor and name of the drawing (default = 0.9999677, 'TR12345').
+
+    OUTPUT
+        A dictionary of the stage durations keyed by the stage name (see STAGES).
+    """
+    # A fresh stand-in and engine module for each run (the engine binds arcpy when imported)
+    amcarcpy.install(amcsynth.tractDrawing(tract))
+    engine = importlib.reload(sys.modules["amc16"]) if "amc16" in sys.modules else importlib.import_module("amc16")
+
+    timings = {}
+    cadpath = os.path.join(directory, "{}.dwg".format(cadname))
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        client = engine.amc(cadpath, directory, directory, cadname, "grid", scalefactor, workers=workers)
+        for stage, function in [("checks", client.baseChecks), ("boundary", client.boundaryProcessing), ("legal", client.createLegalDescription), ("output", lambda: client.finalizeReport(encoder=encoder))]:
+            stime = time.perf_counter()
+            function()
+            timings[stage] = time.perf_counter() - stime
+
+    # The traverse runs within the base checks
+    timings["traverse"] = client.profiler.summary()["Stages"].get("traverseCourse", {}).get("Seconds", 0.0)
+    timings["checks"] -= timings["traverse"]
+    if len(client.course) != tract["parcels"]:
+        raise ValueError("Synthetic tract traversed as {} parcel(s) (expected {})".format(len(client.course), tract["parcels"]))
+
+    return {stage: timings[stage] for stage in STAGES}
+
+
+
+#==================== AMC Benchmark Function: Run Benchmark ====================#
+
+def runBenchmark(sizes=(10, 100, 1000, 10000), case="Single", parcels=(1,), curveRatio=0.3, repeat=3, seed=0, encoder="json", workers=1):
+    """
+    AMC Benchmark Function: Run Benchmark
+        Times the stages of the AMC engine on synthetic tracts of each size and number of parcels, keeping the best (shortest) time of each stage over the repeats.
+
+    INPUT
+        sizes: (optional) the numbers of boundary lines of the tracts (default = 10, 100, 1000, 10000).
+        case, curveRatio, seed: (optional) the synthetic tract settings (see amcsynth.syntheticTract).
+        parcels: (optional) the numbers of parcels of the tracts (default = 1); several numbers sweep the parcel count.
+        repeat: (optional) the number of runs of each tract (default = 3).
+        encoder: (optional) the response encoder of the output stage (default = 'json').
+        workers: (optional) the number of worker processes of the boundary processing (default = 1).
+
+    OUTPUT
+        A dictionary of the benchmark 'Settings', and the 'Results' of each tract (keyed by 'size' or 'size/parcels'), holding the number of 'Segments' and 'Parcels' and the best duration of each stage in seconds.
+    """
+    results = {}
+    for size in sizes:
+        for count in parcels:
+            tract = amcsynth.syntheticTract(size, curveRatio, parcels=count, case=case, seed=seed)
+            best = {}
+            for i in range(max(repeat, 1)):
+                with tempfile.TemporaryDirectory() as directory:
+                    for stage, seconds in benchmarkTract(tract, directory, encoder, workers).items():
+                        best[stage] = min(best.get(stage, math.inf), seconds)
+            key = str(size) if len(parcels) == 1 else "{}/{}".format(size, count)
+            results[key] = dict(Segments=len(tract["segments"]), Parcels=tract["parcels"], **best)
+
+    settings = {"Case": case, "Parcels": list(parcels), "CurveRatio": curveRatio, "Repeat": repeat, "Seed": seed, "Encoder": encoder, "Workers": workers, "Python": platform.python_version(), "Machine": platform.node()}
+    return {"Settings": settings, "Results": results}
+
+
+
+#==================== AMC Benchmark Function: Scaling Exponents ====================#
+
+def scalingExponents(benchmark, minimum=100, variable="Segments"):
+    """
+    AMC Benchmark Function: Scaling Exponents
+        Returns the scaling exponent k of each stage (time ~ n^k, where n is the number of 'Segments', or of 'Parcels' for a parcel-count sweep), the slope of the least squares line of log(time) over log(n) for the tracts of at least the minimum number of segments (the smallest tracts are dominated by fixed costs). A linear stage has k close to 1 and a quadratic stage close to 2; None when fewer than two tracts are timed.
+    """
+    rows = [row for row in benchmark["Results"].values() if row["Segments"] >= minimum]
+    exponents = {}
+    for stage in STAGES:
+        points = [(math.log(row[variable]), math.log(row[stage])) for row in rows if row[stage] > 0]
+        exponents[stage] = float(numpy.polyfit(*zip(*points), 1)[0]) if len(points) >= 2 else None
+    return exponents
+
+
+
+#==================== AMC Benchmark Function: Sweep Variable ====================#
+
+def sweepVariable(benchmark):
+    """
+    AMC Benchmark Function: Sweep Variable
+        Returns the variable the stages of a benchmark are scaled over: 'Parcels' for a parcel-count sweep, otherwise 'Segments'.
+    """
+    return "Parcels" if len(benchmark["Settings"].get("Parcels", [1])) > 1 else "Segments"
+
+
+
+#==================== AMC Benchmark Function: Compare Baseline ====================#
+
+def compareBaseline(benchmark, baseline, threshold=1.5, floor=0.005):
+    """
+    AMC Benchmark Function: Compare Baseline
+        Returns the regressions of a benchmark against a baseline benchmark: the (size, stage, seconds, baseline seconds) of each stage that is slower than the threshold times its baseline, by more than the floor (seconds, the timer noise of the fastest stages). Tracts that are not in the baseline are skipped.
+    """
+    regressions = []
+    for size, row in benchmark["Results"].items():
+        base = baseline["Results"].get(size)
+        if base is None:
+            continue
+        for stage in STAGES:
+            if stage in base and row[stage] > threshold * base[stage] and row[stage] - base[stage] > floor:
+                regressions.append((size, stage, row[stage], base[stage]))
+    return regressions
+
+
+
+
+#============================================================#
+#  BENCHMARK REPORT                                          #
+#============================================================#
+
+
+#==================== AMC Benchmark Function: Benchmark Table ====================#
+
+def benchmarkTable(benchmark, baseline=None):
+    """
+    AMC Benchmark Function: Benchmark Table
+        Returns the text table of a benchmark: the duration (ms) and the time per boundary line (µs) of each stage and tract, with the change from the baseline (if any), followed by the scaling exponent of each stage.
+    """
+    lines = ["{:>8} {:>8} {:>10} {:>12} {:>10} {:>9}".format("Size", "Parcels", "Stage", "Time (ms)", "µs/line", "Baseline")]
+    for size, row in benchmark["Results"].items():
+        base = (baseline or {}).get("Results", {}).get(size, {})
+        for stage in STAGES:
+            change = "{:+.0%}".format(row[stage] / base[stage] - 1) if base.get(stage) else ""
+            lines.append("{:>8} {:>8} {:>10} {:>12.2f} {:>10.2f} {:>9}".format(row["Segments"], row["Parcels"], stage, row[stage] * 1000, row[stage] * 1e6 / row["Segments"], change))
+    exponents = scalingExponents(benchmark, variable=sweepVariable(benchmark))
+    lines.append("Scaling exponents: " + ", ".join("{} {}".format(stage, "n/a" if k is None else "{:.2f}".format(k)) for stage, k in exponents.items()))
+    return "\n".join(lines)
+
+
+
+
+#============================================================#
+#  BENCHMARK EXECUTION                                       #
+#============================================================#
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the stages of the AMC engine on synthetic tracts of increasing size or number of parcels, without ArcGIS")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000], help="the numbers of boundary lines of the tracts (default: 10 100 1000 10000)")
+    parser.add_argument("--case", choices=amcsynth.CASES, default="Single", help="the boundary case of the tracts (default: Single)")
+    parser.add_argument("--parcels", type=int, nargs="+", default=[1], help="the numbers of parcels; several numbers (with a single size) sweep the parcel count (default: 1)")
+    parser.add_argument("--curves", type=float, default=0.3, help="the fraction of the course units holding curves (default: 0.3)")
+    parser.add_argument("--seed", type=int, default=0, help="the random seed of the curve placement (default: 0)")
+    parser.add_argument("--repeat", type=int, default=3, help="the number of runs of each tract; the best time is kept (default: 3)")
+    parser.add_argument("--workers", type=int, default=1, help="the number of worker processes of the boundary processing (default: 1)")
+    parser.add_argument("--encoder", choices=amcresult.ENCODERS, default="json", help="the response encoder of the output stage (default: json)")
+    parser.add_argument("--baseline", default=None, help="the path of the baseline benchmark (JSON) to compare with")
+    parser.add_argument("--save", action="store_true", help="save this benchmark as the baseline (--baseline path)")
+    parser.add_argument("--threshold", type=float, default=1.5, help="the slowdown from the baseline flagged as a regression (default: 1.5)")
+    parser.add_argument("--max-exponent", type=float, default=1.5, help="the largest accepted scaling exponent of a stage (default: 1.5)")
+    args = parser.parse_args()
+    if len(args.parcels) > 1 and (len(args.sizes) > 1 or args.case == "Single"):
+        parser.error("a parcel-count sweep (several --parcels) needs a single --sizes value and a multi-parcel --case")
+
+    benchmark = runBenchmark(args.sizes, args.case, args.parcels, args.curves, args.repeat, args.seed, args.encoder, args.workers)
+    baseline = None
+    if args.baseline and os.path.exists(args.baseline) and not args.save:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+
+    print("AMC scaling benchmark: {} case, {} parcel(s), curve ratio {}, {} worker(s), best of {}".format(args.case, ", ".join(str(count) for count in args.parcels), args.curves, args.workers, args.repeat))
+    print(benchmarkTable(benchmark, baseline))
+
+    if args.save and args.baseline:
+        with open(args.baseline, "w") as file:
+            json.dump(benchmark, file, indent=2)
+        print("Saved the baseline: {}".format(args.baseline))
+
+    # Failures: superlinear stages, and stages slower than the baseline
+    variable = sweepVariable(benchmark)
+    failures = ["{} scales as {}^{:.2f}".format(stage, variable.lower(), k) for stage, k in scalingExponents(benchmark, variable=variable).items() if k is not None and k > args.max_exponent]
+    if baseline is not None:
+        failures += ["{} at {}: {:.2f} ms (baseline {:.2f} ms)".format(stage, size, seconds * 1000, base * 1000) for size, stage, seconds, base in compareBaseline(benchmark, baseline, args.threshold)]
+    for failure in failures:
+        print("REGRESSION: " + failure)
+    sys.exit(1 if failures else 0)
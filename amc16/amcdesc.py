@@ -0,0 +1,499 @@
+##############################################################
+# PYTHON AUTOMATED MAP CHECKING ANALYSIS                     #
+# AMC Course Descriptions (Description Renderer)             #
+# Version: 1.6                                               #
+# Author: Dr. Kostas Alexandridis, GISP                      #
+# Organization: OC Survey Geospatial Services                #
+# Date: August 2020                                          #
+##############################################################
+
+
+# Importing the required libraries into the project
+import math
+import amcgeom
+
+
+
+
+#============================================================#
+#  DESCRIPTION TEMPLATES                                     #
+#============================================================#
+
+# Name of the point of beginning of a course that does not begin at a TPOB point
+POB = "POINT OF BEGINNING"
+
+# Preambles and closings of a course description
+PREAMBLES = {"tpob": "Thence from said {pobstring}",
+             "except": " EXCEPTING THEREFROM that portion described as follows: Beginning at a point having a State Plane Coordinate Value of Northing {y} and Easting {x}; Thence",
+             "thence": " Thence"}
+CLOSINGS = {"pob": " to the {pobstring}", "except": " to said point of beginning", None: ""}
+
+# Legal descriptions of lines and (by relationship) curves
+LINE = "{preamp} {bearing}, {distance} feet;{closing}"
+CURVES = {amcgeom.RELATION_TANGENT: "{preamp} to the beginning of a curve, concave {concave}, and having a radius of {radius} feet; Thence {direction} along said curve {arclength} feet through a central angle of {delta};{closing}",
+          amcgeom.RELATION_COMPOUND: "{preamp} to the beginning of a compound curve concave {concave} and having a radius of {radius} feet; Thence {direction} along said curve {arclength} feet through a central angle of {delta};{closing}",
+          amcgeom.RELATION_REVERSE: "{preamp} to the beginning of a reverse curve concave {concave} and having a radius of {radius} feet; Thence {direction} along said curve {arclength} feet through a central angle of {delta};{closing}",
+          amcgeom.RELATION_NONTANGENT: "{preamp} to the beginning of a non-tangent curve, concave {concave}, and having a radius of {radius} feet, a radial line to said beginning of curve bears {radial}; Thence {direction} along said curve {arclength} feet through a central angle of {delta};{closing}"}
+
+# Annotation labels (map labels and web labels)
+LINE_ANN = "{bearing}  {distance}"
+LINE_ANNWEB = "{bearing}\n{distance}"
+CURVE_ANN = "Δ={delta}  R={radius}  L={arclength}"
+CURVE_ANNWEB = "Δ={delta}\nR={radius}\nL={arclength}"
+
+# Preamp from the horizontal control stations to the point of beginning, with the first curve of a course
+PREAMP = "COMMENCING at Orange County Horizontal Control Station \"{hc1id}\" having a State Plane Coordinate Value of Northing {hc1n} and Easting {hc1e}; Thence {course1} to Station \"{hc2id}\"; Thence {course2} to the {pobstring} having a State Plane Coordinate Value of Northing {tpobn} and Easting {tpobe}{predesc}."
+PREDESCS = {amcgeom.RELATION_TANGENT: ", to the beginning of a curve, concave {concave}, and having a radius of {radius} feet, a radial bearing to said beginning of curve bears {radial}",
+            amcgeom.RELATION_REVERSE: ", to the beginning of a reverse curve concave {concave}, and having a radius of {radius} feet, a radial bearing to said beginning of curve bears {radial}",
+            amcgeom.RELATION_COMPOUND: ", to the beginning of a compound curve concave {concave}, and having a radius of {radius} feet, a radial bearing to said beginning of curve bears {radial}",
+            amcgeom.RELATION_NONTANGENT: ", to the beginning of a non-tangent curve, concave {concave}, and having a radius of {radius} feet, a radial bearing to said beginning of curve bears {radial}"}
+RELATION_CODES = {name: code for code, name in amcgeom.RELATION_NAMES.items()}
+
+# Modifiers of the leading 'Thence' of a course leaving a curve
+MODIFIERS = ((amcgeom.RELATION_NONTANGENT_TO_CURVE, "Thence non-tangent to said curve"), (amcgeom.RELATION_RADIAL_TO_CURVE, "Thence radial to said curve"))
+
+
+
+
+#============================================================#
+#  FORMATTING FUNCTIONS                                      #
+#============================================================#
+
+
+#==================== AMC Description Function: Decimal Degrees to Degrees-Minutes-Seconds ====================#
+
+def dd2dms(dd):
+    """
+    AMC Description Function: Decimal Degrees to Degrees-Minutes-Seconds
+        Returns an angle in decimal degrees formatted as degrees, minutes and (truncated) seconds.
+    """
+    minutes = dd % 1.0 * 60
+    seconds = minutes % 1.0 * 60
+    return u'{0:02}\xb0{1:02}\'{2:02}"'.format(int(math.floor(dd)), int(math.floor(minutes)), int(seconds))
+
+
+
+#==================== AMC Description Function: Quadrant Bearing ====================#
+
+def quadrantBearing(bearing, short=False):
+    """
+    AMC Description Function: Quadrant Bearing
+        Returns the quadrant bearing of an azimuth in decimal degrees (e.g., 'North 10°30'00" East', or 'N 10°30'00" E' when short).
+    """
+    if 0 <= bearing <= 90:
+        ns, angle, ew = "North", bearing, "East"
+    elif 90 < bearing <= 180:
+        ns, angle, ew = "South", 180 - bearing, "East"
+    elif 180 < bearing <= 270:
+        ns, angle, ew = "South", bearing - 180, "West"
+    else:
+        ns, angle, ew = "North", 360 - bearing, "West"
+    if short:
+        ns, ew = ns[0], ew[0]
+    return "{} {} {}".format(ns, dd2dms(angle), ew)
+
+
+
+#==================== AMC Description Function: Bearing to Word ====================#
+
+def bearingLabel(bearing):
+    """
+    AMC Description Function: Bearing to Word
+        Returns the direction word (e.g., 'northeasterly') of a bearing in decimal degrees.
+    """
+    words = ["northerly", "northeasterly", "easterly", "southeasterly", "southerly", "southwesterly", "westerly", "northwesterly"]
+    if bearing <= 0 or bearing > 337.5:
+        return "northerly"
+    return words[int(math.ceil((bearing - 22.5) / 45.0))]
+
+
+
+
+#============================================================#
+#  STRUCTURED COURSE RECORDS                                 #
+#============================================================#
+
+
+#==================== AMC Description Function: Course Items ====================#
+
+def courseItems(lines, rings, relations, pobstring, controls=True):
+    """
+    AMC Description Function: Course Items
+        Returns the structured course records of a course: for each line (in course order), its geometry (shape type, bearing, distance, radius, arc length, delta, mid-chord and radial bearings, start point), its relationship code to the previous line, and its preamble and closing.
+
+    INPUT
+        lines: the course's line records (see amc.boundaryProcessing) in course (ring) order.
+        rings: the ring number of each line (0 for the outer ring, 1, 2, ... for excepted areas).
+        relations: the relationship code of each line to the previous line on its ring (see amcgeom.courseRelations).
+        pobstring: the name of the course's point of beginning (e.g., 'TRUE POINT OF BEGINNING').
+        controls: (optional) whether the course is introduced by the preamp from the horizontal controls, which describes a first curve (default = True).
+
+    OUTPUT
+        A list of course item dictionaries (see courseRenderer.render).
+    """
+    items = []
+    for i, line in enumerate(lines):
+        first = i == 0 or rings[i] != rings[i - 1]
+        last = i == len(lines) - 1 or rings[i] != rings[i + 1]
+        if line["tpob"] is True:
+            preamble = "tpob"
+        elif rings[i] != 0 and first:
+            preamble = "except"
+        else:
+            preamble = "thence"
+
+        curve = line["shapetype"] == "Curve"
+        items.append({"shapetype": line["shapetype"],
+                      "bearing": line["bearing"],
+                      "distance": line["distance"],
+                      "radius": line["radius"] if curve else None,
+                      "arclength": line["arclength"] if curve else None,
+                      "delta": line["delta"] if curve else None,
+                      "midbearing": line["midbearing"],
+                      "radbearing_cs": line["radbearing_cs"] if curve else None,
+                      "startx": line["startx"],
+                      "starty": line["starty"],
+                      "relation": int(relations[i]),
+                      "preamble": preamble,
+                      "closing": ("pob" if rings[i] == 0 else "except") if last else None,
+                      "pobstring": pobstring,
+                      "controls": bool(controls and line["coid"] == 1 and curve)})
+    return items
+
+
+
+#==================== AMC Description Function: Point of Beginning ====================#
+
+def pointOfBeginning(first, tpobstring):
+    """
+    AMC Description Function: Point of Beginning
+        Returns the name of a course's point of beginning: the TPOB string of the map (e.g., 'TRUE POINT OF BEGINNING') when the first line of the course starts at a TPOB point (its 'tpobid'), and 'POINT OF BEGINNING' otherwise (e.g., an adjacent parcel whose boundary does not pass through the TPOB).
+    """
+    return tpobstring if first["tpobid"] is not None else POB
+
+
+
+#==================== AMC Description Function: Describe Lines ====================#
+
+def describeLines(lines, rings, renderer, pobstring, controls=True, angularTolerance=amcgeom.ANGULAR_TOLERANCE):
+    """
+    AMC Description Function: Describe Lines
+        Classifies the relationship of every line of a course to the previous line on its ring (amcgeom.courseRelations), and writes the rendered descriptions and annotations (and the radial tangency of curves) to its line records in place.
+
+    INPUT
+        lines: the course's line records in course (ring) order.
+        rings: the ring number of each line (0 for the outer ring, 1, 2, ... for excepted areas).
+        renderer: the course renderer (see courseRenderer).
+        pobstring: the name of the course's point of beginning.
+        controls: (optional) whether the course is introduced by the preamp from the horizontal controls (default = True).
+        angularTolerance: (optional) the largest angular difference (decimal degrees) at which two directions are tangent, radial, compound or reverse; it is independent of the linear tolerance of the renderer (default = amcgeom.ANGULAR_TOLERANCE, 0.01 degrees).
+    """
+    curve = [line["shapetype"] == "Curve" for line in lines]
+    relations = amcgeom.courseRelations([line["shapetype"] for line in lines], [line["bearing"] for line in lines],
+                                        [line["radbearing_cs"] if c else float("nan") for line, c in zip(lines, curve)],
+                                        [line["radbearing_ce"] if c else float("nan") for line, c in zip(lines, curve)],
+                                        rings, angularTolerance)
+    items = courseItems(lines, rings, relations, pobstring, controls)
+    for line, c, item, text in zip(lines, curve, items, renderer.renderCourse(items)):
+        if c:
+            line["radtangent"] = amcgeom.RELATION_NAMES[item["relation"] & 7]
+        line.update(text)
+    return
+
+
+
+
+#============================================================#
+#  CLASS: COURSE RENDERER                                    #
+#============================================================#
+
+
+class courseRenderer(object):
+    """
+    Class Course Renderer: Renders the legal descriptions and annotation labels of structured course records (see courseItems) at the grid and ground scales in one pass, from precompiled templates. The geometry is not touched, so a course can be re-rendered at another scale factor or tolerance (see rescale).
+
+    INPUT
+        scalefactor: (optional) the scale conversion factor from grid to ground (ground = grid / scalefactor) (default = 1.0).
+        tolerance: (optional) the decimal accuracy of the described distances and coordinates (default = 2).
+
+    OUTPUT
+        renderer: a courseRenderer class object
+    """
+
+    #==================== Course Renderer Function: Initialization ====================#
+
+    def __init__(self, scalefactor=1.0, tolerance=2):
+        """
+        Course Renderer Function: Initialization
+            Precompiles the description templates (bound format methods) and the number format of the tolerance.
+        """
+        self.scalefactor = scalefactor
+        self.tolerance = tolerance
+        self.number = "{{:.{}f}}".format(tolerance).format
+        self.preambles = {key: template.format for key, template in PREAMBLES.items()}
+        self.closings = {key: template.format for key, template in CLOSINGS.items()}
+        self.line = LINE.format
+        self.curves = {key: template.format for key, template in CURVES.items()}
+        self.lineAnn, self.lineAnnweb = LINE_ANN.format, LINE_ANNWEB.format
+        self.curveAnn, self.curveAnnweb = CURVE_ANN.format, CURVE_ANNWEB.format
+        self.preamp = PREAMP.format
+        self.predescs = {key: template.format for key, template in PREDESCS.items()}
+        return
+
+
+
+    #==================== Course Renderer Function: Rescale ====================#
+
+    def rescale(self, scalefactor=None, tolerance=None):
+        """
+        Course Renderer Function: Rescale
+            Returns a renderer for another scale factor and/or tolerance.
+        """
+        return courseRenderer(self.scalefactor if scalefactor is None else scalefactor, self.tolerance if tolerance is None else tolerance)
+
+
+
+    #==================== Course Renderer Function: Truncated Number ====================#
+
+    def value(self, v, factor=1.0):
+        """
+        Course Renderer Function: Truncated Number
+            Returns a value (divided by the scale factor) truncated and formatted at the tolerance.
+        """
+        n = 10 ** self.tolerance
+        return self.number(math.floor(v / factor * n) / n)
+
+
+
+    #==================== Course Renderer Function: Render ====================#
+
+    def render(self, item):
+        """
+        Course Renderer Function: Render
+            Returns the six description strings of a course item: 'desc_grid', 'desc_ground', 'ann_grid', 'ann_ground', 'annweb_grid' and 'annweb_ground'.
+
+        INPUT
+            item: a structured course record (see courseItems) holding the 'shapetype', 'bearing', 'distance', 'radius', 'arclength', 'delta', 'midbearing', 'radbearing_cs', 'startx' and 'starty' of the line, its 'relation' code, its 'preamble' ('tpob', 'except' or 'thence') and 'closing' ('pob', 'except' or None), the 'pobstring' and the 'controls' flag.
+        """
+        result = {}
+        curve = item["shapetype"] == "Curve"
+        relation = item["relation"] & 7
+        closing = self.closings[item["closing"]](pobstring=item["pobstring"])
+
+        # Scale independent parts
+        if curve:
+            delta = dd2dms(item["delta"])
+            words = {"concave": bearingLabel(item["midbearing"]), "direction": bearingLabel(item["bearing"]), "delta": delta, "radial": quadrantBearing(item["radbearing_cs"]) if relation == amcgeom.RELATION_NONTANGENT else None}
+        else:
+            dbearing, abearing = quadrantBearing(item["bearing"]), quadrantBearing(item["bearing"], short=True)
+
+        for scale, factor in (("grid", 1.0), ("ground", self.scalefactor)):
+
+            # Preamble (with the ground coordinates of an excepted area's point of beginning); a curve continues the previous line without 'Thence'
+            if item["preamble"] == "except":
+                preamp = self.preambles["except"](x=self.value(item["startx"], factor), y=self.value(item["starty"], factor))
+            elif item["preamble"] == "thence" and curve:
+                preamp = ""
+            else:
+                preamp = self.preambles[item["preamble"]](pobstring=item["pobstring"])
+
+            # Course leaving a curve: non-tangent or radial to said curve (the first course of a ring leaves its point of beginning, not a curve)
+            if item["preamble"] == "thence":
+                for flag, modifier in MODIFIERS:
+                    if item["relation"] & flag:
+                        preamp = preamp.replace("Thence", modifier, 1)
+
+            if curve:
+                radius, arclength = self.value(item["radius"], factor), self.value(item["arclength"], factor)
+                desc = self.curves[relation](preamp=preamp, radius=radius, arclength=arclength, closing=closing, **words)
+                result["ann_" + scale] = self.curveAnn(delta=delta, radius=radius, arclength=arclength)
+                result["annweb_" + scale] = self.curveAnnweb(delta=delta, radius=radius, arclength=arclength)
+
+                # A first curve is introduced by the preamp from the horizontal controls: keep the course along the curve
+                if item["controls"]:
+                    desc = desc.split(";")[1]
+            else:
+                distance = self.value(item["distance"], factor)
+                desc = self.line(preamp=preamp, bearing=dbearing, distance=distance, closing=closing)
+                result["ann_" + scale] = self.lineAnn(bearing=abearing, distance=distance)
+                result["annweb_" + scale] = self.lineAnnweb(bearing=abearing, distance=distance)
+
+            result["desc_" + scale] = desc
+
+        return result
+
+
+
+    #==================== Course Renderer Function: Render Course ====================#
+
+    def renderCourse(self, items):
+        """
+        Course Renderer Function: Render Course
+            Returns the description strings of each course item (see render), in course order.
+        """
+        return [self.render(item) for item in items]
+
+
+
+    #==================== Course Renderer Function: Render Preamp ====================#
+
+    def renderPreamp(self, hc1, hc2, tpob, first, pobstring="TRUE POINT OF BEGINNING"):
+        """
+        Course Renderer Function: Render Preamp
+            Returns the grid and ground preamps of a course from the horizontal control stations to its point of beginning ('grid', 'ground').
+
+        INPUT
+            hc1, hc2: the first (most distant) and second horizontal control stations, each a dictionary with the station 'id', 'x' and 'y' (see orderControls).
+            tpob: the (x, y) coordinates of the course's point of beginning.
+            first: the line record of the first line of the course (its curve is described in the preamp).
+            pobstring: (optional) the name of the course's point of beginning (see pointOfBeginning) (default = 'TRUE POINT OF BEGINNING').
+        """
+        n = 10 ** self.tolerance
+        truncate = lambda v: math.floor(v * n) / n
+        hc1x, hc1y, hc2x, hc2y = truncate(hc1["x"]), truncate(hc1["y"]), truncate(hc2["x"]), truncate(hc2["y"])
+
+        # Bearings and (grid) distances between the stations and to the point of beginning
+        hc1bearing = math.degrees(math.atan2(hc2x - hc1x, hc2y - hc1y)) % 360
+        hc1distance = math.hypot(hc2x - hc1x, hc2y - hc1y)
+        hc2bearing = math.degrees(math.atan2(tpob[0] - hc2x, tpob[1] - hc2y)) % 360
+        hc2distance = math.hypot(tpob[0] - hc2x, tpob[1] - hc2y)
+
+        result = {}
+        for scale, factor in (("grid", 1.0), ("ground", self.scalefactor)):
+            predesc = ""
+            if first["shapetype"] == "Curve":
+                relation = RELATION_CODES.get(first["radtangent"], amcgeom.RELATION_NONTANGENT)
+                predesc = self.predescs[relation](concave=bearingLabel(first["midbearing"]), radius=self.value(first["radius"], factor), radial=quadrantBearing(first["radbearing_cs"]))
+            course1 = "{}, {} feet".format(quadrantBearing(truncate(hc1bearing)), self.value(hc1distance, factor))
+            course2 = "{}, {} feet".format(quadrantBearing(truncate(hc2bearing)), self.value(hc2distance, factor))
+            result[scale] = self.preamp(hc1id=hc1["id"], hc1n=self.value(hc1["y"], factor), hc1e=self.value(hc1["x"], factor), course1=course1, hc2id=hc2["id"], course2=course2, pobstring=pobstring, tpobn=self.value(tpob[1], factor), tpobe=self.value(tpob[0], factor), predesc=predesc)
+        return result
+
+
+
+
+#============================================================#
+#  COURSE CLOSURE                                            #
+#============================================================#
+
+
+#==================== AMC Description Function: Course Closure ====================#
+
+def courseClosure(lines, rings, tolerance=2, precision=10000):
+    """
+    AMC Description Function: Course Closure
+        Returns the traverse closure of a course, computed from the described bearings and distances of its lines and curve chords (amcgeom.courseObservations, amcgeom.traverseClosure): the summed latitudes and departures, the linear misclosure and its bearing, the perimeter and the precision ratio (1:N) of its outer boundary (with each ring listed under 'Rings'), and whether every ring meets the minimum precision.
+
+    INPUT
+        lines: the course's line records in course (ring) order.
+        rings: the ring number of each line (0 for the outer ring, 1, 2, ... for excepted areas).
+        tolerance: (optional) the decimal accuracy of the described distances (default = 2).
+        precision: (optional) the minimum precision ratio (the N of 1:N) of a ring (default = 10000).
+    """
+    bearings, distances, lengths = amcgeom.courseObservations(lines, tolerance)
+    closure = amcgeom.traverseClosure(bearings, distances, lengths, rings)
+    results = []
+    for i in range(len(closure["misclosure"])):
+        ratio = float(closure["precision"][i])
+        results.append({"Latitudes": float(closure["latitude"][i]), "Departures": float(closure["departure"][i]), "Misclosure": float(closure["misclosure"][i]), "Bearing": float(closure["bearing"][i]), "Perimeter": float(closure["perimeter"][i]), "Precision": None if math.isinf(ratio) else ratio, "Ratio": "Exact" if math.isinf(ratio) else "1:{:,.0f}".format(ratio), "Status": "Pass" if ratio >= precision else "Fail"})
+
+    return dict(results[0], Status="Pass" if all(ring["Status"] == "Pass" for ring in results) else "Fail", Rings=results)
+
+
+
+
+#============================================================#
+#  HORIZONTAL CONTROLS                                       #
+#============================================================#
+
+
+#==================== AMC Description Function: Order Controls ====================#
+
+def orderControls(gpspoints, centroid):
+    """
+    AMC Description Function: Order Controls
+        Returns the two horizontal control stations (GPS points) of a map ordered from the most distant to the closest to a parcel's centroid (HC1, HC2), or None when there are not exactly two stations.
+    """
+    if len(gpspoints) != 2:
+        return None
+    points = sorted(gpspoints.values(), key=lambda point: math.hypot(point["x"] - centroid[0], point["y"] - centroid[1]), reverse=True)
+    return points[0], points[1]
+
+
+
+
+#============================================================#
+#  CACHED RESPONSE RE-RENDERING                              #
+#============================================================#
+
+
+#==================== AMC Description Function: Record Rings ====================#
+
+def recordRings(lines, tolerance=2):
+    """
+    AMC Description Function: Record Rings
+        Returns the ring number of each line record of a course (in course order): a new ring (excepted area) starts wherever a line does not begin at the end of the previous line.
+    """
+    rings = []
+    for i, line in enumerate(lines):
+        if i == 0:
+            rings.append(0)
+            continue
+        previous = lines[i - 1]
+        joined = amcgeom.keysMatch(amcgeom.coordinateKey(previous["endx"], previous["endy"], tolerance), amcgeom.coordinateKey(line["startx"], line["starty"], tolerance))
+        rings.append(rings[-1] if joined else rings[-1] + 1)
+    return rings
+
+
+
+#==================== AMC Description Function: Re-render Response ====================#
+
+def rerenderResponse(response, scalefactor=None, tolerance=None, angularTolerance=None):
+    """
+    AMC Description Function: Re-render Response
+        Rebuilds the line descriptions and annotations (desc_*, ann_*, annweb_*) of the boundary records and the legal descriptions (LegalDescription) of a cached JSON data string (jsonResponse.json) from its numeric line attributes, without ArcGIS. The response is updated in place and returned.
+
+    INPUT
+        response: the JSON data string (dictionary) of an AMC run.
+        scalefactor: (optional) the scale factor to render at (default = None, the response's Controls.ScaleFactor).
+        tolerance: (optional) the decimal accuracy to render at (default = None, the response's Controls.Tolerance, or 2).
+        angularTolerance: (optional) the angular tolerance (decimal degrees) of the line relationships (default = None, the response's Controls.AngularTolerance, or amcgeom.ANGULAR_TOLERANCE).
+
+    OUTPUT
+        The updated response. Controls.ScaleFactor, Controls.Tolerance and Controls.AngularTolerance hold the values rendered at.
+    """
+    controls = response["Controls"]
+    scalefactor = float(controls["ScaleFactor"]) if scalefactor is None else scalefactor
+    tolerance = controls.get("Tolerance", 2) if tolerance is None else tolerance
+    angularTolerance = controls.get("AngularTolerance", amcgeom.ANGULAR_TOLERANCE) if angularTolerance is None else angularTolerance
+    renderer = courseRenderer(scalefactor, tolerance)
+    # The TPOB string of the run, kept with the TPOB controls (a response written without it derives it as amc.checkPOB does: a TRUE POINT OF BEGINNING for a single point, or for several drawing points at the same coordinates)
+    tpob = controls["TPOB"]
+    points = set((point["x"], point["y"]) for point in tpob.get("points", {}).values())
+    pobstring = tpob.get("pobstring") or ("TRUE POINT OF BEGINNING" if len(points) <= 1 and not (tpob.get("source") == "user" and tpob.get("count", 1) > 1) else POB)
+
+    legal = response.setdefault("LegalDescription", {})
+    legal["Parcels"] = {}
+    for poid, records in response["Boundaries"].items():
+        lines = sorted(records.values(), key=lambda line: line["coid"])
+        rings = recordRings(lines, tolerance)
+
+        # Relationships, structured records and descriptions of the course
+        parcelstring = pointOfBeginning(lines[0], pobstring)
+        describeLines(lines, rings, renderer, parcelstring, True, angularTolerance)
+
+        # Legal description of the parcel: the preamp from the horizontal controls and the course
+        parcel = legal["Parcels"][poid] = {}
+        stations = orderControls(controls["GPS"], controls["Centroid"][poid])
+        preamps = renderer.renderPreamp(stations[0], stations[1], (lines[0]["startx"], lines[0]["starty"]), lines[0], parcelstring) if stations else {"grid": None, "ground": None}
+        for scale in ("Grid", "Ground"):
+            course = "".join(line["desc_" + scale.lower()] for line in lines).replace("; to the", ", to the")
+            parcel[scale] = {"Preamp": preamps[scale.lower()], "Course": course}
+
+    # The first parcel's description is also kept at the top level (single parcel layout)
+    if len(legal["Parcels"]) > 0:
+        first = legal["Parcels"][next(iter(legal["Parcels"]))]
+        legal["Grid"], legal["Ground"] = first["Grid"], first["Ground"]
+
+    controls["ScaleFactor"], controls["Tolerance"], controls["AngularTolerance"] = scalefactor, tolerance, angularTolerance
+    return response
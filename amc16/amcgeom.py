@@ -0,0 +1,537 @@
+##############################################################
+# PYTHON AUTOMATED MAP CHECKING ANALYSIS                     #
+# AMC Geometry Kernel (Coordinate Geometry Functions)        #
+# Version: 1.6                                               #
+# Author: Dr. Kostas Alexandridis, GISP                      #
+# Organization: OC Survey Geospatial Services                #
+# Date: August 2020                                          #
+##############################################################
+
+
+# Importing the required libraries into the project
+import math, json, numpy
+
+
+
+
+#============================================================#
+#  SEGMENT ARC GEOMETRY                                      #
+#============================================================#
+
+
+#==================== AMC Geometry Function: Arc from Three Points ====================#
+
+def arcFromThreePoints(start, interior, end):
+    """
+    AMC Geometry Function: Arc from Three Points
+        Returns the exact center (x, y) and radius of the circular arc passing through the start, interior and end points of a true curve. Returns None if the three points are collinear.
+    """
+    # Work relative to the start point to keep the state plane coordinates well conditioned
+    bx, by = interior[0] - start[0], interior[1] - start[1]
+    cx, cy = end[0] - start[0], end[1] - start[1]
+    d = 2 * (bx * cy - by * cx)
+    if d == 0:
+        return None
+    b2, c2 = bx * bx + by * by, cx * cx + cy * cy
+    ux = (cy * b2 - by * c2) / d
+    uy = (bx * c2 - cx * b2) / d
+    return (start[0] + ux, start[1] + uy), math.hypot(ux, uy)
+
+
+
+#==================== AMC Geometry Function: Least-Squares Circle Fit ====================#
+
+def fitCircle(vertices):
+    """
+    AMC Geometry Function: Least-Squares Circle Fit
+        Returns the center (x, y) and radius of the algebraic (Kasa) least-squares circle through the vertices of a densified curve. The vertices are an (n, 2) array; the fit is computed on mean-centered coordinates so that state plane values do not lose precision.
+    """
+    xy = numpy.asarray(vertices, dtype=float)[:, :2]
+    origin = xy.mean(axis=0)
+    u = xy - origin
+    # Solve u.x * a + u.y * b + c = -(u.x^2 + u.y^2) for (a, b, c)
+    A = numpy.column_stack((u, numpy.ones(len(u))))
+    rhs = -(u ** 2).sum(axis=1)
+    (a, b, c), *_ = numpy.linalg.lstsq(A, rhs, rcond=None)
+    cx, cy = -a / 2, -b / 2
+    radius = math.sqrt(max(cx * cx + cy * cy - c, 0.0))
+    return (origin[0] + cx, origin[1] + cy), radius
+
+
+
+#==================== AMC Geometry Function: True Curve Interior Point ====================#
+
+def curveInterior(geometryJson):
+    """
+    AMC Geometry Function: True Curve Interior Point
+        Returns the interior point (x, y) of a single circular arc segment from the Esri JSON representation of a geometry (the 'c' entry of 'curvePaths'), or None if the geometry is not a single true circular arc.
+    """
+    if isinstance(geometryJson, str):
+        geometryJson = json.loads(geometryJson)
+    paths = geometryJson.get("curvePaths")
+    if not paths or len(paths) != 1:
+        return None
+    arcs = [p["c"] for p in paths[0] if isinstance(p, dict) and "c" in p]
+    if len(arcs) != 1 or len(paths[0]) != 2:
+        return None
+    return tuple(arcs[0][1][:2])
+
+
+
+#==================== AMC Geometry Function: Segment Arc Parameters ====================#
+
+def segmentParameters(vertices, interior=None):
+    """
+    AMC Geometry Function: Segment Arc Parameters
+        Computes the shape type, arc midpoint, radial center, radius and height (sagitta) of a boundary segment directly from its vertex array.
+
+    INPUT
+        vertices: an (n, 2) or (n, 3) array of the segment's vertex coordinates (start to end).
+        interior: (optional) the interior point of a true circular arc (see curveInterior). When given, the exact three-point arc is used; otherwise densified curves are fitted by least squares (default = None).
+
+    OUTPUT
+        A dictionary with the keys 'shapetype' ('Line' or 'Curve'), 'mid', 'center', 'radius' and 'height'. For lines, 'center' and 'radius' are None, 'mid' is the mid-chord point and 'height' is 0.
+    """
+    xy = numpy.asarray(vertices, dtype=float)[:, :2]
+    start, end = xy[0], xy[-1]
+    chordx, chordy = end[0] - start[0], end[1] - start[1]
+    distance = math.hypot(chordx, chordy)
+    midchord = ((start[0] + end[0]) / 2, (start[1] + end[1]) / 2)
+    line = {"shapetype": "Line", "mid": midchord, "center": None, "radius": None, "height": 0.0}
+
+    if distance == 0:
+        return line
+
+    # Signed perpendicular offsets of the vertices from the chord (positive to the left of start --> end)
+    offsets = (chordx * (xy[:, 1] - start[1]) - chordy * (xy[:, 0] - start[0])) / distance
+
+    # True circular arc: exact three-point geometry
+    if interior is not None:
+        side = math.copysign(1.0, chordx * (interior[1] - start[1]) - chordy * (interior[0] - start[0]))
+        arc = arcFromThreePoints(start, interior, end)
+        if arc is None:
+            return line
+        center, radius = arc
+    # Straight line: all vertices on the chord
+    elif len(xy) < 3 or numpy.abs(offsets).max() <= 1e-9 * max(distance, 1.0):
+        return line
+    # Densified curve: least-squares circle fit over all vertices
+    else:
+        side = math.copysign(1.0, offsets[numpy.abs(offsets).argmax()])
+        center, radius = fitCircle(xy)
+
+    # Height of the arc above the chord; the arc is larger than a half circle when the center lies on the arc side of the chord
+    halfchord = min(distance / 2, radius)
+    apothem = math.sqrt(radius * radius - halfchord * halfchord)
+    centerside = chordx * (center[1] - start[1]) - chordy * (center[0] - start[0])
+    height = radius + apothem if centerside * side > 0 else radius - apothem
+
+    # Arc midpoint: offset from the mid-chord along the chord normal, towards the arc
+    nx, ny = -chordy / distance * side, chordx / distance * side
+    mid = (midchord[0] + nx * height, midchord[1] + ny * height)
+
+    return {"shapetype": "Curve", "mid": mid, "center": center, "radius": radius, "height": height}
+
+
+
+
+#============================================================#
+#  SEGMENT VERTEX ARRAYS                                     #
+#============================================================#
+
+
+#==================== AMC Geometry Function: Vertices from Well Known Binary ====================#
+
+def geometryVertices(wkb, parts=False):
+    """
+    AMC Geometry Function: Vertices from Well Known Binary
+        Returns the vertices of a (multi)linestring geometry as an (n, d) NumPy array of coordinates, read directly from its Well Known Binary (WKB) representation (e.g., arcpy's geometry.WKB). The array holds the x, y (and z/m when present) coordinates of all parts in order, without any text conversion. With parts=True, returns the list of the (n, d) arrays of each part instead.
+    """
+    buffer = memoryview(wkb).cast("B")
+    vertices = []
+    offset = 0
+
+    def header(offset):
+        # Byte order and geometry type (ISO and extended WKB Z/M flags)
+        order = "<" if buffer[offset] == 1 else ">"
+        gtype = int(numpy.frombuffer(buffer, dtype=order + "u4", count=1, offset=offset + 1)[0])
+        iso = (gtype & 0x0fffffff) // 1000
+        dims = 2 + bool(gtype & 0x80000000 or iso in (1, 3)) + bool(gtype & 0x40000000 or iso in (2, 3))
+        return order, (gtype & 0x0fffffff) % 1000, dims, offset + 5
+
+    order, gtype, dims, offset = header(offset)
+    if gtype == 2:
+        nlines = 1
+        offset -= 5
+    elif gtype == 5:
+        nlines = int(numpy.frombuffer(buffer, dtype=order + "u4", count=1, offset=offset)[0])
+        offset += 4
+    else:
+        raise ValueError("Unsupported WKB geometry type: {}".format(gtype))
+
+    for i in range(nlines):
+        order, gtype, dims, offset = header(offset)
+        npoints = int(numpy.frombuffer(buffer, dtype=order + "u4", count=1, offset=offset)[0])
+        offset += 4
+        points = numpy.frombuffer(buffer, dtype=order + "f8", count=npoints * dims, offset=offset).reshape(npoints, dims)
+        vertices.append(points)
+        offset += 8 * npoints * dims
+
+    if parts:
+        return [points.astype(float) for points in vertices]
+    return numpy.concatenate(vertices).astype(float)
+
+
+
+#==================== AMC Geometry Function: Well Known Binary Dimensions ====================#
+
+def geometryDimensions(wkb):
+    """
+    AMC Geometry Function: Well Known Binary Dimensions
+        Returns the (hasZ, hasM) flags of a Well Known Binary geometry (ISO or extended WKB Z/M flags), i.e., what its third and fourth coordinate columns hold.
+    """
+    buffer = memoryview(wkb).cast("B")
+    order = "<" if buffer[0] == 1 else ">"
+    gtype = int(numpy.frombuffer(buffer, dtype=order + "u4", count=1, offset=1)[0])
+    iso = (gtype & 0x0fffffff) // 1000
+    return bool(gtype & 0x80000000 or iso in (1, 3)), bool(gtype & 0x40000000 or iso in (2, 3))
+
+
+
+#==================== AMC Geometry Function: Vertices to Well Known Binary ====================#
+
+def verticesToWkb(vertices, hasZ=None, hasM=False):
+    """
+    AMC Geometry Function: Vertices to Well Known Binary
+        Returns a little-endian Well Known Binary (WKB) MultiLineString for a vertex array, or for a list of part arrays (one linestring per part), suitable for arcpy.FromWKB.
+    NOTES:
+        The ISO geometry type matches the columns written: 2D (5), Z (1005), M (2005) or ZM (3005). A three column array is read as x, y, z unless hasM is set (e.g., from geometryDimensions of the source geometry); a four column array is always x, y, z, m.
+    """
+    if isinstance(vertices, (list, tuple)) and len(vertices) > 0 and numpy.ndim(vertices[0]) == 2:
+        parts = [numpy.ascontiguousarray(part, dtype="<f8") for part in vertices]
+    else:
+        parts = [numpy.ascontiguousarray(vertices, dtype="<f8")]
+    dims = parts[0].shape[1]
+    if hasZ is None:
+        hasZ, hasM = dims == 4 or (dims == 3 and not hasM), hasM or dims == 4
+    if dims != 2 + bool(hasZ) + bool(hasM) or any(part.shape[1] != dims for part in parts):
+        raise ValueError("Vertex arrays with {} columns do not match the Z ({}) and M ({}) flags".format(dims, hasZ, hasM))
+    gtype = 5 + 1000 * (bool(hasZ) + 2 * bool(hasM))
+    wkb = numpy.array([1], dtype="u1").tobytes() + numpy.array([gtype, len(parts)], dtype="<u4").tobytes()
+    for part in parts:
+        wkb += numpy.array([1], dtype="u1").tobytes() + numpy.array([gtype - 3, len(part)], dtype="<u4").tobytes() + part.tobytes()
+    return bytearray(wkb)
+
+
+
+#==================== AMC Geometry Function: Reverse Vertices ====================#
+
+def reverseVertices(vertices):
+    """
+    AMC Geometry Function: Reverse Vertices
+        Reverses the order of a vertex array in place (end --> start) and returns it.
+    """
+    vertices[:] = vertices[::-1].copy()
+    return vertices
+
+
+
+
+#============================================================#
+#  FIXED-POINT COORDINATE KEYS                               #
+#============================================================#
+
+
+#==================== AMC Geometry Function: Coordinate Key ====================#
+
+def coordinateKey(x, y, tolerance=2):
+    """
+    AMC Geometry Function: Coordinate Key
+        Returns the fixed-point integer key of a coordinate pair: the coordinates rounded to the nearest unit of 10^-tolerance feet (e.g., hundredths of a foot for the default tolerance of 2). Integer keys hash and compare exactly, unlike truncated floating point values.
+    """
+    n = 10 ** tolerance
+    return (int(round(x * n)), int(round(y * n)))
+
+
+
+#==================== AMC Geometry Function: Coordinate Keys ====================#
+
+def coordinateKeys(vertices, tolerance=2):
+    """
+    AMC Geometry Function: Coordinate Keys
+        Returns the fixed-point integer keys of an (n, 2) array of coordinates as an (n, 2) int64 array (see coordinateKey).
+    """
+    return numpy.rint(numpy.asarray(vertices, dtype=float)[:, :2] * 10 ** tolerance).astype(numpy.int64)
+
+
+
+#==================== AMC Geometry Function: Neighbor Keys ====================#
+
+def neighborKeys(key):
+    """
+    AMC Geometry Function: Neighbor Keys
+        Returns the key of a coordinate cell followed by the keys of its eight neighboring cells. Two points within the tolerance of each other can round into adjacent cells, so matching probes all nine.
+    """
+    return [(key[0] + i, key[1] + j) for i, j in ((0, 0), (-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (-1, 1), (1, -1), (1, 1))]
+
+
+
+#==================== AMC Geometry Function: Keys Match ====================#
+
+def keysMatch(a, b):
+    """
+    AMC Geometry Function: Keys Match
+        Returns True if two coordinate keys are the same or neighboring cells.
+    """
+    return abs(a[0] - b[0]) <= 1 and abs(a[1] - b[1]) <= 1
+
+
+
+#==================== AMC Geometry Function: Angles Match ====================#
+
+def anglesMatch(a, b, tolerance=2):
+    """
+    AMC Geometry Function: Angles Match
+        Returns True if two bearings (decimal degrees) have the same or neighboring fixed-point keys (units of 10^-tolerance degrees), wrapping around 360 degrees.
+    """
+    n = 10 ** tolerance
+    difference = (int(round(a * n)) - int(round(b * n))) % (360 * n)
+    return min(difference, 360 * n - difference) <= 1
+
+
+
+#==================== AMC Geometry Class: Coordinate Index ====================#
+
+class coordinateIndex(object):
+    """
+    Class Coordinate Index: A hash index of points keyed by their fixed-point coordinate keys. Looking up a point probes its own cell and the eight neighboring cells, and returns the value of the nearest indexed point.
+
+    INPUT
+        tolerance: (optional) the decimal accuracy of the keys (default = 2).
+    """
+
+    def __init__(self, tolerance=2):
+        self.tolerance = tolerance
+        self.cells = {}
+
+    def add(self, xy, value):
+        """Indexes the value of a point (x, y)"""
+        self.cells.setdefault(coordinateKey(xy[0], xy[1], self.tolerance), []).append((float(xy[0]), float(xy[1]), value))
+
+    def find(self, xy, default=None):
+        """Returns the value of the nearest indexed point within the neighboring cells of a point (x, y), or the default"""
+        best, nearest = default, None
+        for key in neighborKeys(coordinateKey(xy[0], xy[1], self.tolerance)):
+            for x, y, value in self.cells.get(key, ()):
+                distance = math.hypot(x - xy[0], y - xy[1])
+                if nearest is None or distance < nearest:
+                    best, nearest = value, distance
+        return best
+
+    def findAll(self, xy):
+        """Returns the values of all the indexed points within the neighboring cells of a point (x, y), nearest first"""
+        matches = []
+        for key in neighborKeys(coordinateKey(xy[0], xy[1], self.tolerance)):
+            for x, y, value in self.cells.get(key, ()):
+                matches.append((math.hypot(x - xy[0], y - xy[1]), len(matches), value))
+        return [value for distance, order, value in sorted(matches)]
+
+    def __contains__(self, xy):
+        return any(key in self.cells for key in neighborKeys(coordinateKey(xy[0], xy[1], self.tolerance)))
+
+
+
+
+#============================================================#
+#  SEGMENT COURSE GEOMETRY                                   #
+#============================================================#
+
+
+#==================== AMC Geometry Function: Course Geometry ====================#
+
+def courseGeometry(vertices, interior=None):
+    """
+    AMC Geometry Function: Course Geometry
+        Computes the coordinate geometry (COGO) of a boundary segment along its course direction: the start, mid, end and mid-chord points, the line (or chord) bearing, distance and height, and for curves the radius, radial center, central angle (delta), radial bearings and arc length.
+
+    INPUT
+        vertices: an (n, 2) or (n, 3) array of the segment's vertex coordinates, ordered along the course (start to end).
+        interior: (optional) the interior point of a true circular arc (see curveInterior) (default = None).
+
+    OUTPUT
+        A dictionary keyed by the boundary field names (see amc.boundaryProcessing). The curve values (center, radius, delta, radial bearings and arc length) are None for lines.
+    """
+    xy = numpy.asarray(vertices, dtype=float)[:, :2]
+    arc = segmentParameters(xy, interior)
+    startx, starty = float(xy[0][0]), float(xy[0][1])
+    endx, endy = float(xy[-1][0]), float(xy[-1][1])
+    midx, midy = float(arc["mid"][0]), float(arc["mid"][1])
+    midchordx, midchordy = (startx + endx) / 2, (starty + endy) / 2
+    distance = math.hypot(endx - startx, endy - starty)
+    height = arc["height"]
+
+    cogo = {"shapetype": arc["shapetype"], "nwkt": len(xy), "startx": startx, "starty": starty, "midx": midx, "midy": midy, "endx": endx, "endy": endy, "midchordx": midchordx, "midchordy": midchordy, "centerx": None, "centery": None, "bearing": math.degrees(math.atan2(endx - startx, endy - starty)) % 360, "distance": distance, "height": height, "arclength": None, "radius": None, "midbearing": math.degrees(math.atan2(midchordx - midx, midchordy - midy)) % 360, "delta": None, "radbearing_cs": None, "radbearing_sc": None, "radbearing_ce": None, "radbearing_st": None}
+
+    if arc["shapetype"] == "Curve":
+        radius = float(arc["radius"])
+        centerx, centery = float(arc["center"][0]), float(arc["center"][1])
+
+        # Curve angle (delta): more than a half circle when the arc is higher than half the chord (e.g., cul-de-sac)
+        delta = math.degrees(2 * math.asin(min(distance / (2 * radius), 1.0)))
+        delta = (360 - delta) % 360 if height > (distance / 2) else delta % 360
+
+        # Radial bearings: center to start, start to center, center to end, and the tangent angle at the start
+        radbearing_cs = math.degrees(math.atan2(startx - centerx, starty - centery)) % 360
+        cogo.update({"centerx": centerx, "centery": centery, "radius": radius, "delta": delta, "radbearing_cs": radbearing_cs, "radbearing_sc": math.degrees(math.atan2(centerx - startx, centery - starty)) % 360, "radbearing_ce": math.degrees(math.atan2(endx - centerx, endy - centery)) % 360, "radbearing_st": (90 + radbearing_cs) % 360, "arclength": (2 * math.pi * radius) * (delta / 360)})
+
+    return cogo
+
+
+
+
+#============================================================#
+#  TRAVERSE CLOSURE                                          #
+#============================================================#
+
+
+#==================== AMC Geometry Function: Traverse Closure ====================#
+
+def traverseClosure(bearings, distances, lengths=None, rings=None):
+    """
+    AMC Geometry Function: Traverse Closure
+        Computes the closure of traverses from their course bearings and distances (line lengths or curve chords), vectorized over all the courses: the summed latitudes and departures, the linear misclosure, the misclosure bearing and the precision ratio (the N of 1:N).
+
+    INPUT
+        bearings: an array of the course bearings (azimuths in decimal degrees, clockwise from north).
+        distances: an array of the course distances (line lengths or curve chord lengths).
+        lengths: (optional) an array of the course lengths along the boundary (arc lengths for curves), used for the perimeter (default = None, the distances).
+        rings: (optional) an array of the traverse (ring) number 0, 1, 2, ... of each course, to close several traverses at once (default = None, a single traverse).
+
+    OUTPUT
+        A dictionary of arrays with one value per traverse: 'latitude' and 'departure' (the summed northing and easting components), 'misclosure' (the linear misclosure), 'bearing' (the azimuth of the misclosure, from the point of beginning to the computed end point), 'perimeter' and 'precision' (perimeter / misclosure; infinite for an exact closure).
+    """
+    radians = numpy.radians(numpy.asarray(bearings, dtype=float))
+    distances = numpy.asarray(distances, dtype=float)
+    lengths = distances if lengths is None else numpy.asarray(lengths, dtype=float)
+    rings = numpy.zeros(len(distances), dtype=int) if rings is None else numpy.asarray(rings, dtype=int)
+    n = int(rings.max()) + 1 if len(rings) > 0 else 0
+
+    latitude = numpy.bincount(rings, distances * numpy.cos(radians), n)
+    departure = numpy.bincount(rings, distances * numpy.sin(radians), n)
+    perimeter = numpy.bincount(rings, lengths, n)
+    misclosure = numpy.hypot(latitude, departure)
+    bearing = numpy.degrees(numpy.arctan2(departure, latitude)) % 360
+    precision = numpy.divide(perimeter, misclosure, out=numpy.full(n, numpy.inf), where=misclosure > 0)
+
+    return {"latitude": latitude, "departure": departure, "misclosure": misclosure, "bearing": bearing, "perimeter": perimeter, "precision": precision}
+
+
+
+#==================== AMC Geometry Function: Course Observations ====================#
+
+def courseObservations(lines, tolerance=2):
+    """
+    AMC Geometry Function: Course Observations
+        Returns the bearings (truncated to the second), distances (truncated to the tolerance) and lengths (arc lengths for curves) of the line records of a course (in course order), as they are described.
+    """
+    bearings = numpy.array([line["bearing"] for line in lines], dtype=float)
+    distances = numpy.array([line["distance"] for line in lines], dtype=float)
+    lengths = numpy.array([line["arclength"] if line["shapetype"] == "Curve" else line["distance"] for line in lines], dtype=float)
+
+    # Truncate the quadrant bearings to the second and the distances to the tolerance
+    quadrant = numpy.select([bearings <= 90, bearings <= 180, bearings <= 270], [bearings, 180 - bearings, bearings - 180], 360 - bearings)
+    quadrant = numpy.floor(quadrant * 3600) / 3600
+    bearings = numpy.select([bearings <= 90, bearings <= 180, bearings <= 270], [quadrant, 180 - quadrant, quadrant + 180], 360 - quadrant)
+    distances = numpy.trunc(distances * 10 ** tolerance) / 10 ** tolerance
+
+    return bearings, distances, lengths
+
+
+
+
+#============================================================#
+#  COURSE RELATIONSHIPS                                      #
+#============================================================#
+
+# Relationship codes of a course to the previous course on its ring: the type of a curve, with the flags of a line or curve that leaves a curve
+RELATION_LINE = 0
+RELATION_TANGENT = 1
+RELATION_NONTANGENT = 2
+RELATION_COMPOUND = 3
+RELATION_REVERSE = 4
+RELATION_NONTANGENT_TO_CURVE = 8
+RELATION_RADIAL_TO_CURVE = 16
+RELATION_NAMES = {RELATION_TANGENT: "Tangent", RELATION_NONTANGENT: "Non-Tangent", RELATION_COMPOUND: "Compound", RELATION_REVERSE: "Reverse"}
+
+# Largest angular difference (decimal degrees) at which two course directions are the same: 0.01 degrees (36 seconds of arc), independent of the linear tolerance
+ANGULAR_TOLERANCE = 0.01
+
+
+#==================== AMC Geometry Function: Previous Course Index ====================#
+
+def previousIndex(rings):
+    """
+    AMC Geometry Function: Previous Course Index
+        Returns the index of the previous course of each course on its ring, for an array of ring numbers whose courses are consecutive. The first course of a ring (its point of beginning) has no previous course (-1).
+    """
+    rings = numpy.asarray(rings, dtype=int)
+    index = numpy.arange(len(rings)) - 1
+    if len(rings) > 0:
+        index[numpy.diff(rings, prepend=rings[0] - 1) != 0] = -1
+    return index
+
+
+
+#==================== AMC Geometry Function: Angle Difference ====================#
+
+def angleDifference(a, b):
+    """
+    AMC Geometry Function: Angle Difference
+        Returns the absolute angular difference (0 to 180 degrees) between two arrays of bearings in decimal degrees.
+    """
+    return numpy.abs((numpy.asarray(a, dtype=float) - numpy.asarray(b, dtype=float) + 180) % 360 - 180)
+
+
+
+#==================== AMC Geometry Function: Course Relationships ====================#
+
+def courseRelations(shapetypes, bearings, radbearings_cs, radbearings_ce, rings=None, angularTolerance=ANGULAR_TOLERANCE):
+    """
+    AMC Geometry Function: Course Relationships
+        Classifies the relationship of every course to the previous course on its ring in one vectorized pass over the shifted (previous course) arrays. The first course of a ring (its point of beginning) has no previous course: a line is RELATION_LINE and a curve RELATION_NONTANGENT, without flags.
+
+    INPUT
+        shapetypes: an array of the course shape types ('Line' or 'Curve').
+        bearings: an array of the line (or chord) bearings in decimal degrees.
+        radbearings_cs: an array of the radial bearings from the center to the start of each curve (NaN for lines).
+        radbearings_ce: an array of the radial bearings from the center to the end of each curve (NaN for lines).
+        rings: (optional) an array of the ring number of each course, with the courses of each ring consecutive (default = None, a single ring).
+        angularTolerance: (optional) the largest angular difference (decimal degrees) at which two directions are the same (default = ANGULAR_TOLERANCE, 0.01).
+
+    OUTPUT
+        An integer array of relationship codes. A curve is RELATION_TANGENT (its start tangent continues the previous line), RELATION_COMPOUND or RELATION_REVERSE (it shares the previous curve's end radial, on the same or the opposite side), or RELATION_NONTANGENT; a line is RELATION_LINE. A course leaving a curve is flagged RELATION_RADIAL_TO_CURVE (a line along the curve's end radial) or RELATION_NONTANGENT_TO_CURVE (a line off the curve's end tangent, or a non-tangent curve).
+    """
+    curve = numpy.asarray(shapetypes) == "Curve"
+    bearings = numpy.asarray(bearings, dtype=float)
+    cs = numpy.asarray(radbearings_cs, dtype=float)
+    ce = numpy.asarray(radbearings_ce, dtype=float)
+    previous = previousIndex(numpy.zeros(len(curve), dtype=int) if rings is None else rings)
+    head = previous < 0
+
+    # Shifted arrays of the previous course (none for the first course of a ring)
+    pcurve, pbearings, pce = curve[previous] & ~head, bearings[previous], ce[previous]
+
+    with numpy.errstate(invalid="ignore"):
+        # Curves: the start tangent is perpendicular to the start radial; compound and reverse curves share the previous curve's end radial
+        tangent = ~head & ~pcurve & (numpy.abs(angleDifference(pbearings, cs) - 90) <= angularTolerance)
+        compound = pcurve & (angleDifference(cs, pce) <= angularTolerance)
+        reverse = pcurve & (angleDifference(cs, pce + 180) <= angularTolerance)
+        codes = numpy.where(curve, numpy.select([tangent, compound, reverse], [RELATION_TANGENT, RELATION_COMPOUND, RELATION_REVERSE], RELATION_NONTANGENT), RELATION_LINE)
+
+        # Lines leaving a curve: along its end radial (either way), along its end tangent, or neither
+        leaving = ~curve & pcurve
+        radial = leaving & ((angleDifference(bearings, pce) <= angularTolerance) | (angleDifference(bearings, pce + 180) <= angularTolerance))
+        offTangent = leaving & ~radial & (numpy.abs(angleDifference(bearings, pce) - 90) > angularTolerance)
+        nontangent = offTangent | (curve & pcurve & (codes == RELATION_NONTANGENT))
+
+    return codes | numpy.where(radial, RELATION_RADIAL_TO_CURVE, 0) | numpy.where(nontangent, RELATION_NONTANGENT_TO_CURVE, 0)
@@ -0,0 +1,477 @@
+##############################################################
+# PYTHON AUTOMATED MAP CHECKING ANALYSIS                     #
+# AMC Planar Graph (Boundary Topology Functions)             #
+# Version: 1.6                                               #
+# Author: Dr. Kostas Alexandridis, GISP                      #
+# Organization: OC Survey Geospatial Services                #
+# Date: August 2020                                          #
+##############################################################
+
+
+# Importing the required libraries into the project
+import math, numpy
+import amcgeom
+
+
+
+
+#============================================================#
+#  CLASS: PLANAR GRAPH                                       #
+#============================================================#
+
+
+class planarGraph(object):
+    """
+    Class Planar Graph: An in-memory planar endpoint graph of the boundary (PIQ) line segments. Nodes are the segment endpoints (matched at the coordinate tolerance), edges are the segments, and each edge is split into two half-edges (forward: start --> end, backward: end --> start). Half-edges are sorted by angle around each node and linked into faces, so the graph knows its connected components, the bounded faces (parcel areas) of each component, the edges shared between faces, and which components lie inside others.
+
+    INPUT
+        segments: a dictionary of the boundary line segments, keyed by the line OID, holding the (n, 2) or (n, 3) vertex array of each segment (start to end).
+        tolerance: (optional) the decimal accuracy used to match segment endpoints (default = 2).
+
+    OUTPUT
+        graph: a planarGraph class object
+    """
+
+    #==================== Planar Graph Function: Initialization ====================#
+
+    def __init__(self, segments, tolerance=2):
+        """
+        Planar Graph Function: Initialization
+            Builds the nodes, edges, half-edges and faces of the planar graph from the segment vertex arrays.
+        """
+        self.tolerance = tolerance
+        self.oids = list(segments.keys())
+        self.vertices = [numpy.asarray(segments[oid], dtype=float)[:, :2] for oid in self.oids]
+        self.edgeIndex = {oid: e for e, oid in enumerate(self.oids)}
+
+        # Nodes: segment endpoints keyed at the coordinate tolerance (fixed-point integer keys, probing the neighboring cells)
+        self.nodes = amcgeom.coordinateIndex(tolerance)
+        self.nodeXY = []
+        edgeNodes = []
+        for xy in self.vertices:
+            edgeNodes.append((self.addNode(xy[0]), self.addNode(xy[-1])))
+        self.edgeNodes = numpy.array(edgeNodes, dtype=int).reshape(-1, 2)
+
+        # Half-edges: 2e is the forward (start --> end) and 2e + 1 the backward (end --> start) direction of edge e
+        nedges = len(self.oids)
+        self.origin = self.edgeNodes.reshape(-1)
+        self.angle = numpy.empty(2 * nedges)
+        for e, xy in enumerate(self.vertices):
+            # Leaving direction at each end, using the first interior vertex so that curves and lines sharing both endpoints are told apart
+            self.angle[2 * e] = math.atan2(xy[1][1] - xy[0][1], xy[1][0] - xy[0][0])
+            self.angle[2 * e + 1] = math.atan2(xy[-2][1] - xy[-1][1], xy[-2][0] - xy[-1][0])
+
+        # Outgoing half-edges around each node, sorted counter-clockwise by angle
+        order = numpy.lexsort((self.angle, self.origin))
+        self.outgoing = {}
+        for h in order:
+            self.outgoing.setdefault(int(self.origin[h]), []).append(int(h))
+
+        # Next half-edge around the face to the left: at the head node, the outgoing half-edge just clockwise from the twin
+        position = {}
+        for node, hes in self.outgoing.items():
+            for i, h in enumerate(hes):
+                position[h] = i
+        self.nextHalfEdge = numpy.empty(2 * nedges, dtype=int)
+        for h in range(2 * nedges):
+            twin = h ^ 1
+            hes = self.outgoing[int(self.origin[twin])]
+            self.nextHalfEdge[h] = hes[position[twin] - 1]
+
+        # Faces: cycles of next half-edges, with their signed areas (positive for bounded, counter-clockwise faces)
+        self.face = numpy.full(2 * nedges, -1, dtype=int)
+        self.faces = []
+        for h in range(2 * nedges):
+            if self.face[h] == -1:
+                cycle = []
+                while self.face[h] == -1:
+                    self.face[h] = len(self.faces)
+                    cycle.append(h)
+                    h = int(self.nextHalfEdge[h])
+                self.faces.append(cycle)
+
+        # Face rings, signed areas and bounding boxes (xmin, ymin, xmax, ymax), computed once; the bounding boxes index the faces for point location
+        self.rings = [numpy.concatenate([self.halfEdgeVertices(h)[:-1] for h in cycle] + [self.halfEdgeVertices(cycle[0])[:1]]) for cycle in self.faces]
+        self.faceArea = numpy.array([self.ringArea(ring) for ring in self.rings])
+        self.faceBounds = numpy.array([numpy.concatenate([ring.min(axis=0), ring.max(axis=0)]) for ring in self.rings]).reshape(-1, 4)
+        self.bounded = numpy.flatnonzero(self.faceArea > 10 ** (-2 * self.tolerance))
+
+        # Connected components of the edges (union-find over the nodes)
+        parent = list(range(len(self.nodeXY)))
+        def find(i):
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+        for u, v in self.edgeNodes:
+            parent[find(u)] = find(v)
+        roots = {}
+        self.component = numpy.array([roots.setdefault(find(int(u)), len(roots)) for u in self.edgeNodes[:, 0]], dtype=int)
+        self.ncomponents = len(roots)
+        self.faceComponents = self.component[[cycle[0] // 2 for cycle in self.faces]] if len(self.faces) > 0 else numpy.empty(0, dtype=int)
+
+        # Containment of the components, holes of the faces and nodes of the points of beginning (computed once, on first use)
+        self.contained = None
+        self.holes = None
+        self.startNodes = None
+
+        return
+
+
+
+    #==================== Planar Graph Function: Node Key ====================#
+
+    def nodeKey(self, x, y):
+        """
+        Planar Graph Function: Node Key
+            Returns the fixed-point integer key of a coordinate pair, in units of 10^-tolerance feet (see amcgeom.coordinateKey).
+        """
+        return amcgeom.coordinateKey(x, y, self.tolerance)
+
+
+
+    #==================== Planar Graph Function: Add Node ====================#
+
+    def addNode(self, xy):
+        """
+        Planar Graph Function: Add Node
+            Returns the node ID for an endpoint coordinate (the nearest node in its own or a neighboring key cell), adding a new node if there is none.
+        """
+        node = self.nodes.find(xy)
+        if node is None:
+            node = len(self.nodeXY)
+            self.nodes.add(xy, node)
+            self.nodeXY.append((float(xy[0]), float(xy[1])))
+        return node
+
+
+
+    #==================== Planar Graph Function: Half-Edge Vertices ====================#
+
+    def halfEdgeVertices(self, h):
+        """
+        Planar Graph Function: Half-Edge Vertices
+            Returns the vertex array of a half-edge in its direction of travel.
+        """
+        xy = self.vertices[h // 2]
+        return xy if h % 2 == 0 else xy[::-1]
+
+
+
+    #==================== Planar Graph Function: Face Ring ====================#
+
+    def faceRing(self, f):
+        """
+        Planar Graph Function: Face Ring
+            Returns the closed ring of vertex coordinates around face f, as an (n, 2) array.
+        """
+        return self.rings[f]
+
+
+
+    #==================== Planar Graph Function: Ring Area ====================#
+
+    @staticmethod
+    def ringArea(ring):
+        """
+        Planar Graph Function: Ring Area
+            Returns the signed (shoelace) area of a closed ring; positive for counter-clockwise rings.
+        """
+        x, y = ring[:, 0] - ring[0, 0], ring[:, 1] - ring[0, 1]
+        return float(numpy.dot(x[:-1], y[1:]) - numpy.dot(x[1:], y[:-1])) / 2
+
+
+
+    #==================== Planar Graph Function: Point in Ring ====================#
+
+    @staticmethod
+    def pointInRing(point, ring):
+        """
+        Planar Graph Function: Point in Ring
+            Returns True if the point (x, y) lies inside the closed ring (even-odd rule).
+        """
+        x, y = point
+        x1, y1, x2, y2 = ring[:-1, 0], ring[:-1, 1], ring[1:, 0], ring[1:, 1]
+        crossing = (y1 > y) != (y2 > y)
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            xcross = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+        return bool(numpy.count_nonzero(crossing & (x < xcross)) % 2)
+
+
+
+    #==================== Planar Graph Function: Bounded Faces ====================#
+
+    def boundedFaces(self):
+        """
+        Planar Graph Function: Bounded Faces
+            Returns the list of the bounded (enclosed, counter-clockwise) face IDs of the graph.
+        """
+        return self.bounded.tolist()
+
+
+
+    #==================== Planar Graph Function: Containing Faces ====================#
+
+    def containingFaces(self, point):
+        """
+        Planar Graph Function: Containing Faces
+            Returns the list of the bounded faces that contain the point (x, y). Only the faces whose bounding box holds the point are tested against their rings.
+        """
+        x, y = point
+        bounds = self.faceBounds[self.bounded]
+        candidates = self.bounded[(bounds[:, 0] <= x) & (x <= bounds[:, 2]) & (bounds[:, 1] <= y) & (y <= bounds[:, 3])]
+        return [int(f) for f in candidates if self.pointInRing(point, self.rings[f])]
+
+
+
+    #==================== Planar Graph Function: Shared Edges ====================#
+
+    def sharedEdges(self):
+        """
+        Planar Graph Function: Shared Edges
+            Returns the OIDs of the boundary lines that are shared between two bounded faces (e.g., the common line of adjacent parcels).
+        """
+        bounded = set(self.boundedFaces())
+        return [oid for e, oid in enumerate(self.oids) if self.face[2 * e] in bounded and self.face[2 * e + 1] in bounded]
+
+
+
+    #==================== Planar Graph Function: Open Edges ====================#
+
+    def openEdges(self):
+        """
+        Planar Graph Function: Open Edges
+            Returns the OIDs of the boundary lines that do not bound any face (dangling lines that break the closure).
+        """
+        bounded = set(self.boundedFaces())
+        return [oid for e, oid in enumerate(self.oids) if self.face[2 * e] not in bounded and self.face[2 * e + 1] not in bounded]
+
+
+
+    #==================== Planar Graph Function: Component Edges ====================#
+
+    def componentEdges(self):
+        """
+        Planar Graph Function: Component Edges
+            Returns a dictionary of the boundary line OIDs of each connected component, assigned in a single pass over the lines.
+        """
+        edges = {c: [] for c in range(self.ncomponents)}
+        for e, oid in enumerate(self.oids):
+            edges[int(self.component[e])].append(oid)
+        return edges
+
+
+
+    #==================== Planar Graph Function: Face Component ====================#
+
+    def faceComponent(self, f):
+        """
+        Planar Graph Function: Face Component
+            Returns the connected component of a face.
+        """
+        return int(self.faceComponents[f])
+
+
+
+    #==================== Planar Graph Function: Containment ====================#
+
+    def containment(self):
+        """
+        Planar Graph Function: Containment
+            Returns a list of (inner, outer, face) tuples for every connected component (inner) that lies inside a bounded face of another component (outer). Computed once per graph.
+        """
+        if self.contained is None:
+            self.contained = []
+            first = {}
+            for e in range(len(self.oids)):
+                first.setdefault(int(self.component[e]), e)
+            for c in range(self.ncomponents):
+                # Any node of the component is representative (components do not cross)
+                point = self.nodeXY[int(self.edgeNodes[first[c], 0])]
+                for f in self.containingFaces(point):
+                    if self.faceComponents[f] != c:
+                        self.contained.append((c, int(self.faceComponents[f]), f))
+        return list(self.contained)
+
+
+
+    #==================== Planar Graph Function: Classify Boundary Case ====================#
+
+    def classify(self):
+        """
+        Planar Graph Function: Classify Boundary Case
+            Returns the boundary case of the graph: 'Single' (one closed boundary), 'Separate' (disjoint closed boundaries), 'Adjacent' (boundaries sharing lines), 'Not a Part' (a boundary inside another), or None if no closed boundary exists.
+        """
+        bounded = self.boundedFaces()
+        if len(bounded) == 0:
+            return None
+        if len(self.containment()) > 0:
+            return "Not a Part"
+        if len(self.sharedEdges()) > 0:
+            return "Adjacent"
+        if self.ncomponents > 1 or len(bounded) > 1:
+            return "Separate"
+        return "Single"
+
+
+
+    #==================== Planar Graph Function: Locate Face ====================#
+
+    def locateFace(self, point):
+        """
+        Planar Graph Function: Locate Face
+            Returns the smallest bounded face that contains the point (x, y), or None if the point is outside all bounded faces. For a parcel with an excepted (not a part) area, a point inside the parcel but outside the excepted area resolves to the parcel's face.
+        """
+        containing = self.containingFaces(point)
+        if len(containing) == 0:
+            return None
+        return min(containing, key=lambda f: self.faceArea[f])
+
+
+
+    #==================== Planar Graph Function: Face Labels ====================#
+
+    def faceLabels(self, labels):
+        """
+        Planar Graph Function: Face Labels
+            Joins labels to the bounded faces that hold them (see locateFace): returns a dictionary of the list of (x, y, value) labels inside each face, keyed by the face. Labels outside all bounded faces are dropped.
+
+        INPUT
+            labels: a list of (x, y, value) labels, e.g. the lot numbers of the annotation of a drawing.
+        """
+        faces = {}
+        for x, y, value in labels:
+            f = self.locateFace((x, y))
+            if f is not None:
+                faces.setdefault(f, []).append((x, y, value))
+        return faces
+
+
+
+    #==================== Planar Graph Function: Face Holes ====================#
+
+    def faceHoles(self):
+        """
+        Planar Graph Function: Face Holes
+            Returns a dictionary of the bounded faces that hold other components (holes), with the list of the hole rings of each. A hole ring is the outer (unbounded side) face cycle of the contained component; a contained component belongs to the smallest face that contains it. Computed once per graph.
+        """
+        if self.holes is None:
+            self.holes = {}
+            innermost = {}
+            for inner, outer, f in self.containment():
+                if inner not in innermost or self.faceArea[f] < self.faceArea[innermost[inner]]:
+                    innermost[inner] = f
+            # The outer face cycle of a component is its face with the smallest (most negative) signed area
+            outerFace = {}
+            for g in range(len(self.faces)):
+                c = int(self.faceComponents[g])
+                if c not in outerFace or self.faceArea[g] < self.faceArea[outerFace[c]]:
+                    outerFace[c] = g
+            for inner, f in sorted(innermost.items()):
+                self.holes.setdefault(f, []).append(outerFace[inner])
+        return {f: list(rings) for f, rings in self.holes.items()}
+
+
+
+    #==================== Planar Graph Function: Contained Faces ====================#
+
+    def containedFaces(self):
+        """
+        Planar Graph Function: Contained Faces
+            Returns the bounded faces of the components that lie inside another component's face (i.e., the excepted, not a part areas).
+        """
+        inner = set(c for c, outer, f in self.containment())
+        return [f for f in self.boundedFaces() if self.faceComponent(f) in inner]
+
+
+
+    #==================== Planar Graph Function: Face Course ====================#
+
+    def faceCourse(self, f, direction="clockwise", starts=None):
+        """
+        Planar Graph Function: Face Course
+            Returns the ordered boundary course of a bounded face, walking the half-edges of its outer ring and of each of its holes.
+
+        INPUT
+            f: the bounded face ID.
+            direction: (optional) the course direction, 'clockwise' or 'counter-clockwise' (default = 'clockwise'). Holes are walked in the same rotational direction.
+            starts: (optional) a list of (x, y) points of beginning (TPOB). A ring that passes through one of them starts there (default = None).
+
+        OUTPUT
+            A list of course entries (in course order), each a dictionary with the line 'oid', the course 'start' and 'end' coordinates, whether the line is 'reversed' relative to its stored geometry, and the 'ring' number (0 for the outer ring, 1, 2, ... for holes).
+        """
+        # Nodes of the points of beginning (resolved once for the same list of points passed to every face's course, e.g., all the TPOB points of a tract)
+        if self.startNodes is None or self.startNodes[0] is not starts:
+            self.startNodes = (starts, set(self.nodes.find(xy) for xy in (starts or [])) - {None})
+        startNodes = self.startNodes[1]
+        clockwise = direction is None or direction == "clockwise"
+
+        course = []
+        rings = [f] + self.faceHoles().get(f, [])
+        for ring, g in enumerate(rings):
+            cycle = list(self.faces[g])
+            # Outer rings are counter-clockwise and hole rings clockwise as walked; reverse them (using the twin half-edges) as needed
+            if (ring == 0) == clockwise:
+                cycle = [h ^ 1 for h in reversed(cycle)]
+            # Start the ring at a point of beginning if it passes through one
+            for i, h in enumerate(cycle):
+                if int(self.origin[h]) in startNodes:
+                    cycle = cycle[i:] + cycle[:i]
+                    break
+            for h in cycle:
+                xy = self.halfEdgeVertices(h)
+                course.append({"oid": self.oids[h // 2], "start": (float(xy[0][0]), float(xy[0][1])), "end": (float(xy[-1][0]), float(xy[-1][1])), "reversed": bool(h % 2), "ring": ring})
+        return course
+
+
+
+
+#============================================================#
+#  LINE JUNCTIONS                                            #
+#============================================================#
+
+
+#==================== Planar Graph Function: Line Junctions ====================#
+
+def lineJunctions(segments, tolerance=2):
+    """
+    Planar Graph Function: Line Junctions
+        Returns the T-junctions of the boundary lines: the endpoints of lines that lie on the interior of another line (within 10^-tolerance feet, away from its endpoints). An endpoint graph does not node these points, so the lines holding them must be split there (e.g., arcpy.SplitLineAtPoint) before the graph is built. Only the endpoints within a line's bounding box (found through the endpoints sorted by x) are tested against its vertices.
+
+    INPUT
+        segments: a dictionary of the boundary line segments, keyed by the line OID, holding the (n, 2) or (n, 3) vertex array of each segment (start to end).
+        tolerance: (optional) the decimal accuracy used to match segment endpoints (default = 2).
+
+    OUTPUT
+        A list of (oid, x, y, other) tuples: the OID of the line holding the junction, the junction point, and the OID of the line ending there (one entry per line and junction point).
+    """
+    eps = 10 ** -tolerance
+    oids = list(segments.keys())
+    vertices = [numpy.asarray(segments[oid], dtype=float)[:, :2] for oid in oids]
+    if len(vertices) == 0:
+        return []
+    ends = numpy.array([[xy[0], xy[-1]] for xy in vertices]).reshape(-1, 2)
+    owner = numpy.repeat(numpy.arange(len(oids)), 2)
+
+    # Endpoints sorted by x: the endpoints within a line's x range are found by binary search
+    order = numpy.argsort(ends[:, 0], kind="stable")
+    sortedX = ends[order, 0]
+
+    junctions = []
+    for i, xy in enumerate(vertices):
+        low, high = xy.min(axis=0) - eps, xy.max(axis=0) + eps
+        near = order[numpy.searchsorted(sortedX, low[0], "left"):numpy.searchsorted(sortedX, high[0], "right")]
+        keys = set()
+        for k in sorted(near[(ends[near, 1] >= low[1]) & (ends[near, 1] <= high[1]) & (owner[near] != i)]):
+            point = ends[k]
+            key = amcgeom.coordinateKey(point[0], point[1], tolerance)
+            if key in keys or any(amcgeom.keysMatch(key, amcgeom.coordinateKey(end[0], end[1], tolerance)) for end in (xy[0], xy[-1])):
+                continue
+            # Distance from the point to the nearest piece of the line
+            a, d = xy[:-1], numpy.diff(xy, axis=0)
+            lengths = (d * d).sum(axis=1)
+            t = numpy.clip(((point - a) * d).sum(axis=1) / numpy.where(lengths > 0, lengths, 1.0), 0.0, 1.0)
+            if numpy.hypot(*(a + t[:, None] * d - point).T).min() < eps:
+                keys.add(key)
+                junctions.append((oids[i], float(point[0]), float(point[1]), oids[int(owner[k])]))
+    return junctions
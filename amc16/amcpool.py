@@ -0,0 +1,163 @@
+##############################################################
+# PYTHON AUTOMATED MAP CHECKING ANALYSIS                     #
+# AMC Parcel Pool (Parallel Per-Parcel Processing)           #
+# Version: 1.6                                               #
+# Author: Dr. Kostas Alexandridis, GISP                      #
+# Organization: OC Survey Geospatial Services                #
+# Date: August 2020                                          #
+##############################################################
+
+
+# Importing the required libraries into the project
+import os, sys, multiprocessing, concurrent.futures, numpy
+import amcgeom, amcdesc, amcresult
+
+try:
+    from multiprocessing import shared_memory
+except ImportError: # Python < 3.8 (e.g., ArcGIS Pro 2.x): the segment arrays are passed to the workers by value
+    shared_memory = None
+
+
+
+
+#============================================================#
+#  SHARED SEGMENT ARRAYS                                     #
+#============================================================#
+
+
+#==================== AMC Pool Function: Pack Segments ====================#
+
+def packSegments(segments):
+    """
+    AMC Pool Function: Pack Segments
+        Packs the vertex arrays of the boundary lines into a single contiguous (n, 2) array of x, y coordinates, with a layout dictionary holding the (first, last) row of each line's vertices, keyed by the line OID.
+    """
+    layout = {}
+    first = 0
+    for oid, vertices in segments.items():
+        layout[oid] = (first, first + len(vertices))
+        first += len(vertices)
+    packed = numpy.empty((first, 2), dtype=float)
+    for oid, vertices in segments.items():
+        packed[layout[oid][0]:layout[oid][1]] = numpy.asarray(vertices, dtype=float)[:, :2]
+    return packed, layout
+
+
+
+#==================== AMC Pool Function: Parcel Course ====================#
+
+def parcelCourse(source, layout, poid, course, interiors, options):
+    """
+    AMC Pool Function: Parcel Course
+        Processes a parcel's course (the worker task of processCourses): computes the coordinate geometry of its lines in boundary records, matches the start point of each line with the TPOB points, renders the line and curve descriptions and annotations (amcdesc.describeLines), and checks the traverse closure of the course (amcdesc.courseClosure).
+
+    INPUT
+        source: the packed segment array, or a (name, shape) tuple of the shared memory block that holds it.
+        layout: the (first, last) rows of the vertices of the parcel's lines in the packed array, keyed by the line OID.
+        poid: the parcel ID (POID).
+        course: a list of (coid, oid, start, ring) tuples of the parcel's course, where start is the (x, y) start point of the line along the course and ring is its ring number (0 for the outer boundary).
+        interiors: the interior points of the true circular arcs of the parcel's lines, keyed by the line OID.
+        options: a dictionary of the 'scalefactor', 'tolerance', 'angularTolerance', minimum 'precision', 'pobstring' (the TPOB string) and 'controls' flag of the descriptions (see amcdesc.describeLines), and the 'tpobIndex' of the TPOB points (amcgeom.coordinateIndex, or None when the courses do not begin at TPOB points).
+
+    OUTPUT
+        A dictionary of the parcel's line 'records' (amcresult.boundaryRecord, keyed by the line OID), whether each line runs opposite to its stored geometry ('reversed', keyed by the line OID), the 'closure' of its course, and the name of its point of beginning ('pobstring', see amcdesc.pointOfBeginning).
+
+    NOTES
+        The course always begins at its first line (coid 1). A course whose first line does not start at a TPOB point (e.g., an adjacent parcel whose boundary does not pass through the TPOB) begins at a 'POINT OF BEGINNING'.
+    """
+    block = None
+    if isinstance(source, tuple):
+        block = shared_memory.SharedMemory(name=source[0])
+        packed = numpy.ndarray(source[1], dtype=float, buffer=block.buf)
+    else:
+        packed = source
+
+    records, reversed = {}, {}
+    for coid, oid, start, ring in course:
+        first, last = layout[oid]
+        # Orient the vertices along the course (a line shared by two parcels runs in opposite directions in each)
+        reverse = bool(numpy.hypot(*(packed[first] - start)) > numpy.hypot(*(packed[last - 1] - start)))
+        record = records[oid] = amcresult.boundaryRecord(coid=coid, poid=poid)
+        record.update(amcgeom.courseGeometry(packed[first:last][::-1] if reverse else packed[first:last], interiors.get(oid)))
+        reversed[oid] = reverse
+
+        # The course begins at its point of beginning (a TPOB point, when its first line starts at one); a TPOB met further along the course belongs to another parcel
+        record["tpob"] = coid == 1
+        if options["tpobIndex"] is not None:
+            record["tpobid"] = options["tpobIndex"].find((record["startx"], record["starty"]))
+
+    # Release the view of the shared memory block before closing it
+    del packed
+    if block is not None:
+        block.close()
+
+    # Descriptions and closure of the course, in ring order (the parcel's boundary, followed by any excepted areas)
+    ordered = sorted(course, key=lambda task: (task[3], task[0]))
+    lines, rings = [records[task[1]] for task in ordered], [task[3] for task in ordered]
+    pobstring = amcdesc.pointOfBeginning(lines[0], options["pobstring"])
+    amcdesc.describeLines(lines, rings, amcdesc.courseRenderer(options["scalefactor"], options["tolerance"]), pobstring, options["controls"], options["angularTolerance"])
+    closure = amcdesc.courseClosure(lines, rings, options["tolerance"], options["precision"])
+
+    return {"records": records, "reversed": reversed, "closure": closure, "pobstring": pobstring}
+
+
+
+
+#============================================================#
+#  PARCEL PROCESS POOL                                       #
+#============================================================#
+
+
+#==================== AMC Pool Function: Process Courses ====================#
+
+def processCourses(segments, interiors, courses, options, workers=1):
+    """
+    AMC Pool Function: Process Courses
+        Processes the courses of all parcels (coordinate geometry, descriptions and closure, see parcelCourse), one parcel per task across a process pool. The segment vertex arrays are packed once into a shared memory block that the workers read in place (Python 3.8 or later; otherwise each task carries the packed vertices of its own lines). Each task carries only the layout rows and curve interior points of its parcel's lines.
+
+    INPUT
+        segments: the vertex arrays of the boundary lines, keyed by the line OID.
+        interiors: the interior points of the true circular arcs, keyed by the line OID.
+        courses: the parcels' courses (course[poid][coid] entries holding 'oid', 'start' and optionally 'ring').
+        options: the description and closure options (see parcelCourse).
+        workers: (optional) the number of worker processes; 1 processes the parcels in this process and 0 uses all the processor cores (default = 1).
+
+    OUTPUT
+        A dictionary keyed by the parcel ID (POID) of the parcelCourse results of each parcel.
+
+    NOTES
+        On Windows the worker processes re-import the calling script, so scripts using more than one worker must guard their entry point with `if __name__ == "__main__":`.
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = {poid: [(coid, entry["oid"], entry["start"], entry.get("ring", 0)) for coid, entry in courses[poid].items()] for poid in courses}
+    parcelInteriors = {poid: {oid: interiors[oid] for coid, oid, start, ring in tasks[poid] if oid in interiors} for poid in tasks}
+
+    # Serial processing: a single worker or a single parcel
+    if workers <= 1 or len(tasks) <= 1:
+        packed, layout = packSegments(segments)
+        return {poid: parcelCourse(packed, layout, poid, tasks[poid], parcelInteriors[poid], options) for poid in tasks}
+
+    # Within ArcGIS Pro the interpreter is the application itself; the workers need the environment's python executable
+    if os.name == "nt" and not os.path.basename(sys.executable).lower().startswith("python"):
+        multiprocessing.set_executable(os.path.join(sys.exec_prefix, "python.exe"))
+
+    # The packed array in shared memory, and each parcel's slice of the layout; without shared memory, each parcel's own lines are packed
+    block = None
+    if shared_memory is not None:
+        packed, layout = packSegments(segments)
+        block = shared_memory.SharedMemory(create=True, size=max(packed.nbytes, 1))
+        numpy.ndarray(packed.shape, dtype=float, buffer=block.buf)[:] = packed
+        sources = {poid: ((block.name, packed.shape), {oid: layout[oid] for coid, oid, start, ring in tasks[poid]}) for poid in tasks}
+    else:
+        sources = {poid: packSegments({oid: segments[oid] for coid, oid, start, ring in tasks[poid]}) for poid in tasks}
+
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            futures = {poid: pool.submit(parcelCourse, sources[poid][0], sources[poid][1], poid, tasks[poid], parcelInteriors[poid], options) for poid in tasks}
+            results = {poid: futures[poid].result() for poid in tasks}
+    finally:
+        if block is not None:
+            block.close()
+            block.unlink()
+
+    return results
@@ -0,0 +1,428 @@
+##############################################################
+# PYTHON AUTOMATED MAP CHECKING ANALYSIS                     #
+# AMC Execution Profile (Stage Timing and Counters)          #
+# Version: 1.6                                               #
+# Author: Dr. Kostas Alexandridis, GISP                      #
+# Organization: OC Survey Geospatial Services                #
+# Date: August 2020                                          #
+##############################################################
+
+
+# Importing the required libraries into the project
+import os, re, sys, time, random, marshal, cProfile, threading, functools, collections
+
+
+
+
+#============================================================#
+#  STAGE PROFILER                                            #
+#============================================================#
+
+# Counters of each stage: arcpy cursors opened, rows read or inserted through them, geoprocessing tools called, and server geodatabase (SDE) queries
+COUNTERS = ["Cursors", "Rows", "Tools", "Queries"]
+
+# The profiler of the AMC run in progress (the arcpy counters add to its innermost stage)
+active = None
+
+
+class stageProfiler(object):
+    """
+    Class Stage Profiler: Records the duration (perf_counter) and the arcpy counters of each stage (class method) of an AMC run. Stages nest: the duration of a stage includes its inner stages ('Seconds'), its own share excludes them ('Self'), and the counters go to the innermost stage running.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stages = {}
+        self.stack = [] # [stage name, start time, seconds of inner stages]
+        self.serverLayers = set()
+        self.capture = None # Optional profiler capture of the main stages (see stageCapture)
+
+    def stage(self, name):
+        """Returns the timing and counters of a stage"""
+        if name not in self.stages:
+            self.stages[name] = dict({"Calls": 0, "Seconds": 0.0, "Self": 0.0}, **{counter: 0 for counter in COUNTERS})
+        return self.stages[name]
+
+    def enter(self, name):
+        """Starts a (nested) stage"""
+        global active
+        active = self
+        self.stack.append([name, time.perf_counter(), 0.0])
+
+    def exit(self):
+        """Ends the innermost stage"""
+        name, start, inner = self.stack.pop()
+        elapsed = time.perf_counter() - start
+        stage = self.stage(name)
+        stage["Calls"] += 1
+        stage["Seconds"] += elapsed
+        stage["Self"] += elapsed - inner
+        if self.stack:
+            self.stack[-1][2] += elapsed
+
+    def count(self, counter, n=1):
+        """Adds to a counter of the innermost stage running"""
+        self.stage(self.stack[-1][0] if self.stack else "(outside)")[counter] += n
+
+    def summary(self):
+        """Returns the profile of the run: the total duration, the totals of the counters, and the timing and counters of each stage (in order of duration). Stages still running are included with their duration so far ('Running')"""
+        now = time.perf_counter()
+        stages = {name: dict(stage) for name, stage in self.stages.items()}
+        inner = 0.0
+        for name, start, innerSeconds in reversed(self.stack):
+            stage = stages.setdefault(name, dict(self.stage(name)))
+            stage["Seconds"] += now - start
+            stage["Self"] += now - start - innerSeconds - inner
+            stage["Running"] = True
+            inner = now - start
+
+        for stage in stages.values():
+            stage["Seconds"], stage["Self"] = round(stage["Seconds"], 6), round(stage["Self"], 6)
+        summary = {"Seconds": round(now - self.start, 6),
+                   "Totals": {counter: sum(stage[counter] for stage in stages.values()) for counter in COUNTERS},
+                   "Stages": dict(sorted(stages.items(), key=lambda item: -item[1]["Seconds"]))}
+        if self.capture is not None:
+            summary["Capture"] = {"Mode": self.capture.mode, "Files": [os.path.basename(path) for path in self.capture.files]}
+        return summary
+
+    def table(self, limit=None):
+        """Returns the report lines of the profile (stages in order of duration)"""
+        summary = self.summary()
+        lines = ["\t{:<36s}{:>7s}{:>11s}{:>11s}{:>9s}{:>10s}{:>7s}{:>9s}".format("Stage", "Calls", "Seconds", "Self", "Cursors", "Rows", "Tools", "Queries")]
+        for name, stage in list(summary["Stages"].items())[:limit]:
+            lines.append("\t{:<36s}{:>7d}{:>11.3f}{:>11.3f}{:>9d}{:>10d}{:>7d}{:>9d}".format(name[:35], stage["Calls"], stage["Seconds"], stage["Self"], stage["Cursors"], stage["Rows"], stage["Tools"], stage["Queries"]))
+        lines.append("\tTotal: {:.3f} seconds; {Cursors} cursors, {Rows} rows, {Tools} geoprocessing tools, {Queries} server queries".format(summary["Seconds"], **summary["Totals"]))
+        return lines
+
+
+
+#==================== AMC Profile Function: Profiled ====================#
+
+def profiled(method):
+    """
+    AMC Profile Function: Profiled
+        Wraps a class method as a stage of the instance's profiler (self.profiler); methods of instances without a profiler run unchanged.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        profiler = getattr(self, "profiler", None)
+        if profiler is None:
+            return method(self, *args, **kwargs)
+        profiler.enter(method.__name__)
+        try:
+            if profiler.capture is not None and method.__name__ in profiler.capture.stages:
+                return profiler.capture.run(method.__name__, method, self, *args, **kwargs)
+            return method(self, *args, **kwargs)
+        finally:
+            profiler.exit()
+    return wrapper
+
+
+
+#==================== AMC Profile Function: Profile Class ====================#
+
+def profileClass(cls):
+    """
+    AMC Profile Function: Profile Class
+        Class decorator that times every method of a class as a stage (see profiled). The instance's profiler (self.profiler) is created before the class initialization runs, which is itself timed as the '__init__' stage.
+    """
+    for name, value in list(vars(cls).items()):
+        if callable(value) and not name.startswith("__"):
+            setattr(cls, name, profiled(value))
+
+    initialize = profiled(cls.__init__)
+
+    @functools.wraps(cls.__init__)
+    def init(self, *args, **kwargs):
+        self.profiler = stageProfiler()
+        initialize(self, *args, **kwargs)
+
+    cls.__init__ = init
+    return cls
+
+
+
+
+#============================================================#
+#  PROFILER CAPTURE                                          #
+#============================================================#
+
+# Profiler capture modes: statistical (stack sampling from a background thread, low overhead) or deterministic (cProfile, every call)
+CAPTURE_MODES = ["statistical", "deterministic"]
+
+# The main stages of an AMC run captured by default
+CAPTURE_STAGES = ["baseChecks", "boundaryProcessing", "createLegalDescription", "boundaryToTable", "finalizeReport"]
+
+
+#==================== AMC Profile Function: Frame Label ====================#
+
+def frameLabel(key):
+    """
+    AMC Profile Function: Frame Label
+        Returns the collapsed-stack label of a function (filename, first line, name): 'name (file.py:line)'.
+    """
+    return "{} ({}:{})".format(key[2], os.path.basename(key[0]), key[1])
+
+
+
+class stackSampler(object):
+    """
+    Class Stack Sampler: Samples the call stack of a thread at a fixed interval from a background thread, counting the distinct stacks from a root function down. Each sample is weighted by the time since the previous sample (the interval is a lower bound: the sampling thread waits for the interpreter lock).
+
+    INPUT
+        root: the code object of the root function (stack frames above it are dropped).
+        interval: (optional) the sampling interval in seconds (default = 0.005).
+    """
+
+    def __init__(self, root, interval=0.005):
+        self.root = root
+        self.interval = interval
+        self.samples = collections.Counter()
+        self.times = collections.Counter()
+        self.stopped = threading.Event()
+        self.ident = threading.get_ident()
+        self.thread = threading.Thread(target=self.sample, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stopped.set()
+        self.thread.join()
+        return False
+
+    def sample(self):
+        last = time.perf_counter()
+        while not self.stopped.wait(self.interval):
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+            frame = sys._current_frames().get(self.ident)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                if code is self.root:
+                    self.samples[tuple(reversed(stack))] += 1
+                    self.times[tuple(reversed(stack))] += elapsed
+                    break
+                frame = frame.f_back
+
+    def stats(self):
+        """Returns the samples as profile statistics (the pstats data layout): the times are the sampled times, and the call counts are the sample counts"""
+        stats = {}
+        for stack, n in self.samples.items():
+            t = self.times[stack]
+            for i, key in enumerate(stack):
+                entry = stats.setdefault(key, [0, 0, 0.0, 0.0, {}])
+                leaf = i == len(stack) - 1
+                if key not in stack[:i]:
+                    entry[0] += n
+                    entry[1] += n
+                    entry[3] += t
+                if leaf:
+                    entry[2] += t
+                if i > 0:
+                    caller = entry[4].setdefault(stack[i - 1], [0, 0, 0.0, 0.0])
+                    caller[0] += n
+                    caller[1] += n
+                    caller[2] += t if leaf else 0.0
+                    caller[3] += t
+        return {key: (cc, nc, tt, ct, {caller: tuple(values) for caller, values in callers.items()}) for key, (cc, nc, tt, ct, callers) in stats.items()}
+
+
+
+class stageCapture(object):
+    """
+    Class Stage Capture: Captures a profile of each main stage of an AMC run, and saves a pstats file (Profile_<stage>.pstats, see pstats.Stats) and a flamegraph-ready collapsed-stack file (Profile_<stage>.collapsed, e.g., for flamegraph.pl or speedscope) in the output directory of the run (self.outpath, next to ExecutionReport.txt).
+
+    INPUT
+        mode: (optional) 'statistical' samples the call stack at an interval (low overhead; collapsed stacks weighted by sample counts), 'deterministic' profiles every call with cProfile (collapsed caller-callee pairs weighted by microseconds) (default = 'statistical').
+        interval: (optional) the sampling interval of the statistical mode in seconds (default = 0.005).
+        stages: (optional) the names of the stages (class methods) to capture (default = CAPTURE_STAGES).
+    """
+
+    def __init__(self, mode="statistical", interval=0.005, stages=None):
+        if mode not in CAPTURE_MODES:
+            raise ValueError("Unknown profiler capture mode '{}' (expected one of: {})".format(mode, ", ".join(CAPTURE_MODES)))
+        self.mode = mode
+        self.interval = interval
+        self.stages = CAPTURE_STAGES if stages is None else stages
+        self.files = []
+
+    def run(self, name, method, instance, *args, **kwargs):
+        """Runs a stage (class method) under the profiler, saves its profile files (also when the stage fails), and returns the stage's result"""
+        if self.mode == "deterministic":
+            profile = cProfile.Profile()
+            try:
+                return profile.runcall(method, instance, *args, **kwargs)
+            finally:
+                profile.create_stats()
+                self.save(name, getattr(instance, "outpath", os.getcwd()), profile.stats)
+
+        sampler = stackSampler(method.__code__, self.interval)
+        try:
+            with sampler:
+                return method(instance, *args, **kwargs)
+        finally:
+            self.save(name, getattr(instance, "outpath", os.getcwd()), sampler.stats(), sampler.samples)
+
+    def save(self, name, directory, stats, samples=None):
+        """Writes the pstats and collapsed-stack files of a stage: the full sampled stacks weighted by sample counts (statistical), or the caller-callee pairs weighted by their own time in microseconds (deterministic)"""
+        base = os.path.join(directory, "Profile_{}".format(name))
+        with open(base + ".pstats", "wb") as file:
+            marshal.dump(stats, file)
+
+        lines = collections.Counter()
+        if samples is not None:
+            for stack, n in samples.items():
+                lines[";".join(frameLabel(key) for key in stack)] += n
+        else:
+            for key, (cc, nc, tt, ct, callers) in stats.items():
+                for caller, values in (callers.items() if callers else [(None, (cc, nc, tt, ct))]):
+                    lines[";".join(frameLabel(k) for k in (caller, key) if k is not None)] += int(round(values[2] * 1e6))
+
+        with open(base + ".collapsed", "w") as file:
+            for stack, weight in sorted(lines.items()):
+                if weight > 0:
+                    file.write("{};{} {}\n".format(name, stack, weight))
+        self.files.extend([base + ".pstats", base + ".collapsed"])
+
+
+
+
+#==================== AMC Profile Function: Capture For ====================#
+
+def captureFor(mode=None, fraction=1.0, interval=0.005):
+    """
+    AMC Profile Function: Capture For
+        Returns the stage capture of a run in the given mode (see stageCapture), drawn for a fraction of the runs (e.g., 0.05 profiles one run in twenty), or None when the run is not profiled.
+    """
+    if not mode or random.random() >= fraction:
+        return None
+    return stageCapture(mode, interval)
+
+
+
+
+#============================================================#
+#  ARCPY COUNTERS                                            #
+#============================================================#
+
+# Geoprocessing tools (e.g., GetCount_management, Select_analysis, CADToGeodatabase_conversion)
+TOOL = re.compile(r"^[A-Z]\w*_[a-z]+$")
+
+# Toolbox modules of arcpy, whose functions are geoprocessing tools (e.g., arcpy.management.GetCount, arcpy.analysis.Select)
+TOOLBOXES = ["management", "analysis", "conversion", "cartography", "edit", "stats", "ddd", "sa", "na", "lr", "server", "geocoding", "intelligence"]
+
+# Cursor classes of the arcpy data access module
+CURSORS = ["SearchCursor", "UpdateCursor", "InsertCursor"]
+
+
+#==================== AMC Profile Function: Server Path ====================#
+
+def serverPath(value):
+    """
+    AMC Profile Function: Server Path
+        Returns whether a dataset (path or layer name) is in a server geodatabase (SDE connection), or a layer made from one.
+    """
+    return isinstance(value, str) and (".sde" in value.lower() or (active is not None and value in active.serverLayers))
+
+
+
+class cursorCounter(object):
+    """
+    Class Cursor Counter: Forwards to an arcpy data access cursor, counting the rows read (or inserted) into the active profiler.
+    """
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def __enter__(self):
+        self.cursor.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self.cursor.__exit__(*exc)
+
+    def __iter__(self):
+        rows = 0
+        try:
+            for row in self.cursor:
+                rows += 1
+                yield row
+        finally:
+            if active is not None:
+                active.count("Rows", rows)
+
+    def __next__(self):
+        row = next(self.cursor)
+        if active is not None:
+            active.count("Rows")
+        return row
+
+    next = __next__
+
+    def insertRow(self, row):
+        if active is not None:
+            active.count("Rows")
+        return self.cursor.insertRow(row)
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+
+
+class arcpyCounter(object):
+    """
+    Class ArcPy Counter: Forwards to the arcpy module (or its data access module, arcpy.da, or one of its toolbox modules, e.g., arcpy.management), counting the cursors opened, the geoprocessing tools called (arcpy.Tool_toolbox, or arcpy.toolbox.Tool) and the server geodatabase queries (cursors and tools on SDE datasets) into the active profiler (see stageProfiler).
+    """
+
+    def __init__(self, module, toolbox=False):
+        object.__setattr__(self, "module", module)
+        object.__setattr__(self, "toolbox", toolbox)
+        object.__setattr__(self, "wrapped", {})
+
+    def __getattr__(self, name):
+        if name not in self.wrapped:
+            value = getattr(self.module, name)
+            if name == "da":
+                value = arcpyCounter(value)
+            elif name in TOOLBOXES and not self.toolbox:
+                value = arcpyCounter(value, toolbox=True)
+            elif name in CURSORS:
+                value = self.cursor(value)
+            elif callable(value) and not isinstance(value, type) and (TOOL.match(name) or (self.toolbox and not name.startswith("_"))):
+                value = self.tool(value)
+            else:
+                return value
+            self.wrapped[name] = value
+        return self.wrapped[name]
+
+    def __setattr__(self, name, value):
+        setattr(self.module, name, value)
+
+    @staticmethod
+    def cursor(function):
+        @functools.wraps(function)
+        def opener(dataset, *args, **kwargs):
+            if active is not None:
+                active.count("Cursors")
+                if serverPath(dataset):
+                    active.count("Queries")
+            return cursorCounter(function(dataset, *args, **kwargs))
+        return opener
+
+    @staticmethod
+    def tool(function):
+        @functools.wraps(function)
+        def caller(*args, **kwargs):
+            if active is not None:
+                active.count("Tools")
+                # A tool reading a server dataset is a server query, and its output (e.g., a feature layer) is a server layer
+                if args and serverPath(args[0]):
+                    active.count("Queries")
+                    if len(args) > 1 and isinstance(args[1], str):
+                        active.serverLayers.add(args[1])
+            return function(*args, **kwargs)
+        return caller
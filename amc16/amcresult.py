@@ -0,0 +1,448 @@
+##############################################################
+# PYTHON AUTOMATED MAP CHECKING ANALYSIS                     #
+# AMC Result Model (Typed Response Records)                  #
+# Version: 1.6                                               #
+# Author: Dr. Kostas Alexandridis, GISP                      #
+# Organization: OC Survey Geospatial Services                #
+# Date: August 2020                                          #
+##############################################################
+
+
+# Importing the required libraries into the project
+import os, json, math, zipfile, numpy
+
+# Optional encoders of the JSON data string (see responseEncoder)
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+
+
+#============================================================#
+#  BOUNDARY RECORD FIELDS                                    #
+#============================================================#
+
+# Fields of a boundary line record (the JSON data string schema of jsonResponse['Boundaries'][poid][oid]), in order
+BOUNDARY_FIELDS = ["coid", "poid", "tpob", "tpobid", "shapetype", "wkt", "nwkt", "wktpoints", "startx", "starty", "midx", "midy", "endx", "endy", "midchordx", "midchordy", "centerx", "centery", "bearing", "distance", "height", "arclength", "radius", "midbearing", "delta", "radbearing_cs", "radbearing_sc", "radbearing_ce", "radbearing_st", "radtangent", "desc_grid", "desc_ground", "ann_grid", "ann_ground", "annweb_grid", "annweb_ground"]
+
+# Coordinate geometry fields, held in a single float array per record (NaN for null)
+NUMERIC_FIELDS = ["startx", "starty", "midx", "midy", "endx", "endy", "midchordx", "midchordy", "centerx", "centery", "bearing", "distance", "height", "arclength", "radius", "midbearing", "delta", "radbearing_cs", "radbearing_sc", "radbearing_ce", "radbearing_st"]
+NUMERIC_INDEX = {field: i for i, field in enumerate(NUMERIC_FIELDS)}
+
+# Coordinate fields, rounded when the response is written with fewer digits (see responseEncoder)
+COORDINATE_FIELDS = ["startx", "starty", "midx", "midy", "endx", "endy", "midchordx", "midchordy", "centerx", "centery"]
+COORDINATE_INDEX = numpy.array([NUMERIC_INDEX[field] for field in COORDINATE_FIELDS])
+
+# Identifier, text and vertex fields, held in slots (None for null)
+SLOT_FIELDS = [field for field in BOUNDARY_FIELDS if field not in NUMERIC_INDEX]
+
+
+
+
+#============================================================#
+#  CLASS: BOUNDARY RECORD                                    #
+#============================================================#
+
+
+class boundaryRecord(object):
+    """
+    Class Boundary Record: A compact boundary line record. The coordinate geometry values are held in one float array, the other fields in slots, and the vertex coordinates ('wktpoints') as a NumPy array. Records are read and written like the dictionaries they replace (record['field']), and unset fields are null (None) rather than empty dictionaries.
+
+    INPUT
+        values: (optional) the initial field values, as keyword arguments.
+    """
+    __slots__ = ["_numbers"] + SLOT_FIELDS
+
+    def __init__(self, **values):
+        self._numbers = numpy.full(len(NUMERIC_FIELDS), numpy.nan)
+        for field in SLOT_FIELDS:
+            object.__setattr__(self, field, None)
+        self.update(values)
+
+    def __getitem__(self, field):
+        if field in NUMERIC_INDEX:
+            value = self._numbers[NUMERIC_INDEX[field]]
+            return None if math.isnan(value) else float(value)
+        if field in SLOT_FIELDS:
+            return getattr(self, field)
+        raise KeyError(field)
+
+    def __setitem__(self, field, value):
+        if field in NUMERIC_INDEX:
+            self._numbers[NUMERIC_INDEX[field]] = numpy.nan if value is None else value
+        elif field in SLOT_FIELDS:
+            setattr(self, field, value)
+        else:
+            raise KeyError(field)
+
+    def __contains__(self, field):
+        return field in NUMERIC_INDEX or field in SLOT_FIELDS
+
+    def __iter__(self):
+        return iter(BOUNDARY_FIELDS)
+
+    def __len__(self):
+        return len(BOUNDARY_FIELDS)
+
+    def __repr__(self):
+        return "boundaryRecord(poid={}, coid={}, shapetype={})".format(self.poid, self.coid, self.shapetype)
+
+    def get(self, field, default=None):
+        """Returns the value of a field, or the default for an unknown field"""
+        return self[field] if field in self else default
+
+    def keys(self):
+        """Returns the field names (in schema order)"""
+        return list(BOUNDARY_FIELDS)
+
+    def items(self):
+        """Returns the (field, value) pairs (in schema order)"""
+        return [(field, self[field]) for field in BOUNDARY_FIELDS]
+
+    def update(self, values):
+        """Sets the values of several fields from a dictionary"""
+        for field, value in values.items():
+            self[field] = value
+
+    def toDict(self, digits=None):
+        """Returns the record as a JSON-ready dictionary (vertex arrays as lists, unset fields as None), with the coordinates and vertices rounded to the given number of decimals (default = None, full precision)"""
+        numbers = self._numbers
+        if digits is not None:
+            numbers = numbers.copy()
+            numbers[COORDINATE_INDEX] = numpy.round(numbers[COORDINATE_INDEX], digits)
+        record = {}
+        for field in BOUNDARY_FIELDS:
+            if field in NUMERIC_INDEX:
+                value = numbers[NUMERIC_INDEX[field]]
+                record[field] = None if math.isnan(value) else float(value)
+            else:
+                record[field] = getattr(self, field)
+        if isinstance(record["wktpoints"], numpy.ndarray):
+            record["wktpoints"] = (record["wktpoints"] if digits is None else numpy.round(record["wktpoints"], digits)).tolist()
+        return record
+
+
+
+
+#============================================================#
+#  CLASS: AMC RESULT                                         #
+#============================================================#
+
+
+class amcResult(object):
+    """
+    Class AMC Result: The typed container of the JSON data string sections of an AMC run (Execution, Checks, Boundaries, Controls, LegalDescription and the optional Lots and Adjustment). The sections are held by reference and serialized to the jsonResponse schema only when needed (see toDict, encode).
+    """
+    __slots__ = ["Execution", "Checks", "Boundaries", "Controls", "LegalDescription", "Lots", "Adjustment"]
+
+    def __init__(self, execution, checks, boundaries, controls, legal, lots=None, adjustment=None):
+        self.Execution = execution
+        self.Checks = checks
+        self.Boundaries = boundaries
+        self.Controls = controls
+        self.LegalDescription = legal
+        self.Lots = lots or None
+        self.Adjustment = adjustment or None
+
+    def sections(self):
+        """Returns the (name, section) pairs of the response, omitting the optional sections that are empty"""
+        return [(name, getattr(self, name)) for name in self.__slots__ if getattr(self, name) is not None]
+
+    def toDict(self):
+        """Returns the response as a dictionary of its sections (the boundary records stay typed; see encode)"""
+        return dict(self.sections())
+
+
+
+
+#============================================================#
+#  JSON SERIALIZATION                                        #
+#============================================================#
+
+
+#==================== AMC Result Function: Encode ====================#
+
+def encode(value):
+    """
+    AMC Result Function: Encode
+        JSON encoder hook (json.dump(..., default=encode)) that serializes the typed records, NumPy arrays and NumPy scalars of a response on demand.
+    """
+    if isinstance(value, boundaryRecord):
+        return value.toDict()
+    if isinstance(value, amcResult):
+        return value.toDict()
+    if isinstance(value, numpy.ndarray):
+        return value.tolist()
+    if isinstance(value, numpy.generic):
+        return value.item()
+    raise TypeError("Object of type {} is not JSON serializable".format(type(value).__name__))
+
+
+
+
+#============================================================#
+#  CLASS: RESPONSE ENCODER                                   #
+#============================================================#
+
+# Response encoders: the standard library JSON encoder, the (optional) orjson fast JSON encoder, and the (optional) MessagePack binary encoder
+ENCODERS = ["json", "orjson", "msgpack"]
+EXTENSIONS = {"json": ".json", "orjson": ".json", "msgpack": ".msgpack"}
+
+
+#==================== AMC Result Function: String Keys ====================#
+
+def stringKeys(value):
+    """
+    AMC Result Function: String Keys
+        Returns a decoded value with the keys of all its dictionaries as strings (as in a JSON data string); MessagePack keeps the integer keys (e.g., poid, oid) of the response.
+    """
+    if isinstance(value, dict):
+        return {str(key): stringKeys(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [stringKeys(item) for item in value]
+    return value
+
+
+
+class responseEncoder(object):
+    """
+    Class Response Encoder: Encodes and decodes the sections of a response with a pluggable backend. Responses are written in chunks (see write), so that the complete encoded response is never held in memory.
+
+    INPUT
+        name: (optional) the encoder: 'json' (standard library), 'orjson' (fast JSON, requires orjson) or 'msgpack' (compact MessagePack binary, requires msgpack) (default = 'json').
+        digits: (optional) the number of decimals of the boundary coordinates and vertices (default = None, full precision).
+    """
+
+    def __init__(self, name="json", digits=None):
+        if name not in ENCODERS:
+            raise ValueError("Unknown response encoder '{}' (expected one of: {})".format(name, ", ".join(ENCODERS)))
+        if (name == "orjson" and orjson is None) or (name == "msgpack" and msgpack is None):
+            raise ImportError("The '{0}' response encoder requires the {0} package".format(name))
+        self.name = name
+        self.digits = digits
+        self.binary = name == "msgpack"
+        self.extension = EXTENSIONS[name]
+
+    def default(self, value):
+        """Encoder hook for the typed records (rounded to the encoder's digits), NumPy arrays and NumPy scalars"""
+        if isinstance(value, boundaryRecord):
+            return value.toDict(self.digits)
+        return encode(value)
+
+    def dumps(self, value):
+        """Returns a value encoded as bytes"""
+        if self.name == "json":
+            return json.dumps(value, default=self.default).encode("utf-8")
+        if self.name == "orjson":
+            return orjson.dumps(value, default=self.default, option=orjson.OPT_NON_STR_KEYS)
+        return msgpack.packb(value, default=self.default, use_bin_type=True)
+
+    def loads(self, data):
+        """Returns a value decoded from bytes (dictionary keys as strings, as in a JSON data string)"""
+        if self.name == "json":
+            return json.loads(data.decode("utf-8"))
+        if self.name == "orjson":
+            return orjson.loads(data)
+        return stringKeys(msgpack.unpackb(data, raw=False, strict_map_key=False))
+
+    def write(self, file, value, depth=3):
+        """Writes a value to a binary file: dictionaries are written entry by entry down to the given depth (e.g., section, parcel, boundary record), and only the deeper values are encoded whole"""
+        if isinstance(value, amcResult):
+            value = value.toDict()
+        if depth <= 0 or not isinstance(value, dict):
+            file.write(self.dumps(value))
+            return
+        if self.binary:
+            file.write(msgpack.Packer().pack_map_header(len(value)))
+        else:
+            file.write(b"{")
+        for i, (key, item) in enumerate(value.items()):
+            if self.binary:
+                file.write(self.dumps(str(key)))
+            else:
+                file.write("{}{}: ".format(", " if i > 0 else "", json.dumps(str(key))).encode("utf-8"))
+            self.write(file, item, depth - 1)
+        if not self.binary:
+            file.write(b"}")
+
+
+
+#==================== AMC Result Function: Response Decoder ====================#
+
+def responseDecoder(name):
+    """
+    AMC Result Function: Response Decoder
+        Returns the encoder used to decode a response written with the given encoder: JSON data strings are decoded with orjson when it is installed.
+    """
+    if name in ("json", "orjson"):
+        return responseEncoder("orjson" if orjson is not None else "json")
+    return responseEncoder(name)
+
+
+
+
+#============================================================#
+#  SECTIONED RESPONSE FILES                                  #
+#============================================================#
+
+# Response file layouts: 'json' (one data string), 'index' (the same data string, plus an index of the byte offsets of its sections), and 'zip' (a zip archive with one member per section)
+LAYOUTS = ["json", "index", "zip"]
+
+
+#==================== AMC Result Function: Index Path ====================#
+
+def indexPath(path):
+    """
+    AMC Result Function: Index Path
+        Returns the path of the section index of a response file (jsonResponse.json -> jsonResponse.index.json).
+    """
+    return "{}.index.json".format(os.path.splitext(path)[0])
+
+
+
+#==================== AMC Result Function: Write Response ====================#
+
+def writeResponse(response, path, layout="json", encoder="json", digits=None):
+    """
+    AMC Result Function: Write Response
+        Writes the sections of a response to disk in one of the response file layouts, streaming each section through the response encoder. The 'json' and 'index' layouts write the same data string; the 'index' layout also writes the byte offset and length of each section, so that readers can load single sections without decoding the rest (see responseReader).
+
+    INPUT
+        response: the response (an amcResult, or a dictionary of sections).
+        path: the path of the response file (e.g., jsonResponse.json, jsonResponse.msgpack, or jsonResponse.zip for the 'zip' layout).
+        layout: (optional) the response file layout: 'json', 'index' or 'zip' (default = 'json').
+        encoder: (optional) the response encoder name, or a responseEncoder: 'json', 'orjson' or 'msgpack' (default = 'json').
+        digits: (optional) the number of decimals of the boundary coordinates and vertices (default = None, full precision).
+
+    OUTPUT
+        The list of the files written.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError("Unknown response layout '{}' (expected one of: {})".format(layout, ", ".join(LAYOUTS)))
+    encoder = responseEncoder(encoder, digits) if isinstance(encoder, str) else encoder
+    sections = response.sections() if isinstance(response, amcResult) else list(response.items())
+
+    if layout == "zip":
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for name, section in sections:
+                with archive.open("{}{}".format(name, encoder.extension), "w") as member:
+                    encoder.write(member, section, 2)
+        return [path]
+
+    # The sections are written one at a time into a single object (map), recording where each section's value starts and ends
+    index = {}
+    with open(path, "wb") as file:
+        file.write(msgpack.Packer().pack_map_header(len(sections)) if encoder.binary else b"{")
+        for i, (name, section) in enumerate(sections):
+            file.write(encoder.dumps(name) if encoder.binary else "{}{}: ".format(", " if i > 0 else "", json.dumps(name)).encode("utf-8"))
+            offset = file.tell()
+            encoder.write(file, section, 2)
+            index[name] = [offset, file.tell() - offset]
+        if not encoder.binary:
+            file.write(b"}")
+        size = file.tell()
+
+    if layout == "json":
+        return [path]
+    with open(indexPath(path), "w") as file:
+        json.dump({"File": os.path.basename(path), "Size": size, "Encoder": encoder.name, "Sections": index}, file)
+    return [path, indexPath(path)]
+
+
+
+
+#============================================================#
+#  CLASS: RESPONSE READER                                    #
+#============================================================#
+
+
+class responseReader(object):
+    """
+    Class Response Reader: Reads the sections of a response file of any layout and encoder (see writeResponse). With a section index ('index' layout) or a zip archive ('zip' layout), only the requested sections are read from disk and decoded; a plain response file is decoded once, in full, on the first read. A stale index (one that does not match the size of its response file) is ignored.
+
+    INPUT
+        path: the path to the response file (jsonResponse.json, jsonResponse.msgpack or jsonResponse.zip).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.index = None
+        self.cache = {}
+        if zipfile.is_zipfile(path):
+            self.layout = "zip"
+            with zipfile.ZipFile(path) as archive:
+                self.members = {os.path.splitext(member)[0]: member for member in archive.namelist()}
+            self.names = list(self.members)
+            return
+
+        self.layout = "json"
+        self.names = None
+        self.decoder = responseDecoder("msgpack" if path.endswith(EXTENSIONS["msgpack"]) else "json")
+        if os.path.exists(indexPath(path)):
+            with open(indexPath(path)) as file:
+                index = json.load(file)
+            if index.get("Size") == os.path.getsize(path):
+                self.layout = "index"
+                self.index = index["Sections"]
+                self.names = list(self.index)
+                self.decoder = responseDecoder(index.get("Encoder", "json"))
+
+    def __getitem__(self, name):
+        return self.read(name)
+
+    def __contains__(self, name):
+        return name in self.sections()
+
+    def sections(self):
+        """Returns the names of the response's sections"""
+        if self.names is None:
+            self.names = list(self.load())
+        return list(self.names)
+
+    def read(self, name, default=KeyError):
+        """Returns one section of the response (decoded), raising KeyError (or returning the default) when the response has no such section"""
+        if name not in self.cache:
+            if self.layout == "zip":
+                if name in self.members:
+                    member = self.members[name]
+                    with zipfile.ZipFile(self.path) as archive:
+                        self.cache[name] = responseDecoder("msgpack" if member.endswith(EXTENSIONS["msgpack"]) else "json").loads(archive.read(member))
+            elif self.layout == "index":
+                if name in self.index:
+                    offset, length = self.index[name]
+                    with open(self.path, "rb") as file:
+                        file.seek(offset)
+                        self.cache[name] = self.decoder.loads(file.read(length))
+            elif self.names is None:
+                self.load()
+        if name not in self.cache:
+            if default is KeyError:
+                raise KeyError(name)
+            return default
+        return self.cache[name]
+
+    def load(self, names=None):
+        """Returns a dictionary of the requested sections of the response (default = None, all the sections)"""
+        if self.layout == "json" and self.names is None:
+            with open(self.path, "rb") as file:
+                self.cache = self.decoder.loads(file.read())
+            self.names = list(self.cache)
+        names = self.sections() if names is None else names
+        return {name: self.read(name) for name in names if name in self.sections()}
+
+
+
+#==================== AMC Result Function: Read Response ====================#
+
+def readResponse(path, sections=None):
+    """
+    AMC Result Function: Read Response
+        Returns a dictionary of the requested sections of a response file of any layout and encoder (default = None, all the sections). See responseReader.
+    """
+    return responseReader(path).load(sections)
@@ -0,0 +1,232 @@
+##############################################################
+# PYTHON AUTOMATED MAP CHECKING ANALYSIS                     #
+# AMC Synthetic Boundaries (Tract Generator)                 #
+# Version: 1.6                                               #
+# Author: Dr. Kostas Alexandridis, GISP                      #
+# Organization: OC Survey Geospatial Services                #
+# Date: August 2020                                          #
+##############################################################
+
+
+# Importing the required libraries into the project
+import math, json, random, numpy
+
+
+
+
+#============================================================#
+#  SYNTHETIC COURSES                                         #
+#============================================================#
+
+# Boundary cases of the synthetic tracts (see amcgraph.planarGraph.classify)
+CASES = ["Single", "Separate", "Adjacent", "Not a Part"]
+
+# Curve types of the synthetic courses: a tangent curve after a line, a compound curve, a reverse curve, or a non-tangent curve (after a bend)
+CURVE_TYPES = ["tangent", "compound", "reverse", "nontangent"]
+
+# Number of boundary lines of each course unit (a line, and the curves of its type)
+UNIT_SEGMENTS = {None: 1, "tangent": 2, "compound": 3, "reverse": 3, "nontangent": 2}
+
+# CAD layers of the synthetic drawings (AMC 1.6): the boundary lines, TPOB points and GPS labels, and other layers holding a short line each
+DRAWING_LAYERS = {"Boundary": "V-LINE-PIQ-PARCEL", "TPOB": "V-NODE-TPOB", "GPS": "V-ANNO", "Other": []}
+
+
+#==================== AMC Synthetic Function: Arc Vertices ====================#
+
+def arcVertices(start, heading, turn, radius, n=9):
+    """
+    AMC Synthetic Function: Arc Vertices
+        Returns the vertices (n, 2), interior point and end heading of a circular arc that leaves a start point tangent to a heading (radians, counter-clockwise from east) and turns by an angle (radians; positive to the left).
+    """
+    side = 1.0 if turn > 0 else -1.0
+    center = numpy.asarray(start) + side * radius * numpy.array([-math.sin(heading), math.cos(heading)])
+    angles = heading - side * math.pi / 2 + turn * numpy.linspace(0.0, 1.0, n)
+    vertices = center + radius * numpy.column_stack([numpy.cos(angles), numpy.sin(angles)])
+    middle = heading - side * math.pi / 2 + turn / 2
+    interior = (float(center[0] + radius * math.cos(middle)), float(center[1] + radius * math.sin(middle)))
+    return vertices, interior, heading + turn
+
+
+
+#==================== AMC Synthetic Function: Synthetic Ring ====================#
+
+def syntheticRing(segments, curveRatio=0.3, curveTypes=CURVE_TYPES, origin=(0.0, 0.0), length=50.0, radius=100.0, delta=25.0, bend=10.0, rng=None):
+    """
+    AMC Synthetic Function: Synthetic Ring
+        Returns a closed ring of boundary lines and curves, walked counter-clockwise as a sequence of course units: each unit is a line followed (at the curve ratio) by a tangent, compound, reverse or non-tangent curve, and a bend at its end that turns the course 360 / units degrees from the start of the unit. The curves turn left and right in turn, and a closing line returns to the first point.
+
+    INPUT
+        segments: the (approximate) number of boundary lines of the ring (at least 4).
+        curveRatio: (optional) the fraction of the course units holding curves (default = 0.3).
+        curveTypes: (optional) the curve types used, in turn (default = CURVE_TYPES).
+        origin: (optional) the first point of the ring (default = (0, 0)).
+        length, radius: (optional) the line length and curve radius in feet (default = 50, 100).
+        delta, bend: (optional) the curve central angle and the bend before a non-tangent curve in degrees (default = 25, 10).
+        rng: (optional) a random.Random generator (default = None, seeded with 0).
+
+    OUTPUT
+        A list of (vertices, interior) pairs of the ring's lines in course order; the interior point of a curve is its arc midpoint (None for lines).
+    """
+    rng = rng or random.Random(0)
+    segments = max(int(segments), 4)
+
+    # Course units: the curve type of each unit, until the ring (with its closing line) holds the requested number of lines
+    units, count, k = [], 1, 0
+    while count < segments:
+        kind = None
+        if rng.random() < curveRatio and count + UNIT_SEGMENTS[curveTypes[k % len(curveTypes)]] < segments:
+            kind = curveTypes[k % len(curveTypes)]
+            k += 1
+        units.append(kind)
+        count += UNIT_SEGMENTS[kind]
+
+    turn = 2 * math.pi / len(units)
+    d, b = math.radians(delta), math.radians(bend)
+    point, heading, side = numpy.asarray(origin, dtype=float), -math.pi / 2, 1.0
+    start = heading
+    lines = []
+    for kind in units:
+        end = point + length * numpy.array([math.cos(heading), math.sin(heading)])
+        lines.append((numpy.vstack([point, end]), None))
+        point = end
+
+        arcs = []
+        if kind == "tangent":
+            arcs = [(side * d, radius)]
+        elif kind == "compound":
+            arcs = [(side * d / 2, radius), (side * d / 2, 2 * radius)]
+        elif kind == "reverse":
+            arcs = [(side * d, radius), (-side * d, radius)]
+        elif kind == "nontangent":
+            heading += side * b
+            arcs = [(side * d, radius)]
+        for angle, r in arcs:
+            vertices, interior, heading = arcVertices(point, heading, angle, r)
+            lines.append((vertices, interior))
+            point = vertices[-1]
+        if kind is not None:
+            side = -side
+        # The bend at the end of the unit takes back the turn of its curves, so the ring's heading advances evenly and it does not cross itself
+        heading = start + turn
+        start = heading
+
+    # The closing line returns to the first point (sharing its coordinates exactly)
+    first = lines[0][0][0]
+    lines.append((numpy.vstack([point, first]), None))
+    return lines
+
+
+
+#==================== AMC Synthetic Function: Square Ring ====================#
+
+def squareRing(center, side):
+    """
+    AMC Synthetic Function: Square Ring
+        Returns a closed square ring of four lines (walked counter-clockwise) around a center point, as (vertices, interior) pairs.
+    """
+    x, y, h = center[0], center[1], side / 2
+    corners = [(x - h, y - h), (x + h, y - h), (x + h, y + h), (x - h, y + h)]
+    return [(numpy.array([corners[i], corners[(i + 1) % 4]], dtype=float), None) for i in range(4)]
+
+
+
+
+#============================================================#
+#  SYNTHETIC TRACTS                                          #
+#============================================================#
+
+
+#==================== AMC Synthetic Function: Synthetic Tract ====================#
+
+def syntheticTract(segments=100, curveRatio=0.3, curveTypes=CURVE_TYPES, parcels=1, case="Single", seed=0, origin=(6000000.0, 2200000.0)):
+    """
+    AMC Synthetic Function: Synthetic Tract
+        Generates the boundary lines of a synthetic tract in one of the boundary cases, in State Plane-like coordinates (feet), without ArcGIS.
+
+    INPUT
+        segments: (optional) the (approximate) total number of boundary lines (default = 100).
+        curveRatio: (optional) the fraction of the course units holding curves (default = 0.3). See syntheticRing.
+        curveTypes: (optional) the curve types used, in turn: 'tangent', 'compound', 'reverse' and/or 'nontangent' (default = CURVE_TYPES).
+        parcels: (optional) the number of parcels (default = 1). 'Single' has one parcel; 'Separate' places the parcels' rings apart; 'Adjacent' divides one ring into sectors by radial lines from its center; 'Not a Part' places square excepted areas inside one ring.
+        case: (optional) the boundary case: 'Single', 'Separate', 'Adjacent' or 'Not a Part' (default = 'Single').
+        seed: (optional) the random seed of the curve placement (default = 0).
+        origin: (optional) the first point of the (first) ring (default = (6000000, 2200000)).
+
+    OUTPUT
+        A dictionary holding the 'segments' (vertex arrays keyed by the line OID, 1, 2, ...), the 'interiors' (the arc interior points of the curves, keyed by the line OID), the 'tpob' points (the first point of each ring), the boundary 'case' and the number of 'parcels'.
+    """
+    if case not in CASES:
+        raise ValueError("Unknown boundary case '{}' (expected one of: {})".format(case, ", ".join(CASES)))
+    rng = random.Random(seed)
+    parcels = 1 if case == "Single" else max(int(parcels), 2)
+
+    rings, tpob = [], []
+    if case == "Separate":
+        per = max(segments // parcels, 4)
+        spacing = 3.0 * per * 50.0 / math.pi
+        for p in range(parcels):
+            start = (origin[0] + p * spacing, origin[1])
+            rings.append(syntheticRing(per, curveRatio, curveTypes, start, rng=rng))
+            tpob.append(start)
+    else:
+        extra = parcels if case == "Adjacent" else 4 * (parcels - 1)
+        ring = syntheticRing(max(segments - extra, 4 * parcels), curveRatio, curveTypes, origin, rng=rng)
+        rings.append(ring)
+        tpob.append(tuple(origin))
+        center = numpy.mean(numpy.vstack([vertices for vertices, interior in ring]), axis=0)
+        size = numpy.ptp(numpy.vstack([vertices for vertices, interior in ring]), axis=0).min()
+
+        if case == "Adjacent":
+            # Radial lines from the center to evenly spaced corners of the ring (the starts of its lines) divide it into sectors
+            starts = [i * len(ring) // parcels for i in range(parcels)]
+            rings.append([(numpy.vstack([center, ring[i][0][0]]), None) for i in starts])
+        elif case == "Not a Part":
+            # Square excepted areas in a row across the middle of the ring
+            side = size / (4.0 * parcels)
+            for p in range(parcels - 1):
+                offset = (p - (parcels - 2) / 2.0) * 2.0 * side
+                rings.append(squareRing((center[0] + offset, center[1]), side))
+
+    lines = [line for ring in rings for line in ring]
+    return {"segments": {oid: vertices for oid, (vertices, interior) in enumerate(lines, start=1)},
+            "interiors": {oid: interior for oid, (vertices, interior) in enumerate(lines, start=1) if interior is not None},
+            "tpob": tpob, "case": case, "parcels": parcels}
+
+
+
+#==================== AMC Synthetic Function: Tract Drawing ====================#
+
+def tractDrawing(tract, gps=((-500.0, -500.0), (-500.0, 500.0)), layers=DRAWING_LAYERS):
+    """
+    AMC Synthetic Function: Tract Drawing
+        Returns a synthetic tract as a recording of the CAD drawing import (see amcarcpy), so that an AMC run processes it offline as if it were a CAD drawing: the boundary lines (the curves as true circular arcs), the TPOB points and the GPS control point labels on their CAD layers, and a short line on each of the other layers the AMC version checks for.
+
+    INPUT
+        tract: a synthetic tract (see syntheticTract).
+        gps: (optional) the offsets (feet) of the GPS control points from the first TPOB point (default = two points to the west).
+        layers: (optional) the CAD layer names of the 'Boundary' lines, the 'TPOB' points and the 'GPS' labels, and the list of the 'Other' layers (default = DRAWING_LAYERS, the AMC 1.6 layers).
+
+    OUTPUT
+        A recording (dictionary) to replay with amcarcpy.install.
+    """
+    fields = [["Entity", "TEXT", "Entity"], ["Layer", "TEXT", "Layer"], ["RefName", "TEXT", "RefName"]]
+
+    def shape(shapeType, parts, esriJson=None):
+        return {"type": shapeType, "parts": [numpy.asarray(part, dtype=float).tolist() for part in parts], "json": esriJson}
+
+    lines = []
+    for oid, vertices in tract["segments"].items():
+        interior = tract["interiors"].get(oid)
+        esriJson = None
+        if interior is not None:
+            start, end = vertices[0].tolist(), vertices[-1].tolist()
+            esriJson = json.dumps({"curvePaths": [[start, {"c": [end, list(interior)]}]], "spatialReference": {"wkid": 102646}})
+        lines.append([oid, shape("polyline", [vertices], esriJson), "Arc" if interior is not None else "Line", layers["Boundary"], None])
+    x0, y0 = tract["tpob"][0]
+    for i, layer in enumerate(layers.get("Other", []), start=len(lines) + 1):
+        lines.append([i, shape("polyline", [[(x0 - 2000.0, y0 + 10.0 * i), (x0 - 1990.0, y0 + 10.0 * i)]]), "Line", layer, None])
+    points = [[i, shape("point", [[xy]]), "Point", layers["TPOB"], None] for i, xy in enumerate(tract["tpob"], start=1)]
+    labels = [[i, shape("point", [[(x0 + dx, y0 + dy)]]), "Attribute", layers["GPS"], "GPS NO. {}".format(1000 + i)] for i, (dx, dy) in enumerate(gps, start=1)]
+
+    datasets = {name: {"ShapeType": shapeType, "Alias": name, "Fields": fields, "Rows": rows} for name, shapeType, rows in [("Polyline", "Polyline", lines), ("Point", "Point", points), ("Annotation", "Point", labels)]}
+    return {"Version": 1, "Recorded": "synthetic", "Events": {"CADToGeodatabase_conversion": [{"Output": "CAD", "Datasets": datasets}]}}
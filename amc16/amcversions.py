@@ -0,0 +1,321 @@
+##############################################################
+# PYTHON AUTOMATED MAP CHECKING ANALYSIS                     #
+# AMC Cross-Version Engine Comparison                        #
+# Version: 1.6                                               #
+# Variant: Python Stand-Alone Execution Script (no ArcGIS)   #
+# Date: August 2020                                          #
+##############################################################
+
+# Runs the same input (a synthetic tract, or a recorded CAD drawing run) through the AMC
+# engines of each version (amc13, amc13/amc, amc14, amc15, amc16, or another copy of one
+# of them, e.g., a baseline checkout) on the offline arcpy stand-in (amcarcpy), times the
+# main stages of each engine side by side, and compares the fields of each engine's
+# jsonResponse with the reference engine's within numeric tolerances, so that an
+# optimization is shown to be output-equivalent and faster.
+#
+# Usage: python amcversions.py [--engines amc14 amc15 amc16 base=/path/to/amc16/amc16.py@amc16] [--reference amc16]
+#                              [--replay TR18141.json.gz | --segments 100 --case Single --parcels 1 --curves 0.3 --seed 0]
+#                              [--repeat 3] [--tolerance 0.0001] [--save report.json] [--strict] [--max-ratio 1.0]
+
+
+# Importing the required libraries
+import os, sys, json, math, time, shutil, argparse, contextlib, tempfile, importlib.util, multiprocessing, concurrent.futures, traceback
+import amcsynth
+
+
+# The main stages of an AMC run common to all the engine versions, in order
+STAGES = ["baseChecks", "boundaryProcessing", "createLegalDescription", "finalizeReport"]
+
+# The repository root (the engine paths are relative to it)
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# CAD layers of the drawings of AMC 1.3 and 1.4 (the boundary must be closed by all the checked layers)
+LEGACY_LAYERS = {"Boundary": "BOUNDARY", "TPOB": "TRUE POINT OF BEGINNING", "GPS": "GPS", "Other": ["BASIS OF BEARING GPS TIES", "CENTERLINES", "EASEMENTS", "LOT LINES", "NORTH ARROW MISCELLANEOUS", "RIGHT OF WAY"]}
+
+# The engine of each version: its module path, class, argument order ('outpath': cadpath, prjpath, outpath, cadname, ...; 'prjpath': cadname, scale, scalefactor, cadpath, prjpath), CAD layers, and the project files it reads from its directory
+ENGINES = {
+    "amc13": {"Path": "amc13/amc.py", "Class": "amc", "Arguments": "prjpath", "Layers": LEGACY_LAYERS, "Files": ["LDTemplate.docx", "SealKH.png"]},
+    "amc13/amc": {"Path": "amc13/amc/amc.py", "Class": "cad2amc", "Arguments": "outpath", "Layers": LEGACY_LAYERS, "Files": []},
+    "amc14": {"Path": "amc14/amc.py", "Class": "amc", "Arguments": "outpath", "Layers": LEGACY_LAYERS, "Files": []},
+    "amc15": {"Path": "amc15/amc15.py", "Class": "amc", "Arguments": "outpath", "Layers": {"Boundary": "V-LINE-PIQ", "TPOB": "V-NODE-TPOB", "GPS": "V-ANNO", "Other": []}, "Files": []},
+    "amc16": {"Path": "amc16/amc16.py", "Class": "amc", "Arguments": "outpath", "Layers": amcsynth.DRAWING_LAYERS, "Files": []}
+    }
+
+
+
+
+#============================================================#
+#  ENGINE RUNS                                               #
+#============================================================#
+
+
+#==================== AMC Versions Function: Engine Specification ====================#
+
+def engineSpec(name):
+    """
+    AMC Versions Function: Engine Specification
+        Returns the label and specification of an engine: a version name (see ENGINES), or 'label=path@version' for another copy of a version's engine module (e.g., a baseline checkout), whose specification is the version's (default = 'amc16').
+    """
+    if "=" not in name:
+        if name not in ENGINES:
+            raise ValueError("Unknown engine '{}' (expected one of: {}, or label=path@version)".format(name, ", ".join(ENGINES)))
+        return name, dict(ENGINES[name], Path=os.path.join(ROOT, ENGINES[name]["Path"]))
+    label, path = name.split("=", 1)
+    path, version = path.rsplit("@", 1) if "@" in path else (path, "amc16")
+    if version not in ENGINES:
+        raise ValueError("Unknown engine version '{}' of {}".format(version, label))
+    return label, dict(ENGINES[version], Path=os.path.abspath(path))
+
+
+
+#==================== AMC Versions Function: Run Engine ====================#
+
+def runEngine(job):
+    """
+    AMC Versions Function: Run Engine
+        Runs the main stages of an AMC engine on a replayed drawing with the offline arcpy stand-in, and returns the best duration of each stage over the repeated runs and the engine's jsonResponse. Runs in a fresh process, so that each engine imports its own helper modules (amcgeom, amcgraph, ...) and a fresh stand-in.
+
+    INPUT
+        job: a dictionary of the engine 'Label', its specification ('Spec', see ENGINES), the 'Drawing' recording to replay (see amcarcpy.install), the run 'Directory', the number of runs ('Repeat') and the 'ScaleFactor'.
+
+    OUTPUT
+        A dictionary of the engine's 'Stages' (seconds), 'Total', 'Status' ('Pass', or the failed stage and error) and 'Response'.
+    """
+    spec = job["Spec"]
+    sys.path.insert(0, os.path.dirname(spec["Path"]))
+    import amcarcpy
+
+    timings, response, status = {}, None, "Pass"
+    for run in range(job["Repeat"]):
+        # A fresh stand-in and engine module for each run (the engine binds arcpy when imported)
+        amcarcpy.install(job["Drawing"])
+
+        prjpath = os.path.join(job["Directory"], "run{}".format(run))
+        os.makedirs(prjpath, exist_ok=True)
+        for file in spec["Files"]:
+            if os.path.exists(os.path.join(os.path.dirname(spec["Path"]), file)):
+                shutil.copy(os.path.join(os.path.dirname(spec["Path"]), file), prjpath)
+        cadpath = os.path.join(prjpath, "{}.dwg".format(job["CadName"]))
+
+        # The engines echo their execution report (also written to ExecutionReport.txt) to the console; an engine that cannot be imported (e.g., a missing dependency) fails in its import
+        stage = "import"
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            try:
+                loader = importlib.util.spec_from_file_location("amcengine{}".format(run), spec["Path"])
+                module = importlib.util.module_from_spec(loader)
+                loader.loader.exec_module(module)
+                stage = "__init__"
+                if spec["Arguments"] == "prjpath":
+                    client = getattr(module, spec["Class"])(job["CadName"], "grid", job["ScaleFactor"], cadpath, prjpath)
+                else:
+                    client = getattr(module, spec["Class"])(cadpath, prjpath, prjpath, job["CadName"], "grid", job["ScaleFactor"])
+                for stage in STAGES:
+                    stime = time.perf_counter()
+                    getattr(client, stage)()
+                    seconds = time.perf_counter() - stime
+                    timings[stage] = min(timings.get(stage, seconds), seconds)
+            except Exception as e:
+                status = "Failed in {}: {}: {}".format(stage, type(e).__name__, e)
+                traceback.print_exc(file=sys.stderr)
+                break
+
+        if response is None:
+            with open(os.path.join(client.outpath, "jsonResponse.json"), encoding="utf-8") as file:
+                response = json.load(file)
+
+    return {"Stages": timings, "Total": sum(timings.values()) if status == "Pass" else None, "Status": status, "Response": response}
+
+
+
+#==================== AMC Versions Function: Run Versions ====================#
+
+def runVersions(engines, replay=None, segments=100, case="Single", parcels=1, curveRatio=0.3, seed=0, repeat=3, scalefactor=0.9999677, cadname="TR12345", directory=None):
+    """
+    AMC Versions Function: Run Versions
+        Runs the same input through each engine, one fresh process after another, and returns the stage durations, status and jsonResponse of each engine.
+
+    INPUT
+        engines: a list of engine names (see engineSpec).
+        replay: (optional) a recorded drawing run (dictionary or file path, see amcarcpy.arcpyRecorder), replayed unchanged for every engine (default = None, a synthetic tract on each engine's CAD layers).
+        segments, case, parcels, curveRatio, seed: (optional) the synthetic tract (see amcsynth.syntheticTract).
+        repeat: (optional) the number of runs of each engine; the best time of each stage is kept (default = 3).
+        scalefactor, cadname: (optional) the scale factor and name of the drawing (default = 0.9999677, 'TR12345').
+        directory: (optional) the directory of the runs' output (default = None, a temporary directory).
+
+    OUTPUT
+        A dictionary of the 'Settings' and of the 'Engines' results keyed by their label (see runEngine).
+    """
+    if isinstance(replay, str):
+        import amcarcpy
+        replay = amcarcpy.loadRecording(replay)
+    tract = amcsynth.syntheticTract(segments, curveRatio, parcels=parcels, case=case, seed=seed) if replay is None else None
+    directory = directory or tempfile.mkdtemp(prefix="amcversions")
+
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    for name in engines:
+        label, spec = engineSpec(name)
+        job = {"Label": label, "Spec": spec, "Drawing": replay or amcsynth.tractDrawing(tract, layers=spec["Layers"]), "Directory": os.path.join(directory, label.replace("/", "_")), "Repeat": repeat, "ScaleFactor": scalefactor, "CadName": cadname}
+        with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+            results[label] = pool.submit(runEngine, job).result()
+        results[label]["Path"] = spec["Path"]
+
+    settings = {"Input": "replay" if replay is not None else "synthetic", "Segments": segments, "Case": case, "Parcels": parcels, "CurveRatio": curveRatio, "Seed": seed, "Repeat": repeat, "ScaleFactor": scalefactor, "Directory": directory}
+    return {"Settings": settings, "Engines": results}
+
+
+
+
+#============================================================#
+#  OUTPUT EQUIVALENCE                                        #
+#============================================================#
+
+
+#==================== AMC Versions Function: Flatten Response ====================#
+
+def flattenResponse(response, ignore=("Execution",)):
+    """
+    AMC Versions Function: Flatten Response
+        Returns the fields of a jsonResponse as a dictionary of values keyed by their path (e.g., 'Controls/Areas/1/Acres'), in a layout common to the engine versions: the boundary records keyed by their object ID (without the parcel level of AMC 1.6), list items keyed by their index, strings with collapsed white space, and without the fields that were not computed (None or empty placeholders).
+
+    INPUT
+        response: a jsonResponse (dictionary).
+        ignore: (optional) the sections that are not compared (default = the execution details).
+    """
+    fields = {}
+
+    def walk(value, path):
+        if isinstance(value, dict):
+            for key, item in value.items():
+                walk(item, "{}/{}".format(path, key) if path else str(key))
+        elif isinstance(value, (list, tuple)):
+            for i, item in enumerate(value):
+                walk(item, "{}/{}".format(path, i))
+        elif isinstance(value, str):
+            fields[path] = " ".join(value.split())
+        elif value is not None:
+            fields[path] = value
+
+    for section, value in response.items():
+        if section in ignore:
+            continue
+        if section == "Boundaries" and all(isinstance(records, dict) and all(isinstance(r, dict) and "coid" in r for r in records.values()) for records in value.values()):
+            # AMC 1.6: boundary records keyed by parcel, then object ID
+            value = {oid: record for records in value.values() for oid, record in records.items()}
+        walk(value, section)
+    return fields
+
+
+
+#==================== AMC Versions Function: Compare Responses ====================#
+
+def compareResponses(reference, response, tolerance=1e-4, relative=1e-9):
+    """
+    AMC Versions Function: Compare Responses
+        Compares the fields of an engine's jsonResponse with the reference engine's: numbers are equal within the absolute or relative tolerance, and the other values (strings, booleans) exactly.
+
+    INPUT
+        reference, response: the jsonResponse (dictionary) of the reference engine and of the compared engine.
+        tolerance: (optional) the absolute tolerance of the numeric fields, in feet, degrees or acres (default = 0.0001).
+        relative: (optional) the relative tolerance of the numeric fields (default = 1e-9).
+
+    OUTPUT
+        A dictionary of the number of 'Compared' and 'Matched' fields, the 'Mismatched' fields (path, reference value, value), and the fields found only in the reference ('Missing') or only in the response ('Extra').
+    """
+    a, b = flattenResponse(reference), flattenResponse(response)
+    common = [path for path in a if path in b]
+    mismatched = []
+    for path in common:
+        x, y = a[path], b[path]
+        if isinstance(x, (int, float)) and isinstance(y, (int, float)) and not isinstance(x, bool) and not isinstance(y, bool):
+            equal = math.isclose(x, y, rel_tol=relative, abs_tol=tolerance)
+        else:
+            equal = x == y
+        if not equal:
+            mismatched.append([path, x, y])
+    return {"Compared": len(common), "Matched": len(common) - len(mismatched), "Mismatched": mismatched, "Missing": [path for path in a if path not in b], "Extra": [path for path in b if path not in a]}
+
+
+
+#==================== AMC Versions Function: Versions Table ====================#
+
+def versionsTable(report, reference):
+    """
+    AMC Versions Function: Versions Table
+        Returns the text tables of a versions report: the duration (ms) of each stage of each engine side by side with the ratio of each engine's total to the reference engine's, and the output equivalence of each engine with the reference engine.
+    """
+    engines = report["Engines"]
+    labels = list(engines)
+    width = max([12] + [len(label) + 2 for label in labels])
+    lines = ["{:<24}".format("Stage (ms)") + "".join("{:>{}}".format(label, width) for label in labels)]
+    for stage in STAGES + ["Total"]:
+        values = [engines[label]["Stages"].get(stage) if stage != "Total" else engines[label]["Total"] for label in labels]
+        lines.append("{:<24}".format(stage) + "".join("{:>{}}".format("{:.2f}".format(v * 1000) if v is not None else "-", width) for v in values))
+    base = engines[reference]["Total"]
+    lines.append("{:<24}".format("Ratio to " + reference) + "".join("{:>{}}".format("{:.2f}".format(engines[label]["Total"] / base) if base and engines[label]["Total"] else "-", width) for label in labels))
+
+    lines.append("")
+    lines.append("{:<16} {:>9} {:>9} {:>10} {:>9} {:>9}  {}".format("Engine", "Compared", "Matched", "Mismatched", "Missing", "Extra", "Status"))
+    for label in labels:
+        result = report["Equivalence"].get(label)
+        if result is None:
+            lines.append("{:<16} {:>9} {:>9} {:>10} {:>9} {:>9}  {}".format(label, "-", "-", "-", "-", "-", engines[label]["Status"]))
+            continue
+        lines.append("{:<16} {:>9} {:>9} {:>10} {:>9} {:>9}  {}".format(label, result["Compared"], result["Matched"], len(result["Mismatched"]), len(result["Missing"]), len(result["Extra"]), engines[label]["Status"]))
+    return "\n".join(lines)
+
+
+
+
+#============================================================#
+#  VERSIONS EXECUTION                                        #
+#============================================================#
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the same input through the AMC engine versions, time their stages side by side, and compare their jsonResponse fields, without ArcGIS")
+    parser.add_argument("--engines", nargs="+", default=list(ENGINES), help="the engines: version names ({}) or label=path@version for another copy of an engine (default: all versions)".format(", ".join(ENGINES)))
+    parser.add_argument("--reference", default=None, help="the engine the others are compared with (default: the last engine)")
+    parser.add_argument("--replay", default=None, help="a recorded drawing run (amcarcpy) replayed for every engine, instead of a synthetic tract")
+    parser.add_argument("--segments", type=int, default=100, help="the number of boundary lines of the synthetic tract (default: 100)")
+    parser.add_argument("--case", choices=amcsynth.CASES, default="Single", help="the boundary case of the synthetic tract (default: Single)")
+    parser.add_argument("--parcels", type=int, default=1, help="the number of parcels (default: 1)")
+    parser.add_argument("--curves", type=float, default=0.3, help="the fraction of the course units holding curves (default: 0.3)")
+    parser.add_argument("--seed", type=int, default=0, help="the random seed of the curve placement (default: 0)")
+    parser.add_argument("--repeat", type=int, default=3, help="the number of runs of each engine; the best time of each stage is kept (default: 3)")
+    parser.add_argument("--tolerance", type=float, default=1e-4, help="the absolute tolerance of the numeric fields (default: 0.0001)")
+    parser.add_argument("--details", type=int, default=10, help="the number of mismatched fields listed for each engine (default: 10)")
+    parser.add_argument("--save", default=None, help="the path of the report (JSON) to write, with the mismatched fields and the responses")
+    parser.add_argument("--strict", action="store_true", help="fail (exit status 1) when an engine fails or a compared field does not match the reference")
+    parser.add_argument("--max-ratio", type=float, default=None, help="fail when an engine's total time exceeds this ratio to the reference's (e.g., 1.0: no slower)")
+    args = parser.parse_args()
+
+    report = runVersions(args.engines, args.replay, args.segments, args.case, args.parcels, args.curves, args.seed, args.repeat)
+    engines = report["Engines"]
+    reference = args.reference or list(engines)[-1]
+    if reference not in engines:
+        sys.exit("The reference engine '{}' is not one of the engines: {}".format(reference, ", ".join(engines)))
+    report["Reference"] = reference
+    report["Equivalence"] = {label: compareResponses(engines[reference]["Response"], result["Response"], args.tolerance) for label, result in engines.items() if label != reference and result["Response"] is not None and engines[reference]["Response"] is not None}
+
+    settings = report["Settings"]
+    print("AMC engine versions: {} input{}, best of {}, compared with {} (tolerance {})".format(settings["Input"], "" if args.replay else " ({} lines, {} case, {} parcel(s), curve ratio {})".format(args.segments, args.case, args.parcels, args.curves), args.repeat, reference, args.tolerance))
+    print(versionsTable(report, reference))
+    for label, result in report["Equivalence"].items():
+        for path, x, y in result["Mismatched"][:args.details]:
+            print("  {} {}: {!r} ({}: {!r})".format(label, path, y, reference, x))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, default=str)
+        print("Saved the report: {}".format(args.save))
+
+    # Failures: failed engines and mismatched fields (strict), and engines slower than the reference
+    failures = [] if engines[reference]["Response"] is not None else ["{}: the reference engine did not produce a jsonResponse ({})".format(reference, engines[reference]["Status"])]
+    if args.strict:
+        failures += ["{}: {}".format(label, result["Status"]) for label, result in engines.items() if result["Status"] != "Pass"]
+        failures += ["{}: {} field(s) differ from {}".format(label, len(result["Mismatched"]), reference) for label, result in report["Equivalence"].items() if result["Mismatched"]]
+    if args.max_ratio is not None and engines[reference]["Total"]:
+        failures += ["{}: {:.2f} times the time of {}".format(label, result["Total"] / engines[reference]["Total"], reference) for label, result in engines.items() if result["Total"] and result["Total"] / engines[reference]["Total"] > args.max_ratio]
+    for failure in failures:
+        print("FAILED: " + failure)
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,47 @@
+##############################################################
+# PYTHON AUTOMATED MAP CHECKING ANALYSIS                     #
+# Legal Description Re-Rendering from JSON                   #
+# Version: 1.6                                               #
+# Variant: Python Stand-Alone Execution Script (no ArcGIS)   #
+# Date: August 2020                                          #
+##############################################################
+
+# Rebuilds the line descriptions, annotations and legal descriptions of a cached AMC
+# JSON data string (jsonResponse.json, or any layout and encoder of amcresult.writeResponse) at a new
+# scale factor and/or tolerance.
+#
+# Usage: python json2legal.py jsonResponse.json [--scalefactor 0.99996] [--tolerance 2] [--angular-tolerance 0.01] [--output path.json] [--scale ground]
+
+
+# Importing the required libraries
+import argparse, json, os, time
+import amcdesc, amcresult
+
+
+parser = argparse.ArgumentParser(description="Re-render the legal descriptions of an AMC JSON data string (jsonResponse.json) without ArcGIS")
+parser.add_argument("jsonpath", help="the path to the JSON data string (jsonResponse.json)")
+parser.add_argument("--scalefactor", type=float, default=None, help="the scale factor (default: the JSON's Controls.ScaleFactor)")
+parser.add_argument("--tolerance", type=int, default=None, help="the decimal accuracy (default: the JSON's Controls.Tolerance, or 2)")
+parser.add_argument("--angular-tolerance", type=float, default=None, help="the angular tolerance (degrees) of tangent, radial, compound and reverse courses (default: the JSON's Controls.AngularTolerance, or 0.01)")
+parser.add_argument("--output", default=None, help="the path of the re-rendered JSON data string (default: jsonResponse_rerender.json next to the input)")
+parser.add_argument("--scale", choices=["grid", "ground"], default="ground", help="the legal description printed to the console (default: ground)")
+args = parser.parse_args()
+
+response = amcresult.readResponse(args.jsonpath)
+
+stime = time.perf_counter()
+response = amcdesc.rerenderResponse(response, args.scalefactor, args.tolerance, args.angular_tolerance)
+etime = time.perf_counter()
+
+output = args.output or os.path.join(os.path.dirname(os.path.abspath(args.jsonpath)), "jsonResponse_rerender.json")
+with open(output, "w") as file:
+    json.dump(response, file)
+
+scale = args.scale.capitalize()
+for poid, parcel in response["LegalDescription"]["Parcels"].items():
+    print("\nLEGAL DESCRIPTION ({}) - PARCEL {}\n".format(scale.upper(), poid))
+    print(response["LegalDescription"].get("Map", ""))
+    print(parcel[scale]["Preamp"])
+    print(parcel[scale]["Course"])
+
+print("\nRe-rendered {} parcel(s) at scale factor {} and tolerance {} in {:.1f} ms: {}".format(len(response["LegalDescription"]["Parcels"]), response["Controls"]["ScaleFactor"], response["Controls"]["Tolerance"], (etime - stime) * 1000, output))
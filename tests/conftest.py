@@ -0,0 +1,4 @@
+# Pytest configuration for the OCAMC tests: the AMC 1.6 modules import each other by flat module name (e.g., import amcgeom), so the amc16 folder is placed on the import path.
+import os, sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "amc16"))
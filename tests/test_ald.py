@@ -0,0 +1,40 @@
+# Tests of the Automated Legal Description (ald): parcel selection of the legal description exhibits
+import pytest
+
+pytest.importorskip("docx")
+import ald
+
+
+def response(parcels=True):
+    areas = {"1": {"SquareFeet": 1000.0, "Acres": 0.023}, "2": {"SquareFeet": 200.0, "Acres": 0.005}}
+    legal = {"Map": "THAT PORTION", "Grid": {"Preamp": "MAP", "Course": "MAP COURSE"}, "Ground": {"Preamp": "MAP", "Course": "MAP COURSE"}}
+    if parcels:
+        legal["Parcels"] = {"1": {"Grid": {"Preamp": "P1", "Course": "P1 GRID"}, "Ground": {"Preamp": "P1", "Course": "P1 GROUND"}}}
+    return {"Controls": {"Areas": areas}, "LegalDescription": legal}
+
+
+def test_parcel_ids_skip_not_a_part_areas():
+    assert ald.parcelIds(response()) == ["1"]
+
+
+def test_parcel_ids_of_earlier_versions_use_areas():
+    assert ald.parcelIds(response(parcels=False)) == ["1", "2"]
+
+
+def test_parcel_ids_explicit():
+    assert ald.parcelIds(response(), 3) == ["3"]
+    assert ald.parcelIds(response(), [1, "2"]) == ["1", "2"]
+
+
+def test_parcel_description():
+    assert ald.parcelDescription(response(), 1, "ground")["Course"] == "P1 GROUND"
+    assert ald.parcelDescription(response(), "1", "grid")["Course"] == "P1 GRID"
+
+
+def test_parcel_description_of_earlier_versions_uses_map():
+    assert ald.parcelDescription(response(parcels=False), 2, "ground")["Course"] == "MAP COURSE"
+
+
+def test_parcel_description_unknown_parcel():
+    with pytest.raises(KeyError):
+        ald.parcelDescription(response(), 2, "ground")
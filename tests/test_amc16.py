@@ -0,0 +1,70 @@
+# Tests of the AMC 1.6 engine (amc16) on synthetic tracts replayed by the offline arcpy stand-in (amcarcpy): traverse, descriptions, closure and re-rendering
+import os, sys, copy, json, importlib, pytest
+import amcarcpy, amcdesc, amcsynth
+
+pytest.importorskip("pandas")
+
+
+def runTract(tmp_path, case, parcels, segments=80, repeatTPOB=False):
+    # A fresh stand-in and engine module for each tract (the engine binds arcpy when imported); the first TPOB point may be repeated in the drawing
+    tract = amcsynth.syntheticTract(segments, 0.4, parcels=parcels, case=case, seed=1)
+    if repeatTPOB:
+        tract["tpob"].append(tract["tpob"][0])
+    amcarcpy.install(amcsynth.tractDrawing(tract))
+    engine = importlib.reload(sys.modules["amc16"]) if "amc16" in sys.modules else importlib.import_module("amc16")
+    client = engine.amc(str(tmp_path / "TR1.dwg"), str(tmp_path), str(tmp_path), "TR1", "grid", 0.9999677)
+    client.baseChecks()
+    client.boundaryProcessing()
+    client.createLegalDescription()
+    client.finalizeReport()
+    with open(os.path.join(client.outpath, "jsonResponse.json"), encoding="utf-8") as file:
+        return tract, json.load(file)
+
+
+@pytest.mark.parametrize("case, parcels", [("Single", 1), ("Adjacent", 4), ("Separate", 3), ("Not a Part", 2)])
+def test_boundary_cases(tmp_path, case, parcels):
+    tract, response = runTract(tmp_path, case, parcels)
+    assert len(response["Boundaries"]) == (1 if case == "Not a Part" else tract["parcels"])
+    assert all(closure["Status"] == "Pass" for closure in response["Checks"]["BoundaryClosure"].values())
+    assert any(record["tpobid"] is not None and record["coid"] == 1 for records in response["Boundaries"].values() for record in records.values())
+    for poid, records in response["Boundaries"].items():
+        assert all(record["desc_grid"] and record["desc_ground"] for record in records.values())
+
+        # Each course begins at the (TRUE) POINT OF BEGINNING its preamp runs to, and the first course of each ring leaves its point of beginning (not a curve)
+        first = min(records.values(), key=lambda record: record["coid"])
+        assert first["tpob"] is True
+        for scale in ("Grid", "Ground"):
+            legal = response["LegalDescription"]["Parcels"][poid][scale]
+            pobstring = "TRUE POINT OF BEGINNING" if legal["Course"].startswith("Thence from said TRUE POINT OF BEGINNING ") else "POINT OF BEGINNING"
+            assert legal["Course"].startswith("Thence from said {} ".format(pobstring))
+            assert " to the {} having".format(pobstring) in legal["Preamp"]
+            assert first["tpobid"] is not None or pobstring == "POINT OF BEGINNING"
+        heads = [record for record in records.values() if record["coid"] == 1 or record["desc_grid"].startswith(" EXCEPTING THEREFROM")]
+        assert len(heads) == (2 if case == "Not a Part" else 1)
+        for record in heads:
+            assert not any(modifier in record["desc_grid"] + record["desc_ground"] for modifier in ("non-tangent to said curve", "radial to said curve"))
+
+
+@pytest.mark.parametrize("case, parcels", [("Single", 1), ("Adjacent", 4), ("Not a Part", 2)])
+def test_rerender_matches_engine(tmp_path, case, parcels):
+    tract, response = runTract(tmp_path, case, parcels)
+    rerendered = amcdesc.rerenderResponse(copy.deepcopy(response))
+    for poid, records in response["Boundaries"].items():
+        for oid, record in records.items():
+            for field in ("desc_grid", "desc_ground", "ann_grid", "ann_ground", "annweb_grid", "annweb_ground", "radtangent"):
+                assert rerendered["Boundaries"][poid][oid][field] == record[field]
+        for scale in ("Grid", "Ground"):
+            assert rerendered["LegalDescription"]["Parcels"][poid][scale] == response["LegalDescription"]["Parcels"][poid][scale]
+
+
+@pytest.mark.parametrize("stored", [True, False])
+def test_rerender_keeps_the_tpob_string(tmp_path, stored):
+    # Several TPOB points at the same coordinates are a single TRUE POINT OF BEGINNING, also when re-rendered from a response with or without the stored TPOB string
+    tract, response = runTract(tmp_path, "Single", 1, repeatTPOB=True)
+    assert response["Controls"]["TPOB"]["count"] == 2 and response["Controls"]["TPOB"]["pobstring"] == "TRUE POINT OF BEGINNING"
+    if not stored:
+        del response["Controls"]["TPOB"]["pobstring"]
+    rerendered = amcdesc.rerenderResponse(copy.deepcopy(response))
+    for poid, parcel in response["LegalDescription"]["Parcels"].items():
+        assert parcel["Grid"]["Course"].startswith("Thence from said TRUE POINT OF BEGINNING ")
+        assert rerendered["LegalDescription"]["Parcels"][poid] == parcel
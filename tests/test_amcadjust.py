@@ -0,0 +1,61 @@
+# Tests of the AMC Traverse Adjustment (amcadjust): compass and weighted least squares adjustments
+import numpy
+import amcadjust
+
+
+def traverse(m, seed=1, noise=True):
+    rng = numpy.random.default_rng(seed)
+    angles = numpy.sort(rng.uniform(0, 2 * numpy.pi, m))[::-1]
+    radii = rng.uniform(80, 120, m)
+    points = numpy.column_stack([radii * numpy.cos(angles), radii * numpy.sin(angles)])
+    points = numpy.vstack([points, points[:1]])
+    delta = numpy.diff(points, axis=0)
+    bearings = numpy.degrees(numpy.arctan2(delta[:, 0], delta[:, 1])) % 360
+    distances = numpy.hypot(delta[:, 0], delta[:, 1])
+    if noise:
+        bearings = bearings + rng.normal(0, 2 / 3600, m)
+        distances = distances + rng.normal(0, 0.01, m)
+    return points[0], points[1:], bearings, distances
+
+
+def test_block_tridiagonal_solve():
+    rng = numpy.random.default_rng(2)
+    k = 6
+    blocks = rng.normal(size=(k, 2, 2))
+    diagonal = numpy.array([b @ b.T + 4 * numpy.eye(2) for b in blocks])
+    offdiagonal = rng.normal(size=(k - 1, 2, 2))
+    rhs = rng.normal(size=(k, 2))
+    dense = numpy.zeros((2 * k, 2 * k))
+    for j in range(k):
+        dense[2 * j:2 * j + 2, 2 * j:2 * j + 2] = diagonal[j]
+    for j in range(k - 1):
+        dense[2 * j:2 * j + 2, 2 * j + 2:2 * j + 4] = offdiagonal[j]
+        dense[2 * j + 2:2 * j + 4, 2 * j:2 * j + 2] = offdiagonal[j].T
+    expected = numpy.linalg.solve(dense, rhs.ravel()).reshape(-1, 2)
+    numpy.testing.assert_allclose(amcadjust.blockTridiagonalSolve(diagonal, offdiagonal, rhs), expected, rtol=1e-10, atol=1e-12)
+
+
+def test_exact_traverse_is_unchanged():
+    start, points, bearings, distances = traverse(12, noise=False)
+    for result in (amcadjust.compassAdjustment(start, bearings, distances), amcadjust.leastSquaresAdjustment(start, bearings, distances)):
+        numpy.testing.assert_allclose(result["points"], points, atol=1e-6)
+        numpy.testing.assert_allclose(result["corrections"], 0, atol=1e-6)
+
+
+def test_adjustments_close_on_start():
+    start, points, bearings, distances = traverse(40)
+    unadjusted = amcadjust.traverseCoordinates(start, bearings, distances)
+    assert numpy.hypot(*(unadjusted[-1] - start)) > 1e-4
+    for result in (amcadjust.compassAdjustment(start, bearings, distances), amcadjust.leastSquaresAdjustment(start, bearings, distances)):
+        numpy.testing.assert_allclose(result["points"][-1], start, atol=1e-9)
+        numpy.testing.assert_allclose(result["points"], points, atol=0.1)
+
+
+def test_least_squares_rings_are_independent():
+    start1, points1, bearings1, distances1 = traverse(9, seed=3)
+    start2, points2, bearings2, distances2 = traverse(5, seed=4)
+    both = amcadjust.leastSquaresAdjustment(numpy.vstack([start1, start2]), numpy.concatenate([bearings1, bearings2]), numpy.concatenate([distances1, distances2]), numpy.repeat([0, 1], [9, 5]))
+    first = amcadjust.leastSquaresAdjustment(start1, bearings1, distances1)
+    second = amcadjust.leastSquaresAdjustment(start2, bearings2, distances2)
+    numpy.testing.assert_allclose(both["points"], numpy.vstack([first["points"], second["points"]]), atol=1e-9)
+    numpy.testing.assert_allclose(both["sigma0"], numpy.concatenate([first["sigma0"], second["sigma0"]]), rtol=1e-9)
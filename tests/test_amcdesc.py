@@ -0,0 +1,73 @@
+# Tests of the AMC Course Descriptions (amcdesc): bearings, course records and the grid and ground renderer
+import amcdesc, amcgeom
+
+
+def line(coid, bearing, distance, startx=0.0, starty=0.0, tpob=False):
+    return {"coid": coid, "tpob": tpob, "shapetype": "Line", "bearing": bearing, "distance": distance, "midbearing": None, "startx": startx, "starty": starty}
+
+
+def curve(coid, bearing, distance, radius, arclength, delta, midbearing, radbearing_cs, radbearing_ce=None):
+    return {"coid": coid, "tpob": False, "shapetype": "Curve", "bearing": bearing, "distance": distance, "radius": radius, "arclength": arclength, "delta": delta, "midbearing": midbearing, "radbearing_cs": radbearing_cs, "radbearing_ce": radbearing_ce, "startx": 0.0, "starty": 100.0}
+
+
+def test_bearings():
+    assert amcdesc.dd2dms(12.5) == "12°30'00\""
+    assert amcdesc.quadrantBearing(135.5) == "South 44°30'00\" East"
+    assert amcdesc.quadrantBearing(300.25, short=True) == "N 59°45'00\" W"
+    assert amcdesc.bearingLabel(90) == "easterly"
+
+
+def test_course_items():
+    items = amcdesc.courseItems([line(1, 0.0, 100.0, tpob=True), line(2, 90.0, 100.0), line(3, 0.0, 10.0, 40.0, 40.0)], [0, 0, 1], [0, 0, 0], "TRUE POINT OF BEGINNING")
+    assert [item["preamble"] for item in items] == ["tpob", "thence", "except"]
+    assert [item["closing"] for item in items] == [None, "pob", "except"]
+
+
+def test_render_line_grid_and_ground():
+    renderer = amcdesc.courseRenderer(scalefactor=0.5, tolerance=2)
+    items = amcdesc.courseItems([line(1, 0.0, 100.004, tpob=True)], [0], [0], "TRUE POINT OF BEGINNING")
+    text = renderer.render(items[0])
+    assert text["desc_grid"] == "Thence from said TRUE POINT OF BEGINNING North 00°00'00\" East, 100.00 feet; to the TRUE POINT OF BEGINNING"
+    assert text["desc_ground"] == "Thence from said TRUE POINT OF BEGINNING North 00°00'00\" East, 200.00 feet; to the TRUE POINT OF BEGINNING"
+    assert text["ann_grid"] == "N 00°00'00\" E  100.00"
+    assert text["annweb_ground"] == "N 00°00'00\" E\n200.00"
+
+
+def test_render_tangent_curve_and_rescale():
+    lines = [line(1, 0.0, 100.0, tpob=True), curve(2, 45.0, 70.71, 50.0, 78.54, 90.0, 135.0, 270.0)]
+    items = amcdesc.courseItems(lines, [0, 0], [amcgeom.RELATION_LINE, amcgeom.RELATION_TANGENT], "TRUE POINT OF BEGINNING", controls=False)
+    text = amcdesc.courseRenderer(1.0, 2).renderCourse(items)[1]
+    assert text["desc_grid"] == " to the beginning of a curve, concave southeasterly, and having a radius of 50.00 feet; Thence northeasterly along said curve 78.54 feet through a central angle of 90°00'00\"; to the TRUE POINT OF BEGINNING"
+    assert text["ann_grid"] == "Δ=90°00'00\"  R=50.00  L=78.54"
+    rescaled = amcdesc.courseRenderer(1.0, 2).rescale(tolerance=1).render(items[1])
+    assert rescaled["ann_grid"] == "Δ=90°00'00\"  R=50.0  L=78.5"
+
+
+def test_describe_lines_and_closure():
+    lines = [line(1, 0.0, 100.0, tpob=True), line(2, 90.0, 100.0), line(3, 180.0, 100.0), line(4, 270.0, 100.0)]
+    amcdesc.describeLines(lines, [0, 0, 0, 0], amcdesc.courseRenderer(1.0, 2), "TRUE POINT OF BEGINNING")
+    assert lines[1]["desc_grid"] == " Thence North 90°00'00\" East, 100.00 feet;"
+    closure = amcdesc.courseClosure(lines, [0, 0, 0, 0], 2, 10000)
+    assert closure["Misclosure"] < 1e-9 and closure["Status"] == "Pass" and closure["Perimeter"] == 400.0
+
+
+def test_describe_rings_closing_with_a_curve():
+    # Each ring closes with a curve whose end radial is off the ring's first line: the first lines leave the points of beginning, not the curves
+    lines = [line(1, 45.0, 100.0, tpob=True), line(2, 135.0, 100.0), curve(3, 270.0, 141.42, 100.0, 157.08, 90.0, 0.0, 45.0, 0.0),
+             line(4, 45.0, 10.0, 40.0, 40.0), line(5, 135.0, 10.0), curve(6, 270.0, 14.14, 10.0, 15.71, 90.0, 0.0, 45.0, 0.0)]
+    amcdesc.describeLines(lines, [0, 0, 0, 1, 1, 1], amcdesc.courseRenderer(1.0, 2), "TRUE POINT OF BEGINNING")
+    assert lines[0]["desc_grid"] == "Thence from said TRUE POINT OF BEGINNING North 45°00'00\" East, 100.00 feet;"
+    assert lines[3]["desc_grid"].startswith(" EXCEPTING THEREFROM that portion described as follows: Beginning at a point having a State Plane Coordinate Value of Northing 40.00 and Easting 40.00; Thence North 45°00'00\" East")
+    assert all("to said curve" not in lines[i]["desc_grid"] for i in (0, 3))
+
+
+def test_angular_tolerance_is_independent_of_the_tolerance():
+    # A curve 0.005 degrees off the tangent of the line before it: tangent within 0.01 degrees at any linear tolerance, non-tangent within 0.001 degrees
+    course = lambda: [line(1, 0.0, 100.0, tpob=True), curve(2, 45.0, 70.71, 50.0, 78.54, 90.0, 135.0, 270.005, 0.0)]
+    for tolerance in (1, 2, 3):
+        lines = course()
+        amcdesc.describeLines(lines, [0, 0], amcdesc.courseRenderer(1.0, tolerance), "TRUE POINT OF BEGINNING", controls=False)
+        assert lines[1]["radtangent"] == "Tangent"
+    lines = course()
+    amcdesc.describeLines(lines, [0, 0], amcdesc.courseRenderer(1.0, 2), "TRUE POINT OF BEGINNING", controls=False, angularTolerance=0.001)
+    assert lines[1]["radtangent"] == "Non-Tangent"
@@ -0,0 +1,84 @@
+# Tests of the AMC Geometry Kernel (amcgeom): Well Known Binary vertex round trips, coordinate index and course relationships
+import numpy, pytest
+import amcgeom
+
+
+def test_wkb_round_trip_2d():
+    vertices = numpy.array([[6000000.25, 2100000.5], [6000010.0, 2100020.0], [6000030.5, 2100025.75]])
+    wkb = amcgeom.verticesToWkb(vertices)
+    assert amcgeom.geometryDimensions(wkb) == (False, False)
+    numpy.testing.assert_array_equal(amcgeom.geometryVertices(wkb), vertices)
+
+
+def test_wkb_round_trip_z():
+    vertices = numpy.array([[1.0, 2.0, 3.0], [5.0, 6.0, 7.0]])
+    wkb = amcgeom.verticesToWkb(vertices)
+    assert amcgeom.geometryDimensions(wkb) == (True, False)
+    numpy.testing.assert_array_equal(amcgeom.geometryVertices(wkb), vertices)
+
+
+def test_wkb_round_trip_m():
+    vertices = numpy.array([[1.0, 2.0, 3.0], [5.0, 6.0, 7.0]])
+    wkb = amcgeom.verticesToWkb(vertices, hasZ=False, hasM=True)
+    assert amcgeom.geometryDimensions(wkb) == (False, True)
+    numpy.testing.assert_array_equal(amcgeom.geometryVertices(wkb), vertices)
+
+
+def test_wkb_round_trip_zm():
+    vertices = [[1, 2, 3, 4], [5, 6, 7, 8]]
+    wkb = amcgeom.verticesToWkb(vertices)
+    assert amcgeom.geometryDimensions(wkb) == (True, True)
+    numpy.testing.assert_array_equal(amcgeom.geometryVertices(wkb), vertices)
+
+
+def test_wkb_round_trip_keeps_parts():
+    parts = [numpy.array([[0.0, 0.0], [1.0, 1.0]]), numpy.array([[2.0, 2.0], [3.0, 3.0], [4.0, 3.0]])]
+    wkb = amcgeom.verticesToWkb(parts)
+    read = amcgeom.geometryVertices(wkb, parts=True)
+    assert len(read) == 2
+    for part, expected in zip(read, parts):
+        numpy.testing.assert_array_equal(part, expected)
+    numpy.testing.assert_array_equal(amcgeom.geometryVertices(wkb), numpy.concatenate(parts))
+
+
+def test_wkb_reverse_round_trip():
+    parts = [numpy.array([[0.0, 0.0, 1.0], [1.0, 1.0, 2.0]]), numpy.array([[1.0, 1.0, 2.0], [3.0, 3.0, 4.0]])]
+    wkb = amcgeom.verticesToWkb(parts)
+    reversedParts = [amcgeom.reverseVertices(part) for part in amcgeom.geometryVertices(wkb, parts=True)[::-1]]
+    read = amcgeom.geometryVertices(amcgeom.verticesToWkb(reversedParts, *amcgeom.geometryDimensions(wkb)))
+    numpy.testing.assert_array_equal(read, numpy.concatenate(parts)[::-1])
+
+
+def test_wkb_rejects_mismatched_flags():
+    with pytest.raises(ValueError):
+        amcgeom.verticesToWkb([[1.0, 2.0], [3.0, 4.0]], hasZ=True)
+
+
+def test_coordinate_index_find_all():
+    index = amcgeom.coordinateIndex(2)
+    index.add((10.0, 10.0), (1, False))
+    index.add((10.004, 10.0), (2, True))
+    index.add((10.5, 10.0), (3, False))
+    assert index.findAll((10.003, 10.0)) == [(2, True), (1, False)]
+    assert index.find((10.003, 10.0)) == (2, True)
+    assert index.findAll((20.0, 20.0)) == []
+
+
+def test_course_relations():
+    nan = float("nan")
+    shapetypes = ["Line", "Curve", "Curve", "Curve", "Line", "Curve", "Line"]
+    bearings = [0.0, 45.0, 45.0, 235.0, 200.0, 30.0, 77.0]
+    cs = [nan, 270.0, 0.0, 270.0, nan, 10.0, nan]
+    ce = [nan, 0.0, 90.0, 200.0, nan, 50.0, nan]
+    codes = amcgeom.courseRelations(shapetypes, bearings, cs, ce)
+    expected = [amcgeom.RELATION_LINE, amcgeom.RELATION_TANGENT, amcgeom.RELATION_COMPOUND, amcgeom.RELATION_REVERSE,
+                amcgeom.RELATION_LINE | amcgeom.RELATION_RADIAL_TO_CURVE, amcgeom.RELATION_NONTANGENT, amcgeom.RELATION_LINE | amcgeom.RELATION_NONTANGENT_TO_CURVE]
+    assert codes.tolist() == expected
+
+
+def test_course_relations_ring_heads():
+    nan = float("nan")
+    # The first course of each ring has no previous course, even when its ring closes with a curve (a line is a plain line, a curve is non-tangent)
+    codes = amcgeom.courseRelations(["Line", "Curve", "Curve", "Line"], [0.0, 45.0, 45.0, 0.0], [nan, 270.0, 270.0, nan], [nan, 0.0, 0.0, nan], [0, 0, 1, 1])
+    assert codes.tolist() == [amcgeom.RELATION_LINE, amcgeom.RELATION_TANGENT, amcgeom.RELATION_NONTANGENT, amcgeom.RELATION_LINE | amcgeom.RELATION_RADIAL_TO_CURVE]
+    assert amcgeom.previousIndex([0, 0, 1, 1]).tolist() == [-1, 0, -1, 2]
@@ -0,0 +1,87 @@
+# Tests of the AMC Planar Graph (amcgraph): boundary case classification and face courses
+import numpy
+import amcgraph, amcsynth
+
+
+def ring(points, segments):
+    points = points + [points[0]]
+    for a, b in zip(points, points[1:]):
+        segments[len(segments) + 1] = numpy.array([a, b], dtype=float)
+    return segments
+
+
+def test_classify_single():
+    graph = amcgraph.planarGraph(ring([(0, 0), (0, 10), (10, 10), (10, 0)], {}))
+    assert graph.classify() == "Single"
+    assert len(graph.boundedFaces()) == 1
+
+
+def test_classify_adjacent():
+    segments = ring([(0, 0), (0, 10), (10, 10), (10, 0)], {})
+    segments[5] = numpy.array([(10, 10), (20, 10)], dtype=float)
+    segments[6] = numpy.array([(20, 10), (20, 0)], dtype=float)
+    segments[7] = numpy.array([(20, 0), (10, 0)], dtype=float)
+    graph = amcgraph.planarGraph(segments)
+    assert graph.classify() == "Adjacent"
+    assert graph.sharedEdges() == [3]
+
+
+def test_classify_separate():
+    segments = ring([(100, 0), (100, 10), (110, 10), (110, 0)], ring([(0, 0), (0, 10), (10, 10), (10, 0)], {}))
+    graph = amcgraph.planarGraph(segments)
+    assert graph.classify() == "Separate"
+    assert graph.ncomponents == 2
+    assert graph.containment() == []
+
+
+def test_classify_not_a_part_and_holes():
+    segments = ring([(40, 40), (40, 60), (60, 60), (60, 40)], ring([(0, 0), (0, 100), (100, 100), (100, 0)], {}))
+    graph = amcgraph.planarGraph(segments)
+    assert graph.classify() == "Not a Part"
+    outer = graph.locateFace((10, 10))
+    inner = graph.locateFace((50, 50))
+    assert graph.containedFaces() == [inner]
+    assert list(graph.faceHoles()) == [outer]
+    course = graph.faceCourse(outer)
+    assert sorted(entry["oid"] for entry in course) == list(range(1, 9))
+    assert [entry["ring"] for entry in course] == [0] * 4 + [1] * 4
+
+
+def test_face_course_clockwise_from_start():
+    graph = amcgraph.planarGraph(ring([(0, 0), (0, 10), (10, 10), (10, 0)], {}))
+    course = graph.faceCourse(graph.boundedFaces()[0], "clockwise", [(10, 10)])
+    assert [entry["oid"] for entry in course] == [3, 4, 1, 2]
+    assert course[0]["start"] == (10.0, 10.0) and course[0]["end"] == (10.0, 0.0)
+    for a, b in zip(course, course[1:] + course[:1]):
+        assert a["end"] == b["start"]
+    reverse = graph.faceCourse(graph.boundedFaces()[0], "counter-clockwise", [(10, 10)])
+    assert [entry["reversed"] for entry in reverse] == [True] * 4
+
+
+def test_separate_synthetic_tract():
+    tract = amcsynth.syntheticTract(160, 0.3, parcels=20, case="Separate", seed=1)
+    graph = amcgraph.planarGraph(tract["segments"])
+    assert graph.classify() == "Separate"
+    assert len(graph.boundedFaces()) == 20
+    for f in graph.boundedFaces():
+        assert graph.locateFace(tuple(graph.faceRing(f)[:-1].mean(axis=0))) == f
+        assert len(graph.faceCourse(f, "clockwise", tract["tpob"])) == len(graph.faces[f])
+
+
+def test_line_junctions():
+    segments = ring([(0, 0), (0, 10), (20, 10), (20, 0)], {})
+    segments[5] = numpy.array([(10, 10), (10, 0)], dtype=float)
+    assert amcgraph.planarGraph(segments).openEdges() == [5]
+    assert amcgraph.lineJunctions(segments) == [(2, 10.0, 10.0, 5), (4, 10.0, 0.0, 5)]
+    assert amcgraph.lineJunctions(ring([(0, 0), (0, 10), (10, 10), (10, 0)], {})) == []
+
+
+def test_face_labels():
+    segments = ring([(0, 0), (0, 10), (10, 10), (10, 0)], {})
+    segments[5] = numpy.array([(10, 10), (20, 10)], dtype=float)
+    segments[6] = numpy.array([(20, 10), (20, 0)], dtype=float)
+    segments[7] = numpy.array([(20, 0), (10, 0)], dtype=float)
+    graph = amcgraph.planarGraph(segments)
+    labels = graph.faceLabels([(5, 5, "1"), (15, 5, "2"), (15, 6, "2A"), (50, 50, "3")])
+    assert sorted(sorted(value for x, y, value in found) for found in labels.values()) == [["1"], ["2", "2A"]]
+    assert [value for x, y, value in labels[graph.locateFace((5, 5))]] == ["1"]
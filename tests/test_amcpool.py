@@ -0,0 +1,49 @@
+# Tests of the AMC Parcel Pool (amcpool): per-parcel course processing, serial and across the process pool
+import amcgeom, amcgraph, amcpool, amcsynth
+
+
+OPTIONS = {"scalefactor": 0.99996, "tolerance": 2, "angularTolerance": 0.01, "precision": 10000, "pobstring": "POINT OF BEGINNING", "controls": False, "tpobIndex": None}
+
+
+def tractCourses(case, parcels):
+    tract = amcsynth.syntheticTract(60, 0.4, parcels=parcels, case=case, seed=1)
+    graph = amcgraph.planarGraph(tract["segments"])
+    excepted = graph.containedFaces()
+    faces = [f for f in graph.boundedFaces() if f not in excepted]
+    courses = {poid: {coid: entry for coid, entry in enumerate(graph.faceCourse(f, "clockwise", tract["tpob"]), start=1)} for poid, f in enumerate(faces, start=1)}
+    return tract, courses
+
+
+def test_parcel_course_records():
+    tract, courses = tractCourses("Single", 1)
+    result = amcpool.processCourses(tract["segments"], tract["interiors"], courses, OPTIONS)[1]
+    course = courses[1]
+    assert set(result["records"]) == set(entry["oid"] for entry in course.values())
+    first = result["records"][course[1]["oid"]]
+    assert first["tpob"] is True and first["desc_grid"].startswith("Thence from said POINT OF BEGINNING")
+    assert all(record["desc_ground"] for record in result["records"].values())
+    assert result["closure"]["Status"] == "Pass"
+
+
+def test_pool_matches_serial():
+    tract, courses = tractCourses("Adjacent", 4)
+    serial = amcpool.processCourses(tract["segments"], tract["interiors"], courses, OPTIONS, 1)
+    pooled = amcpool.processCourses(tract["segments"], tract["interiors"], courses, OPTIONS, 2)
+    assert list(serial) == list(pooled)
+    for poid in serial:
+        assert serial[poid]["reversed"] == pooled[poid]["reversed"]
+        assert serial[poid]["closure"] == pooled[poid]["closure"]
+        for oid in serial[poid]["records"]:
+            assert serial[poid]["records"][oid]["desc_grid"] == pooled[poid]["records"][oid]["desc_grid"]
+
+
+def test_every_course_begins_at_its_point_of_beginning():
+    tract, courses = tractCourses("Adjacent", 4)
+    tpobIndex = amcgeom.coordinateIndex(OPTIONS["tolerance"])
+    tpobIndex.add(tract["tpob"][0], 1)
+    results = amcpool.processCourses(tract["segments"], tract["interiors"], courses, dict(OPTIONS, pobstring="TRUE POINT OF BEGINNING", tpobIndex=tpobIndex))
+    assert set(result["pobstring"] for result in results.values()) == set(["TRUE POINT OF BEGINNING", "POINT OF BEGINNING"])
+    for poid, result in results.items():
+        first = result["records"][courses[poid][1]["oid"]]
+        assert first["tpob"] is True and first["desc_grid"].startswith("Thence from said {}".format(result["pobstring"]))
+        assert result["pobstring"] == ("TRUE POINT OF BEGINNING" if first["tpobid"] == 1 else "POINT OF BEGINNING")
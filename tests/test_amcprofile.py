@@ -0,0 +1,33 @@
+# Tests of the AMC Execution Profile (amcprofile): stage counters of the arcpy cursors, rows and geoprocessing tools
+import types
+import amcprofile
+
+
+def fakeArcpy():
+    arcpy = types.ModuleType("arcpy")
+    arcpy.GetCount_management = lambda dataset: [3]
+    arcpy.Exists = lambda dataset: True
+    arcpy.management = types.ModuleType("arcpy.management")
+    arcpy.management.GetCount = lambda dataset: [3]
+    arcpy.analysis = types.ModuleType("arcpy.analysis")
+    arcpy.analysis.Select = lambda dataset, output: output
+    arcpy.analysis.Result = type("Result", (object,), {})
+    arcpy.da = types.ModuleType("arcpy.da")
+    arcpy.da.SearchCursor = lambda dataset, fields: iter([(1,), (2,)])
+    return arcpy
+
+
+def test_counts_tools_of_toolbox_modules():
+    arcpy = amcprofile.arcpyCounter(fakeArcpy())
+    profiler = amcprofile.stageProfiler()
+    profiler.enter("stage")
+    arcpy.GetCount_management("PIQ")
+    arcpy.management.GetCount("PIQ")
+    arcpy.analysis.Select("connection.sde/PARCELS", "ParcelLayer")
+    arcpy.Exists("PIQ")
+    arcpy.analysis.Result()
+    rows = [row for row in arcpy.da.SearchCursor("ParcelLayer", ["OID@"])]
+    profiler.exit()
+    stage = profiler.summary()["Stages"]["stage"]
+    assert len(rows) == 2
+    assert (stage["Tools"], stage["Cursors"], stage["Rows"], stage["Queries"]) == (3, 1, 2, 2)
@@ -0,0 +1,44 @@
+# Tests of the AMC Result (amcresult): boundary records, response encoders, file layouts and the section reader
+import numpy, pytest
+import amcresult
+
+
+def response():
+    record = amcresult.boundaryRecord(coid=1, poid=1, tpob=True, shapetype="Line", startx=6000000.123456, starty=2200000.5, bearing=90.0, distance=100.0, desc_grid="Thence North 90°00'00\" East, 100.00 feet;")
+    record["wktpoints"] = numpy.array([[6000000.123456, 2200000.5], [6000100.123456, 2200000.5]])
+    return {"Checks": {"BoundaryChecks": "Pass"}, "Boundaries": {1: {7: record}}, "Controls": {"Tolerance": 2, "Parcels": [1]}, "LegalDescription": {"Parcels": {1: {"Grid": {"Course": "..."}}}}}
+
+
+def test_boundary_record_fields():
+    record = response()["Boundaries"][1][7]
+    assert record["radius"] is None and record["desc_ground"] is None
+    data = record.toDict(digits=2)
+    assert list(data) == amcresult.BOUNDARY_FIELDS
+    assert data["startx"] == 6000000.12 and data["bearing"] == 90.0
+    assert data["wktpoints"] == [[6000000.12, 2200000.5], [6000100.12, 2200000.5]]
+
+
+@pytest.mark.parametrize("encoder", amcresult.ENCODERS)
+@pytest.mark.parametrize("layout", amcresult.LAYOUTS)
+def test_write_and_read_response(tmp_path, encoder, layout):
+    if encoder != "json":
+        pytest.importorskip(encoder)
+    path = str(tmp_path / ("jsonResponse" + (".zip" if layout == "zip" else amcresult.EXTENSIONS[encoder])))
+    amcresult.writeResponse(response(), path, layout, encoder)
+    reader = amcresult.responseReader(path)
+    assert reader.sections() == ["Checks", "Boundaries", "Controls", "LegalDescription"]
+    assert reader["Controls"] == {"Tolerance": 2, "Parcels": [1]}
+    record = reader["Boundaries"]["1"]["7"]
+    assert record["desc_grid"] == "Thence North 90°00'00\" East, 100.00 feet;"
+    assert record["startx"] == 6000000.123456 and record["wktpoints"][1] == [6000100.123456, 2200000.5]
+    assert amcresult.readResponse(path, ["Checks"]) == {"Checks": {"BoundaryChecks": "Pass"}}
+
+
+def test_index_layout_reads_single_sections(tmp_path):
+    path = str(tmp_path / "jsonResponse.json")
+    amcresult.writeResponse(response(), path, "index")
+    reader = amcresult.responseReader(path)
+    assert reader.layout == "index"
+    assert reader.read("LegalDescription")["Parcels"]["1"]["Grid"]["Course"] == "..."
+    assert "Boundaries" not in reader.cache
+    assert reader.read("Lots", None) is None